@@ -5,7 +5,24 @@ from flask import jsonify
 
 from .config import Config
 from .sources import db, migrate
-from .routes import auth_bp, projects_bp, tasks_bp, time_entries_bp, teams_bp, users_bp
+from .routes import (
+    auth_bp, projects_bp, tasks_bp, time_entries_bp, teams_bp, users_bp, ops_bp, dashboard_bp, me_bp, search_bp, tags_bp,
+    dependencies_bp
+)
+from .cli import register_commands
+from .utils.versioning import register_change_tracking, on_versions_committed
+from .utils.cache import init_response_cache, invalidate_committed
+from .utils.token_cache import init_token_cache
+from .utils.dependency_graph import init_dependency_graphs
+from .utils.logger import configure_logging
+from .utils.metrics import use_timed_pool, init_metrics, metrics_response
+from .utils.db_logging import setup_db_logging
+from .utils.query_recorder import init_query_recorder
+from .utils.db_pool import register_pool_gauges
+from .utils.replica import init_replica
+
+# Flask-CORS options for every route; app/asgi.py applies the same to the responses it sends itself
+CORS_OPTIONS = {"origins": ["http://localhost:*", "https://taskvale.netlify.app"], "expose_headers": ["X-Read-After"]}
 
 def register_routes(app: Flask):
     """
@@ -18,17 +35,39 @@ def register_routes(app: Flask):
     app.register_blueprint(time_entries_bp)
     app.register_blueprint(teams_bp)
     app.register_blueprint(users_bp)
+    app.register_blueprint(ops_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(me_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(tags_bp)
+    app.register_blueprint(dependencies_bp)
     
     
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    configure_logging(app)
 
     # Initialize extensions
+    use_timed_pool(app)
     db.init_app(app)
     migrate.init_app(app, db)
-    CORS(app, resources={r"/*": {"origins": ["http://localhost:*", "https://taskvale.netlify.app" ]}})
+    with app.app_context():
+        init_query_recorder(app, *db.engines.values())
+        init_metrics(app)
+        for bind_key, engine in db.engines.items():
+            register_pool_gauges(engine, bind_key or "primary")
+        init_replica(app, db.engines)
+        if app.config["LOG_SQL"]:
+            setup_db_logging(db)
+    app.add_url_rule("/metrics", "metrics", metrics_response)
+    register_change_tracking()
+    init_response_cache(app)
+    on_versions_committed(invalidate_committed)
+    init_token_cache(app)
+    init_dependency_graphs(app)
+    CORS(app, resources={r"/*": CORS_OPTIONS})
 
     # CORS(app)  # Allow frontend access
     # CORS(app, resources={r"/*": {"origins": "*"}})
@@ -36,6 +75,7 @@ def create_app():
 
     # Register routes
     register_routes(app)
+    register_commands(app)
     
     # Global error handlers
     @app.errorhandler(404)
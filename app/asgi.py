@@ -0,0 +1,325 @@
+# app/asgi.py
+"""
+Optional ASGI serving mode (`uvicorn asgi:app`, see asgi.py at the repo root). The read-only list and stats
+routes in ASYNC_ROUTES are served on the event loop through SQLAlchemy's asyncio engine (asyncpg) with the
+same SQL the DAOs build. A slow list query then holds a pooled connection but no thread. Every other request,
+including all writes and streamed lists (`?stream=1`), is handed to the Flask app, which runs in a thread pool
+exactly as under gunicorn.
+
+Authentication, ETags/304s, the response cache and CORS work as in the Flask routes, and the response bodies
+are the same: like the DAOs, the list handlers splice in JSON rendered by Postgres when DB_JSON_PASSTHROUGH is
+on and build the rows in Python when it is off. Needs the packages in requirements-asgi.txt.
+"""
+import logging
+import re
+import time
+import traceback
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl
+
+import jwt
+from a2wsgi import WSGIMiddleware
+from flask import Flask
+from flask_cors.core import get_cors_headers, get_cors_options
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.http import parse_etags, quote_etag
+
+from . import CORS_OPTIONS, create_app
+from .dao import ProjectsDao, TasksDao, TeamsDao, UsersDao
+from .dao.projects import PROJECT_STATS_QUERY
+from .middleware.auth_and_log import AuthAndLogMiddleware
+from .services.project_service import ProjectService
+from .services.task_service import TaskService
+from .utils.cache import cache_tag
+from .utils.conditional import etag_for
+from .utils.logger import app_logger, request_logger, sample
+from .utils.metrics import REGISTRY
+from .utils.pagination import PaginationError, decode_datetime_cursor, parse_page_args, split_page
+from .utils.responses import page_info, raw_json_body
+from .utils.streaming import wants_stream
+from .utils.versioning import VERSIONS_QUERY, versions_from_rows
+
+
+class HandlerError(Exception):
+    """
+    An error response from an async handler, shaped like utils.responses.error_response.
+    """
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def async_database_url(url: str) -> str:
+    """
+    The same database through the asyncpg driver, e.g. postgresql://... -> postgresql+asyncpg://...
+    """
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def create_read_engine(config: dict) -> AsyncEngine:
+    """
+    Async engine for the read routes, with the sync engine's pool settings and session settings; the pool size
+    is ASYNC_DB_POOL_SIZE because one process now serves many concurrent requests.
+    """
+    options = config["SQLALCHEMY_ENGINE_OPTIONS"]
+    return create_async_engine(
+        config.get("ASYNC_DATABASE_URL") or async_database_url(config["SQLALCHEMY_DATABASE_URI"]),
+        pool_size=config.get("ASYNC_DB_POOL_SIZE", 20),
+        max_overflow=options.get("max_overflow", 5),
+        pool_timeout=options.get("pool_timeout", 30),
+        pool_recycle=options.get("pool_recycle", 1800),
+        pool_pre_ping=options.get("pool_pre_ping", True),
+        connect_args={"server_settings": {
+            "application_name": config.get("DB_APPLICATION_NAME", "tasks-api"),
+            **config.get("DB_SESSION_SETTINGS", {}),
+        }},
+    )
+
+
+class AsyncReadApp:
+    """
+    ASGI app answering ASYNC_ROUTES itself and passing everything else to `fallback` (the Flask app).
+    """
+
+    def __init__(self, flask_app: Flask, engine: AsyncEngine, fallback):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.fallback = fallback
+        self.dumps = flask_app.json.dumps
+        self.passthrough = flask_app.config.get("DB_JSON_PASSTHROUGH", False)
+        self.cache = flask_app.extensions.get("response_cache")
+        # These responses never pass through Flask-CORS, so its headers are added here from the same options;
+        # preflight OPTIONS requests are not matched and reach Flask-CORS in the Flask app
+        self.cors_options = get_cors_options(flask_app, CORS_OPTIONS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        route, match = self._match(scope)
+        if route is None:
+            return await self.fallback(scope, receive, send)
+        args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        if wants_stream(args):
+            return await self.fallback(scope, receive, send)
+
+        start = time.perf_counter()
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        status, response_headers, body = await self._respond(route, match, scope, headers, args)
+        REGISTRY.inc("http_requests_total", (route.endpoint, scope["method"], str(status)))
+        REGISTRY.observe("http_request_duration_seconds", time.perf_counter() - start, (route.endpoint, scope["method"]))
+
+        cors_headers = get_cors_headers(self.cors_options, Headers(list(headers.items())), scope["method"])
+        response_headers = [("content-type", "application/json"), ("content-length", str(len(body))), *response_headers,
+                            *((k.lower(), v) for k, v in cors_headers.items(multi=True))]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response_headers],
+        })
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    def _match(self, scope) -> Tuple[Optional["AsyncRoute"], Optional[re.Match]]:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return None, None
+        for route in ASYNC_ROUTES:
+            match = route.pattern.fullmatch(scope["path"])
+            if match:
+                return route, match
+        return None, None
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _authenticate(self, scope, headers: dict) -> Tuple[Optional[dict], Optional[tuple]]:
+        """
+        The same checks and request-log records as AuthAndLogMiddleware.authenticate_and_log.
+        Returns (claims, None) or (None, error response).
+        """
+        request_info = {"event": "before_request", "method": scope["method"], "path": scope["path"], "timestamp": time.time()}
+        token = headers.get("authorization")
+        if not token:
+            request_info["error"] = "No token provided"
+            request_logger.warning(request_info)
+            return None, self._json(401, {"message": "Authentication token is missing"})
+        if token.startswith("Bearer "):
+            token = token[7:]
+        try:
+            with self.flask_app.app_context():
+                decoded = AuthAndLogMiddleware.verify_token(token)
+        except jwt.ExpiredSignatureError:
+            request_info["error"] = "Token has expired"
+            request_logger.error(request_info)
+            return None, self._json(401, {"message": "Token has expired"})
+        except jwt.InvalidTokenError as e:
+            request_info["error"] = str(e)
+            request_logger.error(request_info)
+            return None, self._json(401, {"message": "Invalid token", "details": str(e)})
+        if sample(request_logger, logging.INFO):
+            request_info["decoded"] = dict(decoded)
+            request_logger.info(request_info, extra={"sampled": True})
+        return decoded, None
+
+    async def _respond(self, route: "AsyncRoute", match: re.Match, scope, headers: dict, args: MultiDict) -> tuple:
+        decoded, failure = self._authenticate(scope, headers)
+        if failure is not None:
+            return failure
+
+        customer_id = decoded.get("customer_id")
+        try:
+            async with self.engine.connect() as connection:
+                etag = None
+                if customer_id:
+                    # Same validator and cache key as utils.conditional.conditional_get
+                    rows = (await connection.execute(
+                        text(VERSIONS_QUERY), {"customer_id": customer_id, "scopes": sorted(route.scopes)}
+                    )).fetchall()
+                    etag = etag_for(scope["path"], args, decoded, versions_from_rows(sorted(route.scopes), rows))
+                    validators = [("etag", quote_etag(etag, weak=True)), ("cache-control", "private, no-cache")]
+                    if parse_etags(headers.get("if-none-match")).contains_weak(etag):
+                        return 304, validators, b""
+                    if route.cache and self.cache is not None and (body := self.cache.get(etag)) is not None:
+                        return 200, validators + [("x-cache", "HIT")], body
+
+                body = (await route.handler(self, connection, decoded, args, **match.groupdict())).encode("utf-8")
+        except HandlerError as e:
+            return self._json(e.status_code, {"status": "error", "message": e.message})
+        except Exception as e:
+            app_logger.error({"function": f"AsyncReadApp.{route.handler.__name__}", "error": str(e), "traceback": traceback.format_exc()})
+            return self._json(500, {"status": "error", "message": f"Failed to fetch {route.noun}: {str(e)}"})
+
+        if etag is None:
+            return 200, [], body
+        if route.cache and self.cache is not None:
+            if len(body) <= self.flask_app.config.get("RESPONSE_CACHE_MAX_ENTRY_BYTES", 1024 * 1024):
+                self.cache.set(etag, body, [cache_tag(customer_id, s) for s in route.scopes])
+            validators.append(("x-cache", "MISS"))
+        return 200, validators, body
+
+    def _json(self, status: int, payload: dict) -> tuple:
+        return status, [], self._render(payload).encode("utf-8")
+
+    def _render(self, payload: dict) -> str:
+        # What jsonify renders outside debug mode: compact separators and a trailing newline
+        return self.dumps(payload, separators=(",", ":")) + "\n"
+
+    def _success(self, data, message: str, pagination: dict = None) -> str:
+        payload = {"status": "success", "message": message, "data": data}
+        if pagination is not None:
+            payload["pagination"] = pagination
+        return self._render(payload)
+
+    # Handlers: the service-layer checks of each Flask route, then the DAO's SQL on the async connection
+
+    async def list_tasks(self, connection, decoded: dict, args: MultiDict) -> str:
+        user_id, customer_id = decoded.get("user_id"), decoded.get("customer_id")
+        if not user_id or not customer_id:
+            raise HandlerError("Unauthorized: Invalid token data", 401)
+        filters, error = TaskService.parse_list_filters(args)
+        if error:
+            raise HandlerError(error, 400)
+        limit, cursor = _page_args(args)
+        list_args = (args.get("project_id"), user_id, customer_id, decoded.get("role"), filters, limit, cursor)
+        if self.passthrough:
+            query, params = TasksDao.json_list_query(*list_args)
+            page = TasksDao.json_page((await connection.execute(text(query), params)).fetchone(), limit)
+            return raw_json_body(self.dumps, page["json"], "Tasks fetched successfully", page_info({**page, "limit": limit}))
+        query, params = TasksDao.list_query(*list_args)
+        rows = (await connection.execute(text(query), params)).fetchall()
+        rows, next_cursor = split_page(rows, limit, lambda row: (row.updated_at, row.id))
+        pagination = page_info({"next_cursor": next_cursor, "limit": limit})
+        return self._success([TasksDao._row_to_dict(row) for row in rows], "Tasks fetched successfully", pagination)
+
+    async def list_projects(self, connection, decoded: dict, args: MultiDict) -> str:
+        user_id, customer_id = decoded.get("user_id"), decoded.get("customer_id")
+        if not user_id or not customer_id:
+            raise HandlerError("Unauthorized: Invalid token data", 401)
+        limit, cursor = _page_args(args)
+        query, params = ProjectsDao.list_query(
+            customer_id, decoded.get("role"), user_id, limit, cursor, ProjectService.parse_list_filters(args)
+        )
+        rows = (await connection.execute(text(query), params)).mappings().all()
+        rows, next_cursor = split_page(rows, limit, lambda row: (row["updated_at"], row["id"]))
+        pagination = page_info({"next_cursor": next_cursor, "limit": limit})
+        return self._success([dict(row) for row in rows], "Projects fetched successfully", pagination)
+
+    async def project_stats(self, connection, decoded: dict, args: MultiDict, project_id: str) -> str:
+        customer_id = decoded.get("customer_id")
+        if not customer_id:
+            raise HandlerError("Unauthorized: Invalid token data", 401)
+        row = (await connection.execute(
+            text(PROJECT_STATS_QUERY), {"project_id": project_id, "customer_id": customer_id}
+        )).fetchone()
+        if not row:
+            raise HandlerError("Project not found or unauthorized", 404)
+        return self._success(ProjectsDao.stats_from_row(row), "Success")
+
+    async def list_teams(self, connection, decoded: dict, args: MultiDict) -> str:
+        if not decoded.get("customer_id"):
+            raise HandlerError("Unauthorized: Invalid token data", 401)
+        list_args = (decoded["customer_id"], decoded.get("role"), decoded.get("user_id"))
+        if self.passthrough:
+            query, params = TeamsDao.json_list_query(*list_args)
+            data = (await connection.execute(text(query), params)).scalar()
+            return raw_json_body(self.dumps, data, "Teams fetched successfully")
+        query, params = TeamsDao.list_query(*list_args)
+        rows = (await connection.execute(text(query), params)).fetchall()
+        return self._success([dict(row._mapping) for row in rows], "Teams fetched successfully")
+
+    async def list_users(self, connection, decoded: dict, args: MultiDict) -> str:
+        if not decoded.get("customer_id"):
+            raise HandlerError("Unauthorized: Invalid token data", 401)
+        if decoded.get("role") not in ["Admin", "Project Manager"]:
+            raise HandlerError("Insufficient permissions", 403)
+        if self.passthrough:
+            query, params = UsersDao.json_list_query(decoded["customer_id"])
+            data = (await connection.execute(text(query), params)).scalar()
+            return raw_json_body(self.dumps, data, "Users fetched successfully")
+        query, params = UsersDao.list_query(decoded["customer_id"])
+        rows = (await connection.execute(text(query), params)).fetchall()
+        return self._success([UsersDao._user_row_to_dict(row) for row in rows], "Users fetched successfully")
+
+
+def _page_args(args: MultiDict) -> tuple:
+    try:
+        limit, cursor = parse_page_args(args)
+        return limit, decode_datetime_cursor(cursor) if cursor else None
+    except PaginationError as e:
+        raise HandlerError(str(e), 400)
+
+
+class AsyncRoute:
+    def __init__(self, path: str, endpoint: str, handler, scopes: tuple, cache: bool, noun: str):
+        self.pattern = re.compile(path)
+        self.endpoint = endpoint  # the Flask endpoint name, so metrics line up across both modes
+        self.handler = handler
+        self.scopes = scopes
+        self.cache = cache
+        self.noun = noun
+
+
+# Scopes and cache flags mirror each Flask route's @conditional_get
+ASYNC_ROUTES = [
+    AsyncRoute(r"/api/v1/tasks/list", "tasks.list_tasks", AsyncReadApp.list_tasks, ("tasks",), False, "tasks"),
+    AsyncRoute(r"/api/v1/projects/list", "projects.list_projects", AsyncReadApp.list_projects, ("projects",), True, "projects"),
+    AsyncRoute(r"/api/v1/projects/(?P<project_id>[^/]+)/stats", "projects.project_stats", AsyncReadApp.project_stats,
+               ("projects", "tasks"), True, "project stats"),
+    AsyncRoute(r"/api/v1/teams/list", "teams.list_teams", AsyncReadApp.list_teams, ("teams",), True, "teams"),
+    AsyncRoute(r"/api/v1/users/list", "users.list_users", AsyncReadApp.list_users, ("users",), True, "users"),
+]
+
+
+def create_asgi_app(flask_app: Flask = None) -> AsyncReadApp:
+    flask_app = flask_app or create_app()
+    return AsyncReadApp(flask_app, create_read_engine(flask_app.config), WSGIMiddleware(flask_app))
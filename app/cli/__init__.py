@@ -0,0 +1,18 @@
+from flask import Flask
+
+from .perf import perf_cli
+from .projects import projects_cli
+from .tags import tags_cli
+from .tasks import tasks_cli
+from .time_entries import time_entries_cli
+
+
+def register_commands(app: Flask):
+    """
+    Register all `flask` CLI command groups for the application.
+    """
+    app.cli.add_command(perf_cli)
+    app.cli.add_command(projects_cli)
+    app.cli.add_command(tags_cli)
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(time_entries_cli)
@@ -0,0 +1,67 @@
+# app/cli/auth_bench.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from flask import current_app
+
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.token_cache import VerifiedTokenCache
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _worker(app, view, tokens: list, requests: int, offset: int) -> list:
+    """
+    One gthread-style worker thread: time the authenticate_and_log wrapper around a no-op view, in
+    microseconds, replaying the session tokens round-robin.
+    """
+    timings = []
+    for i in range(requests):
+        headers = {"Authorization": f"Bearer {tokens[(offset + i) % len(tokens)]}"}
+        with app.test_request_context("/bench", headers=headers):
+            start = time.perf_counter()
+            _, status = view()
+            timings.append((time.perf_counter() - start) * 1e6)
+        if status != 204:
+            raise RuntimeError(f"authentication failed with {status}")
+    return timings
+
+
+def compare_auth_paths(threads: int, requests: int, sessions: int) -> list:
+    """
+    Per-request auth overhead with every token verified by jwt.decode ("uncached") and with the verified-token
+    cache ("cached"), run on `threads` concurrent threads the way one gthread worker serves requests.
+    """
+    app = current_app._get_current_object()
+    tokens = [
+        AuthAndLogMiddleware.generate_token(str(uuid4()), "Team Member", str(uuid4()))
+        for _ in range(sessions)
+    ]
+    view = AuthAndLogMiddleware.authenticate_and_log(lambda: ("", 204))
+    original = app.extensions["token_cache"]
+    results = []
+    try:
+        for mode, max_entries in (("uncached", 0), ("cached", max(sessions, 1))):
+            cache = VerifiedTokenCache(max_entries)
+            app.extensions["token_cache"] = cache
+            _worker(app, view, tokens, sessions, 0)  # warm-up; also fills the cache once per session
+            wall_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                futures = [pool.submit(_worker, app, view, tokens, requests, n) for n in range(threads)]
+                timings = [t for future in futures for t in future.result()]
+            wall = time.perf_counter() - wall_start
+            results.append({
+                "mode": mode,
+                "requests": len(timings),
+                "p50_us": _percentile(timings, 0.50),
+                "p99_us": _percentile(timings, 0.99),
+                "throughput_rps": len(timings) / wall,
+                "hit_rate": cache.stats.snapshot()["hit_rate"],
+            })
+    finally:
+        app.extensions["token_cache"] = original
+    return results
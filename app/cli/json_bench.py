@@ -0,0 +1,69 @@
+# app/cli/json_bench.py
+import json
+import time
+from statistics import median
+
+from flask import current_app
+
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from .query_plans import sample_ids
+
+# (name, url, role); the role picks which seeded user the request is made as
+ENDPOINTS = [
+    ("tasks.list", "/api/v1/tasks/list", "Admin"),
+    ("tasks.list.paged", "/api/v1/tasks/list?limit=100", "Admin"),
+    ("tasks.list.member", "/api/v1/tasks/list", "Team Member"),
+    ("teams.list", "/api/v1/teams/list", "Admin"),
+    ("users.list", "/api/v1/users/list", "Admin"),
+]
+
+USER_KEYS = {"Admin": "admin_id", "Team Member": "member_id"}
+
+
+def _measure(client, url: str, headers: dict, requests: int) -> dict:
+    """
+    Issue `requests` GETs and report per-request process CPU time and wall time, in milliseconds.
+    Process CPU time covers only this process, so time spent inside Postgres shows up as wall time only.
+    """
+    cpu, wall = [], []
+    for _ in range(requests):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        response = client.get(url, headers=headers)
+        response.get_data()
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return {"cpu_ms": median(cpu), "wall_ms": median(wall), "bytes": len(response.get_data())}
+
+
+def compare_json_paths(prefix: str, requests: int, warmup: int) -> list:
+    """
+    Time each list endpoint with DB_JSON_PASSTHROUGH off (rows decoded and re-encoded by jsonify) and on
+    (JSON rendered by Postgres and spliced into the envelope), and check both return the same payload.
+    """
+    ids = sample_ids(prefix)
+    app = current_app._get_current_object()
+    client = app.test_client()
+    original = app.config.get("DB_JSON_PASSTHROUGH", False)
+    results = []
+    try:
+        for name, url, role in ENDPOINTS:
+            token = AuthAndLogMiddleware.generate_token(ids[USER_KEYS[role]], role, ids["customer_id"])
+            headers = {"Authorization": f"Bearer {token}"}
+            timings, payloads = {}, {}
+            for mode, passthrough in (("python", False), ("passthrough", True)):
+                app.config["DB_JSON_PASSTHROUGH"] = passthrough
+                _measure(client, url, headers, warmup)
+                timings[mode] = _measure(client, url, headers, requests)
+                payloads[mode] = json.loads(client.get(url, headers=headers).get_data())
+            results.append({
+                "endpoint": name,
+                "python": timings["python"],
+                "passthrough": timings["passthrough"],
+                "rows": len(payloads["python"].get("data", [])),
+                "identical": payloads["python"] == payloads["passthrough"],
+            })
+    finally:
+        app.config["DB_JSON_PASSTHROUGH"] = original
+    return results
@@ -0,0 +1,508 @@
+# app/cli/load_test.py
+"""
+Scripted HTTP load against a running server (gunicorn run:app, or uvicorn asgi:app) and a seeded dataset.
+
+Each virtual user signs in as a seeded user of one role, picked by ROLE_MIX, and loops over that role's
+weighted SCENARIOS until the run ends. A scenario is a short session. For example, a Team Member pages
+through tasks and then logs time, and a Project Manager creates a task with a subtask, works it and deletes
+it again. Together the scenarios cover every /api/v1 route. Write flows clean up after themselves where the
+API allows it, so repeated runs see a comparable dataset.
+
+Results are kept per route, keyed by Flask endpoint name, with throughput, p50/p95/p99 latency and error rate.
+They can be saved as a JSON baseline and compared against one.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+from sqlalchemy import text
+
+from ..sources import db
+
+# A quantile is only compared when at least this many requests in both runs lie above it (p95 needs 100
+# requests, p99 500); fewer make the tail one or two unlucky requests
+TAIL_SAMPLES = 5
+
+# Share of virtual users per role
+ROLE_MIX = {"Team Member": 0.7, "Project Manager": 0.2, "Admin": 0.1}
+
+
+class VirtualUser:
+    """
+    One simulated client: a keep-alive connection, a signed-in seeded user and the tenant's fixture ids.
+    """
+
+    def __init__(self, base_url: str, tenant: dict, user: dict, password: str, rng: random.Random, timeout: float):
+        self.parts = urlsplit(base_url)
+        self.tenant = tenant
+        self.user = user
+        self.password = password
+        self.rng = rng
+        self.timeout = timeout
+        self.token = None
+        self.recording = False
+        self.samples = defaultdict(list)  # endpoint -> [seconds, ...] for successful requests
+        self.errors = defaultdict(int)  # endpoint -> failed requests
+        self.error_samples = {}  # endpoint -> first failure seen
+        self._connect()
+
+    @property
+    def role(self) -> str:
+        return self.user["role"]
+
+    def _connect(self) -> None:
+        self.connection = http.client.HTTPConnection(self.parts.hostname, self.parts.port or 80, timeout=self.timeout)
+
+    def call(self, endpoint: str, method: str, path: str, body=None, query: dict = None,
+             content_type: str = "application/json", expect=(200,)) -> Optional[dict]:
+        """
+        Issue one request, recording its latency under `endpoint`. Returns the parsed response body on an
+        expected status, else None (counted as an error), so flows stop at the first failed step.
+        """
+        url = "/api/v1" + path + ("?" + urlencode(query) if query else "")
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        if body is not None:
+            if content_type == "application/json":
+                body = json.dumps(body)
+            headers["Content-Type"] = content_type
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, url, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()
+            self._connect()
+            return self._fail(endpoint, f"{method} {url}: {type(e).__name__}")
+        elapsed = time.perf_counter() - start
+        if status not in expect:
+            return self._fail(endpoint, f"{method} {url}: {status} {payload[:200].decode('utf-8', 'replace')}")
+        if self.recording:
+            self.samples[endpoint].append(elapsed)
+        return json.loads(payload) if payload else {}
+
+    def _fail(self, endpoint: str, detail: str) -> None:
+        if self.recording:
+            self.errors[endpoint] += 1
+            self.error_samples.setdefault(endpoint, detail)
+        return None
+
+    def login(self) -> bool:
+        self.token = None
+        data = self.call("auth.login", "POST", "/auth/login", {"email": self.user["email"], "password": self.password})
+        if data:
+            self.token = data["data"]["token"]
+        return self.token is not None
+
+    def pick(self, key: str):
+        return self.rng.choice(self.tenant[key])
+
+    def time_window(self) -> dict:
+        """
+        A plausible entry from the last month, on a minute boundary so `duration` matches exactly.
+        """
+        start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=self.rng.randint(60, 30 * 24 * 60))
+        minutes = self.rng.randint(15, 240)
+        return {
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=minutes)).isoformat(),
+            "duration": minutes,
+        }
+
+
+# Scenarios: each takes a VirtualUser and issues one short session of requests
+
+def browse_tasks(vu: VirtualUser) -> None:
+    query = {"limit": 50}
+    if vu.rng.random() < 0.3:
+        query["status"] = vu.rng.choice(["Not Started", "In Progress", "Completed"])
+    if vu.rng.random() < 0.3:
+        query["project_id"] = vu.pick("project_ids")
+    # Read the first page, then sometimes keep paging
+    for _ in range(vu.rng.randint(1, 3)):
+        page = vu.call("tasks.list_tasks", "GET", "/tasks/list", query=query)
+        cursor = page and page["pagination"]["next_cursor"]
+        if not cursor:
+            return
+        query["cursor"] = cursor
+
+
+def check_my_work(vu: VirtualUser) -> None:
+    query = {"limit": 20}
+    for _ in range(vu.rng.randint(1, 2)):
+        page = vu.call("me.list_my_work", "GET", "/me/work", query=query)
+        cursor = page and page["pagination"]["next_cursor"]
+        if not cursor:
+            return
+        query["cursor"] = cursor
+
+
+def search_work(vu: VirtualUser) -> None:
+    # Seeded titles read "Subtask 3 of Task 180 of Project 15", seeded tags "tag13"
+    terms = vu.rng.choice([f'"task {vu.rng.randint(1, 200)}"', f"tag{vu.rng.randint(0, 19)}", "project -subtask"])
+    page = vu.call("search.search", "GET", "/search", query={"q": terms, "limit": 20})
+    cursor = page and page["pagination"]["next_cursor"]
+    if cursor and vu.rng.random() < 0.3:
+        vu.call("search.search", "GET", "/search", query={"q": terms, "limit": 20, "cursor": cursor})
+
+
+def filter_by_tag(vu: VirtualUser) -> None:
+    # Pick a tag from the facets, then list the tasks carrying it
+    body = vu.call("tags.tag_facets", "GET", "/tags/facets", query={"source": "task", "limit": 10})
+    tags = [facet["tag"] for facet in body["data"]["task"]] if body else []
+    if tags:
+        vu.call("tasks.list_tasks", "GET", "/tasks/list", query={"tag": vu.rng.choice(tags), "limit": 50})
+
+
+def browse_projects(vu: VirtualUser) -> None:
+    page = vu.call("projects.list_projects", "GET", "/projects/list", query={"limit": 20})
+    projects = page["data"] if page else []
+    for project in vu.rng.sample(projects, min(2, len(projects))):
+        vu.call("projects.project_stats", "GET", f"/projects/{project['id']}/stats")
+
+
+def open_dashboard(vu: VirtualUser) -> None:
+    vu.call("dashboard.get_dashboard", "GET", "/dashboard")
+
+
+def view_teams(vu: VirtualUser) -> None:
+    vu.call("teams.list_teams", "GET", "/teams/list")
+
+
+def view_profile(vu: VirtualUser) -> None:
+    vu.call("users.get_user", "GET", f"/users/{vu.user['id']}")
+
+
+def browse_users(vu: VirtualUser) -> None:
+    users = vu.call("users.list_users", "GET", "/users/list")
+    if users and users["data"]:
+        vu.call("users.get_user", "GET", f"/users/{vu.rng.choice(users['data'])['id']}")
+
+
+def log_time(vu: VirtualUser) -> None:
+    subtask_id = vu.pick("subtask_ids")
+    created = vu.call("time_entries.create_time_entry", "POST", "/time-entries/create",
+                      {"subtask_id": subtask_id, "notes": "load test", **vu.time_window()}, expect=(201,))
+    if created and vu.rng.random() < 0.3:
+        vu.call("time_entries.update_time_entry", "PUT", f"/time-entries/update/{created['data']['timeEntry']['id']}",
+                {"subtask_id": subtask_id, "notes": "load test, corrected", **vu.time_window()})
+
+
+def review_time(vu: VirtualUser) -> None:
+    today = datetime.now(timezone.utc).date()
+    vu.call("time_entries.list_time_entries", "GET", "/time-entries/list",
+            query={"limit": 50, "start_date": (today - timedelta(days=30)).isoformat()})
+    vu.call("time_entries.time_report", "GET", "/time-entries/report", query={
+        "from": (today - timedelta(days=30)).isoformat(),
+        "to": today.isoformat(),
+        "granularity": vu.rng.choice(["day", "week"]),
+        "group_by": vu.rng.choice(["user", "project", "user,project"]),
+    })
+
+
+def import_time(vu: VirtualUser) -> None:
+    lines = [json.dumps({"subtask_id": vu.pick("subtask_ids"), **vu.time_window()}) for _ in range(5)]
+    vu.call("time_entries.import_time_entries", "POST", "/time-entries/import", "\n".join(lines) + "\n",
+            query={"format": "ndjson"}, content_type="application/x-ndjson", expect=(201,))
+
+
+def refresh_token(vu: VirtualUser) -> None:
+    data = vu.call("auth.refresh_token", "POST", "/auth/refresh")
+    if data:
+        vu.token = data["data"]["token"]
+
+
+def sign_in(vu: VirtualUser) -> None:
+    vu.login()
+
+
+def plan_work(vu: VirtualUser) -> None:
+    """
+    Create a task with a subtask, work it through to Completed, then delete both.
+    """
+    created = vu.call("tasks.create_task", "POST", "/tasks/create", {
+        "title": "Load test task", "status": "Not Started", "project_id": vu.pick("project_ids"),
+        "priority": vu.rng.choice(["Low", "Medium", "High"]), "tags": ["load"],
+    }, expect=(201,))
+    if not created:
+        return
+    task_id = created["data"]["task"]["id"]
+    subtask = vu.call("tasks.create_subtask", "POST", "/tasks/subtasks/create", {
+        "title": "Load test subtask", "status": "Not Started", "task_id": task_id, "assigned_user_id": vu.pick("user_ids"),
+    }, expect=(201,))
+    if subtask:
+        subtask_id = subtask["data"]["subtask"]["id"]
+        for status in ("In Progress", "Completed"):
+            vu.call("tasks.update_subtask", "PUT", f"/tasks/subtasks/update/{subtask_id}", {"status": status})
+        vu.call("tasks.update_task", "PUT", f"/tasks/update/{task_id}", {"status": "Completed"})
+        vu.call("tasks.delete_subtask", "DELETE", f"/tasks/subtasks/delete/{subtask_id}")
+    vu.call("tasks.delete_task", "DELETE", f"/tasks/delete/{task_id}")
+
+
+def plan_batch(vu: VirtualUser) -> None:
+    """
+    Create a few tasks and subtasks through the batch endpoints, then delete the tasks.
+    """
+    project_id = vu.pick("project_ids")
+    created = vu.call("tasks.create_tasks_batch", "POST", "/tasks/batch", {"items": [
+        {"title": f"Load test batch task {n}", "status": "Not Started", "project_id": project_id} for n in range(3)
+    ]}, expect=(201,))
+    if not created:
+        return
+    task_ids = [r["id"] for r in created["data"]["results"]]
+    vu.call("tasks.create_subtasks_batch", "POST", "/tasks/subtasks/batch", {"items": [
+        {"title": f"Load test batch subtask {n}", "status": "Not Started", "task_id": task_id}
+        for task_id in task_ids for n in range(2)
+    ]}, expect=(201,))
+    for task_id in task_ids:
+        vu.call("tasks.delete_task", "DELETE", f"/tasks/delete/{task_id}")
+
+
+def plan_dependencies(vu: VirtualUser) -> None:
+    """
+    Chain two new tasks with a dependency, read the project's dependency graph, try the edge that would close
+    a cycle, then remove the dependency and the tasks.
+    """
+    project_id = vu.pick("project_ids")
+    created = vu.call("tasks.create_tasks_batch", "POST", "/tasks/batch", {"items": [
+        {"title": f"Load test step {n}", "status": "Not Started", "project_id": project_id, "estimated_duration": 60}
+        for n in range(2)
+    ]}, expect=(201,))
+    if not created:
+        return
+    first, second = [r["id"] for r in created["data"]["results"]]
+    dependency = vu.call("dependencies.create_dependency", "POST", "/dependencies/create",
+                         {"task_id": second, "depends_on_task_id": first}, expect=(201,))
+    if dependency:
+        vu.call("projects.project_dependencies", "GET", f"/projects/{project_id}/dependencies")
+        vu.call("dependencies.create_dependency", "POST", "/dependencies/create",
+                {"task_id": first, "depends_on_task_id": second}, expect=(409,))
+        vu.call("dependencies.list_dependencies", "GET", "/dependencies/list", query={"task_id": second})
+        vu.call("dependencies.delete_dependency", "DELETE", f"/dependencies/delete/{dependency['data']['dependency']['id']}")
+    for task_id in (first, second):
+        vu.call("tasks.delete_task", "DELETE", f"/tasks/delete/{task_id}")
+
+
+def manage_project(vu: VirtualUser) -> None:
+    """
+    Create a project, edit it and archive it.
+    """
+    created = vu.call("projects.create_project", "POST", "/projects/create", {
+        "title": "Load test project", "description": "Created by the load test", "status": "Active",
+        "start_date": datetime.now(timezone.utc).date().isoformat(), "tech_stack": ["python", "postgres"],
+    }, expect=(201,))
+    if not created:
+        return
+    project_id = created["data"]["project"]["id"]
+    vu.call("projects.update_project", "PUT", f"/projects/update/{project_id}", {"status": "On Hold"})
+    vu.call("projects.archive_project", "DELETE", f"/projects/archive/{project_id}")
+
+
+def staff_team(vu: VirtualUser) -> None:
+    """
+    Create a team, add a member and remove them again.
+    """
+    created = vu.call("teams.create_team", "POST", "/teams/create",
+                      {"name": f"Load test team {uuid.uuid4().hex[:8]}", "description": "Created by the load test"},
+                      expect=(201,))
+    if not created:
+        return
+    team_id, user_id = created["data"]["team"]["id"], vu.pick("user_ids")
+    if vu.call("teams.add_team_member", "POST", f"/teams/{team_id}/members", {"user_id": user_id}, expect=(201,)) is not None:
+        vu.call("teams.remove_team_member", "DELETE", f"/teams/{team_id}/members/{user_id}")
+
+
+def register_user(vu: VirtualUser) -> None:
+    # Joins the virtual user's own seeded customer (matched by email domain), so `flask perf purge` removes it
+    name = f"{vu.tenant['prefix']}_load_{uuid.uuid4().hex[:12]}"
+    vu.call("auth.register", "POST", "/auth/register", {
+        "username": name, "email": f"{name}@{vu.tenant['domain']}", "password": vu.password, "role": "Team Member",
+    }, expect=(201,))
+
+
+def check_ops(vu: VirtualUser) -> None:
+    for endpoint, path in (
+        ("ops.cache_stats", "/ops/cache"),
+        ("ops.token_cache_stats", "/ops/token-cache"),
+        ("ops.logging_pipeline_stats", "/ops/logging"),
+        ("ops.metrics_summary", "/ops/metrics"),
+        ("ops.replica_status", "/ops/replica"),
+    ):
+        vu.call(endpoint, "GET", path)
+
+
+# role -> [(weight, scenario), ...]
+SCENARIOS = {
+    "Team Member": [
+        (20, browse_tasks), (10, check_my_work), (5, search_work), (15, browse_projects), (5, open_dashboard),
+        (5, view_teams), (5, view_profile), (15, log_time), (10, review_time), (2, import_time), (3, refresh_token),
+        (1, sign_in),
+    ],
+    "Project Manager": [
+        (20, browse_tasks), (5, check_my_work), (5, search_work), (5, filter_by_tag), (15, browse_projects),
+        (5, open_dashboard), (5, view_teams), (5, review_time), (10, plan_work), (5, plan_batch), (3, plan_dependencies),
+        (3, manage_project), (3, staff_team), (5, log_time), (2, refresh_token), (1, sign_in),
+    ],
+    "Admin": [
+        (15, browse_tasks), (5, search_work), (5, filter_by_tag), (10, browse_projects), (5, open_dashboard),
+        (10, browse_users), (5, view_teams), (5, review_time), (5, plan_work), (3, manage_project), (5, check_ops),
+        (1, register_user), (1, sign_in),
+    ],
+}
+
+
+def load_tenants(prefix: str, customers: Optional[int] = None) -> list:
+    """
+    Fixture ids for each seeded customer: its users by role and a sample of projects and subtasks.
+    """
+    rows = db.session.execute(text("""
+        SELECT id, domain FROM customers WHERE domain LIKE :prefix || '%' ORDER BY domain LIMIT :customers
+    """), {"prefix": prefix, "customers": customers}).fetchall()
+    if not rows:
+        raise RuntimeError(f"No seeded customer found for prefix '{prefix}'; run `flask perf seed` first")
+    tenants = []
+    for customer_id, domain in rows:
+        params = {"customer_id": customer_id}
+        users = [dict(r._mapping) for r in db.session.execute(text("""
+            SELECT id, email, role FROM users
+            WHERE customer_id = :customer_id AND username NOT LIKE '%\\_load\\_%'
+        """), params)]
+        tenants.append({
+            "prefix": prefix,
+            "customer_id": customer_id,
+            "domain": domain,
+            "users": users,
+            "user_ids": [u["id"] for u in users],
+            "project_ids": db.session.execute(text("""
+                SELECT id FROM projects WHERE customer_id = :customer_id AND is_archived IS NOT TRUE
+                  AND title <> 'Load test project'
+            """), params).scalars().all(),
+            "subtask_ids": db.session.execute(text("""
+                SELECT s.id FROM subtasks s JOIN tasks t ON t.id = s.task_id
+                WHERE t.customer_id = :customer_id
+                ORDER BY s.id LIMIT 500
+            """), params).scalars().all(),
+        })
+    db.session.rollback()
+    return tenants
+
+
+def _quantile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] if sorted_values else 0.0
+
+
+def summarize_samples(samples: list, errors: int, seconds: float) -> dict:
+    samples = sorted(samples)
+    total = len(samples) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput_rps": total / seconds if seconds else 0.0,
+        "p50_ms": _quantile(samples, 0.50) * 1000,
+        "p95_ms": _quantile(samples, 0.95) * 1000,
+        "p99_ms": _quantile(samples, 0.99) * 1000,
+    }
+
+
+def run_load(base_url: str, prefix: str, users: int, duration: float, warmup: float, seed: int,
+             customers: Optional[int] = None, timeout: float = 30.0) -> dict:
+    """
+    Run `users` virtual users against `base_url` for `warmup` + `duration` seconds and summarize the timed part.
+    """
+    tenants = load_tenants(prefix, customers)
+    rng = random.Random(seed)
+    roles = list(ROLE_MIX)
+    vus = []
+    for n in range(users):
+        tenant = tenants[n % len(tenants)]
+        role = rng.choices(roles, weights=[ROLE_MIX[r] for r in roles])[0]
+        candidates = [u for u in tenant["users"] if u["role"] == role] or tenant["users"]
+        vus.append(VirtualUser(base_url, tenant, rng.choice(candidates), prefix, random.Random(rng.random()), timeout))
+
+    stop_at = {}
+
+    def drive(vu: VirtualUser) -> None:
+        if not vu.login():
+            return
+        weights, scenarios = zip(*SCENARIOS[vu.role])
+        while time.perf_counter() < stop_at["end"]:
+            vu.recording = time.perf_counter() >= stop_at["warm"]
+            vu.rng.choices(scenarios, weights=weights)[0](vu)
+
+    start = time.perf_counter()
+    stop_at.update(warm=start + warmup, end=start + warmup + duration)
+    threads = [threading.Thread(target=drive, args=(vu,), daemon=True) for vu in vus]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - stop_at["warm"]
+
+    samples, errors, error_samples = defaultdict(list), defaultdict(int), {}
+    for vu in vus:
+        for endpoint, values in vu.samples.items():
+            samples[endpoint].extend(values)
+        for endpoint, count in vu.errors.items():
+            errors[endpoint] += count
+        for endpoint, detail in vu.error_samples.items():
+            error_samples.setdefault(endpoint, detail)
+        vu.connection.close()
+
+    endpoints = sorted(set(samples) | set(errors))
+    return {
+        "config": {
+            "users": users,
+            "duration": duration,
+            "warmup": warmup,
+            "seed": seed,
+            "prefix": prefix,
+            "customers": len(tenants),
+            "role_mix": ROLE_MIX,
+            "roles": {role: sum(1 for vu in vus if vu.role == role) for role in roles},
+        },
+        "total": summarize_samples([s for v in samples.values() for s in v], sum(errors.values()), elapsed),
+        "endpoints": {e: summarize_samples(samples.get(e, []), errors.get(e, 0), elapsed) for e in endpoints},
+        "error_samples": error_samples,
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float, min_delta_ms: float, min_requests: int) -> list:
+    """
+    Regressions against a saved run. A route's latency counts when p95 or p99 grew by more than `tolerance`
+    (relative) and by more than `min_delta_ms`, provided both runs have TAIL_SAMPLES requests above that
+    quantile. Errors count when the error rate rose by more than one percentage point. Routes with fewer than
+    `min_requests` requests in either run are skipped. Throughput is judged on the total only, because a route's share of requests depends on which
+    scenarios the virtual users happened to pick.
+    """
+    regressions = []
+    if results["total"]["throughput_rps"] < baseline["total"]["throughput_rps"] * (1 - tolerance):
+        regressions.append(
+            f"total: throughput {baseline['total']['throughput_rps']:.1f} -> {results['total']['throughput_rps']:.1f} req/s"
+        )
+    for endpoint, before in {"total": baseline["total"], **baseline["endpoints"]}.items():
+        after = results["total"] if endpoint == "total" else results["endpoints"].get(endpoint)
+        if after is None:
+            if before["requests"] >= min_requests:
+                regressions.append(f"{endpoint}: not exercised in this run")
+            continue
+        requests = min(before["requests"], after["requests"])
+        if requests < min_requests:
+            continue
+        for key, q in (("p95_ms", 0.95), ("p99_ms", 0.99)):
+            if requests * (1 - q) < TAIL_SAMPLES:
+                continue
+            delta = after[key] - before[key]
+            if delta > min_delta_ms and after[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{endpoint}: {key} {before[key]:.1f} -> {after[key]:.1f}")
+        if after["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{endpoint}: error rate {before['error_rate']:.2%} -> {after['error_rate']:.2%}")
+    return regressions
@@ -0,0 +1,220 @@
+# app/cli/microbench.py
+"""
+Database-free microbenchmarks of the pure-Python work on the request hot paths. Each case builds its input
+in memory at every size in SIZES (rows, objects or calls) and times the code the request path runs on it:
+
+- the DAO row-to-dict loops
+- the model to_dict() methods
+- jsonify of a task list
+- token verification
+- task field sanitation
+
+Timings are the median of several repeats, reported per batch and per item, so results can be saved and
+compared between commits.
+"""
+import platform
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+import jwt
+from flask import current_app
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from ..dao import TasksDao, UsersDao
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..models import Subtask, Task, TimeEntry, User
+from ..services.task_service import TaskService
+from ..utils.responses import success_response
+from ..utils.token_cache import VerifiedTokenCache
+
+SIZES = (1, 100, 10000)
+
+# Repeats per case stop at whichever comes first: MAX_REPEATS, or TARGET_SECONDS spent (but at least MIN_REPEATS)
+MIN_REPEATS = 3
+MAX_REPEATS = 50
+TARGET_SECONDS = 0.5
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+TASK_COLUMNS = (
+    "id", "customer_id", "project_id", "category_id", "title", "description", "status", "priority", "due_date",
+    "tags", "estimated_duration", "actual_duration", "start_date", "end_date", "created_at", "updated_at",
+    "subtasks", "subtask_total", "subtask_completed",
+)
+
+USER_COLUMNS = ("id", "customer_id", "username", "email", "password_hash", "role", "created_at", "updated_at", "teams")
+
+
+def _rows(columns: tuple, values: List[tuple]) -> list:
+    """
+    SQLAlchemy Row objects, as a Result hands them to the DAOs, without a database.
+    """
+    return IteratorResult(SimpleResultMetaData(columns), iter(values)).all()
+
+
+def _subtask_docs(task_id: str, count: int = 5) -> list:
+    return [{
+        "id": str(uuid4()), "task_id": task_id, "title": f"Subtask {n}", "status": "In Progress",
+        "assigned_user_id": str(uuid4()), "assigned_team_id": None, "due_date": NOW.isoformat(),
+        "tags": ["backend"], "estimated_duration": 60, "created_at": NOW.isoformat(), "updated_at": NOW.isoformat(),
+    } for n in range(count)]
+
+
+def task_rows(size: int) -> list:
+    values = []
+    for n in range(size):
+        task_id = str(uuid4())
+        values.append((
+            task_id, str(uuid4()), str(uuid4()), None, f"Task {n}", "Synthetic task for benchmarking",
+            "In Progress", "Medium", NOW + timedelta(days=7), ["backend", "api"], 480, 120,
+            NOW - timedelta(days=3), None, NOW - timedelta(days=5), NOW - timedelta(minutes=n),
+            _subtask_docs(task_id), 5, 2,
+        ))
+    return _rows(TASK_COLUMNS, values)
+
+
+def user_rows(size: int) -> list:
+    return _rows(USER_COLUMNS, [(
+        str(uuid4()), str(uuid4()), f"user_{n}", f"user_{n}@example.com", "scrypt:32768:8:1$salt$hash",
+        "Team Member", NOW - timedelta(days=30), NOW, [{"id": str(uuid4()), "name": "Team 1"}],
+    ) for n in range(size)])
+
+
+def task_models(size: int) -> list:
+    return [Task(
+        id=str(uuid4()), customer_id=str(uuid4()), project_id=str(uuid4()), title=f"Task {n}",
+        description="Synthetic task for benchmarking", status="In Progress", priority="Medium",
+        due_date=NOW + timedelta(days=7), tags=["backend", "api"], estimated_duration=480, actual_duration=120,
+        start_date=NOW - timedelta(days=3), created_at=NOW - timedelta(days=5), updated_at=NOW,
+    ) for n in range(size)]
+
+
+def subtask_models(size: int) -> list:
+    return [Subtask(
+        id=str(uuid4()), task_id=str(uuid4()), title=f"Subtask {n}", description="", status="Not Started",
+        assigned_user_id=str(uuid4()), due_date=NOW + timedelta(days=2), tags=["backend"], estimated_duration=60,
+        created_at=NOW, updated_at=NOW,
+    ) for n in range(size)]
+
+
+def time_entry_models(size: int) -> list:
+    return [TimeEntry(
+        id=str(uuid4()), customer_id=str(uuid4()), user_id=str(uuid4()), subtask_id=str(uuid4()),
+        start_time=NOW - timedelta(hours=2), end_time=NOW, duration=120, notes="Benchmarking", created_at=NOW,
+    ) for _ in range(size)]
+
+
+def user_models(size: int) -> list:
+    return [User(
+        id=str(uuid4()), customer_id=str(uuid4()), username=f"user_{n}", email=f"user_{n}@example.com",
+        role="Team Member", created_at=NOW - timedelta(days=30), updated_at=NOW,
+    ) for n in range(size)]
+
+
+def task_payloads(size: int) -> list:
+    return [{
+        "title": f"Task {n}", "status": "Not Started", "project_id": str(uuid4()), "estimated_duration": "480",
+        "actual_duration": 0, "due_date": "2026-02-01T17:00:00", "tags": ["backend", "api"],
+    } for n in range(size)]
+
+
+def tokens(size: int) -> list:
+    return [AuthAndLogMiddleware.generate_token(str(uuid4()), "Team Member", str(uuid4())) for _ in range(size)]
+
+
+def _jsonify_tasks(dicts: list) -> None:
+    response, _ = success_response(data=dicts, message="Tasks fetched successfully")
+    response.get_data()
+
+
+def _decode_all(token_list: list) -> None:
+    secret = current_app.config["JWT_SECRET_KEY"]
+    for token in token_list:
+        jwt.decode(token, secret, algorithms=["HS256"])
+
+
+def _verify_all_cached(token_list: list) -> None:
+    for token in token_list:
+        AuthAndLogMiddleware.verify_token(token)
+
+
+def _warm_token_cache(token_list: list) -> list:
+    current_app.extensions["token_cache"] = VerifiedTokenCache(max(len(token_list), 1))
+    _verify_all_cached(token_list)
+    return token_list
+
+
+# (name, build input for a size, code under test); the code under test gets the built input
+CASES = [
+    ("tasks_dao.row_to_dict", task_rows, lambda rows: [TasksDao._row_to_dict(row) for row in rows]),
+    ("users_dao.row_to_dict", user_rows, lambda rows: [UsersDao._user_row_to_dict(row) for row in rows]),
+    ("task.to_dict", task_models, lambda models: [m.to_dict() for m in models]),
+    ("subtask.to_dict", subtask_models, lambda models: [m.to_dict() for m in models]),
+    ("time_entry.to_dict", time_entry_models, lambda models: [m.to_dict() for m in models]),
+    ("user.to_dict", user_models, lambda models: [m.to_dict() for m in models]),
+    ("jsonify.task_list", lambda size: [TasksDao._row_to_dict(row) for row in task_rows(size)], _jsonify_tasks),
+    ("jwt.decode", tokens, _decode_all),
+    ("verify_token.cached", lambda size: _warm_token_cache(tokens(size)), _verify_all_cached),
+    ("task_service.sanitize_fields", task_payloads,
+     lambda payloads: [TaskService._sanitize_task_fields(p) for p in payloads]),
+]
+
+
+def time_case(fn: Callable, data) -> List[float]:
+    """
+    Seconds per call of fn(data): one untimed warm-up, then repeats until MAX_REPEATS or TARGET_SECONDS.
+    """
+    fn(data)
+    timings, spent = [], 0.0
+    while len(timings) < MAX_REPEATS and (len(timings) < MIN_REPEATS or spent < TARGET_SECONDS):
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+        spent += timings[-1]
+    return timings
+
+
+def run_microbenchmarks(sizes: tuple = SIZES, only: Optional[tuple] = None) -> dict:
+    app = current_app._get_current_object()
+    original = app.extensions["token_cache"]
+    results = []
+    try:
+        for name, build, fn in CASES:
+            if only and name not in only:
+                continue
+            for size in sizes:
+                timings = time_case(fn, build(size))
+                results.append({
+                    "case": name,
+                    "size": size,
+                    "repeats": len(timings),
+                    "median_ms": median(timings) * 1000,
+                    "min_ms": min(timings) * 1000,
+                    "per_item_us": median(timings) / size * 1e6,
+                })
+    finally:
+        app.extensions["token_cache"] = original
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare_microbenchmarks(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Cases whose median per-item time grew by more than `tolerance` (relative) against the baseline.
+    """
+    before = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for after in results["results"]:
+        previous = before.get((after["case"], after["size"]))
+        if previous and after["per_item_us"] > previous["per_item_us"] * (1 + tolerance):
+            regressions.append(
+                f"{after['case']}[{after['size']}]: {previous['per_item_us']:.2f}us -> {after['per_item_us']:.2f}us per item"
+            )
+    return regressions
@@ -0,0 +1,285 @@
+# app/cli/perf.py
+import json
+import os
+
+import click
+from flask.cli import AppGroup
+from werkzeug.security import generate_password_hash
+
+from .seed import seed_dataset, purge_dataset
+from .query_plans import collect_plans, check_plans, updated_budgets
+from .query_budgets import check_write_budgets
+from .json_bench import compare_json_paths
+from .auth_bench import compare_auth_paths
+from .microbench import CASES as MICRO_CASES, SIZES as MICRO_SIZES, run_microbenchmarks, compare_microbenchmarks
+from .load_test import run_load, compare_to_baseline
+from .serving_bench import ENDPOINTS as SERVING_ENDPOINTS, compare_serving_modes, concurrency_limit
+
+perf_cli = AppGroup("perf", help="Performance tooling: synthetic data, query-plan checks and load tests.")
+
+DEFAULT_BUDGETS_PATH = os.path.join("benchmarks", "plan_budgets.json")
+DEFAULT_LOAD_BASELINE_PATH = os.path.join("benchmarks", "load_baseline.json")
+DEFAULT_MICRO_BASELINE_PATH = os.path.join("benchmarks", "microbench_baseline.json")
+
+
+@perf_cli.command("seed")
+@click.option("--prefix", default="perf", show_default=True, help="Namespace for seeded customers; reused by purge/explain.")
+@click.option("--customers", default=2, show_default=True)
+@click.option("--users", default=50, show_default=True, help="Users per customer (first is Admin).")
+@click.option("--managers", default=3, show_default=True, help="Project Managers among the users.")
+@click.option("--teams", default=5, show_default=True, help="Teams per customer.")
+@click.option("--projects", default=20, show_default=True, help="Projects per customer.")
+@click.option("--tasks-per-project", default=200, show_default=True)
+@click.option("--subtasks-per-task", default=5, show_default=True)
+@click.option("--entries-per-subtask", default=2, show_default=True, help="Time entries per subtask.")
+@click.option("--purge", is_flag=True, help="Delete an existing dataset with the same prefix first.")
+def seed(prefix, customers, users, managers, teams, projects, tasks_per_project, subtasks_per_task, entries_per_subtask, purge):
+    """Generate a synthetic multi-tenant dataset with set-based INSERT ... SELECT statements."""
+    if purge:
+        purge_dataset(prefix)
+    params = {
+        "prefix": prefix,
+        "customers": customers,
+        "users": max(users, managers + 2),
+        "managers": managers,
+        "teams": max(teams, 1),
+        "projects": projects,
+        "tasks_per_project": tasks_per_project,
+        "subtasks_per_task": subtasks_per_task,
+        "entries_per_subtask": entries_per_subtask,
+        # Every seeded user shares this password so load scenarios can log in.
+        "password_hash": generate_password_hash(prefix),
+    }
+    click.echo(f"Seeding dataset '{prefix}'")
+    seed_dataset(params, echo=click.echo)
+
+
+@perf_cli.command("purge")
+@click.option("--prefix", default="perf", show_default=True)
+def purge(prefix):
+    """Delete a dataset created by `flask perf seed`."""
+    purge_dataset(prefix)
+    click.echo(f"Purged dataset '{prefix}'")
+
+
+@perf_cli.command("explain")
+@click.option("--prefix", default="perf", show_default=True, help="Seeded dataset to probe.")
+@click.option("--budgets", "budgets_path", default=DEFAULT_BUDGETS_PATH, show_default=True, type=click.Path())
+@click.option("--seq-scan-min-rows", default=5000, show_default=True, help="Seq Scans over tables at least this large fail.")
+@click.option("--tolerance", default=0.25, show_default=True, help="Allowed cost growth over the stored budget.")
+@click.option("--update-budgets", is_flag=True, help="Write the current plan costs as the new budgets.")
+@click.option("--verbose", is_flag=True, help="Print every statement with its cost.")
+def explain(prefix, budgets_path, seq_scan_min_rows, tolerance, update_budgets, verbose):
+    """EXPLAIN every DAO statement and service ORM lookup; exit non-zero on plan regressions."""
+    records = collect_plans(prefix)
+
+    if verbose:
+        for record in records:
+            click.echo(f"{record['plan']['Total Cost']:>12.1f}  {record['key']}  {record['statement'][:120]}")
+
+    budgets = {}
+    if os.path.exists(budgets_path):
+        with open(budgets_path) as f:
+            budgets = json.load(f)
+
+    if update_budgets:
+        budgets = updated_budgets(records, budgets)
+        with open(budgets_path, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        click.echo(f"Wrote {len(budgets)} budgets to {budgets_path}")
+        return
+
+    violations = check_plans(records, budgets, seq_scan_min_rows, tolerance)
+    click.echo(f"Checked {len(records)} statements from {len({r['probe'] for r in records})} probes")
+    if violations:
+        for violation in violations:
+            click.echo(f"FAIL {violation}", err=True)
+        raise SystemExit(1)
+    click.echo("All query plans within budget")
+
+
+@perf_cli.command("query-budgets")
+@click.option("--prefix", default="perf", show_default=True, help="Seeded dataset to write to; its users sign in with the prefix as password.")
+def query_budgets(prefix):
+    """Send each write route's most expensive request and exit non-zero if it exceeds its @query_budget."""
+    records = check_write_budgets(prefix, prefix)
+    click.echo(f"{'scenario':<24}{'status':>7}{'statements':>12}{'budget':>8}")
+    for record in records:
+        budget = record.get("budget")
+        click.echo(f"{record['scenario']:<24}{record['status']:>7}{record.get('statements', 0):>12}"
+                   f"{budget if budget is not None else '-':>8}")
+    violations = [record for record in records if "violation" in record]
+    if violations:
+        for record in violations:
+            click.echo(f"FAIL {record['scenario']}: {record['violation']}", err=True)
+            for shape in record.get("shapes", []):
+                click.echo(f"    {shape['count']}x {shape['statement']}", err=True)
+        raise SystemExit(1)
+    click.echo("All write routes within their query budgets")
+
+
+@perf_cli.command("json-bench")
+@click.option("--prefix", default="perf", show_default=True, help="Seeded dataset to request.")
+@click.option("--requests", default=50, show_default=True, help="Timed requests per endpoint and mode.")
+@click.option("--warmup", default=5, show_default=True)
+@click.option("--output", type=click.Path(), help="Also write the results as JSON to this file.")
+def json_bench(prefix, requests, warmup, output):
+    """Compare CPU time per list request with and without database-rendered JSON."""
+    results = compare_json_paths(prefix, requests, warmup)
+    click.echo(f"{'endpoint':<20}{'rows':>7}{'python cpu':>13}{'passthru cpu':>14}{'speedup':>9}{'python wall':>13}{'passthru wall':>15}  same")
+    for r in results:
+        speedup = r["python"]["cpu_ms"] / r["passthrough"]["cpu_ms"] if r["passthrough"]["cpu_ms"] else float("inf")
+        click.echo(
+            f"{r['endpoint']:<20}{r['rows']:>7}{r['python']['cpu_ms']:>11.2f}ms{r['passthrough']['cpu_ms']:>12.2f}ms"
+            f"{speedup:>8.1f}x{r['python']['wall_ms']:>11.2f}ms{r['passthrough']['wall_ms']:>13.2f}ms  {'yes' if r['identical'] else 'NO'}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if not all(r["identical"] for r in results):
+        raise SystemExit(1)
+
+
+@perf_cli.command("auth-bench")
+@click.option("--threads", default=4, show_default=True, help="Concurrent request threads, as in gunicorn --threads.")
+@click.option("--requests", default=2000, show_default=True, help="Requests per thread and mode.")
+@click.option("--sessions", default=50, show_default=True, help="Distinct tokens replayed round-robin.")
+def auth_bench(threads, requests, sessions):
+    """Compare per-request authentication overhead with and without the verified-token cache."""
+    results = compare_auth_paths(threads, requests, sessions)
+    click.echo(f"{'mode':<10}{'requests':>10}{'p50':>11}{'p99':>11}{'req/s':>10}{'hit rate':>10}")
+    for r in results:
+        click.echo(
+            f"{r['mode']:<10}{r['requests']:>10}{r['p50_us']:>9.1f}us{r['p99_us']:>9.1f}us"
+            f"{r['throughput_rps']:>10.0f}{r['hit_rate']:>10.2%}"
+        )
+
+
+@perf_cli.command("serving-bench")
+@click.option("--prefix", default="perf", show_default=True, help="Seeded dataset to request.")
+@click.option("--sync-url", default="http://127.0.0.1:5000", show_default=True, help="gunicorn serving run:app.")
+@click.option("--async-url", default="http://127.0.0.1:8000", show_default=True, help="uvicorn serving asgi:app.")
+@click.option("--concurrency", default="4,16,64,128", show_default=True, help="Comma-separated client counts.")
+@click.option("--requests", default=50, show_default=True, help="Requests per client and level.")
+@click.option("--timeout", default=10.0, show_default=True, help="Per-request timeout in seconds; timeouts count as errors.")
+@click.option("--p99-slo-ms", default=500.0, show_default=True, help="p99 a level must stay under to count as sustained.")
+@click.option("--endpoint", "endpoints", multiple=True, type=click.Choice([e[0] for e in SERVING_ENDPOINTS]),
+              help="Restrict the request mix (repeatable); default all read routes.")
+@click.option("--output", type=click.Path(), help="Also write the results as JSON to this file.")
+def serving_bench(prefix, sync_url, async_url, concurrency, requests, timeout, p99_slo_ms, endpoints, output):
+    """Compare tail latency and sustainable concurrency of the sync (WSGI) and async (ASGI) read paths."""
+    levels = sorted({int(c) for c in concurrency.split(",") if c.strip()})
+    servers = {"sync": sync_url, "async": async_url}
+    results = compare_serving_modes(prefix, servers, levels, requests, timeout, endpoints)
+    click.echo(f"{'mode':<7}{'clients':>8}{'requests':>10}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>9}")
+    for r in results:
+        click.echo(
+            f"{r['mode']:<7}{r['concurrency']:>8}{r['requests']:>10}{r['errors']:>8}"
+            f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms{r['throughput_rps']:>9.0f}"
+        )
+    for mode in servers:
+        limit = concurrency_limit([r for r in results if r["mode"] == mode], p99_slo_ms)
+        click.echo(f"{mode}: highest concurrency without errors and p99 <= {p99_slo_ms:.0f}ms: {limit or 'none'}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+def _echo_load_row(name: str, after: dict, before: dict = None) -> None:
+    line = (
+        f"{name:<34}{after['requests']:>8}{after['error_rate']:>8.2%}{after['p50_ms']:>9.1f}{after['p95_ms']:>9.1f}"
+        f"{after['p99_ms']:>9.1f}{after['throughput_rps']:>9.1f}"
+    )
+    if before is not None:
+        def change(key):
+            return f"{(after[key] - before[key]) / before[key]:>+8.0%}" if before[key] else f"{'n/a':>8}"
+        line += f"{change('p95_ms')}{change('p99_ms')}{change('throughput_rps')}"
+    click.echo(line)
+
+
+@perf_cli.command("load")
+@click.option("--url", "base_url", default="http://127.0.0.1:5000", show_default=True, help="Server under test.")
+@click.option("--prefix", default="perf", show_default=True, help="Seeded dataset to use; its users sign in with the prefix as password.")
+@click.option("--customers", type=int, help="Spread virtual users over the first N seeded customers (default all).")
+@click.option("--users", default=20, show_default=True, help="Concurrent virtual users.")
+@click.option("--duration", default=60.0, show_default=True, help="Timed seconds.")
+@click.option("--warmup", default=10.0, show_default=True, help="Untimed seconds before the timed part.")
+@click.option("--seed", default=1, show_default=True, help="Random seed for role assignment and scenario choice.")
+@click.option("--baseline", "baseline_path", default=DEFAULT_LOAD_BASELINE_PATH, show_default=True, type=click.Path())
+@click.option("--update-baseline", is_flag=True, help="Save this run as the baseline instead of comparing.")
+@click.option("--tolerance", default=0.25, show_default=True, help="Relative change in p95/p99/throughput reported as a regression.")
+@click.option("--min-delta-ms", default=5.0, show_default=True, help="Latency increases smaller than this are never regressions.")
+@click.option("--min-requests", default=50, show_default=True, help="Routes with fewer requests than this are not judged.")
+@click.option("--output", type=click.Path(), help="Also write this run as JSON to this file.")
+def load(base_url, prefix, customers, users, duration, warmup, seed, baseline_path, update_baseline, tolerance,
+         min_delta_ms, min_requests, output):
+    """Run the role-mixed HTTP scenarios against a live server and compare with the saved baseline."""
+    results = run_load(base_url, prefix, users, duration, warmup, seed, customers)
+    baseline = None
+    if not update_baseline and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    header = f"{'endpoint':<34}{'requests':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}"
+    click.echo(header + (f"{'Δp95':>8}{'Δp99':>8}{'Δreq/s':>8}" if baseline else ""))
+    before = baseline["endpoints"] if baseline else {}
+    for name, after in results["endpoints"].items():
+        _echo_load_row(name, after, before.get(name) if baseline else None)
+    _echo_load_row("total", results["total"], baseline["total"] if baseline else None)
+    for name, detail in results["error_samples"].items():
+        click.echo(f"error {name}: {detail}", err=True)
+
+    for path in filter(None, [output, baseline_path if update_baseline else None]):
+        with open(path, "w") as f:
+            json.dump({k: v for k, v in results.items() if k != "error_samples"}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if update_baseline:
+        click.echo(f"Wrote baseline to {baseline_path}")
+        return
+    if baseline is None:
+        click.echo(f"No baseline at {baseline_path}; record one with --update-baseline")
+        return
+    if baseline["config"] != results["config"]:
+        click.echo("Note: run settings differ from the baseline's; compare with care", err=True)
+    regressions = compare_to_baseline(results, baseline, tolerance, min_delta_ms, min_requests)
+    if regressions:
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+        raise SystemExit(1)
+    click.echo("No regressions against the baseline")
+
+
+@perf_cli.command("micro")
+@click.option("--size", "sizes", multiple=True, type=int, help=f"Input sizes (repeatable); default {', '.join(map(str, MICRO_SIZES))}.")
+@click.option("--case", "cases", multiple=True, type=click.Choice([c[0] for c in MICRO_CASES]), help="Run only these cases (repeatable).")
+@click.option("--baseline", "baseline_path", default=DEFAULT_MICRO_BASELINE_PATH, show_default=True, type=click.Path())
+@click.option("--update-baseline", is_flag=True, help="Save this run as the baseline instead of comparing.")
+@click.option("--tolerance", default=0.25, show_default=True, help="Relative growth in per-item time reported as a regression.")
+@click.option("--output", type=click.Path(), help="Also write this run as JSON to this file.")
+def micro(sizes, cases, baseline_path, update_baseline, tolerance, output):
+    """Time the pure-Python hot paths (row mapping, to_dict, jsonify, JWT, validation); no database needed."""
+    results = run_microbenchmarks(tuple(sizes) or MICRO_SIZES, cases)
+    click.echo(f"{'case':<30}{'size':>7}{'repeats':>9}{'median':>12}{'per item':>12}")
+    for r in results["results"]:
+        click.echo(f"{r['case']:<30}{r['size']:>7}{r['repeats']:>9}{r['median_ms']:>10.3f}ms{r['per_item_us']:>10.2f}us")
+
+    for path in filter(None, [output, baseline_path if update_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if update_baseline:
+        click.echo(f"Wrote baseline to {baseline_path}")
+        return
+    if not os.path.exists(baseline_path):
+        click.echo(f"No baseline at {baseline_path}; record one with --update-baseline")
+        return
+    with open(baseline_path) as f:
+        regressions = compare_microbenchmarks(results, json.load(f), tolerance)
+    if regressions:
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+        raise SystemExit(1)
+    click.echo("No regressions against the baseline")
@@ -0,0 +1,33 @@
+# app/cli/projects.py
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from ..dao import ProjectMetricsDao
+
+projects_cli = AppGroup("projects", help="Project maintenance commands.")
+
+
+@projects_cli.command("snapshot-metrics")
+@click.option("--customer-id", default=None, help="Only snapshot this customer's projects.")
+@click.option("--every", type=float, default=None,
+              help="Keep running and take a snapshot every this many seconds (otherwise take one and exit).")
+def snapshot_metrics(customer_id, every):
+    """Record each project's current metrics into project_metrics, skipping unchanged values."""
+    hourly_rate = current_app.config.get("PROJECT_HOURLY_RATE")
+    while True:
+        written = ProjectMetricsDao.snapshot_metrics(hourly_rate, customer_id)
+        click.echo(f"Recorded {written} changed metric value(s)")
+        if not every:
+            return
+        time.sleep(every)
+
+
+@projects_cli.command("rebuild-metric-counters")
+@click.option("--customer-id", default=None, help="Only rebuild this customer's counters.")
+def rebuild_metric_counters(customer_id):
+    """Recompute the project metric counters from the task counters and the daily time rollups."""
+    projects = ProjectMetricsDao.rebuild_counters(customer_id)
+    click.echo(f"Rebuilt metric counters for {projects} project(s)")
@@ -0,0 +1,156 @@
+# app/cli/query_budgets.py
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from flask import current_app, request, request_finished
+from sqlalchemy import text
+
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..sources import db
+from ..utils.query_recorder import current_recorder
+from .query_plans import sample_ids
+
+
+def build_write_scenarios(ids: dict, admin_email: str, password: str) -> list:
+    """
+    Each scenario is (name, role, expected status, callable). The callable takes the test client and the
+    Authorization headers for the role and sends one request down the route's most expensive valid path:
+    status changes that touch the parent task, new assignees to validate, subtasks that are dependency
+    prerequisites, a dependency graph that is not cached yet, a registration that creates its customer.
+    Later scenarios use the rows earlier ones created, and the last ones delete them again.
+    """
+    start = (datetime.utcnow() - timedelta(days=1)).replace(microsecond=0)
+    created = {}
+
+    def entry(subtask_id: str) -> dict:
+        return {
+            "subtask_id": subtask_id,
+            "start_time": start.isoformat() + "Z",
+            "end_time": (start + timedelta(minutes=30)).isoformat() + "Z",
+            "duration": 30,
+        }
+
+    def data(response) -> dict:
+        return (response.get_json() or {}).get("data") or {}
+
+    def create_task(client, headers):
+        response = client.post("/api/v1/tasks/create", headers=headers, json={
+            "title": "budget probe", "status": "Not Started", "project_id": ids["project_id"],
+            "tags": ["budget", "probe"], "estimated_duration": 60,
+        })
+        created["task_id"] = data(response).get("task", {}).get("id")
+        return response
+
+    def create_tasks_batch(client, headers):
+        return client.post("/api/v1/tasks/batch", headers=headers, json={"items": [
+            {"title": f"budget probe {i}", "status": "Not Started", "project_id": ids["project_id"], "tags": ["budget"]}
+            for i in range(3)
+        ]})
+
+    def create_subtask(client, headers):
+        response = client.post("/api/v1/tasks/subtasks/create", headers=headers, json={
+            "title": "budget probe", "status": "Not Started", "task_id": created["task_id"],
+            "assigned_user_id": ids["member_id"], "assigned_team_id": ids["team_id"],
+        })
+        created["subtask_id"] = data(response).get("subtask", {}).get("id")
+        return response
+
+    def create_subtasks_batch(client, headers):
+        return client.post("/api/v1/tasks/subtasks/batch", headers=headers, json={"items": [
+            {"title": f"budget probe {i}", "status": "Completed", "task_id": created["task_id"],
+             "assigned_user_id": ids["member_id"], "assigned_team_id": ids["team_id"]}
+            for i in range(3)
+        ]})
+
+    def create_dependency(client, headers):
+        # Makes the new subtask a prerequisite, so its update and delete stage graph changes too
+        response = client.post("/api/v1/dependencies/create", headers=headers, json={
+            "task_id": ids["task_id"], "depends_on_subtask_id": created["subtask_id"],
+        })
+        created["dependency_id"] = data(response).get("dependency", {}).get("id")
+        return response
+
+    def update_subtask(client, headers):
+        # Leaves "Not Started" with new assignees: the parent task's status and start_date change as well
+        return client.put(f"/api/v1/tasks/subtasks/update/{created['subtask_id']}", headers=headers, json={
+            "title": "budget probe (started)", "status": "In Progress",
+            "assigned_user_id": ids["manager_id"], "assigned_team_id": ids["team_id"],
+        })
+
+    def update_task(client, headers):
+        return client.put(f"/api/v1/tasks/update/{created['task_id']}", headers=headers, json={
+            "title": "budget probe (done)", "status": "Completed", "tags": ["budget"],
+        })
+
+    return [
+        ("auth.register", None, 201, lambda client, headers: client.post("/api/v1/auth/register", json={
+            "username": f"budget_{uuid4().hex[:8]}", "email": f"budget@{uuid4().hex[:12]}.example",
+            "password": "budget", "role": "Admin",
+        })),
+        ("auth.login", None, 200, lambda client, headers: client.post("/api/v1/auth/login", json={
+            "email": admin_email, "password": password,
+        })),
+        ("tasks.create", "Admin", 201, create_task),
+        ("tasks.batch", "Admin", 201, create_tasks_batch),
+        ("subtasks.create", "Admin", 201, create_subtask),
+        ("subtasks.batch", "Admin", 201, create_subtasks_batch),
+        ("dependencies.create", "Admin", 201, create_dependency),
+        ("subtasks.update", "Admin", 200, update_subtask),
+        ("tasks.update", "Admin", 200, update_task),
+        ("time_entries.create", "Team Member", 201, lambda client, headers: client.post(
+            "/api/v1/time-entries/create", headers=headers, json=entry(ids["subtask_id"]))),
+        # Moves the entry to a seeded subtask: one left on the probe subtask would block its delete below
+        ("time_entries.update", "Team Member", 200, lambda client, headers: client.put(
+            f"/api/v1/time-entries/update/{ids['time_entry_id']}", headers=headers, json=entry(ids["subtask_id"]))),
+        ("dependencies.delete", "Admin", 200, lambda client, headers: client.delete(
+            f"/api/v1/dependencies/delete/{created['dependency_id']}", headers=headers)),
+        ("subtasks.delete", "Admin", 200, lambda client, headers: client.delete(
+            f"/api/v1/tasks/subtasks/delete/{created['subtask_id']}", headers=headers)),
+        ("tasks.delete", "Admin", 200, lambda client, headers: client.delete(
+            f"/api/v1/tasks/delete/{created['task_id']}", headers=headers)),
+        ("users.revoke_sessions", "Admin", 200, lambda client, headers: client.post(
+            f"/api/v1/users/{ids['member_id']}/revoke-sessions", headers=headers)),
+    ]
+
+
+def check_write_budgets(prefix: str, password: str) -> list:
+    """
+    Send every write scenario through the full request stack and compare the statements each request
+    recorded with its route's @query_budget. Returns one record per scenario; `violation` is set when
+    the route went over its budget, has none, or answered with an unexpected status.
+    """
+    app = current_app._get_current_object()
+    ids = sample_ids(prefix)
+    admin_email = db.session.execute(text("SELECT email FROM users WHERE id = :id"), {"id": ids["admin_id"]}).scalar()
+    db.session.rollback()
+    users = {"Admin": ids["admin_id"], "Project Manager": ids["manager_id"], "Team Member": ids["member_id"]}
+
+    finished = {}
+
+    def on_finished(sender, response, **extra):
+        recorder = current_recorder()
+        view = sender.view_functions.get(request.endpoint)
+        finished["statements"] = recorder.count if recorder is not None else 0
+        finished["budget"] = getattr(view, "query_budget", None)
+        finished["shapes"] = recorder.shapes() if recorder is not None else []
+
+    records = []
+    client = app.test_client()
+    with request_finished.connected_to(on_finished, app):
+        for name, role, expected, scenario in build_write_scenarios(ids, admin_email, password):
+            headers = {}
+            if role:
+                token = AuthAndLogMiddleware.generate_token(users[role], role, ids["customer_id"])
+                headers["Authorization"] = f"Bearer {token}"
+            finished.clear()
+            response = scenario(client, headers)
+            record = {"scenario": name, "status": response.status_code, **finished}
+            if record.get("budget") is None:
+                record["violation"] = "route declares no @query_budget"
+            elif record["statements"] > record["budget"]:
+                record["violation"] = f"{record['statements']} statements, budget {record['budget']}"
+            elif response.status_code != expected:
+                body = response.get_json(silent=True) or {}
+                record["violation"] = f"status {response.status_code}, expected {expected}: {body.get('message') or body.get('error')}"
+            records.append(record)
+    return records
@@ -0,0 +1,264 @@
+# app/cli/query_plans.py
+import hashlib
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from flask import current_app
+from sqlalchemy import event, text
+
+from ..sources import db
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Stable identifier for a statement shape: whitespace-collapsed SQL, hashed.
+    """
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+@contextmanager
+def capture_statements():
+    """
+    Record every statement (and its driver-level parameters) executed on the engine inside the block.
+    """
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def sample_ids(prefix: str) -> dict:
+    """
+    Pick representative rows from the seeded dataset for the probes to query with.
+    """
+    row = db.session.execute(text("""
+        SELECT cu.id AS customer_id,
+               (SELECT id FROM users WHERE customer_id = cu.id AND role = 'Admin' LIMIT 1) AS admin_id,
+               (SELECT id FROM users WHERE customer_id = cu.id AND role = 'Project Manager' LIMIT 1) AS manager_id,
+               (SELECT id FROM users WHERE customer_id = cu.id AND role = 'Team Member' LIMIT 1) AS member_id,
+               (SELECT id FROM teams WHERE customer_id = cu.id LIMIT 1) AS team_id
+        FROM customers cu
+        WHERE cu.domain LIKE :prefix || '%'
+        ORDER BY cu.id
+        LIMIT 1
+    """), {"prefix": prefix}).mappings().first()
+    if not row:
+        raise RuntimeError(f"No seeded customer found for prefix '{prefix}'; run `flask perf seed` first")
+    ids = dict(row)
+    ids["project_id"] = db.session.execute(text(
+        "SELECT id FROM projects WHERE customer_id = :c AND is_archived IS NOT TRUE LIMIT 1"
+    ), {"c": ids["customer_id"]}).scalar()
+    ids["task_id"] = db.session.execute(text(
+        "SELECT id FROM tasks WHERE project_id = :p LIMIT 1"
+    ), {"p": ids["project_id"]}).scalar()
+    ids["subtask_id"] = db.session.execute(text(
+        "SELECT id FROM subtasks WHERE task_id = :t LIMIT 1"
+    ), {"t": ids["task_id"]}).scalar()
+    ids["time_entry_id"] = db.session.execute(text(
+        "SELECT id FROM time_entries WHERE customer_id = :c AND user_id = :u LIMIT 1"
+    ), {"c": ids["customer_id"], "u": ids["member_id"]}).scalar()
+    db.session.rollback()
+    return ids
+
+
+def build_probes(ids: dict) -> list:
+    """
+    Each probe is (name, role, user_id, callable). The callable runs with `request.decoded` set for the
+    given role, so services and DAOs issue exactly the statements they issue in production.
+    """
+    from ..dao import DependenciesDao, ProjectsDao, TasksDao, TeamsDao, UsersDao
+    from ..services.auth_service import AuthService
+    from ..services.dashboard_service import DashboardService
+    from ..services.dependency_service import DependencyService
+    from ..services.project_service import ProjectService
+    from ..services.search_service import SearchService
+    from ..services.tag_service import TagService
+    from ..services.task_service import TaskService
+    from ..services.team_service import TeamService
+    from ..services.time_entry_service import TimeEntryService
+    from ..utils.versioning import current_versions
+
+    c = ids["customer_id"]
+    now = datetime.utcnow()
+    start = (now - timedelta(days=1)).replace(microsecond=0)
+    entry = {
+        "subtask_id": ids["subtask_id"],
+        "start_time": start.isoformat() + "Z",
+        "end_time": (start + timedelta(minutes=45)).isoformat() + "Z",
+        "duration": 45,
+    }
+    created = {}
+
+    def create_task():
+        result, _ = TaskService.create_task({"title": "plan probe", "status": "Not Started", "project_id": ids["project_id"]})
+        created["task_id"] = result["task"]["id"]
+
+    def create_subtask():
+        result, _ = TaskService.create_subtask({
+            "title": "plan probe", "status": "Not Started", "task_id": created["task_id"],
+            "assigned_user_id": ids["member_id"], "assigned_team_id": ids["team_id"],
+        })
+        created["subtask_id"] = result["subtask"]["id"]
+
+    def create_dependency():
+        result, _ = DependencyService.create_dependency({"task_id": created["task_id"], "depends_on_task_id": ids["task_id"]})
+        created["dependency_id"] = result["dependency"]["id"]
+
+    def register():
+        AuthService.register({
+            "username": f"probe_{uuid4().hex[:8]}", "email": f"probe_{uuid4().hex[:8]}@{ids['customer_id'][:8]}.example",
+            "password": "probe", "role": "Team Member",
+        })
+
+    return [
+        ("versions.current", "Admin", ids["admin_id"], lambda: current_versions(c, ["projects", "tasks"])),
+        ("projects.list", "Admin", ids["admin_id"], lambda: ProjectService.list_projects({})),
+        ("projects.list.manager.paged", "Project Manager", ids["manager_id"], lambda: ProjectService.list_projects({"limit": "20"})),
+        ("projects.list.tech_stack", "Admin", ids["admin_id"], lambda: ProjectService.list_projects({"tech_stack": "python,go"})),
+        ("projects.stats", "Admin", ids["admin_id"], lambda: ProjectsDao.fetch_project_stats(ids["project_id"], c)),
+        ("dashboard", "Admin", ids["admin_id"], lambda: DashboardService.get_dashboard({})),
+        ("dashboard.manager", "Project Manager", ids["manager_id"], lambda: DashboardService.get_dashboard({})),
+        ("projects.metrics", "Admin", ids["admin_id"], lambda: ProjectService.get_project_metrics(
+            ids["project_id"], {"from": (now - timedelta(days=90)).isoformat(), "step": "1d"})),
+        ("tasks.list.project", "Admin", ids["admin_id"], lambda: TasksDao.list_tasks(ids["project_id"], ids["admin_id"], c, "Admin")),
+        ("tasks.list.paged", "Admin", ids["admin_id"], lambda: TaskService.list_tasks(None, {"limit": "50"})),
+        ("tasks.list.filtered", "Admin", ids["admin_id"], lambda: TaskService.list_tasks(
+            ids["project_id"], {"status": "In Progress", "priority": "High", "assignee": ids["member_id"], "limit": "50"})),
+        ("tasks.list.member", "Team Member", ids["member_id"], lambda: TasksDao.list_tasks(None, ids["member_id"], c, "Team Member", limit=50)),
+        ("tasks.my_work", "Team Member", ids["member_id"], lambda: TaskService.list_my_work({"limit": "50"})),
+        ("search", "Admin", ids["admin_id"], lambda: SearchService.search({"q": "task 180"})),
+        ("search.member", "Team Member", ids["member_id"], lambda: SearchService.search({"q": "task 180"})),
+        ("tasks.list.tag_all", "Admin", ids["admin_id"], lambda: TaskService.list_tasks(None, {"tag_all": "tag3,sprint3", "limit": "50"})),
+        ("tags.facets", "Admin", ids["admin_id"], lambda: TagService.get_facets({})),
+        ("tags.facets.project", "Admin", ids["admin_id"], lambda: TagService.get_facets({"project_id": ids["project_id"]})),
+        ("dependencies.graph", "Admin", ids["admin_id"], lambda: DependenciesDao.fetch_graph(ids["project_id"], c)),
+        ("dependencies.list", "Admin", ids["admin_id"], lambda: DependencyService.list_dependencies({"project_id": ids["project_id"]})),
+        ("dependencies.list.member", "Team Member", ids["member_id"], lambda: DependencyService.list_dependencies({"project_id": ids["project_id"]})),
+        ("tasks.list.json", "Admin", ids["admin_id"], lambda: TasksDao.list_tasks(None, ids["admin_id"], c, "Admin", limit=50, as_json=True)),
+        ("teams.list", "Admin", ids["admin_id"], lambda: TeamsDao.fetch_teams(c, "Admin", ids["admin_id"])),
+        ("teams.list.member", "Team Member", ids["member_id"], lambda: TeamsDao.fetch_teams(c, "Team Member", ids["member_id"])),
+        ("teams.list.json", "Admin", ids["admin_id"], lambda: TeamsDao.fetch_teams(c, "Admin", ids["admin_id"], as_json=True)),
+        ("users.list", "Admin", ids["admin_id"], lambda: UsersDao.fetch_users(c, "Admin")),
+        ("users.list.json", "Admin", ids["admin_id"], lambda: UsersDao.fetch_users(c, "Admin", as_json=True)),
+        ("users.get", "Admin", ids["admin_id"], lambda: UsersDao.fetch_user(ids["member_id"], c, "Admin", ids["admin_id"])),
+        ("time_entries.list.project", "Admin", ids["admin_id"], lambda: TimeEntryService.list_time_entries(ids["project_id"], None, None, {"limit": "100"})),
+        ("time_entries.list.member", "Team Member", ids["member_id"], lambda: TimeEntryService.list_time_entries(
+            None, (now - timedelta(days=7)).isoformat() + "Z", now.isoformat() + "Z", {"limit": "100"})),
+        ("time_entries.report", "Admin", ids["admin_id"], lambda: TimeEntryService.get_report({
+            "from": (now - timedelta(days=90)).date().isoformat(), "to": now.date().isoformat(),
+            "granularity": "week", "group_by": "project"})),
+        ("time_entries.report.member", "Team Member", ids["member_id"], lambda: TimeEntryService.get_report({
+            "from": (now - timedelta(days=30)).date().isoformat(), "to": now.date().isoformat(), "granularity": "day"})),
+        ("tasks.create", "Admin", ids["admin_id"], create_task),
+        ("tasks.update", "Admin", ids["admin_id"], lambda: TaskService.update_task(created["task_id"], {"status": "In Progress"})),
+        ("subtasks.create", "Admin", ids["admin_id"], create_subtask),
+        ("subtasks.update", "Admin", ids["admin_id"], lambda: TaskService.update_subtask(created["subtask_id"], {"status": "In Progress"})),
+        ("dependencies.create", "Admin", ids["admin_id"], create_dependency),
+        ("dependencies.delete", "Admin", ids["admin_id"], lambda: DependencyService.delete_dependency(created["dependency_id"])),
+        ("time_entries.create", "Team Member", ids["member_id"], lambda: TimeEntryService.create_time_entry(dict(entry))),
+        ("time_entries.update", "Team Member", ids["member_id"], lambda: TimeEntryService.update_time_entry(ids["time_entry_id"], dict(entry))),
+        ("teams.add_member", "Admin", ids["admin_id"], lambda: TeamService.add_team_member(ids["team_id"], {"user_id": ids["manager_id"]})),
+        ("teams.remove_member", "Admin", ids["admin_id"], lambda: TeamService.remove_team_member(ids["team_id"], ids["manager_id"])),
+        ("auth.register", None, None, register),
+        ("auth.login", None, None, lambda: AuthService.login({"email": "nobody@example.invalid", "password": "x"})),
+        ("subtasks.delete", "Admin", ids["admin_id"], lambda: TaskService.delete_subtask(created["subtask_id"])),
+        ("tasks.delete", "Admin", ids["admin_id"], lambda: TaskService.delete_task(created["task_id"])),
+    ]
+
+
+def explain(statement: str, parameters) -> dict:
+    with db.engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def iter_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def table_sizes() -> dict:
+    rows = db.session.execute(text("""
+        SELECT c.relname, c.reltuples
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema() AND c.relkind = 'r'
+    """)).fetchall()
+    db.session.rollback()
+    return {row.relname: row.reltuples for row in rows}
+
+
+def collect_plans(prefix: str) -> list:
+    """
+    Run every probe, EXPLAIN each statement it issued and return one record per statement.
+    """
+    ids = sample_ids(prefix)
+    records = []
+    for name, role, user_id, probe in build_probes(ids):
+        with current_app.test_request_context():
+            from flask import request
+            request.decoded = {"user_id": user_id, "customer_id": ids["customer_id"], "role": role}
+            with capture_statements() as captured:
+                probe()
+            db.session.rollback()
+            db.session.remove()
+        for statement, parameters in captured:
+            records.append({
+                "probe": name,
+                "key": f"{name}:{fingerprint(statement)}",
+                "statement": re.sub(r"\s+", " ", statement).strip(),
+                "plan": explain(statement, parameters),
+            })
+    return records
+
+
+def check_plans(records: list, budgets: dict, seq_scan_min_rows: int, tolerance: float) -> list:
+    """
+    Return human-readable violations: sequential scans over large tables, and plans whose
+    total cost exceeds the stored budget by more than `tolerance`. A budget entry may list
+    tables in `allow_seq_scan` where a full scan is the expected plan.
+    """
+    sizes = table_sizes()
+    violations = []
+    for record in records:
+        budget = budgets.get(record["key"], {})
+        allowed = set(budget.get("allow_seq_scan", []))
+        for node in iter_nodes(record["plan"]):
+            relation = node.get("Relation Name")
+            if node["Node Type"] == "Seq Scan" and relation not in allowed and sizes.get(relation, 0) >= seq_scan_min_rows:
+                violations.append(f"{record['key']}: Seq Scan on {relation} (~{int(sizes[relation])} rows)")
+        cost = record["plan"]["Total Cost"]
+        if "cost" not in budget:
+            violations.append(f"{record['key']}: no stored budget (cost {cost:.1f}); run with --update-budgets")
+        elif cost > budget["cost"] * (1 + tolerance):
+            violations.append(f"{record['key']}: cost {cost:.1f} exceeds budget {budget['cost']:.1f}")
+    return violations
+
+
+def updated_budgets(records: list, budgets: dict) -> dict:
+    """
+    Budgets for the current plans, keeping any hand-written seq-scan allowances for statements that still exist.
+    """
+    updated = {}
+    for record in records:
+        entry = {k: v for k, v in budgets.get(record["key"], {}).items() if k != "cost"}
+        entry["cost"] = round(record["plan"]["Total Cost"], 2)
+        updated[record["key"]] = entry
+    return updated
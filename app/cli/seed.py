@@ -0,0 +1,190 @@
+# app/cli/seed.py
+from sqlalchemy import text
+from ..sources import db
+from ..utils.db_pool import lift_statement_timeout
+
+# Every seeded id is md5(<parent id> || <tag> || <n>)::uuid, so children can reference their parents with
+# plain expressions instead of lookups and the whole dataset is built with a handful of INSERT ... SELECT statements.
+SEED_STATEMENTS = [
+    ("customers", """
+        INSERT INTO customers (id, name, contact_email, domain, plan, billing_status, time_zone, created_at, updated_at)
+        SELECT md5(:prefix || ':c:' || c)::uuid::text,
+               'Perf Customer ' || c,
+               'owner@' || :prefix || c || '.example',
+               :prefix || c || '.example',
+               'Enterprise', 'Active', 'UTC', now(), now()
+        FROM generate_series(1, :customers) AS c
+    """),
+    ("users", """
+        INSERT INTO users (id, customer_id, username, email, password_hash, role, created_at, updated_at)
+        SELECT md5(cu.id || ':u:' || n)::uuid::text,
+               cu.id,
+               :prefix || '_' || substr(cu.id, 1, 8) || '_' || n,
+               :prefix || '_' || n || '@' || cu.domain,
+               :password_hash,
+               (CASE WHEN n = 1 THEN 'Admin'
+                     WHEN n <= 1 + :managers THEN 'Project Manager'
+                     ELSE 'Team Member' END)::user_role,
+               now(), now()
+        FROM customers cu
+        CROSS JOIN generate_series(1, :users) AS n
+        WHERE cu.domain LIKE :prefix || '%'
+    """),
+    ("teams", """
+        INSERT INTO teams (id, customer_id, name, description, created_at, updated_at)
+        SELECT md5(cu.id || ':t:' || n)::uuid::text, cu.id, 'Team ' || n, 'Seeded team', now(), now()
+        FROM customers cu
+        CROSS JOIN generate_series(1, :teams) AS n
+        WHERE cu.domain LIKE :prefix || '%'
+    """),
+    ("team_members", """
+        INSERT INTO team_members (user_id, team_id, joined_at)
+        SELECT md5(cu.id || ':u:' || n)::uuid::text,
+               md5(cu.id || ':t:' || (n % :teams + 1))::uuid::text,
+               now()
+        FROM customers cu
+        CROSS JOIN generate_series(2, :users) AS n
+        WHERE cu.domain LIKE :prefix || '%'
+    """),
+    ("projects", """
+        INSERT INTO projects (id, customer_id, title, description, project_manager_id, status, start_date,
+                              budget, goals, milestones, tech_stack, repository_url, is_archived, created_at, updated_at)
+        SELECT md5(cu.id || ':p:' || n)::uuid::text,
+               cu.id,
+               'Project ' || n,
+               'Seeded project',
+               md5(cu.id || ':u:' || (n % (:managers + 1) + 1))::uuid::text,
+               'Active',
+               now() - interval '180 days',
+               100000, '{}'::json, '{}'::json,
+               ARRAY['python', 'postgres', (ARRAY['react', 'vue', 'svelte'])[n % 3 + 1]]::varchar[],
+               '', (n % 10 = 0),
+               now() - (n || ' minutes')::interval,
+               now() - (n || ' minutes')::interval
+        FROM customers cu
+        CROSS JOIN generate_series(1, :projects) AS n
+        WHERE cu.domain LIKE :prefix || '%'
+    """),
+    ("tasks", """
+        INSERT INTO tasks (id, customer_id, project_id, title, description, status, priority, due_date, tags,
+                           estimated_duration, actual_duration, created_at, updated_at)
+        SELECT md5(p.id || ':k:' || n)::uuid::text,
+               p.customer_id,
+               p.id,
+               'Task ' || n || ' of ' || p.title,
+               'Seeded task description ' || n,
+               (ARRAY['Not Started', 'In Progress', 'Completed'])[n % 3 + 1]::task_status,
+               (ARRAY['Low', 'Medium', 'High'])[n % 3 + 1]::task_priority,
+               now() + ((n % 90) || ' days')::interval,
+               ARRAY['tag' || (n % 20), 'sprint' || (n % 6)]::varchar[],
+               60 * (n % 8 + 1), 0,
+               now() - ((n * 7) || ' minutes')::interval,
+               now() - ((n * 7) || ' minutes')::interval
+        FROM projects p
+        CROSS JOIN generate_series(1, :tasks_per_project) AS n
+        WHERE p.customer_id IN (SELECT id FROM customers WHERE domain LIKE :prefix || '%')
+    """),
+    ("subtasks", """
+        INSERT INTO subtasks (id, task_id, title, description, status, assigned_user_id, assigned_team_id, due_date,
+                              tags, estimated_duration, created_at, updated_at)
+        SELECT md5(t.id || ':s:' || n)::uuid::text,
+               t.id,
+               'Subtask ' || n || ' of ' || t.title,
+               'Seeded subtask description',
+               (ARRAY['Not Started', 'In Progress', 'Completed'])[(abs(hashtext(t.id)) + n) % 3 + 1]::subtask_status,
+               CASE WHEN n % 4 = 0 THEN NULL
+                    ELSE md5(t.customer_id || ':u:' || ((abs(hashtext(t.id)) + n) % :users + 1))::uuid::text END,
+               CASE WHEN n % 4 = 0 THEN md5(t.customer_id || ':t:' || (abs(hashtext(t.id)) % :teams + 1))::uuid::text END,
+               t.due_date - (n || ' hours')::interval,
+               ARRAY['tag' || ((abs(hashtext(t.id)) + n) % 20)]::varchar[],
+               30 * n,
+               t.created_at, t.updated_at
+        FROM tasks t
+        CROSS JOIN generate_series(1, :subtasks_per_task) AS n
+        WHERE t.customer_id IN (SELECT id FROM customers WHERE domain LIKE :prefix || '%')
+    """),
+    ("time_entries", """
+        INSERT INTO time_entries (id, customer_id, user_id, subtask_id, start_time, end_time, duration, notes, created_at)
+        SELECT md5(s.id || ':e:' || n)::uuid::text,
+               t.customer_id,
+               COALESCE(s.assigned_user_id, md5(t.customer_id || ':u:1')::uuid::text),
+               s.id,
+               date_trunc('minute', now()) - ((abs(hashtext(s.id || n)) % 2160) || ' hours')::interval,
+               date_trunc('minute', now()) - ((abs(hashtext(s.id || n)) % 2160) || ' hours')::interval
+                   + ((n * 15) || ' minutes')::interval,
+               n * 15,
+               NULL,
+               now()
+        FROM subtasks s
+        JOIN tasks t ON t.id = s.task_id
+        CROSS JOIN generate_series(1, :entries_per_subtask) AS n
+        WHERE t.customer_id IN (SELECT id FROM customers WHERE domain LIKE :prefix || '%')
+    """),
+    # 90 days of metric history at 6-hour snapshots, as `flask projects snapshot-metrics` would leave it
+    ("project_metrics", """
+        INSERT INTO project_metrics (id, project_id, metric_type, value, recorded_at)
+        SELECT md5(p.id || ':m:' || m.metric_type || ':' || n)::uuid::text,
+               p.id,
+               m.metric_type,
+               CASE m.metric_type WHEN 'Task Completion' THEN round(100.0 * n / 360, 2) ELSE n * 4.5 END,
+               date_trunc('hour', now() AT TIME ZONE 'UTC') - ((360 - n) * 6 || ' hours')::interval
+        FROM projects p
+        CROSS JOIN unnest(ARRAY['Task Completion', 'Time Spent']::metric_type[]) AS m(metric_type)
+        CROSS JOIN generate_series(1, 360) AS n
+        WHERE p.customer_id IN (SELECT id FROM customers WHERE domain LIKE :prefix || '%')
+    """),
+]
+
+
+def seed_dataset(params: dict, echo=print) -> dict:
+    """
+    Insert a synthetic dataset described by `params` and refresh planner statistics.
+    Returns the number of rows inserted per table.
+    """
+    counts = {}
+    lift_statement_timeout()
+    for table, statement in SEED_STATEMENTS:
+        result = db.session.execute(text(statement), params)
+        counts[table] = result.rowcount
+        echo(f"  {table}: {result.rowcount} rows")
+    db.session.commit()
+
+    # Subtasks and time entries are inserted in bulk, bypassing the services, so bring the per-task
+    # counters, the daily rollups and the project metric counters in line afterwards.
+    from ..dao import ProjectMetricsDao, TasksDao, TimeEntriesDao
+    TasksDao.repair_subtask_counters()
+    TimeEntriesDao.rebuild_rollups()
+    ProjectMetricsDao.rebuild_counters()
+
+    # tag_counts needs no repair: its triggers count the bulk inserts as well
+    lift_statement_timeout()
+    derived = ["time_entry_daily_rollups", "project_metric_counters", "tag_counts"]
+    for table in [table for table, _ in SEED_STATEMENTS] + derived:
+        db.session.execute(text(f"ANALYZE {table}"))
+    db.session.commit()
+    return counts
+
+
+def purge_dataset(prefix: str) -> None:
+    """
+    Delete every row created by seed_dataset for the given prefix.
+    """
+    customers = "SELECT id FROM customers WHERE domain LIKE :prefix || '%'"
+    tasks = f"SELECT id FROM tasks WHERE customer_id IN ({customers})"
+    lift_statement_timeout()
+    for statement in (
+        f"DELETE FROM time_entry_daily_rollups WHERE customer_id IN ({customers})",
+        f"DELETE FROM project_metric_counters WHERE customer_id IN ({customers})",
+        f"DELETE FROM project_metrics WHERE project_id IN (SELECT id FROM projects WHERE customer_id IN ({customers}))",
+        f"DELETE FROM time_entries WHERE customer_id IN ({customers})",
+        f"DELETE FROM subtasks WHERE task_id IN ({tasks})",
+        f"DELETE FROM tasks WHERE customer_id IN ({customers})",
+        f"DELETE FROM projects WHERE customer_id IN ({customers})",
+        f"DELETE FROM team_members WHERE team_id IN (SELECT id FROM teams WHERE customer_id IN ({customers}))",
+        f"DELETE FROM teams WHERE customer_id IN ({customers})",
+        f"DELETE FROM users WHERE customer_id IN ({customers})",
+        f"DELETE FROM resource_versions WHERE customer_id IN ({customers})",
+        "DELETE FROM customers WHERE domain LIKE :prefix || '%'",
+    ):
+        db.session.execute(text(statement), {"prefix": prefix})
+    db.session.commit()
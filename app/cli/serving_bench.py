@@ -0,0 +1,111 @@
+# app/cli/serving_bench.py
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from .query_plans import sample_ids
+
+# (name, url template, role); the read-only routes app.asgi serves asynchronously. Lists are paged, so the
+# comparison measures serving concurrency rather than pushing multi-megabyte bodies through loopback.
+ENDPOINTS = [
+    ("tasks.list", "/api/v1/tasks/list?limit=100", "Admin"),
+    ("tasks.list.member", "/api/v1/tasks/list?limit=100", "Team Member"),
+    ("projects.list", "/api/v1/projects/list?limit=50", "Project Manager"),
+    ("projects.stats", "/api/v1/projects/{project_id}/stats", "Admin"),
+    ("teams.list", "/api/v1/teams/list", "Admin"),
+    ("users.list", "/api/v1/users/list", "Admin"),
+]
+
+USER_KEYS = {"Admin": "admin_id", "Project Manager": "manager_id", "Team Member": "member_id"}
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _worker(base_url: str, requests: list, timeout: float, latencies: list, errors: list) -> None:
+    """
+    Issue `requests` ((url, headers) pairs) one after another over a keep-alive connection, as one client would.
+    """
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    for url, headers in requests:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", url, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(f"{response.status} {url}")
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(f"{type(e).__name__} {url}")
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    connection.close()
+
+
+def run_level(base_url: str, targets: list, concurrency: int, requests: int, timeout: float) -> dict:
+    """
+    `concurrency` clients each send `requests` GETs, cycling through `targets`. Latency percentiles cover
+    successful requests only; failures and timeouts are counted as errors.
+    """
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_worker, args=(
+            base_url, [targets[(i + n) % len(targets)] for n in range(requests)], timeout, latencies, errors
+        ))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency * requests,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def concurrency_limit(levels: list, p99_slo_ms: float) -> int:
+    """
+    Highest concurrency that completed without errors and with p99 inside the SLO; 0 when none did.
+    """
+    passing = [r["concurrency"] for r in levels if r["errors"] == 0 and r["p99_ms"] <= p99_slo_ms]
+    return max(passing, default=0)
+
+
+def compare_serving_modes(prefix: str, servers: dict, concurrency: list, requests: int, timeout: float,
+                          paths: tuple = ()) -> list:
+    """
+    Load each running server in `servers` ({mode: base url}, e.g. gunicorn on run:app and uvicorn on asgi:app)
+    at every concurrency level with the same request mix, and report tail latency and throughput per level.
+    """
+    ids = sample_ids(prefix)
+    endpoints = [e for e in ENDPOINTS if not paths or e[0] in paths]
+    targets = []
+    for _, url, role in endpoints:
+        token = AuthAndLogMiddleware.generate_token(ids[USER_KEYS[role]], role, ids["customer_id"])
+        targets.append((url.format(**ids), {"Authorization": f"Bearer {token}"}))
+
+    results = []
+    for mode, base_url in servers.items():
+        # One untimed pass so pools, token caches and response caches are warm in every worker
+        run_level(base_url, targets, min(concurrency), len(targets), timeout)
+        for level in concurrency:
+            results.append({"mode": mode, **run_level(base_url, targets, level, requests, timeout)})
+    return results
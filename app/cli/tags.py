@@ -0,0 +1,15 @@
+# app/cli/tags.py
+import click
+from flask.cli import AppGroup
+
+from ..dao import TagsDao
+
+tags_cli = AppGroup("tags", help="Tag facet maintenance commands.")
+
+
+@tags_cli.command("rebuild-counts")
+@click.option("--customer-id", default=None, help="Only rebuild this customer's counts.")
+def rebuild_counts(customer_id):
+    """Recompute the per-project tag counts from the task, subtask and project tags."""
+    counters = TagsDao.rebuild_counts(customer_id)
+    click.echo(f"Rebuilt {counters} tag counter(s)")
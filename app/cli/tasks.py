@@ -0,0 +1,15 @@
+# app/cli/tasks.py
+import click
+from flask.cli import AppGroup
+
+from ..dao import TasksDao
+
+tasks_cli = AppGroup("tasks", help="Task maintenance commands.")
+
+
+@tasks_cli.command("repair-counters")
+@click.option("--customer-id", default=None, help="Only repair tasks of this customer.")
+def repair_counters(customer_id):
+    """Recompute tasks.subtask_total/subtask_completed from subtasks and fix drifted rows."""
+    fixed = TasksDao.repair_subtask_counters(customer_id)
+    click.echo(f"Repaired subtask counters on {fixed} task(s)")
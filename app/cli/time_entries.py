@@ -0,0 +1,42 @@
+# app/cli/time_entries.py
+import click
+from flask.cli import AppGroup
+
+from ..dao import TimeEntriesDao
+from ..services.time_entry_service import TimeEntryService, IMPORT_FORMATS, IMPORT_MODES
+
+time_entries_cli = AppGroup("time-entries", help="Time entry maintenance commands.")
+
+
+@time_entries_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--customer-id", required=True, help="Customer the entries belong to.")
+@click.option("--user-id", default=None, help="User for rows without a user_id column.")
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), default=None, help="Defaults to the file extension.")
+@click.option("--mode", type=click.Choice(IMPORT_MODES), default="partial", show_default=True,
+              help="atomic: import nothing if any row is rejected.")
+def import_entries(path, customer_id, user_id, fmt, mode):
+    """Bulk-load time entries from a CSV or NDJSON file with COPY."""
+    fmt = fmt or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(path, encoding="utf-8", newline="") as stream:
+        # Ownership is still enforced per row; the CLI acts with Admin rights within the customer
+        result, status_code = TimeEntryService.import_time_entries(
+            stream, fmt, customer_id=customer_id, user_id=user_id, role="Admin", mode=mode
+        )
+    if "received" not in result:
+        raise click.ClickException(result["error"])
+    click.echo(f"Received {result['received']}, imported {result['imported']}, rejected {result['rejected']}")
+    for reject in result["rejects"]:
+        click.echo(f"  line {reject['line']}: {reject['error']}", err=True)
+    if result["rejects_truncated"]:
+        click.echo(f"  ... {result['rejected'] - len(result['rejects'])} more rejected rows", err=True)
+    if status_code not in (201, 207):
+        raise SystemExit(1)
+
+
+@time_entries_cli.command("rebuild-rollups")
+@click.option("--customer-id", default=None, help="Only rebuild this customer's rollups.")
+def rebuild_rollups(customer_id):
+    """Recompute the daily time entry rollups from time_entries."""
+    buckets = TimeEntriesDao.rebuild_rollups(customer_id)
+    click.echo(f"Rebuilt {buckets} daily rollup bucket(s)")
@@ -7,8 +7,87 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Session settings applied once per physical connection at connect time (libpq startup packet / asyncpg
+    # server_settings), so no request pays a round trip for them
+    DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "tasks-api")
+    DB_SESSION_SETTINGS = {
+        "timezone": os.getenv("DB_TIME_ZONE", "UTC"),
+        "statement_timeout": str(int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))),
+    }
+    # Pool sizing is per worker process
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        "connect_args": {
+            "application_name": DB_APPLICATION_NAME,
+            "options": " ".join(f"-c {name}={value}" for name, value in DB_SESSION_SETTINGS.items()),
+        },
+    }
+    # Optional read replica: GET/HEAD reads go to it (app/utils/replica.py); a client that just wrote reads from
+    # the primary for up to REPLICA_STICKY_SECONDS until the replica replays its write, and a replica lagging
+    # past REPLICA_MAX_LAG_SECONDS or down is skipped
+    SQLALCHEMY_BINDS = (
+        {"replica": {**SQLALCHEMY_ENGINE_OPTIONS, "url": os.environ["DATABASE_REPLICA_URL"]}}
+        if os.getenv("DATABASE_REPLICA_URL") else {}
+    )
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+    REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "1"))
     SECRET_KEY = os.getenv('SECRET_KEY')
-    SQLALCHEMY_POOL_SIZE = 10
-    SQLALCHEMY_MAX_OVERFLOW = 5
     SECRET_KEY = os.getenv("SECRET_KEY", "your-default-secret-key")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-jwt-secret-key")
+    # Let Postgres render the tasks/teams/users list payloads as JSON text instead of building them in Python
+    DB_JSON_PASSTHROUGH = os.getenv("DB_JSON_PASSTHROUGH", "true").lower() in ("1", "true", "yes")
+    # Response cache for hot read endpoints: "memory" (per worker), "redis" (shared, needs redis-py) or "none"
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+    # Verified JWT claims kept per worker until each token's exp; 0 verifies every request again
+    TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    # Longest lifetime (exp - iat) of the tokens the app issues; user revocations are kept this long
+    TOKEN_MAX_LIFETIME = int(os.getenv("TOKEN_MAX_LIFETIME", "86400"))
+    # How revocations reach the other workers: "redis" (pub/sub, needs redis-py) or "local" (this worker only)
+    TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "local")
+    TOKEN_REVOCATION_URL = os.getenv("TOKEN_REVOCATION_URL", RESPONSE_CACHE_URL)
+    # Per-project dependency graphs kept per worker (app/utils/dependency_graph.py); 0 loads them per request
+    DEPENDENCY_GRAPH_CACHE_SIZE = int(os.getenv("DEPENDENCY_GRAPH_CACHE_SIZE", "256"))
+    # Logging pipeline: bounded queue drained by a background writer; records are dropped (and counted) when full
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    # Fraction of INFO records kept per logger, e.g. "request_logger=0.1,rtime_logger=0.5"; warnings and errors are always kept
+    LOG_SAMPLE_RATES = {
+        name: float(rate)
+        for name, _, rate in (item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(",") if item)
+    }
+    # Request bodies in the request log: cut after this many characters (0 logs only the size), JSON keys masked
+    LOG_BODY_MAX_CHARS = int(os.getenv("LOG_BODY_MAX_CHARS", "2048"))
+    LOG_REDACT_FIELDS = frozenset(
+        field.strip().lower()
+        for field in os.getenv("LOG_REDACT_FIELDS", "password,password_hash,token,secret,authorization").split(",")
+        if field.strip()
+    )
+    # Prometheus metrics on /metrics; METRICS_DIR merges the snapshots of all gunicorn workers (see gunicorn.conf.py)
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    # Bearer token scrapes must send; unset, /metrics is only served in debug mode
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Write every SQL statement with its duration to rtime.log (verbose; for debugging)
+    LOG_SQL = os.getenv("LOG_SQL", "false").lower() in ("1", "true", "yes")
+    # Per-request SQL checks (app/utils/query_recorder.py): "enforce" fails over-budget requests (dev/test),
+    # "warn" only logs the offending statement fingerprints, "off" disables the checks
+    QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn")
+    QUERY_BUDGET_DEFAULT = int(os.environ["QUERY_BUDGET_DEFAULT"]) if os.getenv("QUERY_BUDGET_DEFAULT") else None
+    # Optional ASGI mode (asgi.py): read-only list/stats routes run on an asyncpg pool of this size per process;
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+    # Project metrics (`flask projects snapshot-metrics`): hours logged are priced at this rate against the
+    # project budget for Budget Utilization, which is not recorded while it is unset
+    PROJECT_HOURLY_RATE = float(os.environ["PROJECT_HOURLY_RATE"]) if os.getenv("PROJECT_HOURLY_RATE") else None
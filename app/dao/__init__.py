@@ -3,4 +3,9 @@
 from .projects import ProjectsDao
 from .users import UsersDao
 from .team import TeamsDao
-from .tasks import TasksDao
\ No newline at end of file
+from .tasks import TasksDao
+from .time_entries import TimeEntriesDao
+from .project_metrics import ProjectMetricsDao
+from .search import SearchDao
+from .tags import TagsDao
+from .dependencies import DependenciesDao
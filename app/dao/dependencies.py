@@ -0,0 +1,161 @@
+from typing import List, Optional
+
+from ..sources import db
+from ..utils.dependency_graph import graph_scope
+from sqlalchemy import text
+
+# The project, with the version its dependency graph is stamped with; no row for a project the customer
+# does not have
+GRAPH_STAMP_QUERY = """
+    SELECT p.id, COALESCE(v.version, 0) AS version
+    FROM projects p
+    LEFT JOIN resource_versions v ON v.customer_id = p.customer_id AND v.scope = :scope
+    WHERE p.id = :project_id
+    AND p.customer_id = :customer_id
+"""
+
+# Nodes and edges of one project's graph in a single round trip: the project's tasks, the subtasks that
+# dependencies point at, and prerequisites that moved to another project since the edge was created
+GRAPH_QUERY = """
+    WITH project_tasks AS MATERIALIZED (
+        SELECT t.id, t.project_id, t.title, t.status::text AS status, t.estimated_duration
+        FROM tasks t
+        WHERE t.project_id = :project_id
+        AND t.customer_id = :customer_id
+    ),
+    edges AS MATERIALIZED (
+        SELECT d.id, d.task_id, d.depends_on_task_id, d.depends_on_subtask_id
+        FROM project_tasks pt
+        JOIN dependencies d ON d.task_id = pt.id
+    ),
+    nodes AS (
+        SELECT 'task' AS type, pt.id, NULL AS task_id, pt.project_id, pt.title, pt.status, pt.estimated_duration
+        FROM project_tasks pt
+        UNION ALL
+        SELECT 'task', t.id, NULL, t.project_id, t.title, t.status::text, t.estimated_duration
+        FROM tasks t
+        WHERE t.id IN (
+            SELECT e.depends_on_task_id
+            FROM edges e
+            WHERE e.depends_on_task_id IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM project_tasks pt WHERE pt.id = e.depends_on_task_id)
+        )
+        UNION ALL
+        SELECT 'subtask', s.id, s.task_id, t.project_id, s.title, s.status::text, s.estimated_duration
+        FROM subtasks s
+        JOIN tasks t ON t.id = s.task_id
+        WHERE s.id IN (SELECT depends_on_subtask_id FROM edges)
+    )
+    SELECT (SELECT COALESCE(json_agg(nodes), '[]'::json) FROM nodes) AS nodes,
+           (SELECT COALESCE(json_agg(edges), '[]'::json) FROM edges) AS edges
+"""
+
+# Both ends of a new dependency, as graph nodes with the project they belong to; a missing end has no row
+ENDPOINTS_QUERY = """
+    SELECT 'dependent' AS side, 'task' AS type, t.id, NULL AS task_id, t.project_id, t.title,
+           t.status::text AS status, t.estimated_duration
+    FROM tasks t
+    WHERE t.id = :task_id
+    AND t.customer_id = :customer_id
+    UNION ALL
+    SELECT 'prerequisite', 'task', t.id, NULL, t.project_id, t.title, t.status::text, t.estimated_duration
+    FROM tasks t
+    WHERE t.id = :depends_on_task_id
+    AND t.customer_id = :customer_id
+    UNION ALL
+    SELECT 'prerequisite', 'subtask', s.id, s.task_id, t.project_id, s.title, s.status::text, s.estimated_duration
+    FROM subtasks s
+    JOIN tasks t ON t.id = s.task_id
+    WHERE s.id = :depends_on_subtask_id
+    AND t.customer_id = :customer_id
+"""
+
+NODE_FIELDS = ("type", "id", "task_id", "project_id", "title", "status", "estimated_duration")
+
+
+class DependenciesDao:
+    @staticmethod
+    def fetch_graph_stamp(project_id: str, customer_id: str) -> Optional[int]:
+        """
+        Current graph version of the project, or None when the project is not the customer's.
+        """
+        row = db.session.execute(text(GRAPH_STAMP_QUERY), {
+            "project_id": project_id,
+            "customer_id": customer_id,
+            "scope": graph_scope(project_id)
+        }).first()
+        return row.version if row else None
+
+    @staticmethod
+    def fetch_graph(project_id: str, customer_id: str) -> dict:
+        """
+        {"nodes", "edges"} of one project (see GRAPH_QUERY), for DependencyGraph.from_rows.
+        """
+        row = db.session.execute(text(GRAPH_QUERY), {"project_id": project_id, "customer_id": customer_id}).one()
+        return {"nodes": row.nodes, "edges": row.edges}
+
+    @staticmethod
+    def fetch_endpoints(customer_id: str, task_id: str, depends_on_task_id: Optional[str],
+                        depends_on_subtask_id: Optional[str]) -> dict:
+        """
+        {"dependent": node, "prerequisite": node} for a dependency about to be created; an end that does
+        not exist for the customer is left out.
+        """
+        rows = db.session.execute(text(ENDPOINTS_QUERY), {
+            "customer_id": customer_id,
+            "task_id": task_id,
+            "depends_on_task_id": depends_on_task_id,
+            "depends_on_subtask_id": depends_on_subtask_id
+        }).fetchall()
+        return {row.side: {field: getattr(row, field) for field in NODE_FIELDS} for row in rows}
+
+    @staticmethod
+    def lock_project(project_id: str) -> None:
+        """
+        Serialize dependency writes of one project until the end of the transaction, so two edges that
+        are each acyclic on their own cannot be committed together into a cycle.
+        """
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))"),
+                           {"key": f"dependencies:{project_id}"})
+
+    @staticmethod
+    def list_dependencies(customer_id: str, project_id: Optional[str] = None, task_id: Optional[str] = None,
+                          role: Optional[str] = None, user_id: Optional[str] = None) -> List[dict]:
+        """
+        Dependencies of one project, or of one task, oldest first. Team Members see those of the tasks they
+        have a subtask assigned in, as in the task list.
+        """
+        scope = "t.project_id = :project_id" if project_id else "d.task_id = :task_id"
+        if role == "Team Member":
+            scope += " AND t.id IN (SELECT s.task_id FROM subtasks s WHERE s.assigned_user_id = :user_id)"
+        rows = db.session.execute(text(f"""
+            SELECT d.id, d.task_id, d.depends_on_task_id, d.depends_on_subtask_id, d.created_at
+            FROM tasks t
+            JOIN dependencies d ON d.task_id = t.id
+            WHERE t.customer_id = :customer_id
+            AND {scope}
+            ORDER BY d.created_at, d.id
+        """), {"customer_id": customer_id, "project_id": project_id, "task_id": task_id, "user_id": user_id}).fetchall()
+        return [{
+            'id': row.id,
+            'taskId': row.task_id,
+            'dependsOnTaskId': row.depends_on_task_id,
+            'dependsOnSubtaskId': row.depends_on_subtask_id,
+            'createdAt': row.created_at.isoformat() if row.created_at else None
+        } for row in rows]
+
+    @staticmethod
+    def delete_dependency(dependency_id: str, customer_id: str) -> Optional[dict]:
+        """
+        Delete one of the customer's dependencies in the caller's transaction. Returns the deleted edge with
+        its project, or None when there is none to delete.
+        """
+        row = db.session.execute(text("""
+            DELETE FROM dependencies d
+            USING tasks t
+            WHERE d.id = :dependency_id
+            AND t.id = d.task_id
+            AND t.customer_id = :customer_id
+            RETURNING d.id, d.task_id, t.project_id
+        """), {"dependency_id": dependency_id, "customer_id": customer_id}).first()
+        return {"id": row.id, "task_id": row.task_id, "project_id": row.project_id} if row else None
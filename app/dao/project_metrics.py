@@ -0,0 +1,217 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import uuid4
+
+from ..sources import db
+from ..utils.db_pool import lift_statement_timeout
+from sqlalchemy import text
+
+# Values of the metric_type enum, in the order series are returned
+METRIC_TYPES = ("Task Completion", "Budget Utilization", "Time Spent", "Milestone Completion")
+
+# Adds delta rows to the per-project counters. `source` selects (project_id, customer_id, tasks, subtasks,
+# completed subtasks, minutes, updated_at); a project's first delta creates its row.
+COUNTER_UPSERT = """
+    INSERT INTO project_metric_counters (project_id, customer_id, tasks_total, subtasks_total, subtasks_completed,
+                                         minutes_logged, updated_at)
+    {source}
+    ON CONFLICT (project_id)
+    DO UPDATE SET tasks_total = project_metric_counters.tasks_total + EXCLUDED.tasks_total,
+                  subtasks_total = project_metric_counters.subtasks_total + EXCLUDED.subtasks_total,
+                  subtasks_completed = project_metric_counters.subtasks_completed + EXCLUDED.subtasks_completed,
+                  minutes_logged = project_metric_counters.minutes_logged + EXCLUDED.minutes_logged,
+                  updated_at = EXCLUDED.updated_at
+"""
+
+# Current counters of each live project, with the last recorded value of every metric type
+SNAPSHOT_SOURCE_QUERY = """
+    SELECT p.id, p.budget, p.milestones,
+           COALESCE(c.subtasks_total, 0) AS subtasks_total,
+           COALESCE(c.subtasks_completed, 0) AS subtasks_completed,
+           COALESCE(c.minutes_logged, 0) AS minutes_logged,
+           l.latest
+    FROM projects p
+    LEFT JOIN project_metric_counters c ON c.project_id = p.id
+    CROSS JOIN LATERAL (
+        SELECT json_object_agg(m.metric_type, (
+            SELECT pm.value
+            FROM project_metrics pm
+            WHERE pm.project_id = p.id
+            AND pm.metric_type = m.metric_type
+            ORDER BY pm.recorded_at DESC
+            LIMIT 1
+        )) AS latest
+        FROM unnest(enum_range(NULL::metric_type)) AS m(metric_type)
+    ) l
+    WHERE p.is_archived IS NOT TRUE
+    AND (CAST(:customer_id AS varchar) IS NULL OR p.customer_id = :customer_id)
+"""
+
+# One point per metric type and bucket: the last value recorded before the bucket ends. Snapshots are only
+# written when a value changes, so a bucket without one carries the previous value forward.
+SERIES_QUERY = """
+    SELECT m.metric_type, b.bucket, v.value
+    FROM projects p
+    CROSS JOIN unnest(CAST(:metric_types AS metric_type[])) AS m(metric_type)
+    CROSS JOIN generate_series(CAST(:start AS timestamp), CAST(:end AS timestamp), make_interval(secs => :step)) AS b(bucket)
+    LEFT JOIN LATERAL (
+        SELECT pm.value
+        FROM project_metrics pm
+        WHERE pm.project_id = p.id
+        AND pm.metric_type = m.metric_type
+        AND pm.recorded_at < b.bucket + make_interval(secs => :step)
+        ORDER BY pm.recorded_at DESC
+        LIMIT 1
+    ) v ON true
+    WHERE p.id = :project_id
+    AND p.customer_id = :customer_id
+    ORDER BY m.metric_type, b.bucket
+"""
+
+
+def milestone_completion(milestones) -> Optional[float]:
+    """
+    Percentage of completed milestones, or None for a project without any. Milestones are a list, or an
+    object keyed by name; an entry counts as completed when it is `true` or carries `"completed": true`
+    or `"status": "Completed"`.
+    """
+    if isinstance(milestones, dict):
+        milestones = list(milestones.values())
+    if not isinstance(milestones, list) or not milestones:
+        return None
+    completed = sum(
+        1 for m in milestones
+        if m is True or (isinstance(m, dict) and (m.get("completed") is True or m.get("status") == "Completed"))
+    )
+    return round(completed / len(milestones) * 100, 2)
+
+
+class ProjectMetricsDao:
+    @staticmethod
+    def apply_counter_deltas(customer_id: str, deltas: dict) -> None:
+        """
+        Apply {project_id: (tasks, subtasks, completed_subtasks, minutes)} to the project counters with a
+        single UPSERT, in the caller's transaction.
+        """
+        deltas = {project_id: delta for project_id, delta in deltas.items() if project_id and any(delta)}
+        if not deltas:
+            return
+        project_ids = list(deltas)
+        db.session.execute(text(COUNTER_UPSERT.format(source="""
+            SELECT d.project_id, :customer_id, d.tasks, d.subtasks, d.completed, d.minutes, now() AT TIME ZONE 'UTC'
+            FROM unnest(CAST(:project_ids AS varchar[]), CAST(:tasks AS int[]), CAST(:subtasks AS int[]),
+                        CAST(:completed AS int[]), CAST(:minutes AS bigint[])) AS d(project_id, tasks, subtasks, completed, minutes)
+        """)), {
+            "customer_id": customer_id,
+            "project_ids": project_ids,
+            "tasks": [deltas[project_id][0] for project_id in project_ids],
+            "subtasks": [deltas[project_id][1] for project_id in project_ids],
+            "completed": [deltas[project_id][2] for project_id in project_ids],
+            "minutes": [deltas[project_id][3] for project_id in project_ids]
+        })
+
+    @staticmethod
+    def rebuild_counters(customer_id: str = None) -> int:
+        """
+        Recompute the project counters from the task counters and the daily time rollups, e.g. after rows
+        were written outside the services. Returns the number of projects written.
+        """
+        params = {"customer_id": customer_id}
+        lift_statement_timeout()
+        db.session.execute(text("""
+            DELETE FROM project_metric_counters
+            WHERE (CAST(:customer_id AS varchar) IS NULL OR customer_id = :customer_id)
+        """), params)
+        result = db.session.execute(text("""
+            INSERT INTO project_metric_counters (project_id, customer_id, tasks_total, subtasks_total,
+                                                 subtasks_completed, minutes_logged, updated_at)
+            SELECT p.id, p.customer_id, COALESCE(t.tasks, 0), COALESCE(t.subtasks, 0), COALESCE(t.completed, 0),
+                   COALESCE(r.minutes, 0), now() AT TIME ZONE 'UTC'
+            FROM projects p
+            LEFT JOIN (
+                SELECT project_id, COUNT(*) AS tasks, SUM(subtask_total) AS subtasks, SUM(subtask_completed) AS completed
+                FROM tasks
+                WHERE project_id IS NOT NULL
+                GROUP BY project_id
+            ) t ON t.project_id = p.id
+            LEFT JOIN (
+                SELECT project_id, SUM(minutes) AS minutes
+                FROM time_entry_daily_rollups
+                WHERE project_id IS NOT NULL
+                GROUP BY project_id
+            ) r ON r.project_id = p.id
+            WHERE (CAST(:customer_id AS varchar) IS NULL OR p.customer_id = :customer_id)
+        """), params)
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def metric_values(row, hourly_rate: Optional[float]) -> dict:
+        """
+        Metric values for one project from its counters. Budget Utilization prices the logged hours at
+        `hourly_rate` and is left out without one (or without a budget), as is Milestone Completion for a
+        project without milestones.
+        """
+        hours = row.minutes_logged / 60
+        values = {
+            "Task Completion": round(row.subtasks_completed / row.subtasks_total * 100, 2) if row.subtasks_total else 0.0,
+            "Time Spent": round(hours, 2),
+        }
+        if hourly_rate and row.budget:
+            values["Budget Utilization"] = round(hours * hourly_rate / float(row.budget) * 100, 2)
+        milestones = milestone_completion(row.milestones)
+        if milestones is not None:
+            values["Milestone Completion"] = milestones
+        return values
+
+    @staticmethod
+    def snapshot_metrics(hourly_rate: Optional[float] = None, customer_id: str = None) -> int:
+        """
+        Record the current metrics of every live project into project_metrics, skipping values that equal
+        the last recorded one. Returns the number of rows written.
+        """
+        lift_statement_timeout()
+        rows = []
+        for project in db.session.execute(text(SNAPSHOT_SOURCE_QUERY), {"customer_id": customer_id}):
+            latest = project.latest or {}
+            for metric_type, value in ProjectMetricsDao.metric_values(project, hourly_rate).items():
+                if latest.get(metric_type) != value:
+                    rows.append((str(uuid4()), project.id, metric_type, value))
+        if rows:
+            ids, project_ids, metric_types, values = zip(*rows)
+            db.session.execute(text("""
+                INSERT INTO project_metrics (id, project_id, metric_type, value, recorded_at)
+                SELECT id, project_id, metric_type, value, :recorded_at
+                FROM unnest(CAST(:ids AS varchar[]), CAST(:project_ids AS varchar[]), CAST(:metric_types AS metric_type[]),
+                            CAST(:values AS float8[])) AS m(id, project_id, metric_type, value)
+            """), {
+                "ids": list(ids),
+                "project_ids": list(project_ids),
+                "metric_types": list(metric_types),
+                "values": list(values),
+                "recorded_at": datetime.utcnow()
+            })
+        db.session.commit()
+        return len(rows)
+
+    @staticmethod
+    def fetch_series(project_id: str, customer_id: str, metric_types: List[str], start: datetime, end: datetime,
+                     step_seconds: int) -> Optional[dict]:
+        """
+        {metric_type: [{"t", "value"}]} with one point per `step_seconds` bucket from `start` to `end`, read
+        from project_metrics only. None when the project does not exist for the customer.
+        """
+        rows = db.session.execute(text(SERIES_QUERY), {
+            "project_id": project_id,
+            "customer_id": customer_id,
+            "metric_types": metric_types,
+            "start": start,
+            "end": end,
+            "step": step_seconds
+        }).fetchall()
+        if not rows:
+            return None
+        series = {metric_type: [] for metric_type in metric_types}
+        for row in rows:
+            series[row.metric_type].append({"t": row.bucket.isoformat(), "value": row.value})
+        return series
@@ -1,9 +1,30 @@
 from ..sources import db
 from sqlalchemy import text
+from ..utils.streaming import stream_rows
+
+# Totals come from the project's metric counters, so no task or subtask rows are read
+PROJECT_STATS_QUERY = """
+    SELECT
+        COALESCE(c.tasks_total, 0) AS total_tasks,
+        COALESCE(c.subtasks_total, 0) AS total_subtasks,
+        COALESCE(c.subtasks_completed, 0) AS completed_subtasks
+    FROM projects p
+    LEFT JOIN project_metric_counters c ON c.project_id = p.id
+    WHERE p.id = :project_id
+    AND p.customer_id = :customer_id
+"""
+
+# Stats columns fetch_eligible_projects_with_stats adds to each project row
+PROJECT_STATS_COLUMNS = ("total_tasks", "total_subtasks", "completed_subtasks")
 
 class ProjectsDao:
     @staticmethod
-    def fetch_eligible_projects(customer_id, role, user_id):
+    def list_query(customer_id, role, user_id, limit=None, cursor=None, filters=None):
+        """
+        SQL and parameters for the non-archived projects visible to the caller, newest (updated_at, id) first.
+        When `limit` is given one extra row is fetched so the caller can tell whether another page exists.
+        `filters` are ProjectService.parse_list_filters output.
+        """
         base_query = """
             SELECT * FROM projects
             WHERE customer_id = :customer_id
@@ -15,8 +36,53 @@ class ProjectsDao:
             base_query += " AND project_manager_id = :user_id"
             params["user_id"] = user_id
 
+        filters = filters or {}
+        if filters.get("tech_stack"):
+            base_query += " AND tech_stack && CAST(:tech_stack AS varchar[])"
+            params["tech_stack"] = filters["tech_stack"]
+        if filters.get("tech_stack_all"):
+            base_query += " AND tech_stack @> CAST(:tech_stack_all AS varchar[])"
+            params["tech_stack_all"] = filters["tech_stack_all"]
+
+        if cursor:
+            base_query += " AND (updated_at, id) < (:cursor_updated_at, :cursor_id)"
+            params["cursor_updated_at"], params["cursor_id"] = cursor
+
+        base_query += " ORDER BY updated_at DESC, id DESC"
+        if limit:
+            base_query += " LIMIT :limit"
+            params["limit"] = limit + 1
+
+        return base_query, params
+
+    @staticmethod
+    def fetch_eligible_projects(customer_id, role, user_id, limit=None, cursor=None, stream=False, filters=None):
+        """
+        Fetch the non-archived projects visible to the caller (see list_query).
+        With `stream=True` a lazy iterator of row dicts over a server-side cursor is returned instead of a Result.
+        """
+        base_query, params = ProjectsDao.list_query(customer_id, role, user_id, limit, cursor, filters)
+        if stream:
+            return stream_rows(text(base_query), params)
         return db.session.execute(text(base_query), params)
 
+    @staticmethod
+    def fetch_eligible_projects_with_stats(customer_id, role, user_id):
+        """
+        Fetch the non-archived projects visible to the caller (see list_query), each with its stats columns
+        (total_tasks, total_subtasks, completed_subtasks) from the metric counters, in a single query.
+        """
+        base_query, params = ProjectsDao.list_query(customer_id, role, user_id)
+        return db.session.execute(text(f"""
+            SELECT q.*,
+                   COALESCE(c.tasks_total, 0) AS total_tasks,
+                   COALESCE(c.subtasks_total, 0) AS total_subtasks,
+                   COALESCE(c.subtasks_completed, 0) AS completed_subtasks
+            FROM ({base_query}) q
+            LEFT JOIN project_metric_counters c ON c.project_id = q.id
+            ORDER BY q.updated_at DESC, q.id DESC
+        """), params)
+
     @staticmethod
     def fetch_project_stats(project_id: str, customer_id: str) -> dict:
         """
@@ -26,50 +92,13 @@ class ProjectsDao:
             if not customer_id:
                 return {"error": "Unauthorized: Invalid token data"}, 401
 
-            query = """
-                SELECT 
-                    COALESCE((
-                        SELECT COUNT(*) 
-                        FROM tasks t 
-                        WHERE t.project_id = p.id 
-                        AND t.customer_id = :customer_id
-                    ), 0) AS total_tasks,
-                    COALESCE((
-                        SELECT COUNT(*) 
-                        FROM subtasks s 
-                        JOIN tasks t ON s.task_id = t.id 
-                        WHERE t.project_id = p.id 
-                        AND t.customer_id = :customer_id
-                    ), 0) AS total_subtasks,
-                    COALESCE((
-                        SELECT COUNT(*) 
-                        FROM subtasks s 
-                        JOIN tasks t ON s.task_id = t.id 
-                        WHERE t.project_id = p.id 
-                        AND t.customer_id = :customer_id 
-                        AND s.status = 'Completed'
-                    ), 0) AS completed_subtasks
-                FROM projects p
-                WHERE p.id = :project_id 
-                AND p.customer_id = :customer_id
-            """
             params = {"project_id": project_id, "customer_id": customer_id}
 
-            result = db.session.execute(text(query), params).fetchone()
+            result = db.session.execute(text(PROJECT_STATS_QUERY), params).fetchone()
             if not result:
                 return {"error": "Project not found or unauthorized"}, 404
 
-            total_tasks = result.total_tasks
-            total_subtasks = result.total_subtasks
-            completed_subtasks = result.completed_subtasks
-            completion_rate = round((completed_subtasks / total_subtasks * 100) if total_subtasks > 0 else 0)
-
-            return {
-                "total_tasks": total_tasks,
-                "total_subtasks": total_subtasks,
-                "completed_subtasks": completed_subtasks,
-                "completion_rate": completion_rate
-            }, 200
+            return ProjectsDao.stats_from_row(result), 200
 
         except Exception as e:
             from ..utils.logger import app_logger
@@ -80,4 +109,15 @@ class ProjectsDao:
                 "traceback": traceback.format_exc()
             })
             return {"error": f"Failed to fetch project stats: {str(e)}"}, 500
-        
\ No newline at end of file
+
+    @staticmethod
+    def stats_from_row(row) -> dict:
+        total_subtasks = row.total_subtasks
+        completed_subtasks = row.completed_subtasks
+        completion_rate = round((completed_subtasks / total_subtasks * 100) if total_subtasks > 0 else 0)
+        return {
+            "total_tasks": row.total_tasks,
+            "total_subtasks": total_subtasks,
+            "completed_subtasks": completed_subtasks,
+            "completion_rate": completion_rate
+        }
@@ -0,0 +1,59 @@
+# app/dao/rendering.py
+"""
+Helpers for letting Postgres render a whole list result as one JSON text value, which the response layer
+splices into the envelope without decoding it (see utils.responses.raw_json_response). The ::text cast
+matters: psycopg2 would otherwise parse a json column back into Python structures.
+"""
+
+
+def iso_timestamp(column: str) -> str:
+    """
+    SQL rendering of a timestamp column identical to Python's datetime.isoformat(), which omits the
+    fraction when microseconds are zero (Postgres' own json rendering trims trailing zeros instead).
+    """
+    return f"""CASE
+        WHEN {column} IS NULL THEN NULL
+        WHEN date_part('microseconds', {column})::int % 1000000 = 0 THEN to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS')
+        ELSE to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    END"""
+
+
+def http_date(column: str) -> str:
+    """
+    SQL rendering of a timestamp column identical to how jsonify serializes a datetime (RFC 822, GMT).
+    """
+    return f"""to_char({column}, 'Dy, DD Mon YYYY HH24:MI:SS "GMT"')"""
+
+
+def json_array_query(base_query: str, doc: str, order_by: str = None) -> str:
+    """
+    Aggregate `doc`, an expression over the alias `q`, for every row of `base_query` into a JSON array.
+    """
+    order = f" ORDER BY {order_by}" if order_by else ""
+    return f"""
+        SELECT COALESCE(json_agg({doc}{order}), '[]'::json)::text AS data
+        FROM ({base_query}) q
+    """
+
+
+def json_page_query(base_query: str, doc: str, sort_column: str, id_column: str = "id") -> str:
+    """
+    Like json_array_query, for a keyset-paged `base_query` that fetched `:page_size + 1` rows ordered by
+    (sort_column, id_column) descending. Also returns whether another page exists and the sort key of the
+    last row on this page, from which the caller builds next_cursor.
+    """
+    return f"""
+        SELECT
+            COALESCE(json_agg(page.doc ORDER BY page.rn) FILTER (WHERE page.rn <= :page_size), '[]'::json)::text AS data,
+            COUNT(*) > :page_size AS has_more,
+            MAX(page.sort_value) FILTER (WHERE page.rn = :page_size) AS cursor_sort_value,
+            MAX(page.sort_id) FILTER (WHERE page.rn = :page_size) AS cursor_id
+        FROM (
+            SELECT
+                {doc} AS doc,
+                q.{sort_column} AS sort_value,
+                q.{id_column} AS sort_id,
+                row_number() OVER (ORDER BY q.{sort_column} DESC, q.{id_column} DESC) AS rn
+            FROM ({base_query}) q
+        ) page
+    """
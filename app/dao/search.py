@@ -0,0 +1,119 @@
+from typing import Optional, Tuple
+
+from ..sources import db
+from ..utils.pagination import split_page
+from sqlalchemy import text
+
+# Text search configuration of the search_document() function the search_vector columns are built with
+SEARCH_CONFIG = "english"
+
+# <mark> around matched words; descriptions are cut to the fragments around the matches
+TITLE_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, HighlightAll=true"
+DESCRIPTION_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8"
+
+# ts_rank_cd normalization: divide by 1 + log(document length), so a short title that matches outranks
+# the same words buried in a long description
+RANK_NORMALIZATION = 1
+
+SEARCH_TYPES = ("task", "subtask")
+
+
+class SearchDao:
+    @staticmethod
+    def search_query(terms: str, user_id: str, customer_id: str, role: str, types: Tuple[str, ...],
+                     project_id: Optional[str], limit: int, cursor: Optional[tuple]) -> Tuple[str, dict]:
+        """
+        Tasks and subtasks of the customer matching `terms` (web search syntax: quoted phrases, `or`,
+        `-word`), best match first. Matches come from the GIN indexes on search_vector; ranking covers the
+        matching rows only, and the highlights are built for the returned page only. Team Members see the
+        tasks they have a subtask assigned in, and the subtasks of those tasks, as in the task list.
+        """
+        params = {"terms": terms, "customer_id": customer_id, "limit": limit + 1}
+        scope = " AND t.customer_id = :customer_id"
+        if project_id:
+            scope += " AND t.project_id = :project_id"
+            params["project_id"] = project_id
+        if role == "Team Member":
+            scope += " AND t.id IN (SELECT sa.task_id FROM subtasks sa WHERE sa.assigned_user_id = :user_id)"
+            params["user_id"] = user_id
+
+        branches = []
+        if "task" in types:
+            branches.append(f"""
+                SELECT 'task' AS type, t.id, t.id AS task_id, NULL AS task_title, t.project_id, t.title,
+                       t.description, t.status::text AS status, t.tags, t.updated_at,
+                       ts_rank_cd(t.search_vector, q.query, {RANK_NORMALIZATION}) AS rank
+                FROM tasks t, q
+                WHERE t.search_vector @@ q.query
+                {scope}
+            """)
+        if "subtask" in types:
+            branches.append(f"""
+                SELECT 'subtask' AS type, s.id, s.task_id, t.title AS task_title, t.project_id, s.title,
+                       s.description, s.status::text AS status, s.tags, s.updated_at,
+                       ts_rank_cd(s.search_vector, q.query, {RANK_NORMALIZATION}) AS rank
+                FROM subtasks s
+                JOIN tasks t ON t.id = s.task_id, q
+                WHERE s.search_vector @@ q.query
+                {scope}
+            """)
+
+        page_clause = ""
+        if cursor:
+            page_clause = """
+                WHERE h.rank < CAST(:cursor_rank AS real)
+                OR (h.rank = CAST(:cursor_rank AS real) AND (h.type, h.id) > (:cursor_type, :cursor_id))
+            """
+            params["cursor_rank"], params["cursor_type"], params["cursor_id"] = cursor
+
+        query = f"""
+            WITH q AS (
+                SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :terms) AS query
+            ),
+            page AS (
+                SELECT h.*
+                FROM ({" UNION ALL ".join(branches)}) h
+                {page_clause}
+                ORDER BY h.rank DESC, h.type, h.id
+                LIMIT :limit
+            )
+            SELECT page.*,
+                   ts_headline('{SEARCH_CONFIG}', page.title, q.query, '{TITLE_HEADLINE_OPTIONS}') AS title_highlight,
+                   CASE WHEN page.description IS NOT NULL
+                        THEN ts_headline('{SEARCH_CONFIG}', page.description, q.query, '{DESCRIPTION_HEADLINE_OPTIONS}')
+                   END AS description_highlight
+            FROM page, q
+            ORDER BY page.rank DESC, page.type, page.id
+        """
+        return query, params
+
+    @staticmethod
+    def _hit_to_dict(row) -> dict:
+        return {
+            'type': row.type,
+            'id': row.id,
+            'task_id': row.task_id,
+            'task_title': row.task_title,
+            'project_id': row.project_id,
+            'title': row.title,
+            'description': row.description,
+            'status': row.status,
+            'tags': row.tags,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            'rank': row.rank,
+            'highlight': {
+                'title': row.title_highlight,
+                'description': row.description_highlight
+            }
+        }
+
+    @staticmethod
+    def search(terms: str, user_id: str, customer_id: str, role: str, types: Tuple[str, ...] = SEARCH_TYPES,
+               project_id: Optional[str] = None, limit: int = 20, cursor: Optional[tuple] = None) -> dict:
+        """
+        One page of search results (see search_query) with the cursor for the next page.
+        """
+        query, params = SearchDao.search_query(terms, user_id, customer_id, role, types, project_id, limit, cursor)
+        rows = db.session.execute(text(query), params).fetchall()
+        rows, next_cursor = split_page(rows, limit, lambda row: (row.rank, row.type, row.id))
+        return {"data": [SearchDao._hit_to_dict(row) for row in rows], "next_cursor": next_cursor, "limit": limit}
@@ -0,0 +1,104 @@
+from typing import Optional, Tuple
+
+from ..sources import db
+from ..utils.db_pool import lift_statement_timeout
+from sqlalchemy import text
+
+# Sources of tag_counts rows, in the order facets are returned
+TAG_SOURCES = ("task", "subtask", "tech_stack")
+
+# Facets of the customer's live projects: counts summed over projects, top `limit` per source
+CUSTOMER_FACETS_QUERY = """
+    SELECT f.source, f.tag, f.count
+    FROM (
+        SELECT tc.source, tc.tag, SUM(tc.count) AS count,
+               row_number() OVER (PARTITION BY tc.source ORDER BY SUM(tc.count) DESC, tc.tag) AS n
+        FROM tag_counts tc
+        JOIN projects p ON p.id = tc.project_id
+        WHERE tc.customer_id = :customer_id
+        AND tc.source = ANY(:sources)
+        AND p.is_archived IS NOT TRUE
+        GROUP BY tc.source, tc.tag
+    ) f
+    WHERE f.n <= :limit
+    ORDER BY f.source, f.n
+"""
+
+# Facets of one project, top `limit` per source; one row with null facet columns for a project without
+# tags and no rows for a project the customer does not have
+PROJECT_FACETS_QUERY = """
+    SELECT f.source, f.tag, f.count
+    FROM projects p
+    LEFT JOIN LATERAL (
+        SELECT tc.source, tc.tag, tc.count,
+               row_number() OVER (PARTITION BY tc.source ORDER BY tc.count DESC, tc.tag) AS n
+        FROM tag_counts tc
+        WHERE tc.project_id = p.id
+        AND tc.source = ANY(:sources)
+    ) f ON f.n <= :limit
+    WHERE p.id = :project_id
+    AND p.customer_id = :customer_id
+    ORDER BY f.source, f.n
+"""
+
+# Recount from the tagged rows; a row counts each distinct tag once
+REBUILD_QUERY = """
+    INSERT INTO tag_counts (customer_id, project_id, source, tag, count)
+    SELECT customer_id, project_id, source, tag, COUNT(*)
+    FROM (
+        SELECT DISTINCT t.id, t.customer_id, t.project_id, 'task' AS source, u.tag
+        FROM tasks t CROSS JOIN unnest(t.tags) AS u(tag)
+        WHERE t.project_id IS NOT NULL
+        UNION ALL
+        SELECT DISTINCT s.id, t.customer_id, t.project_id, 'subtask', u.tag
+        FROM subtasks s JOIN tasks t ON t.id = s.task_id CROSS JOIN unnest(s.tags) AS u(tag)
+        WHERE t.project_id IS NOT NULL
+        UNION ALL
+        SELECT DISTINCT p.id, p.customer_id, p.id, 'tech_stack', u.tag
+        FROM projects p CROSS JOIN unnest(p.tech_stack) AS u(tag)
+    ) tagged
+    WHERE tag IS NOT NULL
+    AND (CAST(:customer_id AS varchar) IS NULL OR customer_id = :customer_id)
+    GROUP BY customer_id, project_id, source, tag
+"""
+
+
+class TagsDao:
+    @staticmethod
+    def fetch_facets(customer_id: str, project_id: Optional[str] = None, sources: Tuple[str, ...] = TAG_SOURCES,
+                     limit: int = 50) -> Optional[dict]:
+        """
+        {source: [{"tag", "count"}]}, most used first, read from the tag_counts aggregate. Covers the
+        customer's live projects, or only `project_id`; None when that project does not exist for the
+        customer.
+        """
+        params = {"customer_id": customer_id, "sources": list(sources), "limit": limit}
+        if project_id:
+            params["project_id"] = project_id
+            rows = db.session.execute(text(PROJECT_FACETS_QUERY), params).fetchall()
+            if not rows:
+                return None
+        else:
+            rows = db.session.execute(text(CUSTOMER_FACETS_QUERY), params).fetchall()
+
+        facets = {source: [] for source in sources}
+        for row in rows:
+            if row.source:
+                facets[row.source].append({"tag": row.tag, "count": int(row.count)})
+        return facets
+
+    @staticmethod
+    def rebuild_counts(customer_id: str = None) -> int:
+        """
+        Recompute tag_counts from the task, subtask and project tags, e.g. after the triggers were disabled
+        for a bulk load. Returns the number of counters written.
+        """
+        params = {"customer_id": customer_id}
+        lift_statement_timeout()
+        db.session.execute(text("""
+            DELETE FROM tag_counts
+            WHERE (CAST(:customer_id AS varchar) IS NULL OR customer_id = :customer_id)
+        """), params)
+        result = db.session.execute(text(REBUILD_QUERY), params)
+        db.session.commit()
+        return result.rowcount
@@ -1,100 +1,214 @@
 from ..sources import db
+from ..utils.db_pool import lift_statement_timeout
 from sqlalchemy import text
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+from ..utils.pagination import split_page, encode_cursor
+from .rendering import iso_timestamp, json_array_query, json_page_query
+from ..utils.streaming import stream_rows
+from ..utils.versioning import bump_versions, SCOPES_BY_TABLE
+
+# JSON shape of one task row for the database-rendered list; renders exactly what _row_to_dict produces.
+# round() on float8 rounds half to even, like Python's round().
+TASK_JSON_DOC = f"""
+    json_build_object(
+        'id', q.id,
+        'customer_id', q.customer_id,
+        'project_id', q.project_id,
+        'category_id', q.category_id,
+        'title', q.title,
+        'description', q.description,
+        'status', q.status,
+        'priority', q.priority,
+        'due_date', {iso_timestamp("q.due_date")},
+        'tags', q.tags,
+        'estimated_duration', q.estimated_duration,
+        'actual_duration', q.actual_duration,
+        'start_date', {iso_timestamp("q.start_date")},
+        'end_date', {iso_timestamp("q.end_date")},
+        'created_at', {iso_timestamp("q.created_at")},
+        'updated_at', {iso_timestamp("q.updated_at")},
+        'subtasks', q.subtasks,
+        'completion_percentage', CASE WHEN q.subtask_total > 0
+            THEN round(q.subtask_completed::float8 / q.subtask_total * 100)::int ELSE 0 END
+    )
+"""
+
+# Sort key of the my-work feed; matches the expression in the ix_subtasks_assigned_*_open_due indexes
+WORK_DUE_ORDER = "COALESCE(s.due_date, 'infinity'::timestamp)"
 
 class TasksDao:
     @staticmethod
-    def list_tasks(project_id: str = None, user_id: str = None, customer_id: str = None, role: str = None) -> Tuple[List[dict], int]:
+    def _filter_clauses(filters: dict, params: dict) -> str:
+        """
+        Translate already-validated list filters into SQL predicates on `tasks t`.
+        """
+        clauses = ""
+        if filters.get("status"):
+            clauses += " AND t.status::text = ANY(:statuses)"
+            params["statuses"] = filters["status"]
+        if filters.get("priority"):
+            clauses += " AND t.priority::text = ANY(:priorities)"
+            params["priorities"] = filters["priority"]
+        if filters.get("due_from"):
+            clauses += " AND t.due_date >= :due_from"
+            params["due_from"] = filters["due_from"]
+        if filters.get("due_to"):
+            clauses += " AND t.due_date <= :due_to"
+            params["due_to"] = filters["due_to"]
+        if filters.get("assignee"):
+            clauses += """
+                AND EXISTS (
+                    SELECT 1
+                    FROM subtasks sa
+                    WHERE sa.task_id = t.id
+                    AND sa.assigned_user_id = :assignee_id
+                )
+            """
+            params["assignee_id"] = filters["assignee"]
+        if filters.get("tag"):
+            clauses += " AND t.tags && CAST(:tags AS varchar[])"
+            params["tags"] = filters["tag"]
+        if filters.get("tag_all"):
+            clauses += " AND t.tags @> CAST(:tags_all AS varchar[])"
+            params["tags_all"] = filters["tag_all"]
+        return clauses
+
+    @staticmethod
+    def list_query(project_id: str, user_id: str, customer_id: str, role: str,
+                   filters: Optional[dict], limit: Optional[int], cursor: Optional[tuple]) -> Tuple[str, dict]:
+        base_query = """
+            SELECT 
+                t.id, t.customer_id, t.project_id, t.category_id, t.title, 
+                t.description, t.status, t.priority, 
+                t.due_date, t.tags, t.estimated_duration, t.actual_duration,
+                t.start_date, t.end_date, t.created_at, t.updated_at,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'id', s.id,
+                        'task_id', s.task_id,
+                        'title', s.title,
+                        'description', s.description,
+                        'status', s.status,
+                        'assigned_user_id', s.assigned_user_id,
+                        'assigned_team_id', s.assigned_team_id,
+                        'due_date', s.due_date,
+                        'tags', s.tags,
+                        'estimated_duration', s.estimated_duration,
+                        'created_at', s.created_at,
+                        'updated_at', s.updated_at
+                    ))
+                    FROM subtasks s
+                    WHERE s.task_id = t.id
+                ), '[]'::json) AS subtasks,
+                t.subtask_completed,
+                t.subtask_total
+            FROM tasks t
+            WHERE t.customer_id = :customer_id
+        """
+        params = {"customer_id": customer_id}
+
+        if project_id:
+            base_query += " AND t.project_id = :project_id"
+            params["project_id"] = project_id
+
+        if role == "Team Member":
+            base_query += """
+                AND t.id IN (
+                    SELECT s.task_id 
+                    FROM subtasks s 
+                    WHERE s.assigned_user_id = :user_id
+                )
+            """
+            params["user_id"] = user_id
+
+        base_query += TasksDao._filter_clauses(filters or {}, params)
+
+        if cursor:
+            base_query += " AND (t.updated_at, t.id) < (:cursor_updated_at, :cursor_id)"
+            params["cursor_updated_at"], params["cursor_id"] = cursor
+
+        base_query += " ORDER BY t.updated_at DESC, t.id DESC"
+        if limit:
+            base_query += " LIMIT :limit"
+            params["limit"] = limit + 1
+
+        return base_query, params
+
+    @staticmethod
+    def json_list_query(project_id: str, user_id: str, customer_id: str, role: str,
+                        filters: Optional[dict], limit: Optional[int], cursor: Optional[tuple]) -> Tuple[str, dict]:
+        """
+        list_query rendered by Postgres as JSON text: the whole list, or with `limit` one page plus what
+        json_page_query reports for the next cursor. Read the row with json_page.
+        """
+        base_query, params = TasksDao.list_query(project_id, user_id, customer_id, role, filters, limit, cursor)
+        if not limit:
+            return json_array_query(base_query, TASK_JSON_DOC, order_by="q.updated_at DESC, q.id DESC"), params
+        return json_page_query(base_query, TASK_JSON_DOC, "updated_at"), {**params, "page_size": limit}
+
+    @staticmethod
+    def json_page(row, limit: Optional[int]) -> dict:
+        next_cursor = encode_cursor(row.cursor_sort_value, row.cursor_id) if limit and row.has_more else None
+        return {"json": row.data, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        return {
+            'id': row.id,
+            'customer_id': row.customer_id,
+            'project_id': row.project_id,
+            'category_id': row.category_id,
+            'title': row.title,
+            'description': row.description,
+            'status': row.status,
+            'priority': row.priority,
+            'due_date': row.due_date.isoformat() if row.due_date else None,
+            'tags': row.tags,
+            'estimated_duration': row.estimated_duration,
+            'actual_duration': row.actual_duration,
+            'start_date': row.start_date.isoformat() if row.start_date else None,
+            'end_date': row.end_date.isoformat() if row.end_date else None,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat(),
+            'subtasks': row.subtasks,
+            'completion_percentage': round(
+                (row.subtask_completed / row.subtask_total * 100)
+                if row.subtask_total > 0 else 0
+            )
+        }
+
+    @staticmethod
+    def list_tasks(project_id: str = None, user_id: str = None, customer_id: str = None, role: str = None,
+                   filters: Optional[dict] = None, limit: Optional[int] = None,
+                   cursor: Optional[tuple] = None, stream: bool = False, as_json: bool = False) -> Tuple[dict, int]:
         """
         Stuart: Fetch tasks and their subtasks in a single query, including completion percentage.
+        Results are ordered by (updated_at, id) descending so they can be paged with a keyset cursor.
+        With `stream=True` the rows are returned as a lazy iterator over a server-side cursor instead of a list.
+        With `as_json=True` Postgres renders the whole page as JSON text, returned under "json".
         """
         try:
             if not user_id or not customer_id:
                 return [{"error": "Unauthorized: Invalid token data"}], 401
 
-            base_query = """
-                SELECT 
-                    t.id, t.customer_id, t.project_id, t.category_id, t.title, 
-                    t.description, t.status, t.priority, 
-                    t.due_date, t.tags, t.estimated_duration, t.actual_duration,
-                    t.start_date, t.end_date, t.created_at, t.updated_at,
-                    COALESCE((
-                        SELECT json_agg(json_build_object(
-                            'id', s.id,
-                            'task_id', s.task_id,
-                            'title', s.title,
-                            'description', s.description,
-                            'status', s.status,
-                            'assigned_user_id', s.assigned_user_id,
-                            'assigned_team_id', s.assigned_team_id,
-                            'due_date', s.due_date,
-                            'tags', s.tags,
-                            'estimated_duration', s.estimated_duration,
-                            'created_at', s.created_at,
-                            'updated_at', s.updated_at
-                        ))
-                        FROM subtasks s
-                        WHERE s.task_id = t.id
-                    ), '[]'::json) AS subtasks,
-                    COALESCE((
-                        SELECT COUNT(*) 
-                        FROM subtasks s 
-                        WHERE s.task_id = t.id 
-                        AND s.status = 'Completed'
-                    ), 0) AS completed_subtasks_count,
-                    COALESCE((
-                        SELECT COUNT(*) 
-                        FROM subtasks s 
-                        WHERE s.task_id = t.id
-                    ), 0) AS total_subtasks_count
-                FROM tasks t
-                WHERE t.customer_id = :customer_id
-            """
-            params = {"customer_id": customer_id}
-
-            if project_id:
-                base_query += " AND t.project_id = :project_id"
-                params["project_id"] = project_id
-
-            if role == "Team Member":
-                base_query += """
-                    AND t.id IN (
-                        SELECT s.task_id 
-                        FROM subtasks s 
-                        WHERE s.assigned_user_id = :user_id
-                    )
-                """
-                params["user_id"] = user_id
+            if stream:
+                base_query, params = TasksDao.list_query(project_id, user_id, customer_id, role, filters, limit, cursor)
+                return {
+                    "rows": stream_rows(text(base_query), params, TasksDao._row_to_dict),
+                    "cursor_key": lambda task: (task["updated_at"], task["id"])
+                }, 200
+
+            if as_json:
+                query, params = TasksDao.json_list_query(project_id, user_id, customer_id, role, filters, limit, cursor)
+                return TasksDao.json_page(db.session.execute(text(query), params).fetchone(), limit), 200
+
+            base_query, params = TasksDao.list_query(project_id, user_id, customer_id, role, filters, limit, cursor)
 
             result = db.session.execute(text(base_query), params).fetchall()
-            task_dicts = []
-            for row in result:
-                task_dict = {
-                    'id': row.id,
-                    'customer_id': row.customer_id,
-                    'project_id': row.project_id,
-                    'category_id': row.category_id,
-                    'title': row.title,
-                    'description': row.description,
-                    'status': row.status,
-                    'priority': row.priority,
-                    'due_date': row.due_date.isoformat() if row.due_date else None,
-                    'tags': row.tags,
-                    'estimated_duration': row.estimated_duration,
-                    'actual_duration': row.actual_duration,
-                    'start_date': row.start_date.isoformat() if row.start_date else None,
-                    'end_date': row.end_date.isoformat() if row.end_date else None,
-                    'created_at': row.created_at.isoformat(),
-                    'updated_at': row.updated_at.isoformat(),
-                    'subtasks': row.subtasks,
-                    'completion_percentage': round(
-                        (row.completed_subtasks_count / row.total_subtasks_count * 100)
-                        if row.total_subtasks_count > 0 else 0
-                    )
-                }
-                task_dicts.append(task_dict)
-
-            return task_dicts, 200
+            result, next_cursor = split_page(result, limit, lambda row: (row.updated_at, row.id))
+            task_dicts = [TasksDao._row_to_dict(row) for row in result]
+
+            return {"data": task_dicts, "next_cursor": next_cursor}, 200
 
         except Exception as e:
             from ..utils.logger import app_logger
@@ -104,4 +218,132 @@ class TasksDao:
                 "error": str(e),
                 "traceback": traceback.format_exc()
             })
-            return [{"error": f"Failed to fetch tasks: {str(e)}"}], 500
\ No newline at end of file
+            return [{"error": f"Failed to fetch tasks: {str(e)}"}], 500
+
+    @staticmethod
+    def work_feed_query(user_id: str, customer_id: str, statuses: List[str], limit: int,
+                        cursor: Optional[tuple]) -> Tuple[str, dict]:
+        """
+        Open subtasks assigned to the user directly or to one of their teams, in (due date, id) order with
+        undated ones last. Each side is a range scan of its partial index that stops after `limit + 1`
+        rows (per team for team assignments), so the cost follows the page size, not the tenant size.
+        A subtask assigned to the user and to one of their teams is listed once, as a direct assignment.
+        """
+        page_clauses = " AND s.status = ANY(CAST(:statuses AS subtask_status[]))"
+        params = {"user_id": user_id, "customer_id": customer_id, "statuses": statuses, "limit": limit + 1}
+        if cursor:
+            page_clauses += f" AND ({WORK_DUE_ORDER}, s.id) > (COALESCE(CAST(:cursor_due AS timestamp), 'infinity'::timestamp), :cursor_id)"
+            params["cursor_due"], params["cursor_id"] = cursor
+
+        columns = """s.id, s.task_id, s.title, s.description, s.status, s.assigned_user_id, s.assigned_team_id,
+                     s.due_date, s.tags, s.estimated_duration, s.created_at, s.updated_at"""
+        # The page is cut before tasks and projects are joined, so they are looked up for its rows only
+        query = f"""
+            WITH assigned AS (
+                (
+                    SELECT {columns}, 'user' AS assignment
+                    FROM subtasks s
+                    WHERE s.assigned_user_id = :user_id
+                    AND s.status <> 'Completed'
+                    {page_clauses}
+                    ORDER BY {WORK_DUE_ORDER}, s.id
+                    LIMIT :limit
+                )
+                UNION ALL
+                SELECT {columns}, 'team' AS assignment
+                FROM team_members tm
+                CROSS JOIN LATERAL (
+                    SELECT {columns}
+                    FROM subtasks s
+                    WHERE s.assigned_team_id = tm.team_id
+                    AND s.status <> 'Completed'
+                    AND s.assigned_user_id IS DISTINCT FROM :user_id
+                    {page_clauses}
+                    ORDER BY {WORK_DUE_ORDER}, s.id
+                    LIMIT :limit
+                ) s
+                WHERE tm.user_id = :user_id
+            ),
+            page AS MATERIALIZED (
+                SELECT s.*
+                FROM assigned s
+                ORDER BY {WORK_DUE_ORDER}, s.id
+                LIMIT :limit
+            )
+            SELECT s.*,
+                   t.title AS task_title, t.status AS task_status, t.priority AS task_priority,
+                   t.due_date AS task_due_date, t.project_id, p.title AS project_title
+            FROM page s
+            JOIN tasks t ON t.id = s.task_id AND t.customer_id = :customer_id
+            LEFT JOIN projects p ON p.id = t.project_id
+            ORDER BY {WORK_DUE_ORDER}, s.id
+        """
+        return query, params
+
+    @staticmethod
+    def _work_row_to_dict(row) -> dict:
+        return {
+            'id': row.id,
+            'task_id': row.task_id,
+            'title': row.title,
+            'description': row.description,
+            'status': row.status,
+            'assigned_user_id': row.assigned_user_id,
+            'assigned_team_id': row.assigned_team_id,
+            'due_date': row.due_date.isoformat() if row.due_date else None,
+            'tags': row.tags,
+            'estimated_duration': row.estimated_duration,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat(),
+            'assignment': row.assignment,
+            'task': {
+                'id': row.task_id,
+                'title': row.task_title,
+                'status': row.task_status,
+                'priority': row.task_priority,
+                'due_date': row.task_due_date.isoformat() if row.task_due_date else None
+            },
+            'project': {'id': row.project_id, 'title': row.project_title} if row.project_id else None
+        }
+
+    @staticmethod
+    def fetch_work_feed(user_id: str, customer_id: str, statuses: List[str], limit: int,
+                        cursor: Optional[tuple]) -> dict:
+        """
+        One page of the my-work feed (see work_feed_query) with the cursor for the next page.
+        """
+        query, params = TasksDao.work_feed_query(user_id, customer_id, statuses, limit, cursor)
+        rows = db.session.execute(text(query), params).fetchall()
+        rows, next_cursor = split_page(rows, limit, lambda row: (row.due_date, row.id))
+        return {"data": [TasksDao._work_row_to_dict(row) for row in rows], "next_cursor": next_cursor, "limit": limit}
+
+    @staticmethod
+    def repair_subtask_counters(customer_id: str = None) -> int:
+        """
+        Recompute tasks.subtask_total / subtask_completed from the subtasks table and fix any rows that drifted.
+        Returns the number of tasks corrected.
+        """
+        lift_statement_timeout()
+        query = """
+            UPDATE tasks t
+            SET subtask_total = c.total,
+                subtask_completed = c.completed
+            FROM (
+                SELECT t2.id,
+                       COUNT(s.id) AS total,
+                       COUNT(s.id) FILTER (WHERE s.status = 'Completed') AS completed
+                FROM tasks t2
+                LEFT JOIN subtasks s ON s.task_id = t2.id
+                WHERE (CAST(:customer_id AS varchar) IS NULL OR t2.customer_id = :customer_id)
+                GROUP BY t2.id
+            ) c
+            WHERE t.id = c.id
+            AND (t.subtask_total <> c.total OR t.subtask_completed <> c.completed)
+            RETURNING t.customer_id
+        """
+        corrected = db.session.execute(text(query), {"customer_id": customer_id}).scalars().all()
+        # Raw SQL bypasses the flush hook, so invalidate the affected customers' ETags explicitly
+        for affected_customer_id in set(corrected):
+            bump_versions(affected_customer_id, SCOPES_BY_TABLE["tasks"])
+        db.session.commit()
+        return len(corrected)
@@ -1,64 +1,94 @@
 from ..sources import db
 from sqlalchemy import text
+from ..utils.streaming import stream_rows
+from .rendering import json_array_query
 
 class TeamsDao:
     @staticmethod
-    def fetch_teams(customer_id: str, role: str, user_id: str) -> dict:
+    def list_query(customer_id: str, role: str, user_id: str):
+        """
+        SQL and parameters for the customer's teams with their members; Team Members only see their own teams.
+        """
+        # Base query to fetch teams and aggregate members
+        query = """
+            SELECT 
+                t.id,
+                t.customer_id AS "customerId",
+                t.name,
+                t.description,
+                to_char(t.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS "createdAt",
+                to_char(t.updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS "updatedAt",
+                COALESCE(
+                    (
+                        SELECT json_agg(
+                            json_build_object(
+                                'user_id', tm.user_id,
+                                'team_id', tm.team_id,
+                                'joined_at', to_char(tm.joined_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+                                'user', json_build_object(
+                                    'id', u.id,
+                                    'customerId', u.customer_id,
+                                    'username', u.username,
+                                    'email', u.email,
+                                    'role', u.role,
+                                    'createdAt', to_char(u.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+                                    'updatedAt', to_char(u.updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
+                                )
+                            )
+                        )
+                        FROM team_members tm
+                        JOIN users u ON tm.user_id = u.id
+                        WHERE tm.team_id = t.id
+                    ),
+                    '[]'::json
+                ) AS members
+            FROM teams t
+            WHERE t.customer_id = :customer_id
+        """
+        params = {"customer_id": customer_id}
+
+        # Restrict to user's teams for Team Member role
+        if role == "Team Member":
+            query += """
+                AND t.id IN (
+                    SELECT team_id 
+                    FROM team_members 
+                    WHERE user_id = :user_id
+                )
+            """
+            params["user_id"] = user_id
+
+        return query, params
+
+    @staticmethod
+    def json_list_query(customer_id: str, role: str, user_id: str):
+        """
+        list_query rendered by Postgres as one JSON array text value.
+        """
+        query, params = TeamsDao.list_query(customer_id, role, user_id)
+        # Every column is already rendered the way jsonify would, so the row maps to its JSON object as is
+        return json_array_query(query, "row_to_json(q)"), params
+
+    @staticmethod
+    def fetch_teams(customer_id: str, role: str, user_id: str, stream: bool = False, as_json: bool = False) -> dict:
         """
         Fetch all teams for a customer, including their members and user details.
+        With `stream=True` the teams are returned as a lazy row iterator under "rows" instead of a list under "data".
+        With `as_json=True` Postgres renders the list as JSON text, returned under "json".
         """
         try:
             if not customer_id:
                 return {"error": "Unauthorized: Invalid token data"}, 401
 
-            # Base query to fetch teams and aggregate members
-            query = """
-                SELECT 
-                    t.id,
-                    t.customer_id AS "customerId",
-                    t.name,
-                    t.description,
-                    to_char(t.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS "createdAt",
-                    to_char(t.updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS "updatedAt",
-                    COALESCE(
-                        (
-                            SELECT json_agg(
-                                json_build_object(
-                                    'user_id', tm.user_id,
-                                    'team_id', tm.team_id,
-                                    'joined_at', to_char(tm.joined_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
-                                    'user', json_build_object(
-                                        'id', u.id,
-                                        'customerId', u.customer_id,
-                                        'username', u.username,
-                                        'email', u.email,
-                                        'role', u.role,
-                                        'createdAt', to_char(u.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
-                                        'updatedAt', to_char(u.updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
-                                    )
-                                )
-                            )
-                            FROM team_members tm
-                            JOIN users u ON tm.user_id = u.id
-                            WHERE tm.team_id = t.id
-                        ),
-                        '[]'::json
-                    ) AS members
-                FROM teams t
-                WHERE t.customer_id = :customer_id
-            """
-            params = {"customer_id": customer_id}
+            query, params = TeamsDao.list_query(customer_id, role, user_id)
+
+            if stream:
+                return {"message": "Teams fetched successfully", "rows": stream_rows(text(query), params)}, 200
 
-            # Restrict to user's teams for Team Member role
-            if role == "Team Member":
-                query += """
-                    AND t.id IN (
-                        SELECT team_id 
-                        FROM team_members 
-                        WHERE user_id = :user_id
-                    )
-                """
-                params["user_id"] = user_id
+            if as_json:
+                json_query, params = TeamsDao.json_list_query(customer_id, role, user_id)
+                data = db.session.execute(text(json_query), params).scalar()
+                return {"message": "Teams fetched successfully", "json": data}, 200
 
             # Execute query
             results = db.session.execute(text(query), params).fetchall()
@@ -0,0 +1,296 @@
+import csv
+import io
+from typing import Iterable, Iterator, List, Tuple
+
+from ..sources import db
+from ..utils.db_pool import lift_statement_timeout
+from .project_metrics import COUNTER_UPSERT
+from sqlalchemy import text
+
+# Column order of the staging table and of the CSV stream fed to COPY
+STAGING_COLUMNS = ("line_no", "id", "user_id", "subtask_id", "start_time", "end_time", "duration", "notes")
+
+# Rows per CSV chunk handed to COPY; bounds memory regardless of import size
+COPY_CHUNK_ROWS = 1000
+
+# Report granularities (period expression over the local day) and grouping dimensions
+REPORT_PERIODS = {
+    "day": "r.day",
+    "week": "date_trunc('week', r.day)::date",
+    "month": "date_trunc('month', r.day)::date",
+    "total": None,
+}
+REPORT_GROUPS = {"user": "r.user_id", "project": "r.project_id", "task": "r.task_id", "subtask": "r.subtask_id"}
+REPORT_KEYS = {"user": "userId", "project": "projectId", "task": "taskId", "subtask": "subtaskId"}
+
+
+class _CopyStream(io.RawIOBase):
+    """
+    Read-only file object over an iterator of rows, encoding them as CSV on demand so COPY can
+    consume an arbitrarily large import without it ever being held in memory.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def _fill(self) -> bool:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for _, row in zip(range(COPY_CHUNK_ROWS), self._rows):
+            writer.writerow(["" if value is None else value for value in row])
+        self._buffer += out.getvalue().encode("utf-8")
+        return bool(out.tell())
+
+    def read(self, size=-1):
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readinto(self, b):
+        chunk = self.read(len(b))
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class TimeEntriesDao:
+    @staticmethod
+    def create_import_staging() -> None:
+        """
+        Session-private staging table for a bulk import; dropped automatically when the transaction ends.
+        IDs are staged as text, so an over-long one is rejected by the checks rather than failing the COPY.
+        Large imports may outlast the API's statement_timeout, so it is lifted for this transaction.
+        """
+        lift_statement_timeout()
+        db.session.execute(text("""
+            CREATE TEMP TABLE time_entry_import_staging (
+                line_no integer NOT NULL,
+                id text NOT NULL,
+                user_id text NOT NULL,
+                subtask_id text NOT NULL,
+                start_time timestamptz NOT NULL,
+                end_time timestamptz NOT NULL,
+                duration integer NOT NULL,
+                notes text,
+                error text
+            ) ON COMMIT DROP
+        """))
+
+    @staticmethod
+    def copy_into_staging(rows: Iterator[tuple]) -> int:
+        """
+        Stream `rows` (tuples in STAGING_COLUMNS order) into the staging table with COPY.
+        Returns the number of rows copied.
+        """
+        # COPY is driver-level; run it on the DBAPI connection behind the session's transaction
+        dbapi_connection = db.session.connection().connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY time_entry_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                _CopyStream(rows)
+            )
+            copied = cursor.rowcount
+        # Temp tables are never auto-analyzed; without statistics the validation joins are planned for an empty table
+        db.session.execute(text("ANALYZE time_entry_import_staging"))
+        return copied
+
+    @staticmethod
+    def validate_staging(customer_id: str, only_user_id: str = None) -> None:
+        """
+        Mark staged rows that fail ownership or consistency checks, in one set-based pass.
+        `only_user_id` restricts the import to entries of that user (Team Members importing their own time).
+        """
+        db.session.execute(text("""
+            UPDATE time_entry_import_staging st
+            SET error = CASE
+                WHEN CAST(:only_user_id AS varchar) IS NOT NULL AND st.user_id <> :only_user_id
+                    THEN 'Unauthorized: You can only import your own time entries'
+                WHEN NOT EXISTS (
+                    SELECT 1 FROM users u WHERE u.id = st.user_id AND u.customer_id = :customer_id
+                ) THEN 'User not found or unauthorized'
+                WHEN NOT EXISTS (
+                    SELECT 1 FROM subtasks s JOIN tasks t ON t.id = s.task_id
+                    WHERE s.id = st.subtask_id AND t.customer_id = :customer_id
+                ) THEN 'Subtask not found or unauthorized'
+                WHEN st.end_time < st.start_time THEN 'end_time is before start_time'
+                WHEN st.duration <> trunc(extract(epoch FROM st.end_time - st.start_time) / 60)
+                    THEN 'Duration does not match start and end times'
+            END
+        """), {"customer_id": customer_id, "only_user_id": only_user_id})
+
+    @staticmethod
+    def staging_rejects(limit: int) -> Tuple[int, List[dict]]:
+        """
+        Count of rejected staged rows and the first `limit` of them, by line number.
+        """
+        total = db.session.execute(text(
+            "SELECT COUNT(*) FROM time_entry_import_staging WHERE error IS NOT NULL"
+        )).scalar()
+        rows = db.session.execute(text("""
+            SELECT line_no, error
+            FROM time_entry_import_staging
+            WHERE error IS NOT NULL
+            ORDER BY line_no
+            LIMIT :limit
+        """), {"limit": limit}).fetchall()
+        return total, [{"line": row.line_no, "error": row.error} for row in rows]
+
+    @staticmethod
+    def load_staging(customer_id: str) -> int:
+        """
+        Insert the staged rows that passed validation into time_entries. Returns the number inserted.
+        """
+        result = db.session.execute(text("""
+            INSERT INTO time_entries (id, customer_id, user_id, subtask_id, start_time, end_time, duration, notes, created_at)
+            SELECT id, :customer_id, user_id, subtask_id, start_time, end_time, duration, notes, now()
+            FROM time_entry_import_staging
+            WHERE error IS NULL
+        """), {"customer_id": customer_id})
+        return result.rowcount
+
+    @staticmethod
+    def apply_staging_rollups(customer_id: str) -> None:
+        """
+        Add the rows loaded by load_staging to the daily rollups and to the project metric counters, in one
+        statement for the whole import.
+        """
+        db.session.execute(text("""
+            WITH staged AS (
+                SELECT c.id AS customer_id, (st.start_time AT TIME ZONE c.time_zone)::date AS day, st.user_id,
+                       st.subtask_id, t.id AS task_id, t.project_id, SUM(st.duration) AS minutes, COUNT(*) AS entries
+                FROM time_entry_import_staging st
+                JOIN customers c ON c.id = :customer_id
+                JOIN subtasks s ON s.id = st.subtask_id
+                JOIN tasks t ON t.id = s.task_id
+                WHERE st.error IS NULL
+                GROUP BY c.id, (st.start_time AT TIME ZONE c.time_zone)::date, st.user_id, st.subtask_id, t.id, t.project_id
+            ), rollups AS (
+                INSERT INTO time_entry_daily_rollups (customer_id, day, user_id, subtask_id, task_id, project_id, minutes, entries)
+                SELECT customer_id, day, user_id, subtask_id, task_id, project_id, minutes, entries
+                FROM staged
+                ON CONFLICT (customer_id, day, user_id, subtask_id)
+                DO UPDATE SET minutes = time_entry_daily_rollups.minutes + EXCLUDED.minutes,
+                              entries = time_entry_daily_rollups.entries + EXCLUDED.entries
+            )
+        """ + COUNTER_UPSERT.format(source="""
+            SELECT project_id, customer_id, 0, 0, 0, SUM(minutes), now() AT TIME ZONE 'UTC'
+            FROM staged
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id, customer_id
+        """)), {"customer_id": customer_id})
+
+    @staticmethod
+    def apply_rollup_delta(customer_id: str, user_id: str, subtask_id: str, start_time, minutes: int, entries: int) -> None:
+        """
+        Add (or, with negative deltas, remove) one entry's minutes to its daily bucket and to its project's
+        metric counters, in the caller's transaction. Buckets left with no entries are deleted.
+        """
+        params = {
+            "customer_id": customer_id, "user_id": user_id, "subtask_id": subtask_id,
+            "start_time": start_time, "minutes": minutes, "entries": entries
+        }
+        db.session.execute(text("""
+            WITH bucket AS (
+                INSERT INTO time_entry_daily_rollups (customer_id, day, user_id, subtask_id, task_id, project_id, minutes, entries)
+                SELECT c.id, (CAST(:start_time AS timestamptz) AT TIME ZONE c.time_zone)::date, :user_id, s.id,
+                       t.id, t.project_id, :minutes, :entries
+                FROM customers c
+                JOIN subtasks s ON s.id = :subtask_id
+                JOIN tasks t ON t.id = s.task_id
+                WHERE c.id = :customer_id
+                ON CONFLICT (customer_id, day, user_id, subtask_id)
+                DO UPDATE SET minutes = time_entry_daily_rollups.minutes + EXCLUDED.minutes,
+                              entries = time_entry_daily_rollups.entries + EXCLUDED.entries
+                RETURNING project_id
+            )
+        """ + COUNTER_UPSERT.format(source="""
+            SELECT project_id, :customer_id, 0, 0, 0, CAST(:minutes AS bigint), now() AT TIME ZONE 'UTC'
+            FROM bucket
+            WHERE project_id IS NOT NULL
+        """)), params)
+        if entries < 0:
+            db.session.execute(text("""
+                DELETE FROM time_entry_daily_rollups r
+                USING customers c
+                WHERE c.id = :customer_id
+                AND r.customer_id = :customer_id
+                AND r.day = (CAST(:start_time AS timestamptz) AT TIME ZONE c.time_zone)::date
+                AND r.user_id = :user_id
+                AND r.subtask_id = :subtask_id
+                AND r.entries <= 0
+            """), params)
+
+    @staticmethod
+    def rebuild_rollups(customer_id: str = None) -> int:
+        """
+        Recompute the daily rollups from time_entries, e.g. after a customer's time_zone changed or after
+        rows were written outside TimeEntryService. Returns the number of buckets written.
+        """
+        params = {"customer_id": customer_id}
+        lift_statement_timeout()
+        db.session.execute(text("""
+            DELETE FROM time_entry_daily_rollups
+            WHERE (CAST(:customer_id AS varchar) IS NULL OR customer_id = :customer_id)
+        """), params)
+        result = db.session.execute(text("""
+            INSERT INTO time_entry_daily_rollups (customer_id, day, user_id, subtask_id, task_id, project_id, minutes, entries)
+            SELECT te.customer_id, (te.start_time AT TIME ZONE c.time_zone)::date, te.user_id, te.subtask_id,
+                   t.id, t.project_id, SUM(te.duration), COUNT(*)
+            FROM time_entries te
+            JOIN customers c ON c.id = te.customer_id
+            JOIN subtasks s ON s.id = te.subtask_id
+            JOIN tasks t ON t.id = s.task_id
+            WHERE (CAST(:customer_id AS varchar) IS NULL OR te.customer_id = :customer_id)
+            GROUP BY te.customer_id, (te.start_time AT TIME ZONE c.time_zone)::date, te.user_id, te.subtask_id, t.id, t.project_id
+        """), params)
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def fetch_report(customer_id: str, start_day, end_day, group_by: List[str], granularity: str,
+                     user_id: str = None, project_id: str = None) -> List[dict]:
+        """
+        Sum the daily rollups between two local dates (inclusive), bucketed by `granularity`
+        (a key of REPORT_PERIODS) and grouped by the REPORT_GROUPS keys in `group_by`.
+        """
+        period = REPORT_PERIODS[granularity]
+        group_exprs = ([period] if period else []) + [REPORT_GROUPS[group] for group in group_by]
+        select_list = (
+            ([f"{period} AS period"] if period else [])
+            + [f'{REPORT_GROUPS[group]} AS "{REPORT_KEYS[group]}"' for group in group_by]
+            + ["COALESCE(SUM(r.minutes), 0) AS minutes", "COALESCE(SUM(r.entries), 0) AS entries"]
+        )
+
+        query = f"""
+            SELECT {', '.join(select_list)}
+            FROM time_entry_daily_rollups r
+            WHERE r.customer_id = :customer_id
+            AND r.day BETWEEN :start_day AND :end_day
+        """
+        params = {"customer_id": customer_id, "start_day": start_day, "end_day": end_day}
+        if user_id:
+            query += " AND r.user_id = :user_id"
+            params["user_id"] = user_id
+        if project_id:
+            query += " AND r.project_id = :project_id"
+            params["project_id"] = project_id
+        if group_exprs:
+            positions = ", ".join(str(i) for i in range(1, len(group_exprs) + 1))
+            query += f" GROUP BY {positions} ORDER BY {positions}"
+
+        rows = db.session.execute(text(query), params).mappings().all()
+        report = []
+        for row in rows:
+            item = dict(row)
+            if "period" in item:
+                item["period"] = item["period"].isoformat()
+            item["minutes"] = int(item["minutes"])
+            item["entries"] = int(item["entries"])
+            report.append(item)
+        return report
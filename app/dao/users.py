@@ -1,5 +1,7 @@
 from ..sources import db
 from sqlalchemy import text
+from ..utils.streaming import stream_rows
+from .rendering import http_date, json_array_query
 import json
 
 class UsersDao:
@@ -56,9 +58,64 @@ class UsersDao:
             return {"error": f"Failed to fetch user: {str(e)}"}, 500
 
     @staticmethod
-    def fetch_users(customer_id: str, role: str) -> dict:
+    def _user_row_to_dict(row) -> dict:
+        user_dict = dict(row._mapping)
+        # Teams field is already a Python list (json_agg returns parsed JSON)
+        user_dict['teams'] = user_dict['teams'] or []
+        return user_dict
+
+    @staticmethod
+    def list_query(customer_id: str):
+        """
+        SQL and parameters for the customer's users with the names of their teams.
+        """
+        # Query to fetch users and aggregate their teams as JSON (PostgreSQL-compatible)
+        query = """
+            SELECT 
+                u.*,
+                COALESCE(
+                    (
+                        SELECT json_agg(
+                            json_build_object(
+                                'id', t.id,
+                                'name', t.name
+                                -- Add other team fields as needed
+                            )
+                        )
+                        FROM teams t
+                        JOIN team_members tm ON t.id = tm.team_id
+                        WHERE tm.user_id = u.id
+                    ),
+                    '[]'::json
+                ) as teams
+            FROM users u
+            WHERE u.customer_id = :customer_id
+        """
+        params = {"customer_id": customer_id}
+
+        return query, params
+
+    @staticmethod
+    def json_list_query(customer_id: str):
+        """
+        list_query rendered by Postgres as one JSON array text value.
+        """
+        query, params = UsersDao.list_query(customer_id)
+        # Same fields as the row path; timestamps are rendered in the RFC 822 form jsonify uses for datetimes
+        doc = f"""
+            to_jsonb(q) || jsonb_build_object(
+                'created_at', {http_date("q.created_at")},
+                'updated_at', {http_date("q.updated_at")}
+            )
+        """
+        return json_array_query(query, doc), params
+
+    @staticmethod
+    def fetch_users(customer_id: str, role: str, stream: bool = False, as_json: bool = False) -> dict:
         """
         Fetch all users for a customer, including their associated teams.
+        With `stream=True` the users are returned as a lazy row iterator under "rows" instead of a list under "data".
+        With `as_json=True` Postgres renders the list as JSON text, returned under "json".
         """
         try:
             # Authorization checks
@@ -68,40 +125,21 @@ class UsersDao:
             if role not in ["Admin", "Project Manager"]:
                 return {"error": "Insufficient permissions"}, 403
 
-            # Query to fetch users and aggregate their teams as JSON (PostgreSQL-compatible)
-            query = """
-                SELECT 
-                    u.*,
-                    COALESCE(
-                        (
-                            SELECT json_agg(
-                                json_build_object(
-                                    'id', t.id,
-                                    'name', t.name
-                                    -- Add other team fields as needed
-                                )
-                            )
-                            FROM teams t
-                            JOIN team_members tm ON t.id = tm.team_id
-                            WHERE tm.user_id = u.id
-                        ),
-                        '[]'::json
-                    ) as teams
-                FROM users u
-                WHERE u.customer_id = :customer_id
-            """
-            params = {"customer_id": customer_id}
+            query, params = UsersDao.list_query(customer_id)
+
+            if stream:
+                return {"message": "Users fetched successfully", "rows": stream_rows(text(query), params, UsersDao._user_row_to_dict)}, 200
+
+            if as_json:
+                json_query, params = UsersDao.json_list_query(customer_id)
+                data = db.session.execute(text(json_query), params).scalar()
+                return {"message": "Users fetched successfully", "json": data}, 200
 
             # Execute query
             results = db.session.execute(text(query), params).fetchall()
 
             # Convert results to list of dicts
-            user_dicts = []
-            for row in results:
-                user_dict = dict(row._mapping)
-                # Teams field is already a Python list (json_agg returns parsed JSON)
-                user_dict['teams'] = user_dict['teams'] or []
-                user_dicts.append(user_dict)
+            user_dicts = [UsersDao._user_row_to_dict(row) for row in results]
 
             return {"message": "Users fetched successfully", "data": user_dicts}, 200
 
@@ -114,4 +152,11 @@ class UsersDao:
                 "traceback": traceback.format_exc()
             })
             return {"error": f"Failed to fetch users: {str(e)}"}, 500
-        
\ No newline at end of file
+        
+    @staticmethod
+    def user_exists(user_id: str, customer_id: str) -> bool:
+        """
+        Whether `user_id` is one of the customer's users.
+        """
+        query = "SELECT EXISTS (SELECT 1 FROM users WHERE id = :user_id AND customer_id = :customer_id)"
+        return bool(db.session.execute(text(query), {"user_id": user_id, "customer_id": customer_id}).scalar())
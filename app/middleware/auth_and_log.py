@@ -1,12 +1,61 @@
+import json
+import logging
 import time
 import jwt
 from flask import request, current_app
 from functools import wraps
 from typing import Callable, Tuple
-from ..utils.logger import request_logger, app_logger
+from ..utils.logger import request_logger, app_logger, sample
+from ..utils.token_cache import get_token_cache
 from datetime import datetime, timedelta
 import traceback
 
+# Larger bodies (bulk imports) are not logged, so the handler can still stream them from the socket
+MAX_LOGGED_BODY_BYTES = 64 * 1024
+
+
+def body_is_logged() -> bool:
+    """
+    Whether the request logger buffers this request's body; unknown lengths (chunked uploads) are not.
+    """
+    return request.content_length is not None and request.content_length <= MAX_LOGGED_BODY_BYTES
+
+
+def redact(value, fields: frozenset):
+    """
+    Copy of a decoded JSON body with the values of any key in `fields` (case-insensitive) masked.
+    """
+    if isinstance(value, dict):
+        return {k: "[REDACTED]" if k.lower() in fields else redact(v, fields) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v, fields) for v in value]
+    return value
+
+
+def loggable_body():
+    """
+    The request body as it should appear in the request log: JSON bodies decoded (through Flask's cached
+    get_json, so the handler does not parse them again) with LOG_REDACT_FIELDS masked, and anything longer
+    than LOG_BODY_MAX_CHARS cut short. LOG_BODY_MAX_CHARS = 0 logs only the size.
+    """
+    if not body_is_logged():
+        return f"<{request.content_length or 'streamed'} bytes not logged>"
+    limit = current_app.config.get("LOG_BODY_MAX_CHARS", 2048)
+    if limit <= 0 or not request.content_length:
+        return f"<{request.content_length or 0} bytes>"
+
+    payload = request.get_json(silent=True) if request.is_json else None
+    if payload is not None:
+        payload = redact(payload, current_app.config.get("LOG_REDACT_FIELDS", frozenset()))
+        if request.content_length <= limit:
+            return payload
+        body = json.dumps(payload)
+    else:
+        body = request.get_data(as_text=True)
+    if len(body) <= limit:
+        return body
+    return body[:limit] + f"...<{len(body) - limit} more chars>"
+
 class AuthAndLogMiddleware:
     @staticmethod
     def generate_token(user_id: str, role: str, customer_id: str, expires_in: int = 3600) -> str:
@@ -19,6 +68,19 @@ class AuthAndLogMiddleware:
         }
         return jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
 
+    @staticmethod
+    def verify_token(token: str) -> dict:
+        """
+        Claims of a valid token. Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError (including
+        TokenRevokedError); tokens already verified in this worker are answered from the token cache.
+        """
+        cache = get_token_cache()
+        claims = cache.get(token)
+        if claims is None:
+            claims = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
+            cache.put(token, claims)
+        return claims
+
     @staticmethod
     def authenticate_and_log(f: Callable) -> Callable:
         @wraps(f)
@@ -27,13 +89,13 @@ class AuthAndLogMiddleware:
                 "event": "before_request",
                 "method": request.method,
                 "path": request.path,
-                "data": request.get_data(as_text=True),
                 "timestamp": time.time()
             }
 
             token = request.headers.get("Authorization")
             if not token:
                 request_info["error"] = "No token provided"
+                request_info["data"] = loggable_body()
                 request_logger.warning(request_info)
                 return {"message": "Authentication token is missing"}, 401
 
@@ -41,19 +103,24 @@ class AuthAndLogMiddleware:
                 token = token[7:]
 
             try:
-                decoded = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
+                decoded = AuthAndLogMiddleware.verify_token(token)
                 request.decoded = decoded
-                request_info["decoded"] = decoded
+                request_info["decoded"] = dict(decoded)
             except jwt.ExpiredSignatureError:
                 request_info["error"] = "Token has expired"
+                request_info["data"] = loggable_body()
                 request_logger.error(request_info)
                 return {"message": "Token has expired"}, 401
             except jwt.InvalidTokenError as e:
                 request_info["error"] = str(e)
+                request_info["data"] = loggable_body()
                 request_logger.error(request_info)
                 return {"message": "Invalid token", "details": str(e)}, 401
 
-            request_logger.info(request_info)
+            # Sample before touching the body, so requests that are not logged never format it
+            if sample(request_logger, logging.INFO):
+                request_info["data"] = loggable_body()
+                request_logger.info(request_info, extra={"sampled": True})
             return f(*args, **kwargs)
 
         return decorated_function
\ No newline at end of file
@@ -4,7 +4,12 @@ from .team import Team
 from .team_member import TeamMember
 from .project import Project
 from .project_metric import ProjectMetric
+from .project_metric_counter import ProjectMetricCounter
 from .category import Category
 from .task import Task
 from .subtask import Subtask
 from .time_entry import TimeEntry
+from .resource_version import ResourceVersion
+from .time_entry_daily_rollup import TimeEntryDailyRollup
+from .tag_count import TagCount
+from .dependency import Dependency
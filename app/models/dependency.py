@@ -1,13 +1,21 @@
 from uuid import uuid4
+from datetime import datetime
 from app import db
 
 class Dependency(db.Model):
+    """
+    `task_id` cannot start before its prerequisite, a task or a subtask, is completed. Both ends belong to
+    the same project; DependencyService rejects edges that would close a cycle.
+    """
     __tablename__ = 'dependencies'
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
-    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=False)
-    depends_on_task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=True)
-    depends_on_subtask_id = db.Column(db.String(36), db.ForeignKey('subtasks.id'), nullable=True)
+    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
+    depends_on_task_id = db.Column(db.String(36), db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=True,
+                                   index=True)
+    depends_on_subtask_id = db.Column(db.String(36), db.ForeignKey('subtasks.id', ondelete='CASCADE'), nullable=True,
+                                      index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     __table_args__ = (
         db.CheckConstraint(
@@ -15,6 +23,8 @@ class Dependency(db.Model):
             '(depends_on_task_id IS NULL AND depends_on_subtask_id IS NOT NULL)',
             name='check_depends_on_task_or_subtask'
         ),
+        db.Index('uq_dependencies_task_id_prerequisite', 'task_id',
+                 db.text('COALESCE(depends_on_task_id, depends_on_subtask_id)'), unique=True),
     )
 
     def to_dict(self):
@@ -22,5 +32,6 @@ class Dependency(db.Model):
             'id': self.id,
             'taskId': self.task_id,
             'dependsOnTaskId': self.depends_on_task_id,
-            'dependsOnSubtaskId': self.depends_on_subtask_id
-        }
\ No newline at end of file
+            'dependsOnSubtaskId': self.depends_on_subtask_id,
+            'createdAt': self.created_at.isoformat() if self.created_at else None
+        }
@@ -11,7 +11,7 @@ class Project(db.Model):
     customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    project_manager_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    project_manager_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
     status = db.Column(db.Enum('Active', 'On Hold', 'Completed', name='project_status'), default='Active')
     start_date = db.Column(db.DateTime, nullable=True)
     end_date = db.Column(db.DateTime, nullable=True)
@@ -24,6 +24,11 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_projects_customer_id_updated_at', 'customer_id', 'updated_at', 'id'),
+        db.Index('ix_projects_tech_stack', 'tech_stack', postgresql_using='gin'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
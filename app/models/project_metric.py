@@ -11,6 +11,10 @@ class ProjectMetric(db.Model):
     value = db.Column(db.Float, nullable=False)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_project_metrics_project_id_metric_type_recorded_at', 'project_id', 'metric_type', 'recorded_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,29 @@
+from datetime import datetime
+from app import db
+
+class ProjectMetricCounter(db.Model):
+    """
+    Running totals per project that the project metrics are computed from: tasks, subtasks, completed
+    subtasks and minutes logged. Kept current by the task, subtask and time entry writes (ProjectMetricsDao
+    applies the deltas in the writer's transaction) and rebuilt by `flask projects rebuild-metric-counters`.
+    """
+    __tablename__ = 'project_metric_counters'
+
+    project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), primary_key=True)
+    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False, index=True)
+    tasks_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    subtasks_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    subtasks_completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    minutes_logged = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'projectId': self.project_id,
+            'customerId': self.customer_id,
+            'tasksTotal': self.tasks_total,
+            'subtasksTotal': self.subtasks_total,
+            'subtasksCompleted': self.subtasks_completed,
+            'minutesLogged': self.minutes_logged,
+            'updatedAt': self.updated_at.isoformat()
+        }
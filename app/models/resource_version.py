@@ -0,0 +1,23 @@
+from datetime import datetime
+from app import db
+
+class ResourceVersion(db.Model):
+    """
+    Per-customer change stamp for a group of resources ("tasks", "teams", ..., or one project's dependency
+    graph). Bumped in the same transaction as every write to the underlying tables; see
+    app/utils/versioning.py.
+    """
+    __tablename__ = 'resource_versions'
+
+    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), primary_key=True)
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'customerId': self.customer_id,
+            'scope': self.scope,
+            'version': self.version,
+            'updatedAt': self.updated_at.isoformat()
+        }
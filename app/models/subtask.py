@@ -1,24 +1,40 @@
 # app/models/subtask.py
 from uuid import uuid4
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from app import db
 
 class Subtask(db.Model):
     __tablename__ = 'subtasks'
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
-    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=False, index=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.Enum('Not Started', 'In Progress', 'Completed', name='subtask_status'), default='Not Started')
-    assigned_user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True)
-    assigned_team_id = db.Column(db.String(36), db.ForeignKey('teams.id'), nullable=True)
+    assigned_user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True, index=True)
+    assigned_team_id = db.Column(db.String(36), db.ForeignKey('teams.id'), nullable=True, index=True)
     due_date = db.Column(db.DateTime, nullable=True)
     tags = db.Column(ARRAY(db.String), default=[])
     estimated_duration = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Search document over title, tags and description, kept current by the search_vector_update trigger
+    search_vector = deferred(db.Column(TSVECTOR, nullable=True))
+
+    # Open subtasks per assignee in due order (undated last), for the my-work feed
+    __table_args__ = (
+        db.Index('ix_subtasks_assigned_user_id_open_due', 'assigned_user_id',
+                 db.text("COALESCE(due_date, 'infinity'::timestamp)"), 'id',
+                 postgresql_where=db.text("status <> 'Completed'")),
+        db.Index('ix_subtasks_assigned_team_id_open_due', 'assigned_team_id',
+                 db.text("COALESCE(due_date, 'infinity'::timestamp)"), 'id',
+                 postgresql_where=db.text("status <> 'Completed'")),
+        db.Index('ix_subtasks_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_subtasks_tags', 'tags', postgresql_using='gin'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,29 @@
+from app import db
+
+class TagCount(db.Model):
+    """
+    Number of rows carrying each tag, per project and source: 'task' and 'subtask' for task and subtask
+    tags (subtasks count under their task's project), 'tech_stack' for the project's tech stack. Kept
+    current by the tag_counts_* database triggers on every write, so bulk inserts are counted too;
+    rebuilt by `flask tags rebuild-counts`.
+    """
+    __tablename__ = 'tag_counts'
+
+    project_id = db.Column(db.String(36), db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    source = db.Column(db.String(16), primary_key=True)
+    tag = db.Column(db.String, primary_key=True)
+    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_tag_counts_customer_id_source', 'customer_id', 'source'),
+    )
+
+    def to_dict(self):
+        return {
+            'projectId': self.project_id,
+            'source': self.source,
+            'tag': self.tag,
+            'customerId': self.customer_id,
+            'count': self.count
+        }
@@ -1,8 +1,8 @@
 from uuid import uuid4
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from app import db
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 class Task(db.Model):
     __tablename__ = 'tasks'
@@ -19,6 +19,10 @@ class Task(db.Model):
     tags = db.Column(ARRAY(db.String), default=[])
     estimated_duration = db.Column(db.Integer, nullable=True)
     actual_duration = db.Column(db.Integer, nullable=True, default=0)
+
+    # Denormalized subtask counters, maintained by TaskService on every subtask write
+    subtask_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    subtask_completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     start_date = db.Column(db.DateTime, nullable=True)
     end_date = db.Column(db.DateTime, nullable=True)
@@ -26,8 +30,18 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Full-text document of title, tags and description; written by a database trigger, read by SearchDao
+    search_vector = deferred(db.Column(TSVECTOR, nullable=True))
+
     subtasks = relationship('Subtask', backref='task', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_tasks_customer_id_updated_at', 'customer_id', 'updated_at', 'id'),
+        db.Index('ix_tasks_project_id_updated_at', 'project_id', 'updated_at', 'id'),
+        db.Index('ix_tasks_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_tasks_tags', 'tags', postgresql_using='gin'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -6,7 +6,7 @@ class Team(db.Model):
     __tablename__ = 'teams'
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
-    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False)
+    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
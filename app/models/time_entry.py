@@ -8,13 +8,18 @@ class TimeEntry(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    subtask_id = db.Column(db.String(36), db.ForeignKey('subtasks.id'), nullable=False)
+    subtask_id = db.Column(db.String(36), db.ForeignKey('subtasks.id'), nullable=False, index=True)
     start_time = db.Column(db.DateTime(timezone=True), nullable=False)  # Use timezone-aware
     end_time = db.Column(db.DateTime(timezone=True), nullable=False)    # Use timezone-aware
     duration = db.Column(db.Integer, nullable=False)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime(timezone=True), nullable=False)  # Use timezone-aware
 
+    __table_args__ = (
+        db.Index('ix_time_entries_customer_id_start_time', 'customer_id', 'start_time', 'id'),
+        db.Index('ix_time_entries_user_id_start_time', 'user_id', 'start_time'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,36 @@
+from app import db
+
+class TimeEntryDailyRollup(db.Model):
+    """
+    Minutes and entry counts per customer, local day, user and subtask. `day` is the entry's start
+    date in the customer's time_zone; task_id and project_id are copied from the subtask so reports
+    never join back to time_entries. Maintained by TimeEntryService; rebuilt by
+    `flask time-entries rebuild-rollups`.
+    """
+    __tablename__ = 'time_entry_daily_rollups'
+
+    customer_id = db.Column(db.String(36), db.ForeignKey('customers.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    subtask_id = db.Column(db.String(36), db.ForeignKey('subtasks.id'), primary_key=True)
+    task_id = db.Column(db.String(36), db.ForeignKey('tasks.id'), nullable=False)
+    project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=True)
+    minutes = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    entries = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_time_entry_daily_rollups_customer_id_user_id_day', 'customer_id', 'user_id', 'day'),
+        db.Index('ix_time_entry_daily_rollups_customer_id_project_id_day', 'customer_id', 'project_id', 'day'),
+    )
+
+    def to_dict(self):
+        return {
+            'customerId': self.customer_id,
+            'day': self.day.isoformat(),
+            'userId': self.user_id,
+            'subtaskId': self.subtask_id,
+            'taskId': self.task_id,
+            'projectId': self.project_id,
+            'minutes': self.minutes,
+            'entries': self.entries
+        }
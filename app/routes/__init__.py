@@ -3,4 +3,10 @@ from .projects import projects_bp
 from .tasks import tasks_bp
 from .time_entries import time_entries_bp
 from .teams import teams_bp
-from .users import users_bp
\ No newline at end of file
+from .users import users_bp
+from .ops import ops_bp
+from .dashboard import dashboard_bp
+from .me import me_bp
+from .search import search_bp
+from .tags import tags_bp
+from .dependencies import dependencies_bp
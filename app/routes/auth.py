@@ -1,9 +1,10 @@
-from flask import Blueprint, current_app, request
+from flask import Blueprint, request
 from ..services.auth_service import AuthService
 from ..utils.responses import success_response, error_response
 from ..middleware.auth_and_log import AuthAndLogMiddleware
 import jwt
 from ..utils.logger import app_logger
+from ..utils.query_recorder import query_budget
 import traceback
 
 
@@ -11,16 +12,16 @@ auth_bp = Blueprint("auth", __name__, url_prefix="/api/v1/auth")
 auth_service = AuthService()
 
 @auth_bp.route("/register", methods=["POST"])
+@query_budget(5)
 def register():
-    print("REGISTER API HIT", flush=True)
     data = request.get_json()
     result, status_code = auth_service.register(data)
-    print("DATA RECEIVED:", data, flush=True)
     if status_code == 201:
         return success_response(data=result, message=result["message"], status_code=status_code)
     return error_response(message=result["error"], status_code=status_code)
 
 @auth_bp.route("/login", methods=["POST"])
+@query_budget(1)
 def login():
     data = request.get_json()
     result, status_code = auth_service.login(data)
@@ -39,7 +40,7 @@ def refresh_token():
         token = auth_header.split(" ")[1]
         # Decode the token to extract user info
         try:
-            decoded = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
+            decoded = AuthAndLogMiddleware.verify_token(token)
             user_id = decoded["user_id"]
             role = decoded["role"]
             customer_id = decoded["customer_id"]
@@ -0,0 +1,20 @@
+# app/routes/dashboard.py
+from flask import Blueprint, request
+from ..services.dashboard_service import DashboardService
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.conditional import conditional_get
+from ..utils.responses import error_response, list_response
+from ..utils.query_recorder import query_budget
+
+dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/api/v1/dashboard")
+dashboard_service = DashboardService()
+
+@dashboard_bp.route("", methods=["GET"])
+@query_budget(4)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("projects", "tasks", "teams", "users", cache=True)
+def get_dashboard():
+    result, status_code = dashboard_service.get_dashboard(request.args)
+    if status_code == 200:
+        return list_response(result, message="Dashboard fetched successfully", status_code=status_code)
+    return error_response(message=result[0]["error"], status_code=status_code)
@@ -0,0 +1,39 @@
+# app/routes/dependencies.py
+from flask import Blueprint, request
+from ..services.dependency_service import DependencyService
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
+
+dependencies_bp = Blueprint("dependencies", __name__, url_prefix="/api/v1/dependencies")
+dependency_service = DependencyService()
+
+@dependencies_bp.route("/list", methods=["GET"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("tasks")
+def list_dependencies():
+    result, status_code = dependency_service.list_dependencies(request.args)
+    if status_code == 200:
+        return list_response(result, message="Dependencies fetched successfully", status_code=status_code)
+    return error_response(message=result[0]["error"], status_code=status_code)
+
+@dependencies_bp.route("/create", methods=["POST"])
+@query_budget(6)
+@AuthAndLogMiddleware.authenticate_and_log
+def create_dependency():
+    data = request.get_json()
+    result, status_code = dependency_service.create_dependency(data)
+    if status_code == 201:
+        return success_response(data=result, message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code, details=result.get("cycle"))
+
+@dependencies_bp.route("/delete/<dependency_id>", methods=["DELETE"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+def delete_dependency(dependency_id):
+    result, status_code = dependency_service.delete_dependency(dependency_id)
+    if status_code == 200:
+        return success_response(data=result, message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
@@ -0,0 +1,20 @@
+# app/routes/me.py
+from flask import Blueprint, request
+from ..services.task_service import TaskService
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.conditional import conditional_get
+from ..utils.responses import error_response, list_response
+from ..utils.query_recorder import query_budget
+
+me_bp = Blueprint("me", __name__, url_prefix="/api/v1/me")
+task_service = TaskService()
+
+@me_bp.route("/work", methods=["GET"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("tasks", "projects", "teams", cache=True)
+def list_my_work():
+    result, status_code = task_service.list_my_work(request.args)
+    if status_code == 200:
+        return list_response(result, message="Work fetched successfully", status_code=status_code)
+    return error_response(message=result[0]["error"], status_code=status_code)
@@ -0,0 +1,59 @@
+# app/routes/ops.py
+from flask import Blueprint, current_app, request
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.cache import get_response_cache
+from ..utils.token_cache import get_token_cache
+from ..utils.logger import logging_stats
+from ..utils.metrics import collect, summarize
+from ..utils.replica import get_replica_router
+from ..utils.responses import success_response, error_response
+
+ops_bp = Blueprint("ops", __name__, url_prefix="/api/v1/ops")
+
+@ops_bp.route("/cache", methods=["GET"])
+@AuthAndLogMiddleware.authenticate_and_log
+def cache_stats():
+    if request.decoded.get("role") != "Admin":
+        return error_response(message="Insufficient permissions", status_code=403)
+    cache = get_response_cache()
+    if cache is None:
+        return success_response(data={"backend": "none"}, message="Response cache disabled")
+    data = {"backend": cache.name, **cache.info(), **cache.stats.snapshot()}
+    return success_response(data=data, message="Cache stats fetched successfully")
+
+@ops_bp.route("/token-cache", methods=["GET"])
+@AuthAndLogMiddleware.authenticate_and_log
+def token_cache_stats():
+    if request.decoded.get("role") != "Admin":
+        return error_response(message="Insufficient permissions", status_code=403)
+    cache = get_token_cache()
+    data = {"revocation_backend": current_app.config.get("TOKEN_REVOCATION_BACKEND", "local"),
+            **cache.info(), **cache.stats.snapshot()}
+    return success_response(data=data, message="Token cache stats fetched successfully")
+
+
+@ops_bp.route("/logging", methods=["GET"])
+@AuthAndLogMiddleware.authenticate_and_log
+def logging_pipeline_stats():
+    if request.decoded.get("role") != "Admin":
+        return error_response(message="Insufficient permissions", status_code=403)
+    return success_response(data=logging_stats(), message="Logging stats fetched successfully")
+
+
+@ops_bp.route("/metrics", methods=["GET"])
+@AuthAndLogMiddleware.authenticate_and_log
+def metrics_summary():
+    if request.decoded.get("role") != "Admin":
+        return error_response(message="Insufficient permissions", status_code=403)
+    return success_response(data=summarize(collect()), message="Metrics summary fetched successfully")
+
+
+@ops_bp.route("/replica", methods=["GET"])
+@AuthAndLogMiddleware.authenticate_and_log
+def replica_status():
+    if request.decoded.get("role") != "Admin":
+        return error_response(message="Insufficient permissions", status_code=403)
+    router = get_replica_router()
+    if router is None:
+        return success_response(data={"configured": False}, message="No read replica configured")
+    return success_response(data={"configured": True, **router.info()}, message="Replica status fetched successfully")
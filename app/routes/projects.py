@@ -1,18 +1,24 @@
 # app/routes/projects.py
 from flask import Blueprint, request
 from ..services.project_service import ProjectService
+from ..services.dependency_service import DependencyService
 from ..middleware.auth_and_log import AuthAndLogMiddleware
-from ..utils.responses import success_response, error_response
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
 
 projects_bp = Blueprint("projects", __name__, url_prefix="/api/v1/projects")
 project_service = ProjectService()
+dependency_service = DependencyService()
 
 @projects_bp.route("/list", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("projects", cache=True)
 def list_projects():
-    result, status_code = project_service.list_projects()
+    result, status_code = project_service.list_projects(request.args)
     if status_code == 200:
-        return success_response(data=result, message="Projects fetched successfully", status_code=status_code)
+        return list_response(result, message="Projects fetched successfully", status_code=status_code)
     return error_response(message=result[0]["error"], status_code=status_code)
 
 @projects_bp.route("/create", methods=["POST"])
@@ -44,10 +50,32 @@ def archive_project(project_id):
 
 
 @projects_bp.route("/<project_id>/stats", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("projects", "tasks", cache=True)
 def project_stats(project_id):
     result, status_code = project_service.get_project_stats(project_id)
     if status_code == 200:
         return success_response(data=result, message="Success", status_code=status_code)
     return error_response(message=result["error"], status_code=status_code)
 
+
+@projects_bp.route("/<project_id>/metrics", methods=["GET"])
+@query_budget(1)
+@AuthAndLogMiddleware.authenticate_and_log
+def project_metrics(project_id):
+    result, status_code = project_service.get_project_metrics(project_id, request.args)
+    if status_code == 200:
+        return success_response(data=result, message="Project metrics fetched successfully", status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
+
+
+@projects_bp.route("/<project_id>/dependencies", methods=["GET"])
+@query_budget(3)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("tasks", cache=True)
+def project_dependencies(project_id):
+    result, status_code = dependency_service.get_project_graph(project_id)
+    if status_code == 200:
+        return success_response(data=result, message="Dependency graph fetched successfully", status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
@@ -0,0 +1,20 @@
+# app/routes/search.py
+from flask import Blueprint, request
+from ..services.search_service import SearchService
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.conditional import conditional_get
+from ..utils.responses import error_response, list_response
+from ..utils.query_recorder import query_budget
+
+search_bp = Blueprint("search", __name__, url_prefix="/api/v1/search")
+search_service = SearchService()
+
+@search_bp.route("", methods=["GET"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("tasks")
+def search():
+    result, status_code = search_service.search(request.args)
+    if status_code == 200:
+        return list_response(result, message="Search results fetched successfully", status_code=status_code)
+    return error_response(message=result[0]["error"], status_code=status_code)
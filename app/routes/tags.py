@@ -0,0 +1,20 @@
+# app/routes/tags.py
+from flask import Blueprint, request
+from ..services.tag_service import TagService
+from ..middleware.auth_and_log import AuthAndLogMiddleware
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response
+from ..utils.query_recorder import query_budget
+
+tags_bp = Blueprint("tags", __name__, url_prefix="/api/v1/tags")
+tag_service = TagService()
+
+@tags_bp.route("/facets", methods=["GET"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("projects", "tasks", cache=True)
+def tag_facets():
+    result, status_code = tag_service.get_facets(request.args)
+    if status_code == 200:
+        return success_response(data=result, message="Tag facets fetched successfully", status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
@@ -1,21 +1,26 @@
 from flask import Blueprint, request
 from ..services.task_service import TaskService
 from ..middleware.auth_and_log import AuthAndLogMiddleware
-from ..utils.responses import success_response, error_response
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
 
 tasks_bp = Blueprint("tasks", __name__, url_prefix="/api/v1/tasks")
 task_service = TaskService()
 
 @tasks_bp.route("/list", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("tasks")
 def list_tasks():
     project_id = request.args.get("project_id")
-    result, status_code = task_service.list_tasks(project_id)
+    result, status_code = task_service.list_tasks(project_id, request.args)
     if status_code == 200:
-        return success_response(data=result, message="Tasks fetched successfully", status_code=status_code)
+        return list_response(result, message="Tasks fetched successfully", status_code=status_code)
     return error_response(message=result[0]["error"], status_code=status_code)
 
 @tasks_bp.route("/create", methods=["POST"])
+@query_budget(4)
 @AuthAndLogMiddleware.authenticate_and_log
 def create_task():
     data = request.get_json()
@@ -24,7 +29,18 @@ def create_task():
         return success_response(data=result, message=result["message"], status_code=status_code)
     return error_response(message=result["error"], status_code=status_code)
 
+@tasks_bp.route("/batch", methods=["POST"])
+@query_budget(4)
+@AuthAndLogMiddleware.authenticate_and_log
+def create_tasks_batch():
+    data = request.get_json()
+    result, status_code = task_service.create_tasks_batch(data)
+    if status_code in (201, 207):
+        return success_response(data=result, message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code, details=result.get("results"))
+
 @tasks_bp.route("/update/<task_id>", methods=["PUT"])
+@query_budget(4)
 @AuthAndLogMiddleware.authenticate_and_log
 def update_task(task_id):
     data = request.get_json()
@@ -34,6 +50,7 @@ def update_task(task_id):
     return error_response(message=result["error"], status_code=status_code)
 
 @tasks_bp.route("/delete/<task_id>", methods=["DELETE"])
+@query_budget(6)
 @AuthAndLogMiddleware.authenticate_and_log
 def delete_task(task_id):
     result, status_code = task_service.delete_task(task_id)
@@ -42,6 +59,7 @@ def delete_task(task_id):
     return error_response(message=result["error"], status_code=status_code)
 
 @tasks_bp.route("/subtasks/create", methods=["POST"])
+@query_budget(4)
 @AuthAndLogMiddleware.authenticate_and_log
 def create_subtask():
     data = request.get_json()
@@ -50,7 +68,18 @@ def create_subtask():
         return success_response(data=result, message=result["message"], status_code=status_code)
     return error_response(message=result["error"], status_code=status_code)
 
+@tasks_bp.route("/subtasks/batch", methods=["POST"])
+@query_budget(6)
+@AuthAndLogMiddleware.authenticate_and_log
+def create_subtasks_batch():
+    data = request.get_json()
+    result, status_code = task_service.create_subtasks_batch(data)
+    if status_code in (201, 207):
+        return success_response(data=result, message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code, details=result.get("results"))
+
 @tasks_bp.route("/subtasks/update/<subtask_id>", methods=["PUT"])
+@query_budget(6)
 @AuthAndLogMiddleware.authenticate_and_log
 def update_subtask(subtask_id):
     data = request.get_json()
@@ -60,6 +89,7 @@ def update_subtask(subtask_id):
     return error_response(message=result["error"], status_code=status_code)
 
 @tasks_bp.route("/subtasks/delete/<subtask_id>", methods=["DELETE"])
+@query_budget(4)
 @AuthAndLogMiddleware.authenticate_and_log
 def delete_subtask(subtask_id):
     result, status_code = task_service.delete_subtask(subtask_id)
@@ -1,7 +1,9 @@
 from flask import Blueprint, request
 from ..services.team_service import TeamService
 from ..middleware.auth_and_log import AuthAndLogMiddleware
-from ..utils.responses import success_response, error_response
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
 
 teams_bp = Blueprint("teams", __name__, url_prefix="/api/v1/teams")
 team_service = TeamService()
@@ -16,11 +18,13 @@ def create_team():
     return error_response(message=result["error"], status_code=status_code)
 
 @teams_bp.route("/list", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("teams", cache=True)
 def list_teams():
-    result, status_code = team_service.list_teams()
+    result, status_code = team_service.list_teams(request.args)
     if status_code == 200:
-        return success_response(data=result, message="Teams fetched successfully", status_code=status_code)
+        return list_response(result, message="Teams fetched successfully", status_code=status_code)
     return error_response(message=result[0]["error"], status_code=status_code)
 
 @teams_bp.route("/<team_id>/members", methods=["POST"])
@@ -1,23 +1,39 @@
+import io
 from flask import Blueprint, request
 from ..services.time_entry_service import TimeEntryService
-from ..middleware.auth_and_log import AuthAndLogMiddleware
-from ..utils.responses import success_response, error_response
+from ..middleware.auth_and_log import AuthAndLogMiddleware, body_is_logged
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
 
 time_entries_bp = Blueprint("time_entries", __name__, url_prefix="/api/v1/time-entries")
 time_entry_service = TimeEntryService()
 
 @time_entries_bp.route("/list", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("time_entries", "tasks")
 def list_time_entries():
     project_id = request.args.get("project_id")
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
-    result, status_code = time_entry_service.list_time_entries(project_id, start_date, end_date)
+    result, status_code = time_entry_service.list_time_entries(project_id, start_date, end_date, request.args)
     if status_code == 200:
-        return success_response(data=result, message="Time entries fetched successfully", status_code=status_code)
+        return list_response(result, message="Time entries fetched successfully", status_code=status_code)
     return error_response(message=result[0]["error"], status_code=status_code)
 
+@time_entries_bp.route("/report", methods=["GET"])
+@query_budget(2)
+@AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("time_entries", "tasks", cache=True)
+def time_report():
+    result, status_code = time_entry_service.get_report(request.args)
+    if status_code == 200:
+        return success_response(data=result["data"], message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
+
 @time_entries_bp.route("/create", methods=["POST"])
+@query_budget(5)
 @AuthAndLogMiddleware.authenticate_and_log
 def create_time_entry():
     data = request.get_json()
@@ -28,8 +44,30 @@ def create_time_entry():
 
 
 @time_entries_bp.route('/update/<time_entry_id>', methods=['PUT'])
+@query_budget(8)
 @AuthAndLogMiddleware.authenticate_and_log
 def update_time_entry(time_entry_id):
     data = request.get_json()
     response, status = TimeEntryService.update_time_entry(time_entry_id, data)
     return response, status
+
+
+@time_entries_bp.route("/import", methods=["POST"])
+@AuthAndLogMiddleware.authenticate_and_log
+def import_time_entries():
+    # Format comes from ?format= or the Content-Type. Large bodies are still unread and are parsed as they
+    # arrive; small ones were already buffered by the request logger.
+    fmt = request.args.get("format") or ("ndjson" if request.mimetype in ("application/x-ndjson", "application/jsonl") else "csv")
+    raw = io.BytesIO(request.get_data()) if body_is_logged() else io.BufferedReader(request.stream)
+    # utf-8-sig drops the byte order mark spreadsheet exports start with, which would otherwise prefix the first header
+    stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    result, status_code = time_entry_service.import_time_entries(
+        stream, fmt,
+        customer_id=request.decoded.get("customer_id"),
+        user_id=request.decoded.get("user_id"),
+        role=request.decoded.get("role"),
+        mode=request.args.get("mode", "partial")
+    )
+    if status_code in (201, 207):
+        return success_response(data=result, message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code, details=result.get("rejects"))
@@ -1,13 +1,17 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from ..services.user_service import UserService
 from ..middleware.auth_and_log import AuthAndLogMiddleware
-from ..utils.responses import success_response, error_response
+from ..utils.conditional import conditional_get
+from ..utils.responses import success_response, error_response, list_response
+from ..utils.query_recorder import query_budget
 
 users_bp = Blueprint("users", __name__, url_prefix="/api/v1/users")
 user_service = UserService()
 
 @users_bp.route("/<user_id>", methods=["GET"])
+@query_budget(3)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("users")
 def get_user(user_id):
     result, status_code = user_service.get_user(user_id)
     if status_code == 200:
@@ -15,9 +19,20 @@ def get_user(user_id):
     return error_response(message=result["error"], status_code=status_code)
 
 @users_bp.route("/list", methods=["GET"])
+@query_budget(2)
 @AuthAndLogMiddleware.authenticate_and_log
+@conditional_get("users", cache=True)
 def list_users():
-    result, status_code = user_service.list_users()
+    result, status_code = user_service.list_users(request.args)
     if status_code == 200:
-        return success_response(data=result, message="Users fetched successfully", status_code=status_code)
-    return error_response(message=result[0]["error"], status_code=status_code)
\ No newline at end of file
+        return list_response(result, message="Users fetched successfully", status_code=status_code)
+    return error_response(message=result[0]["error"], status_code=status_code)
+
+@users_bp.route("/<user_id>/revoke-sessions", methods=["POST"])
+@query_budget(1)
+@AuthAndLogMiddleware.authenticate_and_log
+def revoke_sessions(user_id):
+    result, status_code = user_service.revoke_sessions(user_id)
+    if status_code == 200:
+        return success_response(message=result["message"], status_code=status_code)
+    return error_response(message=result["error"], status_code=status_code)
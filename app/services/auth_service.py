@@ -7,6 +7,7 @@ from ..middleware.auth_and_log import AuthAndLogMiddleware
 from .. import db
 import traceback
 from typing import Tuple, Optional
+from sqlalchemy import or_
 from uuid import uuid4
 from datetime import datetime
 
@@ -22,8 +23,8 @@ class AuthService:
             if "@" not in data["email"] or "." not in data["email"]:
                 return {"error": "Invalid email format"}, 400
 
-            # Check for existing user
-            if User.query.filter_by(email=data["email"]).first() or User.query.filter_by(username=data["username"]).first():
+            # Check for existing user (email or username) in one query
+            if db.session.query(User.id).filter(or_(User.email == data["email"], User.username == data["username"])).first():
                 return {"error": "User with this email or username already exists"}, 409
 
             # Create or find customer
@@ -43,7 +44,6 @@ class AuthService:
                     updated_at=datetime.utcnow()
                 )
                 db.session.add(customer)
-                db.session.commit()
 
             # Create new user
             user = User(
@@ -54,9 +54,12 @@ class AuthService:
                 role=data["role"]
             )
             db.session.add(user)
+            # Customer and user are written in one flush; serialize before the commit expires them
+            db.session.flush()
+            user_dict = user.to_dict()
             db.session.commit()
 
-            return {"message": "User registered successfully", "user": user.to_dict()}, 201
+            return {"message": "User registered successfully", "user": user_dict}, 201
 
         except Exception as e:
             app_logger.error({
@@ -0,0 +1,75 @@
+# app/services/dashboard_service.py
+from flask import request, current_app
+from ..utils.logger import app_logger
+import traceback
+from typing import Tuple
+from ..dao import ProjectsDao, TeamsDao, UsersDao
+from ..dao.projects import PROJECT_STATS_COLUMNS
+
+# Sections in response order; `include` selects a subset
+DASHBOARD_SECTIONS = ("projects", "stats", "teams", "users")
+# Roles allowed to read the users section (UsersDao.fetch_users enforces the same)
+USERS_SECTION_ROLES = ("Admin", "Project Manager")
+
+class DashboardService:
+    @staticmethod
+    def get_dashboard(args) -> Tuple[dict, int]:
+        """
+        The landing page data in one response: the caller's projects, stats for each of them keyed by
+        project id, teams and users. `include` (comma separated) picks sections; by default every section
+        the caller's role may read is returned. Projects and stats come from one query, and teams and users
+        are rendered by the database when DB_JSON_PASSTHROUGH is on, so the data is returned as JSON text
+        (see list_response).
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return [{"error": "Unauthorized: Invalid token data"}], 401
+
+            if args.get("include"):
+                sections = [s.strip() for s in args["include"].split(",") if s.strip()]
+                invalid = [s for s in sections if s not in DASHBOARD_SECTIONS]
+                if invalid:
+                    return [{"error": f"Invalid include: {', '.join(invalid)}; must be one of: {', '.join(DASHBOARD_SECTIONS)}"}], 400
+                if "users" in sections and role not in USERS_SECTION_ROLES:
+                    return [{"error": "Insufficient permissions"}], 403
+            else:
+                sections = [s for s in DASHBOARD_SECTIONS if s != "users" or role in USERS_SECTION_ROLES]
+            sections = [s for s in DASHBOARD_SECTIONS if s in sections]
+
+            dumps = current_app.json.dumps
+            as_json = current_app.config.get("DB_JSON_PASSTHROUGH", False)
+            rendered = {}
+
+            if "projects" in sections or "stats" in sections:
+                rows = ProjectsDao.fetch_eligible_projects_with_stats(customer_id, role, user_id).all()
+                if "projects" in sections:
+                    rendered["projects"] = dumps([
+                        {k: v for k, v in row._mapping.items() if k not in PROJECT_STATS_COLUMNS} for row in rows
+                    ])
+                if "stats" in sections:
+                    rendered["stats"] = dumps({row.id: ProjectsDao.stats_from_row(row) for row in rows})
+
+            for name, fetch in (
+                ("teams", lambda: TeamsDao.fetch_teams(customer_id, role, user_id, as_json=as_json)),
+                ("users", lambda: UsersDao.fetch_users(customer_id, role, as_json=as_json)),
+            ):
+                if name not in sections:
+                    continue
+                result, status = fetch()
+                if status != 200:
+                    return [result], status
+                rendered[name] = result["json"] if "json" in result else dumps(result["data"])
+
+            return {"json": "{" + ",".join(f"{dumps(name)}:{rendered[name]}" for name in sections) + "}"}, 200
+
+        except Exception as e:
+            app_logger.error({
+                "function": "DashboardService.get_dashboard",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return [{"error": f"Failed to fetch dashboard: {str(e)}"}], 500
@@ -0,0 +1,199 @@
+# app/services/dependency_service.py
+from flask import request
+from ..utils.logger import app_logger
+from ..utils.dependency_graph import DependencyGraph, CycleError, get_dependency_graphs, stage_graph_change
+from ..utils.versioning import bump_versions, SCOPES_BY_TABLE
+import traceback
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import uuid4
+from ..dao import DependenciesDao
+from ..models.dependency import Dependency
+from .. import db
+
+class DependencyService:
+    @staticmethod
+    def _load_graph(project_id: str, customer_id: str) -> Optional[DependencyGraph]:
+        """
+        The project's graph at the current version: the cached one when nothing changed since it was
+        built, else loaded again. None when the project is not the customer's.
+        """
+        version = DependenciesDao.fetch_graph_stamp(project_id, customer_id)
+        if version is None:
+            return None
+        graphs = get_dependency_graphs()
+        graph = graphs.get(project_id, customer_id, version)
+        if graph is None:
+            rows = DependenciesDao.fetch_graph(project_id, customer_id)
+            graph = DependencyGraph.from_rows(project_id, customer_id, version, rows["nodes"], rows["edges"])
+            graphs.put(graph)
+        return graph
+
+    @staticmethod
+    def create_dependency(data: dict) -> Tuple[dict, int]:
+        """
+        Make `task_id` wait on `depends_on_task_id` or `depends_on_subtask_id`, in the same project. An
+        edge that would close a cycle is rejected with 409 and the existing path in `cycle`.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            if role not in ["Admin", "Project Manager"]:
+                return {"error": "Insufficient permissions"}, 403
+
+            if not data or not data.get("task_id"):
+                return {"error": "Missing required fields"}, 400
+            if bool(data.get("depends_on_task_id")) == bool(data.get("depends_on_subtask_id")):
+                return {"error": "Exactly one of depends_on_task_id or depends_on_subtask_id is required"}, 400
+
+            ends = DependenciesDao.fetch_endpoints(customer_id, data["task_id"], data.get("depends_on_task_id"),
+                                                   data.get("depends_on_subtask_id"))
+            dependent, prerequisite = ends.get("dependent"), ends.get("prerequisite")
+            if not dependent:
+                return {"error": "Task not found or unauthorized"}, 404
+            if not prerequisite:
+                return {"error": f"{'Task' if data.get('depends_on_task_id') else 'Subtask'} not found or unauthorized"}, 404
+            project_id = dependent["project_id"]
+            if not project_id:
+                return {"error": "Dependencies require the task to belong to a project"}, 400
+            if prerequisite["project_id"] != project_id:
+                return {"error": "A task can only depend on work in its own project"}, 400
+            if prerequisite["task_id"] == dependent["id"]:
+                return {"error": "A task already waits on its own subtasks"}, 400
+
+            DependenciesDao.lock_project(project_id)
+            graph = DependencyService._load_graph(project_id, customer_id)
+            if graph is None:
+                db.session.rollback()
+                return {"error": "Project not found or unauthorized"}, 404
+            if prerequisite["id"] in graph.prerequisites_of(dependent["id"]):
+                db.session.rollback()
+                return {"error": "Dependency already exists"}, 409
+            try:
+                graph.check_edge(prerequisite["id"], dependent["id"], parent=prerequisite["task_id"])
+            except CycleError as e:
+                db.session.rollback()
+                return {"error": "Dependency would create a cycle", "cycle": e.path}, 409
+
+            dependency_id = str(uuid4())
+
+            def add(committed: DependencyGraph) -> None:
+                if prerequisite["id"] not in committed.nodes:
+                    committed.add_node(prerequisite)
+                committed.add_edge(dependency_id, prerequisite["id"], dependent["id"])
+
+            dependency = Dependency(
+                id=dependency_id,
+                task_id=dependent["id"],
+                depends_on_task_id=data.get("depends_on_task_id"),
+                depends_on_subtask_id=data.get("depends_on_subtask_id"),
+                created_at=datetime.utcnow()
+            )
+            db.session.add(dependency)
+            # Staged before the flush, so the graph version is bumped by the same statement as "tasks"
+            stage_graph_change(customer_id, project_id, add)
+            db.session.flush()
+            dependency_dict = dependency.to_dict()
+            db.session.commit()
+            return {"message": "Dependency created successfully", "dependency": dependency_dict}, 201
+
+        except Exception as e:
+            app_logger.error({
+                "function": "DependencyService.create_dependency",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            db.session.rollback()
+            return {"error": f"Failed to create dependency: {str(e)}"}, 500
+
+    @staticmethod
+    def list_dependencies(args) -> Tuple[list, int]:
+        """
+        Dependencies of a project (`project_id`) or of a task (`task_id`); one of them is required. Team
+        Members only get those of the tasks they see in the task list.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+            if not user_id or not customer_id:
+                return [{"error": "Unauthorized: Invalid token data"}], 401
+            if not args.get("project_id") and not args.get("task_id"):
+                return [{"error": "project_id or task_id is required"}], 400
+
+            return DependenciesDao.list_dependencies(customer_id, project_id=args.get("project_id"),
+                                                     task_id=args.get("task_id"), role=role, user_id=user_id), 200
+        except Exception as e:
+            app_logger.error({
+                "function": "DependencyService.list_dependencies",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return [{"error": f"Failed to fetch dependencies: {str(e)}"}], 500
+
+    @staticmethod
+    def delete_dependency(dependency_id: str) -> Tuple[dict, int]:
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            if role not in ["Admin", "Project Manager"]:
+                return {"error": "Insufficient permissions"}, 403
+
+            deleted = DependenciesDao.delete_dependency(dependency_id, customer_id)
+            if not deleted:
+                return {"error": "Dependency not found or unauthorized"}, 404
+            if deleted["project_id"]:
+                stage_graph_change(customer_id, deleted["project_id"],
+                                   lambda committed: committed.remove_edge(dependency_id))
+            bump_versions(customer_id, SCOPES_BY_TABLE["dependencies"])
+            db.session.commit()
+            return {"message": "Dependency deleted successfully"}, 200
+
+        except Exception as e:
+            app_logger.error({
+                "function": "DependencyService.delete_dependency",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            db.session.rollback()
+            return {"error": f"Failed to delete dependency: {str(e)}"}, 500
+
+    @staticmethod
+    def get_project_graph(project_id: str) -> Tuple[dict, int]:
+        """
+        The project's tasks in topological order, with what blocks each of them, the tasks ready to
+        start, and the critical path by estimated_duration. Served from the in-memory graph. Admins and
+        Project Managers only: the analysis covers every task of the project.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            if role not in ["Admin", "Project Manager"]:
+                return {"error": "Insufficient permissions"}, 403
+
+            graph = DependencyService._load_graph(project_id, customer_id)
+            if graph is None:
+                return {"error": "Project not found or unauthorized"}, 404
+            return {"project_id": project_id, **graph.analysis()}, 200
+        except Exception as e:
+            app_logger.error({
+                "function": "DependencyService.get_project_graph",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return {"error": f"Failed to fetch dependency graph: {str(e)}"}, 500
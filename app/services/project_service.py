@@ -2,16 +2,41 @@
 from flask import request
 from ..models import Project, Task, Subtask
 from ..utils.logger import app_logger
+from ..utils.pagination import parse_page_args, decode_datetime_cursor, split_page, PaginationError
+from ..utils.streaming import wants_stream
 import traceback
 from typing import Tuple, List, Dict
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
+import re
+import dateutil.parser
+from dateutil import tz
 from .. import db
-from ..dao import ProjectsDao
+from ..dao import ProjectsDao, ProjectMetricsDao
+from ..dao.project_metrics import METRIC_TYPES
+
+# Metric series: window when `from` is omitted, bucket width when `step` is omitted, and the most points
+# a single series may have
+DEFAULT_METRICS_DAYS = 30
+DEFAULT_METRICS_STEP = "1d"
+MAX_METRICS_POINTS = 1000
+STEP_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
 
 class ProjectService:
     @staticmethod
-    def list_projects() -> Tuple[List[dict], int]:
+    def parse_list_filters(args) -> dict:
+        """
+        Tech stack filters of the project list: `tech_stack` matches projects using any of the given
+        (comma separated) technologies, `tech_stack_all` those using all of them.
+        """
+        filters = {}
+        for field in ("tech_stack", "tech_stack_all"):
+            if args.get(field):
+                filters[field] = [v.strip() for v in args.get(field).split(",") if v.strip()]
+        return filters
+
+    @staticmethod
+    def list_projects(args=None) -> Tuple[dict, int]:
         try:
             user_id = request.decoded.get("user_id")
             customer_id = request.decoded.get("customer_id")
@@ -20,14 +45,36 @@ class ProjectService:
             if not user_id or not customer_id:
                 return [{"error": "Unauthorized: Invalid token data"}], 401
 
+            try:
+                limit, cursor = parse_page_args(args or {})
+                cursor = decode_datetime_cursor(cursor) if cursor else None
+            except PaginationError as e:
+                return [{"error": str(e)}], 400
+            filters = ProjectService.parse_list_filters(args or {})
+
+            if wants_stream(args):
+                rows = ProjectsDao.fetch_eligible_projects(
+                    customer_id=customer_id,
+                    role=role,
+                    user_id=user_id,
+                    limit=limit,
+                    cursor=cursor,
+                    stream=True,
+                    filters=filters
+                )
+                return {"rows": rows, "limit": limit, "cursor_key": lambda row: (row["updated_at"], row["id"])}, 200
+
             # projects = query.all()
             result = ProjectsDao.fetch_eligible_projects(
                 customer_id=customer_id, 
                 role=role, 
-                user_id=user_id
+                user_id=user_id,
+                limit=limit,
+                cursor=cursor,
+                filters=filters
             )
-            rows = result.mappings().all()
-            return [dict(row) for row in rows], 200
+            rows, next_cursor = split_page(result.mappings().all(), limit, lambda row: (row["updated_at"], row["id"]))
+            return {"data": [dict(row) for row in rows], "next_cursor": next_cursor, "limit": limit}, 200
             # return [project.to_dict() for project in projects], 200
 
         except Exception as e:
@@ -92,7 +139,6 @@ class ProjectService:
             user_id = request.decoded.get("user_id")
             customer_id = request.decoded.get("customer_id")
             role = request.decoded.get("role")
-            print("incoming ..")
 
             if not user_id or not customer_id:
                 return {"error": "Unauthorized: Invalid token data"}, 401
@@ -192,4 +238,78 @@ class ProjectService:
                 "traceback": traceback.format_exc()
             })
             return {"error": f"Failed to fetch project stats: {str(e)}"}, 500
-        
\ No newline at end of file
+
+    @staticmethod
+    def _parse_step(step: str) -> int:
+        """
+        Bucket width in seconds from "<n>" (seconds) or "<n><s|m|h|d|w>", e.g. "15m" or "1d".
+        """
+        match = re.fullmatch(r"(\d+)([smhdw]?)", step.strip())
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(step)
+        return int(match.group(1)) * STEP_UNITS[match.group(2) or "s"]
+
+    @staticmethod
+    def _parse_utc(value: str) -> datetime:
+        """
+        Naive UTC datetime, as recorded_at is stored; timestamps without an offset are taken as UTC.
+        """
+        parsed = dateutil.parser.isoparse(value)
+        return parsed.astimezone(tz.UTC).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+    @staticmethod
+    def get_project_metrics(project_id: str, args) -> Tuple[dict, int]:
+        """
+        Recorded metric series for a project between `from` and `to` (UTC timestamps; the last 30 days by
+        default), downsampled to one point per `step`. `type` picks metric types (comma separated; all by
+        default). Reads project_metrics only; see ProjectMetricsDao.fetch_series.
+        """
+        try:
+            customer_id = request.decoded.get("customer_id")
+            if not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            metric_types = [t.strip() for t in args.get("type", "").split(",") if t.strip()] or list(METRIC_TYPES)
+            invalid = [t for t in metric_types if t not in METRIC_TYPES]
+            if invalid:
+                return {"error": f"Invalid type: {', '.join(invalid)}; must be one of: {', '.join(METRIC_TYPES)}"}, 400
+            metric_types = list(dict.fromkeys(metric_types))
+
+            try:
+                step = ProjectService._parse_step(args.get("step") or DEFAULT_METRICS_STEP)
+            except ValueError:
+                return {"error": "step must be a number of seconds or a duration such as 15m, 1h or 1d"}, 400
+
+            try:
+                end = ProjectService._parse_utc(args["to"]) if args.get("to") else datetime.utcnow()
+                start = ProjectService._parse_utc(args["from"]) if args.get("from") else end - timedelta(days=DEFAULT_METRICS_DAYS)
+            except ValueError:
+                return {"error": "from and to must be ISO 8601 timestamps"}, 400
+            if end < start:
+                return {"error": "to must not be before from"}, 400
+
+            # Align buckets to multiples of the step from a Monday midnight (as date_bin does), so the same
+            # range always yields the same buckets and weekly buckets start on Mondays
+            origin = datetime(2001, 1, 1)
+            start = origin + timedelta(seconds=int((start - origin).total_seconds()) // step * step)
+            if (end - start).total_seconds() // step + 1 > MAX_METRICS_POINTS:
+                return {"error": f"A series may have at most {MAX_METRICS_POINTS} points; use a larger step"}, 400
+
+            series = ProjectMetricsDao.fetch_series(project_id, customer_id, metric_types, start, end, step)
+            if series is None:
+                return {"error": "Project not found or unauthorized"}, 404
+            return {
+                "project_id": project_id,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "step": step,
+                "series": series
+            }, 200
+
+        except Exception as e:
+            app_logger.error({
+                "function": "ProjectService.get_project_metrics",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return {"error": f"Failed to fetch project metrics: {str(e)}"}, 500
@@ -0,0 +1,70 @@
+# app/services/search_service.py
+from flask import request
+from ..utils.logger import app_logger
+from ..utils.pagination import parse_limit, decode_cursor, PaginationError
+import traceback
+from typing import Tuple
+from ..dao import SearchDao
+from ..dao.search import SEARCH_TYPES
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_QUERY_LENGTH = 256
+
+class SearchService:
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> Tuple[float, str, str]:
+        """
+        Decode a (rank, type, id) search cursor.
+        """
+        rank, hit_type, hit_id = decode_cursor(cursor, 3)
+        if not isinstance(rank, (int, float)) or hit_type not in SEARCH_TYPES:
+            raise PaginationError("Invalid cursor")
+        return float(rank), hit_type, str(hit_id)
+
+    @staticmethod
+    def search(args) -> Tuple[dict, int]:
+        """
+        Ranked full-text search over the titles, descriptions and tags of the caller's tasks and subtasks.
+        `q` is required; `type` (comma separated) and `project_id` narrow the results. Always paginated.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return [{"error": "Unauthorized: Invalid token data"}], 401
+
+            terms = (args.get("q") or "").strip()
+            if not terms:
+                return [{"error": "q is required"}], 400
+            if len(terms) > MAX_QUERY_LENGTH:
+                return [{"error": f"q must be at most {MAX_QUERY_LENGTH} characters"}], 400
+
+            types = SEARCH_TYPES
+            if args.get("type"):
+                types = tuple(t.strip() for t in args["type"].split(",") if t.strip())
+                invalid = [t for t in types if t not in SEARCH_TYPES]
+                if invalid or not types:
+                    return [{"error": f"Invalid type: {', '.join(invalid)}; must be one of: {', '.join(SEARCH_TYPES)}"}], 400
+
+            try:
+                limit = parse_limit(args.get("limit"), DEFAULT_SEARCH_LIMIT)
+                cursor = SearchService._decode_search_cursor(args["cursor"]) if args.get("cursor") else None
+            except PaginationError as e:
+                return [{"error": str(e)}], 400
+
+            return SearchDao.search(
+                terms, user_id, customer_id, role,
+                types=types,
+                project_id=args.get("project_id"),
+                limit=limit,
+                cursor=cursor
+            ), 200
+        except Exception as e:
+            app_logger.error({
+                "function": "SearchService.search",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return [{"error": f"Failed to search: {str(e)}"}], 500
@@ -0,0 +1,48 @@
+# app/services/tag_service.py
+from flask import request
+from ..utils.logger import app_logger
+from ..utils.pagination import parse_limit, PaginationError
+import traceback
+from typing import Tuple
+from ..dao import TagsDao
+from ..dao.tags import TAG_SOURCES
+
+DEFAULT_FACET_LIMIT = 50
+
+class TagService:
+    @staticmethod
+    def get_facets(args) -> Tuple[dict, int]:
+        """
+        Tag counts of the caller's customer, or of one project with `project_id`, for task tags, subtask
+        tags and project tech stacks. `source` (comma separated) picks some of them; `limit` caps the tags
+        returned per source. Counts are customer-wide for every role: they expose tag names and usage, not
+        the tagged rows.
+        """
+        try:
+            customer_id = request.decoded.get("customer_id")
+            if not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            sources = TAG_SOURCES
+            if args.get("source"):
+                sources = tuple(s.strip() for s in args["source"].split(",") if s.strip())
+                invalid = [s for s in sources if s not in TAG_SOURCES]
+                if invalid or not sources:
+                    return {"error": f"Invalid source: {', '.join(invalid)}; must be one of: {', '.join(TAG_SOURCES)}"}, 400
+
+            try:
+                limit = parse_limit(args.get("limit"), DEFAULT_FACET_LIMIT)
+            except PaginationError as e:
+                return {"error": str(e)}, 400
+
+            facets = TagsDao.fetch_facets(customer_id, project_id=args.get("project_id"), sources=sources, limit=limit)
+            if facets is None:
+                return {"error": "Project not found or unauthorized"}, 404
+            return facets, 200
+        except Exception as e:
+            app_logger.error({
+                "function": "TagService.get_facets",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return {"error": f"Failed to fetch tag facets: {str(e)}"}, 500
@@ -1,50 +1,305 @@
-from flask import request
+from flask import request, current_app
 
-from app.dao import TasksDao
+from app.dao import TasksDao, ProjectMetricsDao
+from ..dao.project_metrics import COUNTER_UPSERT
 from ..models.task import Task
 from ..models.subtask import Subtask
 from ..models.project import Project
 from ..models.user import User
 from ..models.team import Team
+from ..models.category import Category
+from ..models.dependency import Dependency
 from ..utils.logger import app_logger
+from ..utils.pagination import (
+    parse_page_args, decode_cursor, decode_datetime_cursor, PaginationError, DEFAULT_PAGE_SIZE
+)
+from ..utils.streaming import wants_stream
+from ..utils.dependency_graph import stage_graph_change
+from ..utils.versioning import bump_versions, SCOPES_BY_TABLE
 import traceback
-from typing import Tuple, List
+from collections import Counter
+from typing import Tuple, List, Optional
 from datetime import datetime
 from uuid import uuid4
+from sqlalchemy import insert, or_, text, exists
+from sqlalchemy.orm import contains_eager
 from .. import db
 
+TASK_STATUSES = ("Not Started", "In Progress", "Completed")
+TASK_PRIORITIES = ("Low", "Medium", "High")
+# Subtask statuses the my-work feed lists; completed work drops out of it
+OPEN_SUBTASK_STATUSES = ("Not Started", "In Progress")
+MAX_BATCH_ITEMS = 500
+# Task and subtask fields the dependency graphs keep on their nodes
+GRAPH_FIELDS = ("title", "status", "estimated_duration")
+BATCH_MODES = ("atomic", "partial")
+
 class TaskService:
     @staticmethod
-    def list_tasks(project_id: str = None) -> Tuple[List[dict], int]:
+    def _adjust_subtask_counters(task_id: str, total_delta: int, completed_delta: int) -> None:
+        """
+        Apply a change in subtask counts to the parent task's denormalized counters and to its project's
+        metric counters. Runs as one in-place increment inside the caller's transaction, so it commits or
+        rolls back with the subtask write.
+        """
+        TaskService._adjust_subtask_counters_bulk({task_id: (total_delta, completed_delta)})
+
+    @staticmethod
+    def _adjust_subtask_counters_bulk(deltas: dict) -> None:
+        """
+        Apply {task_id: (total_delta, completed_delta)} to many tasks, and the sums to their projects'
+        metric counters, with a single statement.
+        """
+        deltas = {task_id: delta for task_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        task_ids = list(deltas)
+        db.session.execute(text("""
+            WITH changed AS (
+                UPDATE tasks t
+                SET subtask_total = t.subtask_total + d.total,
+                    subtask_completed = t.subtask_completed + d.completed
+                FROM unnest(CAST(:task_ids AS varchar[]), CAST(:totals AS int[]), CAST(:completed AS int[])) AS d(id, total, completed)
+                WHERE t.id = d.id
+                RETURNING t.project_id, t.customer_id, d.total, d.completed
+            )
+        """ + COUNTER_UPSERT.format(source="""
+            SELECT project_id, customer_id, 0, SUM(total), SUM(completed), 0, now() AT TIME ZONE 'UTC'
+            FROM changed
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id, customer_id
+        """)), {
+            "task_ids": task_ids,
+            "totals": [deltas[task_id][0] for task_id in task_ids],
+            "completed": [deltas[task_id][1] for task_id in task_ids]
+        })
+
+    @staticmethod
+    def _stage_graph_nodes(customer_id: str, project_id: str, tasks: List[dict] = (), subtasks: List[dict] = ()) -> None:
+        """
+        Bump the project's dependency graph version with this transaction; after the commit the cached graph
+        gets `tasks` added or refreshed, and `subtasks` (those dependencies point at) refreshed. Items are
+        to_dict() results or insert rows. The bump rides on the commit's version statement.
+        """
+        task_nodes = [{"type": "task", "id": task["id"], "task_id": None, "project_id": project_id,
+                       **{field: task[field] for field in GRAPH_FIELDS}} for task in tasks]
+        subtask_fields = {subtask["id"]: {field: subtask[field] for field in GRAPH_FIELDS} for subtask in subtasks}
+
+        def apply(graph) -> None:
+            for node in task_nodes:
+                graph.add_node(node)
+            for subtask_id, fields in subtask_fields.items():
+                graph.update_node(subtask_id, fields)
+
+        stage_graph_change(customer_id, project_id, apply)
+
+    @staticmethod
+    def _find_missing_reference(customer_id: str, task_id: str = None, user_id: str = None,
+                                team_id: str = None) -> Optional[str]:
+        """
+        Check in one round trip that every referenced task, user and team belongs to the customer.
+        Returns the error message for the first missing reference, or None.
+        """
+        checks = []
+        if task_id:
+            checks.append((exists().where(Task.id == task_id, Task.customer_id == customer_id),
+                           "Parent task not found or unauthorized"))
+        if user_id:
+            checks.append((exists().where(User.id == user_id, User.customer_id == customer_id),
+                           "Assigned user not found or unauthorized"))
+        if team_id:
+            checks.append((exists().where(Team.id == team_id, Team.customer_id == customer_id),
+                           "Assigned team not found or unauthorized"))
+        if not checks:
+            return None
+        found = db.session.query(*[check.label(f"ref_{i}") for i, (check, _) in enumerate(checks)]).one()
+        return next((message for ok, (_, message) in zip(found, checks) if not ok), None)
+
+    @staticmethod
+    def _parse_batch(data: dict) -> Tuple[list, str, str]:
+        """
+        Validate a batch request body ({"items": [...], "mode": "atomic" | "partial"}). Returns (items, mode, error).
+        """
+        if not isinstance(data, dict):
+            return [], None, "Request body must be an object"
+        items = data.get("items")
+        if not isinstance(items, list) or not items:
+            return [], None, "items must be a non-empty array"
+        if len(items) > MAX_BATCH_ITEMS:
+            return [], None, f"A batch may contain at most {MAX_BATCH_ITEMS} items"
+        mode = data.get("mode", "atomic")
+        if mode not in BATCH_MODES:
+            return [], None, f"mode must be one of: {', '.join(BATCH_MODES)}"
+        return items, mode, None
+
+    @staticmethod
+    def _batch_item_error(item, required: tuple, id_fields: tuple) -> Optional[str]:
+        """
+        Shape check for one batch item, run before its IDs are collected into the batch lookups (which hash
+        them): the required fields are present, and `title`, `description` and the ID fields are strings.
+        Returns the error message, or None.
+        """
+        if not isinstance(item, dict) or not all(field in item for field in required):
+            return "Missing required fields"
+        if not isinstance(item["title"], str):
+            return "Title must be a string"
+        if item.get("description") is not None and not isinstance(item["description"], str):
+            return "Description must be a string"
+        for field in id_fields:
+            if item.get(field) is not None and not isinstance(item[field], str):
+                return f"{field} must be a string"
+        return None
+
+    @staticmethod
+    def _reject_batch(results: list) -> Tuple[dict, int]:
+        """
+        All-or-nothing batch with invalid items: nothing is written, and the valid items say so.
+        """
+        rejected = [
+            {"index": r["index"], "status": 424, "error": "Not created: other items in the batch are invalid"}
+            if r["status"] == 201 else r
+            for r in results
+        ]
+        return {"error": "Batch rejected: some items are invalid", "results": rejected}, 400
+
+    @staticmethod
+    def _batch_outcome(results: list, mode: str, created: int, noun: str) -> Tuple[dict, int]:
+        """
+        Shape the response for a batch: 201 when every item was created, 207 when a partial batch skipped
+        some, 400 when nothing was written.
+        """
+        failed = len(results) - created
+        summary = {"created": created, "failed": failed, "results": results}
+        if created == 0:
+            return {"error": f"No {noun} created: {failed} invalid item(s)", **summary}, 400
+        if failed:
+            return {"message": f"Created {created} of {len(results)} {noun}", **summary}, 207
+        return {"message": f"Created {created} {noun}", **summary}, 201
+
+    @staticmethod
+    def _sanitize_task_fields(data: dict) -> Tuple[dict, str]:
+        """
+        Normalize the optional task fields shared by single and batch creation. Returns (fields, error).
+        """
+        # Sanitize estimated_duration
+        estimated_duration = data.get("estimated_duration")
+        if estimated_duration == "" or estimated_duration is None:
+            estimated_duration = None
+        else:
+            try:
+                estimated_duration = int(estimated_duration)
+                if estimated_duration < 0:
+                    return {}, "Estimated duration must be non-negative"
+            except (ValueError, TypeError):
+                return {}, "Estimated duration must be a valid integer"
+
+        # Sanitize actual_duration
+        actual_duration = data.get("actual_duration")
+        if actual_duration == "" or actual_duration is None:
+            actual_duration = 0
+        else:
+            try:
+                actual_duration = int(actual_duration)
+                if actual_duration < 0:
+                    return {}, "Actual duration must be non-negative"
+            except (ValueError, TypeError):
+                return {}, "Actual duration must be a valid integer"
+
+        # Sanitize due_date
+        due_date = data.get("due_date")
+        if due_date == "" or due_date is None:
+            due_date = None
+        else:
+            try:
+                due_date = datetime.fromisoformat(due_date)
+            except (ValueError, TypeError):
+                return {}, "Due date must be a valid ISO 8601 date"
+
+        # Sanitize tags
+        tags = data.get("tags")
+        if tags == "" or tags is None:
+            tags = []
+        elif not isinstance(tags, list):
+            return {}, "Tags must be an array of strings"
+        else:
+            if not all(isinstance(tag, str) for tag in tags):
+                return {}, "All tags must be strings"
+
+        return {
+            "estimated_duration": estimated_duration,
+            "actual_duration": actual_duration,
+            "due_date": due_date,
+            "tags": tags
+        }, None
+
+    @staticmethod
+    def parse_list_filters(args) -> Tuple[dict, str]:
+        """
+        Validate the task list query arguments. Returns (filters, error).
+        """
+        filters = {}
+
+        for field, allowed in (("status", TASK_STATUSES), ("priority", TASK_PRIORITIES)):
+            value = args.get(field)
+            if value:
+                values = [v.strip() for v in value.split(",") if v.strip()]
+                invalid = [v for v in values if v not in allowed]
+                if invalid:
+                    return {}, f"Invalid {field}: {', '.join(invalid)}"
+                filters[field] = values
+
+        for field in ("due_from", "due_to"):
+            value = args.get(field)
+            if value:
+                try:
+                    filters[field] = datetime.fromisoformat(value)
+                except ValueError:
+                    return {}, f"{field} must be a valid ISO 8601 date"
+
+        if args.get("assignee"):
+            filters["assignee"] = args.get("assignee")
+
+        # tag: any of the tags; tag_all: every one of them
+        for field in ("tag", "tag_all"):
+            if args.get(field):
+                filters[field] = [t.strip() for t in args.get(field).split(",") if t.strip()]
+
+        return filters, None
+
+    @staticmethod
+    def list_tasks(project_id: str = None, args=None) -> Tuple[dict, int]:
         try:
             user_id = request.decoded.get("user_id")
             customer_id = request.decoded.get("customer_id")
             role = request.decoded.get("role")
             if not user_id or not customer_id:
                 return [{"error": "Unauthorized: Invalid token data"}], 401
-            # query = Task.query.filter_by(customer_id=customer_id)
-            # if project_id:
-            #     query = query.filter_by(project_id=project_id)
-            # if role == "Team Member":
-            #     query = query.join(Subtask, Task.id == Subtask.task_id).filter(Subtask.assigned_user_id == user_id)
-            # tasks = query.all()
-            # task_dicts = []
-            # for task in tasks:
-            #     task_dict = task.to_dict()
-            #     subtasks = Subtask.query.filter_by(task_id=task.id).all()
-            #     task_dict['subtasks'] = [subtask.to_dict() for subtask in subtasks]
-            #     completed = len([s for s in subtasks if s.status == 'Completed'])
-            #     task_dict['completion_percentage'] = round((completed / len(subtasks) * 100) if subtasks else 0)
-            #     task_dicts.append(task_dict)
-            # return task_dicts, 200
-            
-            tasks, status_code = TasksDao.list_tasks(
+
+            args = args or {}
+            filters, error = TaskService.parse_list_filters(args)
+            if error:
+                return [{"error": error}], 400
+
+            try:
+                limit, cursor = parse_page_args(args)
+                cursor = decode_datetime_cursor(cursor) if cursor else None
+            except PaginationError as e:
+                return [{"error": str(e)}], 400
+
+            page, status_code = TasksDao.list_tasks(
                 project_id=project_id,
                 user_id=user_id,
                 customer_id=customer_id,
-                role=role
+                role=role,
+                filters=filters,
+                limit=limit,
+                cursor=cursor,
+                stream=wants_stream(args),
+                as_json=current_app.config.get("DB_JSON_PASSTHROUGH", False)
             )
-            return tasks, status_code
+            if status_code == 200:
+                page["limit"] = limit
+            return page, status_code
         except Exception as e:
             app_logger.error({
                 "function": "TaskService.list_tasks",
@@ -53,6 +308,53 @@ class TaskService:
             })
             return [{"error": f"Failed to fetch tasks: {str(e)}"}], 500
 
+    @staticmethod
+    def _decode_work_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+        """
+        Decode a (due_date, id) my-work cursor; the due date is null for undated subtasks.
+        """
+        due_date, subtask_id = decode_cursor(cursor, 2)
+        try:
+            return (datetime.fromisoformat(due_date) if due_date is not None else None), str(subtask_id)
+        except (ValueError, TypeError):
+            raise PaginationError("Invalid cursor")
+
+    @staticmethod
+    def list_my_work(args=None) -> Tuple[dict, int]:
+        """
+        Open subtasks assigned to the caller directly or through one of their teams, soonest due first,
+        with their parent task and project. Always paginated; `status` narrows to some open statuses.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            if not user_id or not customer_id:
+                return [{"error": "Unauthorized: Invalid token data"}], 401
+
+            args = args or {}
+            statuses = list(OPEN_SUBTASK_STATUSES)
+            if args.get("status"):
+                statuses = [v.strip() for v in args.get("status").split(",") if v.strip()]
+                invalid = [v for v in statuses if v not in OPEN_SUBTASK_STATUSES]
+                if invalid:
+                    return [{"error": f"Invalid status: {', '.join(invalid)}"}], 400
+
+            try:
+                limit, cursor = parse_page_args(args)
+                limit = limit or DEFAULT_PAGE_SIZE
+                cursor = TaskService._decode_work_cursor(cursor) if cursor else None
+            except PaginationError as e:
+                return [{"error": str(e)}], 400
+
+            return TasksDao.fetch_work_feed(user_id, customer_id, statuses, limit, cursor), 200
+        except Exception as e:
+            app_logger.error({
+                "function": "TaskService.list_my_work",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return [{"error": f"Failed to fetch work: {str(e)}"}], 500
+
     @staticmethod
     def create_task(data: dict) -> Tuple[dict, int]:
         try:
@@ -74,49 +376,9 @@ class TaskService:
             if not project:
                 return {"error": "Project not found or unauthorized"}, 404
 
-            # Sanitize estimated_duration
-            estimated_duration = data.get("estimated_duration")
-            if estimated_duration == "" or estimated_duration is None:
-                estimated_duration = None
-            else:
-                try:
-                    estimated_duration = int(estimated_duration)
-                    if estimated_duration < 0:
-                        return {"error": "Estimated duration must be non-negative"}, 400
-                except (ValueError, TypeError):
-                    return {"error": "Estimated duration must be a valid integer"}, 400
-
-            # Sanitize actual_duration
-            actual_duration = data.get("actual_duration")
-            if actual_duration == "" or actual_duration is None:
-                actual_duration = 0
-            else:
-                try:
-                    actual_duration = int(actual_duration)
-                    if actual_duration < 0:
-                        return {"error": "Actual duration must be non-negative"}, 400
-                except (ValueError, TypeError):
-                    return {"error": "Actual duration must be a valid integer"}, 400
-
-            # Sanitize due_date
-            due_date = data.get("due_date")
-            if due_date == "" or due_date is None:
-                due_date = None
-            else:
-                try:
-                    due_date = datetime.fromisoformat(due_date)
-                except (ValueError, TypeError):
-                    return {"error": "Due date must be a valid ISO 8601 date"}, 400
-
-            # Sanitize tags
-            tags = data.get("tags")
-            if tags == "" or tags is None:
-                tags = []
-            elif not isinstance(tags, list):
-                return {"error": "Tags must be an array of strings"}, 400
-            else:
-                if not all(isinstance(tag, str) for tag in tags):
-                    return {"error": "All tags must be strings"}, 400
+            fields, error = TaskService._sanitize_task_fields(data)
+            if error:
+                return {"error": error}, 400
 
             task = Task(
                 id=str(uuid4()),
@@ -127,18 +389,24 @@ class TaskService:
                 description=data.get("description", ""),
                 status=data["status"],
                 priority=data.get("priority", "Medium"),
-                due_date=due_date,
-                tags=tags,
-                estimated_duration=estimated_duration,
-                actual_duration=actual_duration,
+                due_date=fields["due_date"],
+                tags=fields["tags"],
+                estimated_duration=fields["estimated_duration"],
+                actual_duration=fields["actual_duration"],
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
             db.session.add(task)
-            db.session.commit()
-
+            TaskService._stage_graph_nodes(customer_id, task.project_id, tasks=[{
+                "id": task.id, "title": task.title, "status": task.status, "estimated_duration": task.estimated_duration
+            }])
+            ProjectMetricsDao.apply_counter_deltas(customer_id, {task.project_id: (1, 0, 0, 0)})
+            # Serialize after the flush but before committing: the commit expires `task`, and reading it
+            # afterwards would reload the row
+            db.session.flush()
             task_dict = task.to_dict()
             task_dict['subtasks'] = []
+            db.session.commit()
             return {"message": "Task created successfully", "task": task_dict}, 201
 
         except Exception as e:
@@ -151,6 +419,107 @@ class TaskService:
             return {"error": f"Failed to create task: {str(e)}"}, 500
 
 
+    @staticmethod
+    def create_tasks_batch(data: dict) -> Tuple[dict, int]:
+        """
+        Create many tasks in one transaction. Items are validated up front, with one lookup per referenced
+        table for the whole batch, then inserted with a multi-row INSERT. In "atomic" mode any invalid item
+        rejects the batch; in "partial" mode the valid items are created and the rest reported.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            if role not in ["Admin", "Project Manager"]:
+                return {"error": "Insufficient permissions"}, 403
+
+            items, mode, error = TaskService._parse_batch(data)
+            if error:
+                return {"error": error}, 400
+
+            errors = [TaskService._batch_item_error(item, ("title", "status", "project_id"), ("project_id", "category_id"))
+                      for item in items]
+            valid = [item for item, error in zip(items, errors) if not error]
+            project_ids = {item["project_id"] for item in valid if item["project_id"]}
+            category_ids = {item.get("category_id") for item in valid if item.get("category_id")}
+            known_projects = {row.id for row in db.session.query(Project.id).filter(
+                Project.id.in_(project_ids), Project.customer_id == customer_id
+            )} if project_ids else set()
+            known_categories = {row.id for row in db.session.query(Category.id).filter(
+                Category.id.in_(category_ids),
+                or_(Category.customer_id == customer_id, Category.customer_id.is_(None))
+            )} if category_ids else set()
+
+            now = datetime.utcnow()
+            results, rows = [], []
+            for index, (item, error) in enumerate(zip(items, errors)):
+                if error:
+                    results.append({"index": index, "status": 400, "error": error})
+                    continue
+                if item["status"] not in TASK_STATUSES:
+                    results.append({"index": index, "status": 400, "error": f"Invalid status: {item['status']}"})
+                    continue
+                if item.get("priority", "Medium") not in TASK_PRIORITIES:
+                    results.append({"index": index, "status": 400, "error": f"Invalid priority: {item['priority']}"})
+                    continue
+                if item["project_id"] not in known_projects:
+                    results.append({"index": index, "status": 404, "error": "Project not found or unauthorized"})
+                    continue
+                if item.get("category_id") and item["category_id"] not in known_categories:
+                    results.append({"index": index, "status": 404, "error": "Category not found or unauthorized"})
+                    continue
+                fields, error = TaskService._sanitize_task_fields(item)
+                if error:
+                    results.append({"index": index, "status": 400, "error": error})
+                    continue
+
+                task_id = str(uuid4())
+                rows.append({
+                    "id": task_id,
+                    "customer_id": customer_id,
+                    "project_id": item["project_id"],
+                    "category_id": item.get("category_id"),
+                    "title": item["title"],
+                    "description": item.get("description", ""),
+                    "status": item["status"],
+                    "priority": item.get("priority", "Medium"),
+                    "created_at": now,
+                    "updated_at": now,
+                    **fields
+                })
+                results.append({"index": index, "status": 201, "id": task_id})
+
+            if mode == "atomic" and len(rows) < len(items):
+                return TaskService._reject_batch(results)
+
+            if rows:
+                # Bulk INSERT bypasses the unit of work, so the change stamps are bumped explicitly
+                db.session.execute(insert(Task), rows)
+                created = Counter(row["project_id"] for row in rows)
+                for project_id in created:
+                    TaskService._stage_graph_nodes(customer_id, project_id,
+                                                   tasks=[row for row in rows if row["project_id"] == project_id])
+                ProjectMetricsDao.apply_counter_deltas(customer_id, {
+                    project_id: (count, 0, 0, 0) for project_id, count in created.items()
+                })
+                bump_versions(customer_id, SCOPES_BY_TABLE["tasks"])
+                db.session.commit()
+
+            return TaskService._batch_outcome(results, mode, len(rows), "tasks")
+
+        except Exception as e:
+            app_logger.error({
+                "function": "TaskService.create_tasks_batch",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            db.session.rollback()
+            return {"error": f"Failed to create tasks: {str(e)}"}, 500
+
     @staticmethod
     def update_task(task_id: str, data: dict) -> Tuple[dict, int]:
         try:
@@ -195,11 +564,14 @@ class TaskService:
                 task.category_id = data.get("category_id")
 
             task.updated_at = datetime.utcnow()
-            db.session.commit()
 
+            # Serialize before committing: the commit expires `task`, and reading it afterwards reloads the row
             task_dict = task.to_dict()
+            if task.project_id and any(field in data for field in GRAPH_FIELDS):
+                TaskService._stage_graph_nodes(customer_id, task.project_id, tasks=[task_dict])
             subtasks = Subtask.query.filter_by(task_id=task.id).all()
             task_dict['subtasks'] = [subtask.to_dict() for subtask in subtasks]
+            db.session.commit()
             return {"message": "Task updated successfully", "task": task_dict}, 200
 
         except Exception as e:
@@ -228,6 +600,12 @@ class TaskService:
             if not task:
                 return {"error": "Task not found or unauthorized"}, 404
 
+            ProjectMetricsDao.apply_counter_deltas(customer_id, {
+                task.project_id: (-1, -task.subtask_total, -task.subtask_completed, 0)
+            })
+            if task.project_id:
+                # The task's dependencies go with it: the graph is loaded again rather than patched
+                stage_graph_change(customer_id, task.project_id)
             db.session.delete(task)
             db.session.commit()
 
@@ -259,21 +637,11 @@ class TaskService:
             if role not in ["Admin", "Project Manager"]:
                 return {"error": "Insufficient permissions"}, 403
 
-            task = Task.query.filter_by(id=data["task_id"], customer_id=customer_id).first()
-            if not task:
-                return {"error": "Parent task not found or unauthorized"}, 404
-
             assigned_user_id = data.get("assigned_user_id")
-            if assigned_user_id:
-                user = User.query.filter_by(id=assigned_user_id, customer_id=customer_id).first()
-                if not user:
-                    return {"error": "Assigned user not found or unauthorized"}, 404
-
             assigned_team_id = data.get("assigned_team_id")
-            if assigned_team_id:
-                team = Team.query.filter_by(id=assigned_team_id, customer_id=customer_id).first()
-                if not team:
-                    return {"error": "Assigned team not found or unauthorized"}, 404
+            missing = TaskService._find_missing_reference(customer_id, data["task_id"], assigned_user_id, assigned_team_id)
+            if missing:
+                return {"error": missing}, 404
 
             subtask = Subtask(
                 id=str(uuid4()),
@@ -290,9 +658,11 @@ class TaskService:
                 updated_at=datetime.utcnow()
             )
             db.session.add(subtask)
+            TaskService._adjust_subtask_counters(subtask.task_id, 1, int(subtask.status == "Completed"))
+            subtask_dict = subtask.to_dict()
             db.session.commit()
 
-            return {"message": "Subtask created successfully", "subtask": subtask.to_dict()}, 201
+            return {"message": "Subtask created successfully", "subtask": subtask_dict}, 201
 
         except Exception as e:
             app_logger.error({
@@ -303,6 +673,110 @@ class TaskService:
             db.session.rollback()
             return {"error": f"Failed to create subtask: {str(e)}"}, 500
 
+    @staticmethod
+    def create_subtasks_batch(data: dict) -> Tuple[dict, int]:
+        """
+        Create many subtasks in one transaction, validated with one lookup per referenced table and inserted
+        with a multi-row INSERT; parent task counters are adjusted with a single UPDATE. Modes as in
+        create_tasks_batch.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            if role not in ["Admin", "Project Manager"]:
+                return {"error": "Insufficient permissions"}, 403
+
+            items, mode, error = TaskService._parse_batch(data)
+            if error:
+                return {"error": error}, 400
+
+            errors = [TaskService._batch_item_error(item, ("title", "status", "task_id"),
+                                                    ("task_id", "assigned_user_id", "assigned_team_id"))
+                      for item in items]
+            valid = [item for item, error in zip(items, errors) if not error]
+
+            def referenced(field):
+                return {item.get(field) for item in valid if item.get(field)}
+
+            task_ids, user_ids, team_ids = referenced("task_id"), referenced("assigned_user_id"), referenced("assigned_team_id")
+            known_tasks = {row.id for row in db.session.query(Task.id).filter(
+                Task.id.in_(task_ids), Task.customer_id == customer_id
+            )} if task_ids else set()
+            known_users = {row.id for row in db.session.query(User.id).filter(
+                User.id.in_(user_ids), User.customer_id == customer_id
+            )} if user_ids else set()
+            known_teams = {row.id for row in db.session.query(Team.id).filter(
+                Team.id.in_(team_ids), Team.customer_id == customer_id
+            )} if team_ids else set()
+
+            now = datetime.utcnow()
+            results, rows, deltas = [], [], {}
+            for index, (item, error) in enumerate(zip(items, errors)):
+                if error:
+                    results.append({"index": index, "status": 400, "error": error})
+                    continue
+                if item["status"] not in TASK_STATUSES:
+                    results.append({"index": index, "status": 400, "error": f"Invalid status: {item['status']}"})
+                    continue
+                if item["task_id"] not in known_tasks:
+                    results.append({"index": index, "status": 404, "error": "Parent task not found or unauthorized"})
+                    continue
+                if item.get("assigned_user_id") and item["assigned_user_id"] not in known_users:
+                    results.append({"index": index, "status": 404, "error": "Assigned user not found or unauthorized"})
+                    continue
+                if item.get("assigned_team_id") and item["assigned_team_id"] not in known_teams:
+                    results.append({"index": index, "status": 404, "error": "Assigned team not found or unauthorized"})
+                    continue
+                fields, error = TaskService._sanitize_task_fields(item)
+                if error:
+                    results.append({"index": index, "status": 400, "error": error})
+                    continue
+
+                subtask_id = str(uuid4())
+                rows.append({
+                    "id": subtask_id,
+                    "task_id": item["task_id"],
+                    "title": item["title"],
+                    "description": item.get("description", ""),
+                    "status": item["status"],
+                    "assigned_user_id": item.get("assigned_user_id") or None,
+                    "assigned_team_id": item.get("assigned_team_id") or None,
+                    "due_date": fields["due_date"],
+                    "tags": fields["tags"],
+                    "estimated_duration": fields["estimated_duration"],
+                    "created_at": now,
+                    "updated_at": now
+                })
+                total, completed = deltas.get(item["task_id"], (0, 0))
+                deltas[item["task_id"]] = (total + 1, completed + int(item["status"] == "Completed"))
+                results.append({"index": index, "status": 201, "id": subtask_id})
+
+            if mode == "atomic" and len(rows) < len(items):
+                return TaskService._reject_batch(results)
+
+            if rows:
+                db.session.execute(insert(Subtask), rows)
+                TaskService._adjust_subtask_counters_bulk(deltas)
+                # Bulk INSERT bypasses the unit of work, so the change stamps are bumped explicitly
+                bump_versions(customer_id, SCOPES_BY_TABLE["subtasks"])
+                db.session.commit()
+
+            return TaskService._batch_outcome(results, mode, len(rows), "subtasks")
+
+        except Exception as e:
+            app_logger.error({
+                "function": "TaskService.create_subtasks_batch",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            db.session.rollback()
+            return {"error": f"Failed to create subtasks: {str(e)}"}, 500
+
     @staticmethod
     def update_subtask(subtask_id: str, data: dict) -> Tuple[dict, int]:
         try:
@@ -316,24 +790,42 @@ class TaskService:
             if role not in ["Admin", "Project Manager"]:
                 return {"error": "Insufficient permissions"}, 403
 
-            subtask = Subtask.query.join(Task).filter(
+            # The parent task is loaded by the same query; status changes below may update it. The subtask
+            # row stays locked until commit, so a concurrent status change or delete waits and then derives
+            # its counter delta from the status written here. `prerequisite`: the subtask is a node of the
+            # project's dependency graph
+            row = Subtask.query.join(Task).options(contains_eager(Subtask.task)).add_columns(
+                exists().where(Dependency.depends_on_subtask_id == Subtask.id).label("prerequisite")
+            ).filter(
                 Subtask.id == subtask_id,
                 Task.customer_id == customer_id
-            ).first()
-            if not subtask:
+            ).with_for_update(of=Subtask).first()
+            if not row:
                 return {"error": "Subtask not found or unauthorized"}, 404
+            subtask, prerequisite = row
+
+            # Validate new assignees before changing anything, so no partial update is flushed by the lookup
+            missing = TaskService._find_missing_reference(
+                customer_id,
+                user_id=data.get("assigned_user_id") if "assigned_user_id" in data else None,
+                team_id=data.get("assigned_team_id") if "assigned_team_id" in data else None
+            )
+            if missing:
+                return {"error": missing}, 404
 
             # Check if subtask status is changing from Not Started
             previous_status = subtask.status
+            parent_task = subtask.task
+            graph_tasks = []
             if "status" in data and data["status"] != previous_status:
                 if previous_status == "Not Started" and data["status"] in ["In Progress", "Completed"]:
                     # Update parent task's start_date and status
-                    parent_task = subtask.task
                     if not parent_task.start_date:
                         parent_task.start_date = datetime.utcnow()
                     if parent_task.status == "Not Started":
                         parent_task.status = "In Progress"
                         parent_task.updated_at = datetime.utcnow()
+                        graph_tasks.append({field: getattr(parent_task, field) for field in ("id",) + GRAPH_FIELDS})
 
             # Update subtask fields if provided
             if "title" in data:
@@ -342,20 +834,14 @@ class TaskService:
                 subtask.description = data.get("description", "")
             if "status" in data:
                 subtask.status = data["status"]
+                TaskService._adjust_subtask_counters(
+                    subtask.task_id, 0,
+                    int(data["status"] == "Completed") - int(previous_status == "Completed")
+                )
             if "assigned_user_id" in data:
-                assigned_user_id = data.get("assigned_user_id")
-                if assigned_user_id:
-                    user = User.query.filter_by(id=assigned_user_id, customer_id=customer_id).first()
-                    if not user:
-                        return {"error": "Assigned user not found or unauthorized"}, 404
-                subtask.assigned_user_id = assigned_user_id
+                subtask.assigned_user_id = data.get("assigned_user_id")
             if "assigned_team_id" in data:
-                assigned_team_id = data.get("assigned_team_id")
-                if assigned_team_id:
-                    team = Team.query.filter_by(id=assigned_team_id, customer_id=customer_id).first()
-                    if not team:
-                        return {"error": "Assigned team not found or unauthorized"}, 404
-                subtask.assigned_team_id = assigned_team_id
+                subtask.assigned_team_id = data.get("assigned_team_id")
             if "due_date" in data:
                 subtask.due_date = datetime.fromisoformat(data["due_date"]) if data["due_date"] else None
             if "tags" in data:
@@ -364,9 +850,14 @@ class TaskService:
                 subtask.estimated_duration = data.get("estimated_duration")
 
             subtask.updated_at = datetime.utcnow()
+            subtask_dict = subtask.to_dict()
+            graph_subtasks = [subtask_dict] if prerequisite and any(field in data for field in GRAPH_FIELDS) else []
+            if parent_task.project_id and (graph_tasks or graph_subtasks):
+                TaskService._stage_graph_nodes(customer_id, parent_task.project_id, tasks=graph_tasks,
+                                               subtasks=graph_subtasks)
             db.session.commit()
 
-            return {"message": "Subtask updated successfully", "subtask": subtask.to_dict()}, 200
+            return {"message": "Subtask updated successfully", "subtask": subtask_dict}, 200
 
         except Exception as e:
             app_logger.error({
@@ -390,13 +881,22 @@ class TaskService:
             if role not in ["Admin", "Project Manager"]:
                 return {"error": "Insufficient permissions"}, 403
 
-            subtask = Subtask.query.join(Task).filter(
+            # Locked like in update_subtask, so the completed delta uses the status as of the delete
+            row = Subtask.query.join(Task).add_columns(
+                Task.project_id,
+                exists().where(Dependency.depends_on_subtask_id == Subtask.id).label("prerequisite")
+            ).filter(
                 Subtask.id == subtask_id,
                 Task.customer_id == customer_id
-            ).first()
-            if not subtask:
+            ).with_for_update(of=Subtask).first()
+            if not row:
                 return {"error": "Subtask not found or unauthorized"}, 404
+            subtask, project_id, prerequisite = row
 
+            TaskService._adjust_subtask_counters(subtask.task_id, -1, -int(subtask.status == "Completed"))
+            if prerequisite and project_id:
+                # The dependencies on the subtask go with it: the graph is loaded again rather than patched
+                stage_graph_change(customer_id, project_id)
             db.session.delete(subtask)
             db.session.commit()
 
@@ -1,8 +1,9 @@
-from flask import request
+from flask import request, current_app
 from ..models.team import Team
 from ..models.team_member import TeamMember
 from ..models.user import User
 from ..utils.logger import app_logger
+from ..utils.streaming import wants_stream
 import traceback
 from typing import Tuple, List
 from datetime import datetime
@@ -50,16 +51,20 @@ class TeamService:
             return {"error": f"Failed to create team: {str(e)}"}, 500
 
     @staticmethod
-    def list_teams() -> Tuple[List[dict], int]:
+    def list_teams(args=None) -> Tuple[List[dict], int]:
         try:
             customer_id = request.decoded.get("customer_id")
             role = request.decoded.get("role")
             user_id = request.decoded.get("user_id")
 
-            result, status = TeamsDao.fetch_teams(customer_id, role, user_id)
+            result, status = TeamsDao.fetch_teams(
+                customer_id, role, user_id,
+                stream=wants_stream(args),
+                as_json=current_app.config.get("DB_JSON_PASSTHROUGH", False)
+            )
             # Adjust response format to match original
             if status == 200:
-                return result["data"], 200
+                return (result if "rows" in result or "json" in result else result["data"]), 200
             return [result], status
 
         except Exception as e:
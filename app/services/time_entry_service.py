@@ -1,20 +1,177 @@
+import csv
+import json
 import dateutil.parser
 from flask import request
 from ..models.task import Task
 from ..models.subtask import Subtask
 from ..models.time_entry import TimeEntry
 from ..utils.logger import app_logger
+from ..utils.pagination import parse_page_args, decode_datetime_cursor, split_page, PaginationError
+from ..utils.streaming import wants_stream, stream_rows
 import traceback
-from typing import Tuple, List
-from datetime import datetime
+from typing import Tuple, List, Iterator, TextIO
+from datetime import datetime, date
 from uuid import uuid4
 from .. import db
+from ..dao import TimeEntriesDao
+from ..dao.time_entries import REPORT_PERIODS, REPORT_GROUPS
+from ..utils.versioning import bump_versions, SCOPES_BY_TABLE
 from dateutil import tz
-from sqlalchemy.sql import text
+from sqlalchemy import tuple_
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_MODES = ("partial", "atomic")
+# Rejected rows listed in an import report; the counts always cover every row
+MAX_REPORTED_REJECTS = 1000
+# Longest date range a single report may span
+MAX_REPORT_DAYS = 366
+# IDs are UUID strings; longer ones cannot match a row
+MAX_ID_LENGTH = 36
 
 class TimeEntryService:
     @staticmethod
-    def list_time_entries(project_id: str = None, start_date: str = None, end_date: str = None) -> Tuple[List[dict], int]:
+    def _iter_import_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, dict, str]]:
+        """
+        Parse an import incrementally, yielding (line number, record, error) per entry.
+        CSV needs a header row; NDJSON holds one JSON object per line and may contain blank lines.
+        """
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            try:
+                for record in reader:
+                    yield reader.line_num, record, None
+            except csv.Error as e:
+                yield reader.line_num, None, f"Malformed CSV, import stopped here: {str(e)}"
+            return
+
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, record, None
+
+    @staticmethod
+    def _import_row(line_no: int, record: dict, default_user_id: str) -> Tuple[tuple, str]:
+        """
+        Validate the shape of one import record and build its staging row (see TimeEntriesDao).
+        Ownership and duration consistency are checked afterwards, in bulk, in the database.
+        Timestamps without an offset are taken as UTC.
+        """
+        missing = [field for field in ("subtask_id", "start_time", "end_time", "duration") if record.get(field) in (None, "")]
+        if missing:
+            return None, f"Missing required fields: {', '.join(missing)}"
+
+        user_id = record.get("user_id") or default_user_id
+        if not user_id:
+            return None, "Missing required fields: user_id"
+        for field, value in (("user_id", user_id), ("subtask_id", record["subtask_id"])):
+            if len(str(value)) > MAX_ID_LENGTH:
+                return None, f"{field} must be at most {MAX_ID_LENGTH} characters"
+
+        try:
+            start_time = dateutil.parser.isoparse(str(record["start_time"]))
+            end_time = dateutil.parser.isoparse(str(record["end_time"]))
+        except ValueError:
+            return None, "Invalid start_time or end_time format"
+        start_time = (start_time if start_time.tzinfo else start_time.replace(tzinfo=tz.UTC)).astimezone(tz.UTC)
+        end_time = (end_time if end_time.tzinfo else end_time.replace(tzinfo=tz.UTC)).astimezone(tz.UTC)
+
+        try:
+            duration = int(record["duration"])
+        except (ValueError, TypeError):
+            return None, "Duration must be a valid integer"
+
+        return (
+            line_no, str(uuid4()), str(user_id), str(record["subtask_id"]),
+            start_time.isoformat(), end_time.isoformat(), duration, record.get("notes") or None
+        ), None
+
+    @staticmethod
+    def import_time_entries(stream: TextIO, fmt: str, customer_id: str, user_id: str, role: str,
+                            mode: str = "partial") -> Tuple[dict, int]:
+        """
+        Bulk-load time entries from a CSV or NDJSON stream. Rows are parsed as they arrive and streamed
+        into a temporary staging table with COPY, checked there in one set-based pass (subtask and user
+        ownership, duration vs start/end), and the valid ones inserted with a single INSERT ... SELECT.
+        Rows without a user_id are attributed to `user_id` (if given); Team Members may only import their own time.
+        In "atomic" mode any rejected row cancels the whole import.
+        """
+        try:
+            if not customer_id or (role == "Team Member" and not user_id):
+                return {"error": "Unauthorized: Invalid token data"}, 401
+            if fmt not in IMPORT_FORMATS:
+                return {"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"}, 400
+            if mode not in IMPORT_MODES:
+                return {"error": f"mode must be one of: {', '.join(IMPORT_MODES)}"}, 400
+
+            rejects = []
+            counts = {"received": 0, "rejected": 0}
+
+            def staging_rows():
+                for line_no, record, error in TimeEntryService._iter_import_records(stream, fmt):
+                    counts["received"] += 1
+                    if not error:
+                        row, error = TimeEntryService._import_row(line_no, record, user_id)
+                    if error:
+                        counts["rejected"] += 1
+                        if len(rejects) < MAX_REPORTED_REJECTS:
+                            rejects.append({"line": line_no, "error": error})
+                        continue
+                    yield row
+
+            TimeEntriesDao.create_import_staging()
+            TimeEntriesDao.copy_into_staging(staging_rows())
+            TimeEntriesDao.validate_staging(customer_id, only_user_id=user_id if role == "Team Member" else None)
+            staged_rejected, staged_rejects = TimeEntriesDao.staging_rejects(MAX_REPORTED_REJECTS)
+
+            counts["rejected"] += staged_rejected
+            rejects = sorted(rejects + staged_rejects, key=lambda reject: reject["line"])[:MAX_REPORTED_REJECTS]
+
+            if counts["received"] == 0:
+                db.session.rollback()
+                return {"error": "No time entries found in the upload"}, 400
+
+            imported = 0
+            if mode == "atomic" and counts["rejected"]:
+                db.session.rollback()
+            else:
+                imported = TimeEntriesDao.load_staging(customer_id)
+                TimeEntriesDao.apply_staging_rollups(customer_id)
+                # Raw SQL bypasses the flush hook, so the change stamps are bumped explicitly
+                bump_versions(customer_id, SCOPES_BY_TABLE["time_entries"])
+                db.session.commit()
+
+            report = {
+                "received": counts["received"],
+                "imported": imported,
+                "rejected": counts["rejected"],
+                "rejects": rejects,
+                "rejects_truncated": counts["rejected"] > len(rejects)
+            }
+            if imported == 0:
+                return {"error": f"No time entries imported: {counts['rejected']} row(s) rejected", **report}, 400
+            if counts["rejected"]:
+                return {"message": f"Imported {imported} of {counts['received']} time entries", **report}, 207
+            return {"message": f"Imported {imported} time entries", **report}, 201
+
+        except Exception as e:
+            app_logger.error({
+                "function": "TimeEntryService.import_time_entries",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            db.session.rollback()
+            return {"error": f"Failed to import time entries: {str(e)}"}, 500
+
+    @staticmethod
+    def list_time_entries(project_id: str = None, start_date: str = None, end_date: str = None, args=None) -> Tuple[dict, int]:
         try:
             user_id = request.decoded.get("user_id")
             customer_id = request.decoded.get("customer_id")
@@ -23,11 +180,11 @@ class TimeEntryService:
             if not user_id or not customer_id:
                 return [{"error": "Unauthorized: Invalid token data"}], 401
 
-            # Set session timezone to UTC
-            db.session.execute(text("SET TIME ZONE 'UTC'"))
-            print("debug --- session timezone:", db.session.execute(text("SHOW timezone")).scalar())
-
-            print("debug --- list:", user_id, customer_id, role, start_date, end_date)
+            try:
+                limit, cursor = parse_page_args(args or {})
+                cursor = decode_datetime_cursor(cursor) if cursor else None
+            except PaginationError as e:
+                return [{"error": str(e)}], 400
 
             query = TimeEntry.query.filter_by(customer_id=customer_id)
             if role == "Team Member":
@@ -41,7 +198,6 @@ class TimeEntryService:
             if start_date:
                 try:
                     start = dateutil.parser.isoparse(start_date).astimezone(tz.UTC)
-                    print("debug --- parsed start_date:", start_date, "->", start.isoformat())
                     query = query.filter(TimeEntry.start_time >= start)
                 except ValueError:
                     return [{"error": "Invalid start_date format"}], 400
@@ -49,16 +205,28 @@ class TimeEntryService:
             if end_date:
                 try:
                     end = dateutil.parser.isoparse(end_date).astimezone(tz.UTC)
-                    print("debug --- parsed end_date:", end_date, "->", end.isoformat())
                     query = query.filter(TimeEntry.end_time <= end)
                 except ValueError:
                     return [{"error": "Invalid end_date format"}], 400
 
-            time_entries = query.all()
+            if cursor:
+                query = query.filter(tuple_(TimeEntry.start_time, TimeEntry.id) < tuple_(*cursor))
+
+            query = query.order_by(TimeEntry.start_time.desc(), TimeEntry.id.desc())
+            if limit:
+                query = query.limit(limit + 1)
+
+            if wants_stream(args):
+                return {
+                    "rows": stream_rows(query.statement, {}, lambda row: row[0].to_dict()),
+                    "limit": limit,
+                    "cursor_key": lambda entry: (entry["startTime"], entry["id"])
+                }, 200
+
+            time_entries, next_cursor = split_page(query.all(), limit, lambda entry: (entry.start_time, entry.id))
 
             result = [entry.to_dict() for entry in time_entries]
-            print("debug --- time_entries:", result)
-            return result, 200
+            return {"data": result, "next_cursor": next_cursor, "limit": limit}, 200
 
         except Exception as e:
             app_logger.error({
@@ -68,6 +236,70 @@ class TimeEntryService:
             })
             return [{"error": f"Failed to fetch time entries: {str(e)}"}], 500
 
+    @staticmethod
+    def get_report(args) -> Tuple[dict, int]:
+        """
+        Time totals from the daily rollups between `from` and `to` (local dates in the customer's
+        time_zone, inclusive), bucketed by `granularity` and grouped by `group_by` (comma separated).
+        Team Members only see their own time.
+        """
+        try:
+            user_id = request.decoded.get("user_id")
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if not user_id or not customer_id:
+                return {"error": "Unauthorized: Invalid token data"}, 401
+
+            try:
+                start_day = date.fromisoformat(args.get("from", ""))
+                end_day = date.fromisoformat(args.get("to", ""))
+            except ValueError:
+                return {"error": "from and to must be dates (YYYY-MM-DD)"}, 400
+            if end_day < start_day:
+                return {"error": "to must not be before from"}, 400
+            if (end_day - start_day).days >= MAX_REPORT_DAYS:
+                return {"error": f"A report may span at most {MAX_REPORT_DAYS} days"}, 400
+
+            granularity = args.get("granularity", "day")
+            if granularity not in REPORT_PERIODS:
+                return {"error": f"granularity must be one of: {', '.join(REPORT_PERIODS)}"}, 400
+
+            group_by = [g.strip() for g in args.get("group_by", "user").split(",") if g.strip()]
+            invalid = [g for g in group_by if g not in REPORT_GROUPS]
+            if invalid:
+                return {"error": f"Invalid group_by: {', '.join(invalid)}"}, 400
+            group_by = list(dict.fromkeys(group_by))
+
+            report_user_id = args.get("user_id")
+            if role == "Team Member":
+                if report_user_id and report_user_id != user_id:
+                    return {"error": "Insufficient permissions"}, 403
+                report_user_id = user_id
+
+            rows = TimeEntriesDao.fetch_report(
+                customer_id, start_day, end_day, group_by, granularity,
+                user_id=report_user_id, project_id=args.get("project_id")
+            )
+            return {
+                "message": "Time report fetched successfully",
+                "data": {
+                    "from": start_day.isoformat(),
+                    "to": end_day.isoformat(),
+                    "granularity": granularity,
+                    "group_by": group_by,
+                    "rows": rows
+                }
+            }, 200
+
+        except Exception as e:
+            app_logger.error({
+                "function": "TimeEntryService.get_report",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return {"error": f"Failed to fetch time report: {str(e)}"}, 500
+
     @staticmethod
     def create_time_entry(data: dict) -> Tuple[dict, int]:
         try:
@@ -93,7 +325,6 @@ class TimeEntryService:
             try:
                 start_time = dateutil.parser.isoparse(data["start_time"]).astimezone(tz.UTC)
                 end_time = dateutil.parser.isoparse(data["end_time"]).astimezone(tz.UTC)
-                print("debug --- parsed start_time:", start_time, "end_time:", end_time)
             except ValueError:
                 return {"error": "Invalid start_time or end_time format"}, 400
 
@@ -102,10 +333,6 @@ class TimeEntryService:
             if calculated_duration != data["duration"]:
                 return {"error": "Duration does not match start and end times"}, 400
 
-            # Force UTC timezone for session (optional)
-            db.session.execute(text("SET TIME ZONE 'UTC'"))
-            print("debug --- session timezone:", db.session.execute(text("SHOW timezone")).scalar())
-
             time_entry = TimeEntry(
                 id=str(uuid4()),
                 customer_id=customer_id,
@@ -118,10 +345,11 @@ class TimeEntryService:
                 created_at=datetime.now(tz.UTC)
             )
             db.session.add(time_entry)
+            TimeEntriesDao.apply_rollup_delta(customer_id, user_id, time_entry.subtask_id, start_time, time_entry.duration, 1)
+            # Serialize before committing; reading the entry after the commit would reload it
+            result = time_entry.to_dict()
             db.session.commit()
 
-            result = time_entry.to_dict()
-            print("debug --- created time_entry:", result)
             return {"message": "Time entry created successfully", "timeEntry": result}, 201
 
         except Exception as e:
@@ -148,8 +376,9 @@ class TimeEntryService:
             if not user_id or not customer_id:
                 return {"error": "Unauthorized: Invalid token data"}, 401
 
-            # Verify time entry exists and belongs to customer
-            time_entry = TimeEntry.query.filter_by(id=time_entry_id, customer_id=customer_id).first()
+            # Verify time entry exists and belongs to customer. Lock the row so concurrent updates cannot both
+            # subtract the same old duration from the daily rollup
+            time_entry = TimeEntry.query.filter_by(id=time_entry_id, customer_id=customer_id).with_for_update().first()
             if not time_entry:
                 return {"error": "Time entry not found or unauthorized"}, 404
 
@@ -173,8 +402,6 @@ class TimeEntryService:
                 start_time = parsed_start.astimezone(tz.UTC)
                 end_time = parsed_end.astimezone(tz.UTC)
 
-                print("debug --- raw start_time:", data["start_time"], "parsed:", parsed_start.isoformat(), "utc:", start_time.isoformat())
-                print("debug --- raw end_time:", data["end_time"], "parsed:", parsed_end.isoformat(), "utc:", end_time.isoformat())
             except ValueError:
                 return {"error": "Invalid start_time or end_time format"}, 400
 
@@ -183,9 +410,11 @@ class TimeEntryService:
             if calculated_duration != data["duration"]:
                 return {"error": f"Duration ({data['duration']}) does not match start and end times ({calculated_duration})"}, 400
 
-            db.session.execute(text("SET TIME ZONE 'UTC'"))
-            print("debug --- session timezone:", db.session.execute(text("SHOW timezone")).scalar())
-
+            # Move the entry's minutes from its old daily bucket to the new one
+            TimeEntriesDao.apply_rollup_delta(
+                customer_id, time_entry.user_id, time_entry.subtask_id, time_entry.start_time, -time_entry.duration, -1
+            )
+            TimeEntriesDao.apply_rollup_delta(customer_id, time_entry.user_id, data["subtask_id"], start_time, data["duration"], 1)
 
             # Update fields
             time_entry.subtask_id = data["subtask_id"]
@@ -194,10 +423,8 @@ class TimeEntryService:
             time_entry.duration = data["duration"]
             time_entry.notes = data.get("notes")
 
-            db.session.commit()
-
             result = time_entry.to_dict()
-            print("debug --- updated time_entry:", result)
+            db.session.commit()
             return {"message": "Time entry updated successfully", "timeEntry": result}, 200
 
         except Exception as e:
@@ -1,5 +1,7 @@
-from flask import request
+from flask import request, current_app
 from ..utils.logger import app_logger
+from ..utils.streaming import wants_stream
+from ..utils.token_cache import get_token_cache
 import traceback
 from typing import Tuple, List
 from ..dao import UsersDao  # Import the new DAO
@@ -23,15 +25,19 @@ class UserService:
             return {"error": f"Failed to fetch user: {str(e)}"}, 500
 
     @staticmethod
-    def list_users() -> Tuple[List[dict], int]:
+    def list_users(args=None) -> Tuple[List[dict], int]:
         try:
             customer_id = request.decoded.get("customer_id")
             role = request.decoded.get("role")
 
-            result, status = UsersDao.fetch_users(customer_id, role)
+            result, status = UsersDao.fetch_users(
+                customer_id, role,
+                stream=wants_stream(args),
+                as_json=current_app.config.get("DB_JSON_PASSTHROUGH", False)
+            )
             # Adjust response format to match original
             if status == 200:
-                return result["data"], 200
+                return (result if "rows" in result or "json" in result else result["data"]), 200
             return [result], status
 
         except Exception as e:
@@ -41,4 +47,31 @@ class UserService:
                 "traceback": traceback.format_exc()
             })
             return [{"error": f"Failed to fetch users: {str(e)}"}], 500
-        
\ No newline at end of file
+        
+
+    @staticmethod
+    def revoke_sessions(user_id: str) -> Tuple[dict, int]:
+        """
+        Deny every token issued to the user so far, e.g. after their role changed or they left; their next
+        login gets a working token again.
+        """
+        try:
+            customer_id = request.decoded.get("customer_id")
+            role = request.decoded.get("role")
+
+            if role != "Admin":
+                return {"error": "Insufficient permissions"}, 403
+
+            if not UsersDao.user_exists(user_id, customer_id):
+                return {"error": "User not found or unauthorized"}, 404
+
+            get_token_cache().revoke_user(user_id)
+            return {"message": "User sessions revoked successfully"}, 200
+
+        except Exception as e:
+            app_logger.error({
+                "function": "UserService.revoke_sessions",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return {"error": f"Failed to revoke sessions: {str(e)}"}, 500
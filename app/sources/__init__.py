@@ -2,9 +2,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
+from ..utils.replica import RoutingSession
 
 
-db = SQLAlchemy()
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 
@@ -0,0 +1,209 @@
+# app/utils/cache.py
+"""
+Response cache backends. Entries are keyed by the request's ETag (see utils.conditional), which already
+folds in the customer's version stamps, so a hit can never return data older than the last committed
+write, even from another worker. Tag invalidation after each commit only reclaims the dead entries early.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from flask import Flask, current_app
+
+from .logger import app_logger
+
+# Bookkeeping bytes charged per in-process entry on top of its key and body
+ENTRY_OVERHEAD = 200
+
+
+class CacheStats:
+    """
+    Thread-safe counters shared by every backend.
+    """
+    FIELDS = ("hits", "misses", "stores", "evictions", "expirations", "invalidations", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class LRUCacheBackend:
+    """
+    In-process cache bounded by total bytes and entry count, evicting least recently used entries first.
+    """
+    name = "memory"
+
+    def __init__(self, max_bytes: int, max_entries: int, default_ttl: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (body, expires_at, size, tags)
+        self._tags = {}  # tag -> set of keys
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.stats.incr("expirations")
+                self.stats.incr("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.incr("hits")
+        return entry[0]
+
+    def set(self, key: str, body: bytes, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        size = len(key) + len(body) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, time.monotonic() + (ttl or self.default_ttl), size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.incr("evictions")
+        self.stats.incr("stores")
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.stats.incr("invalidations")
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _remove(self, key: str) -> None:
+        body, _, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all workers in a Redis-protocol server. `client` only needs the redis-py methods used
+    here (get, set with ex, sadd, smembers, expire, delete, pipeline), so a local stand-in can replace it.
+    Memory bounds and eviction are left to the server's maxmemory policy.
+    """
+    name = "redis"
+
+    def __init__(self, client, default_ttl: int, prefix: str = "rc:"):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            body = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._error("get", e)
+            return None
+        self.stats.incr("hits" if body is not None else "misses")
+        return body
+
+    def set(self, key: str, body: bytes, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        ttl = ttl or self.default_ttl
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.prefix + key, body, ex=ttl)
+            for tag in tags:
+                pipe.sadd(self.prefix + "tag:" + tag, key)
+                pipe.expire(self.prefix + "tag:" + tag, ttl)
+            pipe.execute()
+        except Exception as e:
+            self._error("set", e)
+            return
+        self.stats.incr("stores")
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        try:
+            for tag in tags:
+                tag_key = self.prefix + "tag:" + tag
+                keys = [self.prefix + (k.decode() if isinstance(k, bytes) else k) for k in self.client.smembers(tag_key)]
+                self.client.delete(tag_key, *keys)
+                self.stats.incr("invalidations", len(keys))
+        except Exception as e:
+            self._error("invalidate_tags", e)
+
+    def info(self) -> dict:
+        return {"prefix": self.prefix}
+
+    def _error(self, operation: str, error: Exception) -> None:
+        # An unreachable cache degrades to uncached responses rather than failing requests
+        self.stats.incr("errors")
+        app_logger.error({"function": f"RedisCacheBackend.{operation}", "error": str(error)})
+
+
+def create_cache_backend(config: dict):
+    """
+    Build the backend selected by RESPONSE_CACHE_BACKEND ("memory", "redis" or "none").
+    """
+    backend = config.get("RESPONSE_CACHE_BACKEND", "memory")
+    ttl = config.get("RESPONSE_CACHE_TTL", 300)
+    if backend == "memory":
+        return LRUCacheBackend(
+            max_bytes=config.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+            max_entries=config.get("RESPONSE_CACHE_MAX_ENTRIES", 10000),
+            default_ttl=ttl,
+        )
+    if backend == "redis":
+        import redis  # optional dependency, only needed for the shared backend
+        return RedisCacheBackend(redis.Redis.from_url(config["RESPONSE_CACHE_URL"]), default_ttl=ttl)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND '{backend}'")
+
+
+def init_response_cache(app: Flask, backend=None) -> None:
+    """
+    Attach the response cache to the app; pass `backend` to inject one (e.g. a Redis stand-in).
+    """
+    app.extensions["response_cache"] = backend if backend is not None else create_cache_backend(app.config)
+
+
+def get_response_cache():
+    return current_app.extensions.get("response_cache")
+
+
+def cache_tag(customer_id: str, scope: str) -> str:
+    return f"{customer_id}:{scope}"
+
+
+def invalidate_committed(touched: Dict[str, Dict[str, int]]) -> None:
+    """
+    Commit listener for utils.versioning: drop cached responses built from the scopes that just changed.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return
+    cache.invalidate_tags([cache_tag(customer_id, scope) for customer_id, scopes in touched.items() for scope in scopes])
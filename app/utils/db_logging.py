@@ -15,11 +15,11 @@ def setup_db_logging(db):
     def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
         query_time_ms = (time.perf_counter() - conn.info['query_start_time'].pop()) * 1000
         statement_truncated = (statement[:100] + '...') if len(statement) > 100 else statement
-        rtime_logger.info(
-            f"Query: {statement_truncated}, "
-            f"QueryTimeMs: {query_time_ms:.2f}, "
-            f"Parameters: {parameters}"
-        )
+        rtime_logger.info({
+            "query": statement_truncated,
+            "query_time_ms": round(query_time_ms, 2),
+            "parameters": parameters
+        })
 
     # Defer event listener attachment until the engine is available
     def attach_listeners():
@@ -0,0 +1,45 @@
+# app/utils/db_pool.py
+"""
+Connection pool settings and gauges. Per-session settings (time zone, statement_timeout,
+application_name) travel in the libpq startup packet (see Config.SQLALCHEMY_ENGINE_OPTIONS), so each
+physical connection gets them once at connect time with no extra round trips, and no request can leave a
+pooled connection with different settings.
+"""
+from sqlalchemy import text
+
+from ..sources import db
+from .metrics import REGISTRY
+
+REGISTRY.gauge("db_pool_size", "Configured persistent connections in the pool.", ("pool",))
+REGISTRY.gauge("db_pool_max_overflow", "Connections the pool may open beyond its size.", ("pool",))
+REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out of the pool.", ("pool",))
+REGISTRY.gauge("db_pool_idle", "Connections idle in the pool.", ("pool",))
+REGISTRY.gauge("db_pool_saturation", "Checked-out connections as a fraction of size + max_overflow.", ("pool",))
+
+
+def register_pool_gauges(engine, name: str = "primary") -> None:
+    """
+    Report the pool's occupancy with every metrics snapshot, labelled pool=`name`.
+    """
+    pool = engine.pool
+
+    def collect():
+        if not hasattr(pool, "checkedout"):
+            return  # NullPool / StaticPool keep no occupancy counters
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        REGISTRY.set("db_pool_size", pool.size(), (name,))
+        REGISTRY.set("db_pool_max_overflow", pool._max_overflow, (name,))
+        REGISTRY.set("db_pool_checked_out", checked_out, (name,))
+        REGISTRY.set("db_pool_idle", pool.checkedin(), (name,))
+        REGISTRY.set("db_pool_saturation", round(checked_out / capacity, 4) if capacity > 0 else 0.0, (name,))
+
+    REGISTRY.on_collect(collect)
+
+
+def lift_statement_timeout() -> None:
+    """
+    Disable statement_timeout for the rest of the current transaction, for bulk maintenance work (imports,
+    seeding, rebuilds) that legitimately runs longer than an API request may.
+    """
+    db.session.execute(text("SET LOCAL statement_timeout = 0"))
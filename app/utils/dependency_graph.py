@@ -0,0 +1,438 @@
+# app/utils/dependency_graph.py
+"""
+In-memory dependency graphs, one per project. A graph is loaded once with a single query, stamped with
+the project's graph version (graph_scope), which only writes to the project's tasks, to the subtasks
+that are nodes, and to its dependencies bump. The writes of this worker are then carried over to the
+graph: edges one by one, new tasks, and title, status and estimate changes of nodes. A read that finds a
+newer version (a write elsewhere, or a deleted task or subtask) loads the graph again.
+
+Nodes are the project's tasks plus the subtasks that dependencies point at; an edge runs from the
+prerequisite to the task that waits on it. A subtask node also gets implicit edges: it precedes its
+parent task, and it waits on the prerequisites of its parent, since work on a task cannot start before
+the task itself may.
+
+Cycles are rejected with the Pearce-Kelly dynamic topological order: every node keeps a position in a
+valid topological order, and an edge that agrees with the order is accepted in O(1). Only an edge that
+points backwards searches, and only the nodes between its two positions, so the cost of a check depends
+on the region that has to be reordered, not on the size of the project.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+from .versioning import stage_versions
+
+COMPLETED = "Completed"
+
+
+def graph_scope(project_id: str) -> str:
+    """
+    The utils.versioning scope that stamps one project's graph.
+    """
+    return f"graph:{project_id}"
+
+
+class CycleError(Exception):
+    """
+    The edge would close a cycle; `path` runs from the edge's dependent back to its prerequisite.
+    """
+
+    def __init__(self, path: List[str]):
+        super().__init__("Dependency would create a cycle")
+        self.path = path
+
+
+class DependencyGraph:
+    """
+    Adjacency of one project. `_succ` / `_pred` count edge multiplicity, since an implicit edge can also
+    be implied through more than one dependency. Public methods hold `lock`, which callers also take to
+    make several changes at once.
+    """
+
+    def __init__(self, project_id: str, customer_id: str, version: int):
+        self.project_id = project_id
+        self.customer_id = customer_id
+        self.version = version
+        self.lock = threading.RLock()
+        self.nodes: Dict[str, dict] = {}
+        self.edges: Dict[str, Tuple[str, str]] = {}  # dependency id -> (prerequisite, dependent)
+        self._prerequisites: Dict[str, Dict[str, str]] = {}  # task -> {prerequisite: dependency id}
+        self._children: Dict[str, set] = {}  # task -> subtask nodes of it
+        self._uses: Dict[str, int] = {}  # subtask node -> dependencies pointing at it
+        self._succ: Dict[str, Dict[str, int]] = {}
+        self._pred: Dict[str, Dict[str, int]] = {}
+        self._ord: Dict[str, int] = {}
+        self._next_ord = 0
+        self._analysis = None
+
+    @classmethod
+    def from_rows(cls, project_id: str, customer_id: str, version: int, nodes: Iterable[dict],
+                  edges: Iterable[dict]) -> "DependencyGraph":
+        """
+        Build a graph from the node and edge rows of DependenciesDao.fetch_graph. The edges are linked
+        as they are and ordered once with Kahn's algorithm; only a stored cycle (rows written outside the
+        service) falls back to adding them one by one, which drops the edge that closes it.
+        """
+        nodes = sorted(nodes, key=lambda n: n["type"] != "task")
+        edges = [(edge["id"], edge["depends_on_task_id"] or edge["depends_on_subtask_id"], edge["task_id"])
+                 for edge in edges]
+        graph = cls(project_id, customer_id, version)
+        for node in nodes:
+            graph.add_node(node)
+        edges = [edge for edge in edges if edge[1] in graph.nodes and edge[2] in graph.nodes]
+        for edge in edges:
+            graph._attach(*edge)
+        if graph._renumber():
+            return graph
+
+        graph = cls(project_id, customer_id, version)
+        for node in nodes:
+            graph.add_node(node)
+        for edge in edges:
+            try:
+                graph.add_edge(*edge)
+            except CycleError:
+                continue
+        return graph
+
+    def _renumber(self) -> bool:
+        """
+        Replace the order with a fresh topological order of the whole graph; False if there is a cycle.
+        """
+        indegree = {node_id: len(self._pred[node_id]) for node_id in self.nodes}
+        order = [node_id for node_id, count in indegree.items() if not count]
+        for node_id in order:
+            for successor in self._succ[node_id]:
+                indegree[successor] -= 1
+                if not indegree[successor]:
+                    order.append(successor)
+        if len(order) < len(self.nodes):
+            return False
+        self._ord = {node_id: position for position, node_id in enumerate(order)}
+        self._next_ord = len(order)
+        self._analysis = None
+        return True
+
+    # -- structure ---------------------------------------------------------------------------------------
+
+    def add_node(self, node: dict) -> None:
+        """
+        Add a task or subtask node ({"id", "type", "task_id", "project_id", "title", "status",
+        "estimated_duration"}), or refresh the attributes of a known one. A subtask's parent must be added
+        first.
+        """
+        with self.lock:
+            node_id = node["id"]
+            self._analysis = None
+            if node_id in self.nodes:
+                self.nodes[node_id].update(node)
+                return
+            self.nodes[node_id] = dict(node)
+            self._children.setdefault(node_id, set())
+            self._succ[node_id] = {}
+            self._pred[node_id] = {}
+            self._ord[node_id] = self._next_ord
+            self._next_ord += 1
+            parent = node.get("task_id") if node.get("type") == "subtask" else None
+            if parent in self.nodes:
+                self._children[parent].add(node_id)
+                # Placing a new node cannot close a cycle: nothing reaches it yet
+                self._insert(node_id, parent)
+                for prerequisite in self._prerequisites.get(parent, ()):
+                    self._insert(prerequisite, node_id)
+
+    def update_node(self, node_id: str, attributes: dict) -> None:
+        """
+        Refresh attributes (title, status, estimated_duration) of a node; a node not in the graph is ignored.
+        """
+        with self.lock:
+            if node_id in self.nodes:
+                self.nodes[node_id].update(attributes)
+                self._analysis = None
+
+    def _remove_node(self, node_id: str) -> None:
+        for successor in list(self._succ[node_id]):
+            self._pred[successor].pop(node_id, None)
+        for predecessor in list(self._pred[node_id]):
+            self._succ[predecessor].pop(node_id, None)
+        parent = self.nodes[node_id].get("task_id")
+        self._children.get(parent, set()).discard(node_id)
+        for index in (self.nodes, self._succ, self._pred, self._ord, self._children, self._uses):
+            index.pop(node_id, None)
+
+    def prerequisites_of(self, task_id: str) -> List[str]:
+        with self.lock:
+            return list(self._prerequisites.get(task_id, ()))
+
+    def check_edge(self, prerequisite: str, dependent: str, parent: Optional[str] = None) -> None:
+        """
+        Raise CycleError if `dependent` may not wait on `prerequisite`, without adding the edge. On success
+        the topological order is already arranged for it, so the add_edge that follows is cheap.
+
+        A subtask that is not in the graph yet is checked through its `parent`: its only incoming edges
+        would come from the parent's prerequisites, so the edge closes a cycle exactly when the dependent
+        already precedes one of those.
+        """
+        with self.lock:
+            targets = [dependent] + sorted(self._children.get(dependent, set()) - {prerequisite})
+            if prerequisite in self.nodes:
+                for target in targets:
+                    self._reorder(prerequisite, target)
+                return
+            for inherited in sorted(self._prerequisites.get(parent, ())):
+                for target in targets:
+                    try:
+                        self._reorder(inherited, target)
+                    except CycleError as e:
+                        raise CycleError(e.path + [prerequisite]) from None
+
+    def add_edge(self, dependency_id: str, prerequisite: str, dependent: str) -> None:
+        """
+        Add dependency `dependency_id`. Raises KeyError for an unknown node and CycleError, leaving the
+        graph unchanged, when the edge would close a cycle.
+        """
+        with self.lock:
+            if prerequisite not in self.nodes or dependent not in self.nodes:
+                raise KeyError(prerequisite if prerequisite not in self.nodes else dependent)
+            if dependency_id in self.edges:
+                return
+            self.check_edge(prerequisite, dependent)
+            self._attach(dependency_id, prerequisite, dependent)
+
+    def _attach(self, dependency_id: str, prerequisite: str, dependent: str) -> None:
+        self.edges[dependency_id] = (prerequisite, dependent)
+        self._prerequisites.setdefault(dependent, {})[prerequisite] = dependency_id
+        self._link(prerequisite, dependent)
+        for child in self._children[dependent]:
+            if child != prerequisite:
+                self._link(prerequisite, child)
+        if self.nodes[prerequisite]["type"] == "subtask":
+            self._uses[prerequisite] = self._uses.get(prerequisite, 0) + 1
+        self._analysis = None
+
+    def remove_edge(self, dependency_id: str) -> None:
+        """
+        Remove a dependency; a subtask node that no dependency points at any more leaves the graph.
+        """
+        with self.lock:
+            edge = self.edges.pop(dependency_id, None)
+            if edge is None:
+                return
+            prerequisite, dependent = edge
+            self._prerequisites.get(dependent, {}).pop(prerequisite, None)
+            self._unlink(prerequisite, dependent)
+            for child in self._children.get(dependent, ()):
+                if child != prerequisite:
+                    self._unlink(prerequisite, child)
+            if prerequisite in self._uses:
+                self._uses[prerequisite] -= 1
+                if not self._uses[prerequisite]:
+                    self._remove_node(prerequisite)
+            self._analysis = None
+
+    def _insert(self, source: str, target: str) -> None:
+        self._reorder(source, target)
+        self._link(source, target)
+
+    def _link(self, source: str, target: str) -> None:
+        self._succ[source][target] = self._succ[source].get(target, 0) + 1
+        self._pred[target][source] = self._pred[target].get(source, 0) + 1
+
+    def _unlink(self, source: str, target: str) -> None:
+        count = self._succ[source].get(target, 0) - 1
+        if count > 0:
+            self._succ[source][target] = count
+            self._pred[target][source] = count
+        else:
+            self._succ[source].pop(target, None)
+            self._pred[target].pop(source, None)
+
+    def _reorder(self, source: str, target: str) -> None:
+        """
+        Pearce-Kelly: make `source` precede `target` in the order, or raise CycleError if `target` already
+        reaches `source`. Only nodes positioned between the two are visited.
+        """
+        if source == target:
+            raise CycleError([target])
+        lower, upper = self._ord[target], self._ord[source]
+        if lower < upper:
+            forward = self._search(target, source, self._succ, lambda position: position < upper)
+            backward = self._search(source, None, self._pred, lambda position: position > lower)
+            moved = sorted(backward, key=self._ord.get) + sorted(forward, key=self._ord.get)
+            positions = sorted(self._ord[node] for node in moved)
+            for node, position in zip(moved, positions):
+                self._ord[node] = position
+
+    def _search(self, start: str, goal: Optional[str], adjacency: Dict[str, Dict[str, int]], in_region) -> List[str]:
+        parents = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbour in adjacency[node]:
+                if neighbour == goal:
+                    path = [goal, node]
+                    while parents[node] is not None:
+                        node = parents[node]
+                        path.append(node)
+                    raise CycleError(path[::-1])
+                if neighbour not in parents and in_region(self._ord[neighbour]):
+                    parents[neighbour] = node
+                    stack.append(neighbour)
+        return list(parents)
+
+    # -- analysis ----------------------------------------------------------------------------------------
+
+    def analysis(self) -> dict:
+        """
+        Topological order with each node's blocked state and schedule, the ready and blocked tasks, and the
+        critical path by estimated_duration (a missing estimate counts as zero). Computed in O(V + E) on
+        the first call after a change and reused until the next one.
+        """
+        with self.lock:
+            if self._analysis is None:
+                self._analysis = self._analyze()
+            return self._analysis
+
+    def _waits_on(self, node_id: str) -> List[str]:
+        node = self.nodes[node_id]
+        owner = node["task_id"] if node["type"] == "subtask" else node_id
+        return sorted(self._prerequisites.get(owner, ()))
+
+    def _analyze(self) -> dict:
+        order = sorted(self.nodes, key=self._ord.get)
+        duration = {node_id: self.nodes[node_id].get("estimated_duration") or 0 for node_id in order}
+
+        earliest_finish, previous = {}, {}
+        for node_id in order:
+            best = max(self._pred[node_id], key=earliest_finish.__getitem__, default=None)
+            earliest_finish[node_id] = (earliest_finish[best] if best else 0) + duration[node_id]
+            previous[node_id] = best
+
+        total = max(earliest_finish.values(), default=0)
+        latest_finish = {}
+        for node_id in reversed(order):
+            latest_finish[node_id] = min(
+                (latest_finish[successor] - duration[successor] for successor in self._succ[node_id]), default=total
+            )
+
+        critical_path = []
+        node_id = max(order, key=earliest_finish.__getitem__) if total else None
+        while node_id is not None:
+            critical_path.append(node_id)
+            node_id = previous[node_id]
+        critical_path.reverse()
+
+        nodes, blocked, ready = [], [], []
+        for position, node_id in enumerate(order):
+            node = self.nodes[node_id]
+            completed = node.get("status") == COMPLETED
+            waits_on = self._waits_on(node_id)
+            blocked_by = [] if completed else [
+                prerequisite for prerequisite in waits_on if self.nodes[prerequisite].get("status") != COMPLETED
+            ]
+            if node["type"] == "task" and node.get("project_id") == self.project_id and not completed:
+                (blocked if blocked_by else ready).append(node_id)
+            nodes.append({
+                "id": node_id,
+                "type": node["type"],
+                "task_id": node.get("task_id"),
+                "project_id": node.get("project_id"),
+                "title": node.get("title"),
+                "status": node.get("status"),
+                "estimated_duration": node.get("estimated_duration"),
+                "position": position,
+                "depends_on": waits_on if node["type"] == "task" else [],
+                "blocked": bool(blocked_by),
+                "blocked_by": blocked_by,
+                "earliest_start": earliest_finish[node_id] - duration[node_id],
+                "earliest_finish": earliest_finish[node_id],
+                "slack": latest_finish[node_id] - earliest_finish[node_id]
+            })
+
+        return {
+            "nodes": nodes,
+            "ready": ready,
+            "blocked": blocked,
+            "critical_path": {"nodes": critical_path, "duration": total},
+            "node_count": len(nodes),
+            "edge_count": len(self.edges)
+        }
+
+
+class DependencyGraphCache:
+    """
+    Bounded LRU of project_id -> DependencyGraph. A graph is only handed out for the version it was
+    built or last updated at.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._graphs = OrderedDict()
+
+    def get(self, project_id: str, customer_id: str, version: int) -> Optional[DependencyGraph]:
+        with self._lock:
+            graph = self._graphs.get(project_id)
+            if graph is None or graph.customer_id != customer_id or graph.version != version:
+                return None
+            self._graphs.move_to_end(project_id)
+            return graph
+
+    def peek(self, project_id: str) -> Optional[DependencyGraph]:
+        with self._lock:
+            return self._graphs.get(project_id)
+
+    def put(self, graph: DependencyGraph) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._graphs[graph.project_id] = graph
+            self._graphs.move_to_end(graph.project_id)
+            while len(self._graphs) > self.max_entries:
+                self._graphs.popitem(last=False)
+
+    def discard(self, project_id: str) -> None:
+        with self._lock:
+            self._graphs.pop(project_id, None)
+
+
+def init_dependency_graphs(app: Flask) -> None:
+    """
+    Attach the per-worker graph cache. DEPENDENCY_GRAPH_CACHE_SIZE = 0 loads the graph on every request.
+    """
+    app.extensions["dependency_graphs"] = DependencyGraphCache(app.config.get("DEPENDENCY_GRAPH_CACHE_SIZE", 256))
+
+
+def get_dependency_graphs() -> DependencyGraphCache:
+    return current_app.extensions.get("dependency_graphs")
+
+
+def stage_graph_change(customer_id: str, project_id: str,
+                       change: Optional[Callable[["DependencyGraph"], None]] = None) -> None:
+    """
+    Bump the project's graph version with the current transaction and, once it commits, carry the write
+    over to this worker's cached graph with `change`. Without `change` (or if the graph did not stand at
+    the version right before the write) the cached graph is dropped, to be loaded again by the next read.
+    Changes must be idempotent: a graph loaded after the commit already has them.
+    """
+    scope = graph_scope(project_id)
+    stage_versions(customer_id, [scope],
+                   on_commit=lambda versions: _apply_committed(project_id, versions.get(scope), change))
+
+
+def _apply_committed(project_id: str, version: Optional[int], change) -> None:
+    graphs = get_dependency_graphs()
+    graph = graphs.peek(project_id) if graphs is not None else None
+    if graph is None:
+        return
+    with graph.lock:
+        if change is not None and version is not None and graph.version in (version - 1, version):
+            try:
+                change(graph)
+                graph.version = version
+                return
+            except (CycleError, KeyError):
+                pass
+    graphs.discard(project_id)
@@ -1,44 +1,231 @@
 ### app/ utils/logger.py
+"""
+Logging pipeline. Request threads only build a record and put it on a bounded queue; a background
+QueueListener formats each record as one JSON line and does all rotation and file I/O. When the queue is
+full the record is dropped and counted rather than stalling the request. Each logger can be sampled:
+records below WARNING are kept with the logger's configured probability, warnings and errors always.
+"""
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from functools import wraps
 import time
 
+from flask import Flask
 
-
+LOG_DIR = "logs"
 APPLICATION_LOG_PATH = "logs/application.log"
+REQUEST_LOG_PATH = "logs/request.log"
+RTIME_LOG_PATH = "logs/rtime.log"
 
-appHandler = RotatingFileHandler(
-    APPLICATION_LOG_PATH, maxBytes=100000, backupCount=1)
-appHandler.setFormatter(logging.Formatter(
-    "%(asctime)s - %(levelname)s - %(message)s"))
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
 
-app_logger = logging.getLogger("app_logger")
-app_logger.setLevel(logging.INFO)
-app_logger.addHandler(appHandler)
 
+class LogStats:
+    """
+    Per-logger counters of records enqueued, dropped on overload and skipped by sampling.
+    """
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
 
+    def incr(self, logger_name: str, field: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(logger_name, {"enqueued": 0, "dropped": 0, "sampled_out": 0})
+            counts[field] += 1
 
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
 
-REQUEST_LOG_PATH = "logs/request.log"
 
-requestHandler = RotatingFileHandler(REQUEST_LOG_PATH, maxBytes=100000, backupCount=1)
-requestHandler.setFormatter(logging.Formatter("%(message)s"))
+LOG_STATS = LogStats()
 
 
-request_logger = logging.getLogger("request_logger")
-request_logger.setLevel(logging.INFO)
-request_logger.addHandler(requestHandler)
+class StructuredFormatter(logging.Formatter):
+    """
+    One JSON object per line. Dict messages (the convention across the app) are merged into the object;
+    anything else becomes its "message".
+    """
 
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, dict) and not record.args:
+            entry.update(record.msg)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
-RTIME_LOG_PATH = "logs/rtime.log"
-rtimeHandler = RotatingFileHandler(RTIME_LOG_PATH, maxBytes=100000, backupCount=1)
-rtimeHandler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-rtime_logger = logging.getLogger("rtime_logger")
-rtime_logger.setLevel(logging.INFO)
-rtime_logger.addHandler(rtimeHandler)
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and does no formatting on the calling thread: the record is enqueued
+    as-is (messages are built fresh per call, so they are not mutated afterwards) or dropped when the
+    queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_STATS.incr(record.name, "dropped")
+            return
+        LOG_STATS.incr(record.name, "enqueued")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep records below WARNING with probability `rate`. Records logged with extra={"sampled": True} were
+    already sampled by the caller through `sample()` and always pass.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def keep(self, logger_name: str, levelno: int) -> bool:
+        if levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate:
+            return True
+        LOG_STATS.incr(logger_name, "sampled_out")
+        return False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, "sampled", False) or self.keep(record.name, record.levelno)
+
+
+log_queue = queue.Queue(maxsize=DEFAULT_QUEUE_SIZE)
+_file_handlers = {}
+_queue_handlers = []
+_listener = None
+
+
+def _build_logger(name: str, path: str) -> logging.Logger:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=DEFAULT_MAX_BYTES, backupCount=DEFAULT_BACKUP_COUNT)
+    file_handler.setFormatter(StructuredFormatter())
+    # The listener dispatches on the record's logger name, so each file only receives its own logger's records
+    file_handler.addFilter(logging.Filter(name))
+    _file_handlers[name] = file_handler
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addFilter(SamplingFilter())
+    queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handlers.append(queue_handler)
+    logger.addHandler(queue_handler)
+    return logger
+
+
+app_logger = _build_logger("app_logger", APPLICATION_LOG_PATH)
+request_logger = _build_logger("request_logger", REQUEST_LOG_PATH)
+rtime_logger = _build_logger("rtime_logger", RTIME_LOG_PATH)
+
+
+def _replace_queue(maxsize: int) -> None:
+    """
+    Point every logger at a new, empty queue. Queue.maxsize cannot be changed in place: producers already
+    waiting on the old bound would never be woken.
+    """
+    global log_queue
+    log_queue = queue.Queue(maxsize=maxsize)
+    for handler in _queue_handlers:
+        handler.queue = log_queue
+
+
+def start_log_listener() -> None:
+    """
+    Start the background writer for the current queue.
+    """
+    global _listener
+    _listener = QueueListener(log_queue, *_file_handlers.values(), respect_handler_level=True)
+    _listener.start()
+
+
+def stop_log_listener() -> None:
+    """
+    Flush every queued record to disk and stop the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child() -> None:
+    """
+    A forked child (a gunicorn worker) does not inherit the parent's writer thread, but does inherit its
+    queue: records the parent had not written yet, and the queue's mutex in whatever state that thread left
+    it. The child abandons both and starts its own writer on a fresh queue.
+    """
+    global _listener
+    _listener = None
+    _replace_queue(log_queue.maxsize)
+    start_log_listener()
+
+
+start_log_listener()
+atexit.register(stop_log_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def _sampling_filter(logger: logging.Logger) -> SamplingFilter:
+    return next(f for f in logger.filters if isinstance(f, SamplingFilter))
+
+
+def sample(logger: logging.Logger, level: int = logging.INFO) -> bool:
+    """
+    Decide up front whether a record at `level` would be kept, so callers can skip building an expensive
+    message. Log the kept record with extra={"sampled": True} so it is not sampled a second time.
+    """
+    return logger.isEnabledFor(level) and _sampling_filter(logger).keep(logger.name, level)
+
+
+def configure_logging(app: Flask) -> None:
+    """
+    Apply LOG_* settings: queue bound, file rotation and per-logger sampling rates. A new queue bound
+    flushes the current queue and restarts the writer on a queue created with that bound.
+    """
+    queue_size = app.config.get("LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+    if queue_size != log_queue.maxsize:
+        stop_log_listener()
+        _replace_queue(queue_size)
+        start_log_listener()
+    for handler in _file_handlers.values():
+        handler.maxBytes = app.config.get("LOG_MAX_BYTES", DEFAULT_MAX_BYTES)
+        handler.backupCount = app.config.get("LOG_BACKUP_COUNT", DEFAULT_BACKUP_COUNT)
+    rates = app.config.get("LOG_SAMPLE_RATES", {})
+    for logger in (app_logger, request_logger, rtime_logger):
+        _sampling_filter(logger).rate = rates.get(logger.name, 1.0)
+
+
+def logging_stats() -> dict:
+    return {
+        "queue_depth": log_queue.qsize(),
+        "queue_size": log_queue.maxsize,
+        "sample_rates": {name: _sampling_filter(logging.getLogger(name)).rate for name in _file_handlers},
+        "loggers": LOG_STATS.snapshot(),
+    }
+
 
 def log_execution_time(func):
     @wraps(func)
@@ -48,18 +235,15 @@ def log_execution_time(func):
             result = func(*args, **kwargs)
             end_time = time.perf_counter()
             execution_time_ms = (end_time - start_time) * 1000  # Convert to milliseconds
-            rtime_logger.info(
-                f"Function: {func.__qualname__}, "
-                f"ExecutionTimeMs: {execution_time_ms:.2f}"
-            )
+            rtime_logger.info({"function": func.__qualname__, "execution_time_ms": round(execution_time_ms, 2)})
             return result
         except Exception as e:
             end_time = time.perf_counter()
             execution_time_ms = (end_time - start_time) * 1000
-            rtime_logger.error(
-                f"Function: {func.__qualname__}, "
-                f"ExecutionTimeMs: {execution_time_ms:.2f}, "
-                f"Error: {str(e)}"
-            )
+            rtime_logger.error({
+                "function": func.__qualname__,
+                "execution_time_ms": round(execution_time_ms, 2),
+                "error": str(e)
+            })
             raise
     return wrapper
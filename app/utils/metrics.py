@@ -0,0 +1,349 @@
+# app/utils/metrics.py
+"""
+In-process request and database metrics, rendered in the Prometheus text format on /metrics.
+
+Updates only touch in-memory dicts under one lock. For gunicorn's multiple workers, set METRICS_DIR
+(gunicorn.conf.py does): every worker writes a snapshot of its registry there every
+METRICS_FLUSH_INTERVAL seconds and whenever it serves a scrape, and the scraped worker merges all
+snapshots. Counters and histograms of exited workers are kept, so totals never go backwards; their gauges
+are dropped.
+"""
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, abort, current_app, g, request
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from .logger import app_logger
+from .query_recorder import current_recorder
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms keyed by (name, label values). Snapshots are plain JSON-able dicts so
+    they can be written by one process and merged by another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> {"type", "help", "labels", "buckets"}
+        self._values = {}  # name -> {label values tuple -> float | [bucket counts..., +Inf count, sum]}
+        self._collectors = []
+
+    def _declare(self, name: str, kind: str, help_text: str, labels: Tuple[str, ...], buckets=None) -> None:
+        self._meta[name] = {"type": kind, "help": help_text, "labels": list(labels), "buckets": list(buckets or [])}
+        self._values[name] = {}
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self._declare(name, "counter", help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self._declare(name, "gauge", help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        self._declare(name, "histogram", help_text, labels, buckets)
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            values = self._values[name]
+            values[labels] = values.get(labels, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[name][labels] = value
+
+    def observe(self, name: str, value: float, labels: tuple = ()) -> None:
+        buckets = self._meta[name]["buckets"]
+        index = bisect_left(buckets, value)
+        with self._lock:
+            series = self._values[name].get(labels)
+            if series is None:
+                series = self._values[name][labels] = [0] * (len(buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def on_collect(self, collector) -> None:
+        """
+        Register `collector()` to refresh gauges right before every snapshot (scrape or periodic flush).
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self._collectors:
+            collector()
+        with self._lock:
+            return {
+                name: dict(meta, samples=[[list(labels), value if not isinstance(value, list) else list(value)]
+                                          for labels, value in self._values[name].items()])
+                for name, meta in self._meta.items()
+            }
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.counter("http_requests_total", "Requests served, by route, method and status.", ("endpoint", "method", "status"))
+REGISTRY.histogram("http_request_duration_seconds", "Request latency, by route and method.", ("endpoint", "method"))
+REGISTRY.histogram("http_request_sql_statements", "SQL statements issued per request, by route.", ("endpoint",),
+                   buckets=STATEMENT_BUCKETS)
+REGISTRY.histogram("http_request_sql_seconds", "Time spent executing SQL per request, by route.", ("endpoint",))
+REGISTRY.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+                   buckets=POOL_WAIT_BUCKETS)
+REGISTRY.counter("db_pool_checkout_timeouts_total", "Connection checkouts that gave up waiting for the pool.")
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection (including opening a new one).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            REGISTRY.inc("db_pool_checkout_timeouts_total")
+            raise
+        finally:
+            REGISTRY.observe("db_pool_checkout_wait_seconds", time.perf_counter() - start)
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """
+    Sum counters, histograms and gauges series by series across worker snapshots.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, samples={}))
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def estimate_quantile(metric: dict, series: List[float], q: float) -> Optional[float]:
+    """
+    Quantile of a histogram series, interpolated linearly inside its bucket (as PromQL's histogram_quantile).
+    """
+    counts = series[:-1]
+    total = sum(counts)
+    if not total:
+        return None
+    bounds = metric["buckets"]
+    rank, cumulative = q * total, 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count:
+            if i == len(bounds):
+                return bounds[-1]
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return bounds[-1]
+
+
+def _label_text(names: List[str], values: Iterable, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus(merged: dict) -> str:
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_label_text(metric['labels'], labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(metric['labels'], labels, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(metric['labels'], labels)} {value[-1]}")
+            lines.append(f"{name}_count{_label_text(metric['labels'], labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def summarize(merged: dict) -> dict:
+    """
+    p50/p95/p99 and counts for every histogram series, e.g. for the ops endpoint.
+    """
+    summary = {}
+    for name, metric in merged.items():
+        if metric["type"] != "histogram":
+            continue
+        summary[name] = [
+            dict(
+                zip(metric["labels"], labels),
+                count=sum(series[:-1]),
+                **{f"p{int(q * 100)}": estimate_quantile(metric, series, q) for q in QUANTILES}
+            )
+            for labels, series in sorted(metric["samples"].items())
+        ]
+    return summary
+
+
+# Multi-process aggregation
+
+def _snapshot_path(directory: str, pid: int, dead: bool = False) -> str:
+    # gunicorn.conf.py renames and clears these files from the master without importing the app; keep the
+    # two in step
+    return os.path.join(directory, f"metrics-{pid}{'.dead' if dead else ''}.json")
+
+
+def write_snapshot(directory: str) -> None:
+    path = _snapshot_path(directory, os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(REGISTRY.snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_snapshots(directory: str) -> List[dict]:
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue  # a worker is mid-write or the file was just removed
+        pid = int(os.path.basename(path).split("-")[1].split(".")[0])
+        if path.endswith(".dead.json") or not _pid_alive(pid):
+            snapshot = {name: metric for name, metric in snapshot.items() if metric["type"] != "gauge"}
+        snapshots.append(snapshot)
+    return snapshots
+
+
+_flusher_pid = None
+
+
+def _start_flusher(directory: str, interval: float) -> None:
+    """
+    Background thread writing this worker's snapshot periodically; started lazily so it runs in each
+    forked worker rather than in a preloading master.
+    """
+    global _flusher_pid
+    _flusher_pid = os.getpid()
+
+    def flush_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot(directory)
+            except OSError as e:
+                app_logger.error({"function": "metrics.flush", "error": str(e)})
+
+    threading.Thread(target=flush_forever, name="metrics-flush", daemon=True).start()
+
+
+def collect() -> dict:
+    """
+    Merged view of every worker (or of this process when METRICS_DIR is unset).
+    """
+    directory = current_app.config.get("METRICS_DIR")
+    if not directory:
+        return merge_snapshots([REGISTRY.snapshot()])
+    write_snapshot(directory)
+    return merge_snapshots(read_snapshots(directory))
+
+
+# Request and SQL instrumentation
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    directory = current_app.config.get("METRICS_DIR")
+    if directory and _flusher_pid != os.getpid():
+        os.makedirs(directory, exist_ok=True)
+        _start_flusher(directory, current_app.config.get("METRICS_FLUSH_INTERVAL", 5))
+
+
+def _after_request(response):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return response
+    endpoint, method, status = request.endpoint or "unmatched", request.method, str(response.status_code)
+    recorder = current_recorder()
+
+    def observe():
+        REGISTRY.inc("http_requests_total", (endpoint, method, status))
+        REGISTRY.observe("http_request_duration_seconds", time.perf_counter() - start, (endpoint, method))
+        if recorder is not None:
+            REGISTRY.observe("http_request_sql_statements", recorder.count, (endpoint,))
+            REGISTRY.observe("http_request_sql_seconds", recorder.seconds, (endpoint,))
+
+    # A streamed body, and the SQL behind it, is produced after this hook; observe it once it is sent
+    if response.is_streamed:
+        response.call_on_close(observe)
+    else:
+        observe()
+    return response
+
+
+def use_timed_pool(app: Flask) -> None:
+    """
+    Select TimedQueuePool for every engine; must run before db.init_app, which creates the engines.
+    """
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"poolclass": TimedQueuePool, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})}
+    # Binds given as option dicts do not inherit SQLALCHEMY_ENGINE_OPTIONS, so each gets the pool class itself
+    app.config["SQLALCHEMY_BINDS"] = {
+        key: {"poolclass": TimedQueuePool, **options} if isinstance(options, dict) else options
+        for key, options in app.config.get("SQLALCHEMY_BINDS", {}).items()
+    }
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    Time every request; SQL statement counts and time come from the request's QueryRecorder.
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not app.config.get("METRICS_TOKEN"):
+        app_logger.warning({
+            "function": "init_metrics",
+            "warning": "METRICS_TOKEN is not set; /metrics is only served in debug mode"
+        })
+
+
+def metrics_response() -> Response:
+    """
+    The /metrics view. Scrapes must send METRICS_TOKEN as a bearer token; without a token configured the
+    endpoint only exists in debug mode, since it exposes per-route traffic, pool and error figures.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        if not current_app.debug:
+            abort(404)
+    elif not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render_prometheus(collect()), mimetype="text/plain; version=0.0.4")
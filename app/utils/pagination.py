@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque, URL-safe cursor.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor; raises PaginationError when it is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError("Invalid cursor")
+    return values
+
+
+def decode_datetime_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode an (updated_at/start_time, id) keyset cursor.
+    """
+    sort_value, row_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+
+
+def parse_limit(value: Optional[str], default: Optional[int] = None) -> Optional[int]:
+    """
+    Parse the `limit` query argument. Returns `default` when absent; clamps to MAX_PAGE_SIZE.
+    """
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except (ValueError, TypeError):
+        raise PaginationError("limit must be a positive integer")
+    if limit < 1:
+        raise PaginationError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_page_args(args) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Read `limit` and `cursor` from request args. A cursor without a limit pages with DEFAULT_PAGE_SIZE;
+    neither returns (None, None), which keeps the legacy unpaginated behaviour.
+    """
+    cursor = args.get("cursor") or None
+    limit = parse_limit(args.get("limit"), DEFAULT_PAGE_SIZE if cursor else None)
+    return limit, cursor
+
+
+def split_page(rows: Sequence, limit: Optional[int], key) -> Tuple[Sequence, Optional[str]]:
+    """
+    Trim a `limit + 1` fetch down to `limit` rows and build the cursor for the next page.
+    `key(row)` returns the tuple of sort values that identifies the row.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,174 @@
+# app/utils/query_recorder.py
+"""
+Request-scoped SQL recorder. Engine events append every statement a request issues to a recorder kept in
+`g`. When the request finishes, the recorder checks two things:
+
+- Repeated shapes: the same fingerprint running N_PLUS_ONE_THRESHOLD or more times, the usual N+1 signature.
+- Budgets: routes can declare a maximum statement count with @query_budget.
+
+Statements run with the execution option `unrecorded` (request plumbing such as the replica router's WAL
+position read) are left out.
+
+`flask perf query-budgets` sends each write route's most expensive valid request against the seeded
+dataset and fails when one goes over its budget; budgets are checked there rather than discovered in
+"enforce" mode, where the 500 comes after the write has committed.
+
+QUERY_BUDGET_MODE decides what happens on a violation. "enforce" (dev/test) turns the response into a 500
+listing the offending fingerprints. "warn" (production) only logs them. "off" disables the checks.
+
+Streamed responses (`?stream=1`) run their SQL while the body is sent, after the request hooks. They are
+checked when the response is closed instead; the status is already sent by then, so in "enforce" mode a
+violation is logged as an error rather than turned into a 500.
+"""
+import hashlib
+import re
+import time
+from collections import Counter
+from typing import Callable, List, Optional
+
+from flask import Flask, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+from .logger import app_logger
+
+# A statement shape repeated this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+QUERY_BUDGET_MODES = ("enforce", "warn", "off")
+
+_IN_LIST = re.compile(r"IN \((?:[^()]*?, )+[^()]*?\)", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Stable identifier for a statement shape: whitespace collapsed and expanded IN lists folded to one
+    element, so `IN (%(a_1)s, %(a_2)s)` and `IN (%(a_1)s)` share a fingerprint.
+    """
+    normalized = _IN_LIST.sub("IN (...)", re.sub(r"\s+", " ", statement).strip())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.statements: List[tuple] = []  # (fingerprint, statement, seconds)
+        self.seconds = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements.append((fingerprint(statement), statement, seconds))
+        self.seconds += seconds
+
+    def shapes(self, min_count: int = 1) -> List[dict]:
+        """
+        Statement shapes issued at least `min_count` times, most frequent first.
+        """
+        counts = Counter(fp for fp, _, _ in self.statements)
+        first = {}
+        for fp, statement, _ in self.statements:
+            first.setdefault(fp, statement)
+        return [
+            {"fingerprint": fp, "count": n, "statement": re.sub(r"\s+", " ", first[fp])[:200]}
+            for fp, n in counts.most_common() if n >= min_count
+        ]
+
+
+def query_budget(max_statements: int) -> Callable:
+    """
+    Declare the most SQL statements a route may issue per request. Apply it below the route decorator:
+
+        @tasks_bp.route("/update/<task_id>", methods=["PUT"])
+        @query_budget(6)
+        @AuthAndLogMiddleware.authenticate_and_log
+        def update_task(task_id): ...
+    """
+    def decorator(f: Callable) -> Callable:
+        f.query_budget = max_statements
+        return f
+    return decorator
+
+
+def current_recorder() -> Optional[QueryRecorder]:
+    return g.get("query_recorder") if has_request_context() else None
+
+
+def _before_request():
+    g.query_recorder = QueryRecorder()
+
+
+# The start time lives on the statement's execution context rather than on the connection: a statement that
+# raises never reaches after_cursor_execute, and a start left in conn.info would outlive it on the pooled
+# connection and be popped by the next statement instead
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.recorder_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "recorder_query_start", None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    recorder = current_recorder()
+    if recorder is not None and not (context is not None and context.execution_options.get("unrecorded")):
+        recorder.record(statement, elapsed)
+
+
+def _check(recorder: QueryRecorder, endpoint: str, method: str, budget: Optional[int],
+           enforced: bool = False) -> Optional[dict]:
+    """
+    Log the request's repeated shapes and budget overrun, if any. Returns the logged report, which has
+    `fingerprints` when the budget was exceeded; `enforced` logs an overrun as an error.
+    """
+    repeated = recorder.shapes(min_count=N_PLUS_ONE_THRESHOLD)
+    over_budget = budget is not None and recorder.count > budget
+    if not repeated and not over_budget:
+        return None
+
+    report = {
+        "function": "query_recorder",
+        "endpoint": endpoint,
+        "method": method,
+        "statements": recorder.count,
+        "budget": budget,
+        "repeated": repeated,
+    }
+    if over_budget:
+        report["fingerprints"] = recorder.shapes()
+    (app_logger.error if over_budget and enforced else app_logger.warning)(report)
+    return report
+
+
+def _after_request(response):
+    mode = current_app.config.get("QUERY_BUDGET_MODE", "warn")
+    recorder = current_recorder()
+    if mode == "off" or recorder is None:
+        return response
+
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, "query_budget", current_app.config.get("QUERY_BUDGET_DEFAULT"))
+    if response.is_streamed:
+        endpoint, method = request.endpoint, request.method
+        response.call_on_close(lambda: _check(recorder, endpoint, method, budget, enforced=mode == "enforce"))
+        return response
+
+    report = _check(recorder, request.endpoint, request.method, budget)
+    if report and "fingerprints" in report and mode == "enforce":
+        failure = jsonify({
+            "status": "error",
+            "message": f"Query budget exceeded: {recorder.count} statements, budget {budget}",
+            "details": report["fingerprints"],
+        })
+        failure.status_code = 500
+        return failure
+    return response
+
+
+def init_query_recorder(app: Flask, *engines) -> None:
+    if app.config.get("QUERY_BUDGET_MODE", "warn") not in QUERY_BUDGET_MODES:
+        raise ValueError(f"Unknown QUERY_BUDGET_MODE '{app.config['QUERY_BUDGET_MODE']}'")
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
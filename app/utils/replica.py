@@ -0,0 +1,289 @@
+# app/utils/replica.py
+"""
+Read-replica routing. When DATABASE_REPLICA_URL is set, SELECTs issued while serving a GET or HEAD request
+go to the "replica" bind. Writes, flushes and every statement of any other request stay on the primary.
+A read goes back to the primary when:
+
+- the client wrote recently: a request that committed a write answers with a signed read-after token
+  holding the primary's WAL position after its commit, as the X-Read-After header and a cookie of the
+  same name.
+  While the client sends it back (header or cookie, for up to REPLICA_STICKY_SECONDS), its reads stay on
+  the primary until the replica has replayed past that position. The token travels with the client, so
+  this holds whichever worker or host serves the next request.
+- the replica is lagging: a background monitor measures replay lag every REPLICA_CHECK_INTERVAL seconds
+  and takes the replica out of rotation while the lag is above REPLICA_MAX_LAG_SECONDS. This also limits
+  how stale a read served by another worker can be.
+- the replica is down: a failed connection marks it unavailable until the monitor sees it answer again,
+  and the request carries on against the primary.
+
+A request decides once, so its version stamps (utils.conditional) and its data come from the same server.
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from flask import Flask, current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import TextClause, text
+from sqlalchemy.exc import DBAPIError
+
+from .logger import app_logger
+from .metrics import REGISTRY
+
+READ_METHODS = ("GET", "HEAD")
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+READ_AFTER_HEADER = "X-Read-After"
+READ_AFTER_COOKIE = "read_after"
+
+_READ_SQL = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+# Data-modifying CTEs (WITH changed AS (UPDATE ...)) and locking reads cannot run on a read-only replica
+_WRITE_SQL = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b|\bFOR\s+(KEY\s+)?SHARE\b", re.IGNORECASE)
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received (an idle primary would
+# otherwise look more and more behind), and 0 for a server that is not in recovery at all. Also the replayed
+# WAL position as a byte offset, NULL for a server that is not in recovery.
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS lag,
+    (pg_last_wal_replay_lsn() - '0/0'::pg_lsn)::bigint AS replay_lsn
+"""
+
+# The primary's WAL position after a write request committed, as a byte offset
+WRITE_LSN_QUERY = "SELECT (pg_current_wal_lsn() - '0/0'::pg_lsn)::bigint"
+
+REGISTRY.counter("db_read_routing_total", "GET/HEAD requests by the server their reads went to, and why.",
+                 ("target", "reason"))
+REGISTRY.gauge("db_replica_lag_seconds", "Replay lag of the read replica at its last health check.")
+REGISTRY.gauge("db_replica_available", "1 while the read replica takes reads, 0 while reads fall back to the primary.")
+
+
+def is_read(clause) -> bool:
+    """
+    Whether a statement only reads: ORM/Core selects without FOR UPDATE, and text() statements starting with
+    SELECT or WITH that neither modify data nor lock rows.
+    """
+    if clause is None:
+        return False
+    if getattr(clause, "is_select", False):
+        return getattr(clause, "_for_update_arg", None) is None
+    return (isinstance(clause, TextClause) and _READ_SQL.match(clause.text) is not None
+            and _WRITE_SQL.search(clause.text) is None)
+
+
+class ReplicaRouter:
+    """
+    Routing state for one worker: the replica's health and how far it has replayed. The replica starts out
+    unavailable and joins once the first health check passes.
+    """
+
+    def __init__(self, engine, sticky_seconds: float, max_lag_seconds: float, check_interval: float,
+                 secret_key: str):
+        self.engine = engine
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.available = False
+        self.lag_seconds: Optional[float] = None
+        self.replay_lsn: Optional[int] = None  # None once checked: the server is not a standby
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+        self._serializer = URLSafeTimedSerializer(secret_key, salt="read-after")
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._monitor_pid = None
+
+    def choose(self) -> str:
+        """
+        "replica" or "primary" for the current request, with the reason counted.
+        """
+        if request.method not in READ_METHODS:
+            return "primary"
+        if not self.available:
+            reason = "down" if self.last_error else "lagging" if self.last_check else "unchecked"
+            target = "primary"
+        elif not self.has_replayed(self.read_after()):
+            reason, target = "sticky", "primary"
+        else:
+            reason, target = "read", "replica"
+        self.count(target, reason)
+        return target
+
+    def read_after_token(self, lsn: int) -> str:
+        return self._serializer.dumps(lsn)
+
+    def read_after(self) -> Optional[int]:
+        """
+        WAL position of the client's last write, from a valid read-after token not older than
+        `sticky_seconds`; None when the request has none.
+        """
+        token = request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE)
+        if not token:
+            return None
+        try:
+            lsn = self._serializer.loads(token, max_age=self.sticky_seconds)
+        except BadSignature:
+            return None
+        return lsn if isinstance(lsn, int) else None
+
+    def has_replayed(self, lsn: Optional[int]) -> bool:
+        """
+        Whether the replica had replayed `lsn` at its last health check. Replay only moves forward, so a
+        check that is a little old can only send a read to the primary needlessly, never to stale data.
+        """
+        return lsn is None or self.replay_lsn is None or self.replay_lsn >= lsn
+
+    def check(self) -> None:
+        """
+        Measure replay lag on a fresh checkout and update availability.
+        """
+        try:
+            with self.engine.connect() as connection:
+                row = connection.execute(text(LAG_QUERY)).one()
+        except DBAPIError as e:
+            self.mark_down(e)
+        else:
+            self.lag_seconds, self.replay_lsn, self.last_error = float(row.lag or 0), row.replay_lsn, None
+            self.available = self.lag_seconds <= self.max_lag_seconds
+        self.last_check = time.time()
+
+    def mark_down(self, error: Exception) -> None:
+        if self.available:
+            app_logger.error({"function": "ReplicaRouter.mark_down", "error": str(error)})
+        self.available = False
+        self.last_error = str(error).splitlines()[0] if str(error) else type(error).__name__
+
+    def ensure_monitor(self) -> None:
+        """
+        Start the health-check thread for this process. Started lazily, so each forked gunicorn worker runs
+        its own rather than a preloading master.
+        """
+        if self._monitor_pid == os.getpid():
+            return
+        with self._lock:
+            if self._monitor_pid == os.getpid():
+                return
+            self._monitor_pid = os.getpid()
+
+        def monitor_forever():
+            while True:
+                try:
+                    self.check()
+                except Exception as e:
+                    app_logger.error({"function": "ReplicaRouter.monitor", "error": str(e)})
+                time.sleep(self.check_interval)
+
+        threading.Thread(target=monitor_forever, name="replica-monitor", daemon=True).start()
+
+    def collect(self) -> None:
+        REGISTRY.set("db_replica_available", 1 if self.available else 0)
+        if self.lag_seconds is not None:
+            REGISTRY.set("db_replica_lag_seconds", self.lag_seconds)
+
+    def info(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "available": self.available,
+            "lag_seconds": self.lag_seconds,
+            "replay_lsn": self.replay_lsn,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_error": self.last_error,
+            "last_check": self.last_check,
+            "sticky_seconds": self.sticky_seconds,
+            "requests": counts,
+        }
+
+    def count(self, target: str, reason: str) -> None:
+        with self._lock:
+            self._counts[f"{target}:{reason}"] += 1
+        REGISTRY.inc("db_read_routing_total", (target, reason))
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    return current_app.extensions.get("replica_router")
+
+
+class RoutingSession(Session):
+    """
+    Flask-SQLAlchemy session that sends the reads of GET/HEAD requests to the replica bind when one is
+    configured. Flushes never pass a clause here, so every write is bound to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and is_read(clause):
+            replica = self._replica_bind()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_bind(self):
+        router = get_replica_router()
+        if router is None:
+            return None
+        target = g.get("db_read_target")
+        if target is None:
+            target = g.db_read_target = router.choose()
+        if target != "replica":
+            return None
+        try:
+            # Check out the replica connection now, so a dead replica falls back here instead of failing the query
+            self.connection(bind_arguments={"bind": router.engine})
+        except DBAPIError as e:
+            router.mark_down(e)
+            router.count("primary", "failover")
+            g.db_read_target = "primary"
+            return None
+        return router.engine
+
+
+def _before_request():
+    g.pop("db_read_target", None)
+    get_replica_router().ensure_monitor()
+
+
+def _after_request(response):
+    # Imported here: app.sources imports this module for RoutingSession, and versioning imports app.sources
+    from .versioning import committed_write
+
+    if request.method not in WRITE_METHODS or response.status_code >= 400 or not committed_write():
+        return response
+    # Only after a committed write (logins and rejected writes need no stickiness). Read after the view's
+    # commit; routing overhead, so not counted against the route's query budget
+    session = current_app.extensions["sqlalchemy"].session
+    lsn = session.execute(text(WRITE_LSN_QUERY), execution_options={"unrecorded": True}).scalar()
+    router = get_replica_router()
+    token = router.read_after_token(lsn)
+    response.headers[READ_AFTER_HEADER] = token
+    response.set_cookie(READ_AFTER_COOKIE, token, max_age=math.ceil(router.sticky_seconds), httponly=True,
+                        secure=request.is_secure, samesite="Lax")
+    return response
+
+
+def init_replica(app: Flask, engines: dict) -> None:
+    """
+    Route reads to the "replica" bind when SQLALCHEMY_BINDS has one (set from DATABASE_REPLICA_URL).
+    Without it nothing is registered and every statement uses the primary.
+    """
+    engine = engines.get("replica")
+    if engine is None:
+        return
+    router = ReplicaRouter(
+        engine,
+        sticky_seconds=app.config.get("REPLICA_STICKY_SECONDS", 5),
+        max_lag_seconds=app.config.get("REPLICA_MAX_LAG_SECONDS", 2),
+        check_interval=app.config.get("REPLICA_CHECK_INTERVAL", 1),
+        secret_key=app.config["JWT_SECRET_KEY"],
+    )
+    app.extensions["replica_router"] = router
+    REGISTRY.on_collect(router.collect)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
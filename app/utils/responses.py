@@ -1,14 +1,60 @@
-from flask import jsonify
+from flask import current_app, jsonify
 from typing import Any, Tuple
+from .streaming import stream_response
 
-def success_response(data: Any = None, message: str = "Success", status_code: int = 200) -> Tuple[dict, int]:
+def success_response(data: Any = None, message: str = "Success", status_code: int = 200, pagination: dict = None) -> Tuple[dict, int]:
     response = {"status": "success", "message": message}
     if data is not None:
         response["data"] = data
+    if pagination is not None:
+        response["pagination"] = pagination
     return jsonify(response), status_code
 
 def error_response(message: str, status_code: int = 400, details: Any = None) -> Tuple[dict, int]:
     response = {"status": "error", "message": message}
     if details is not None:
         response["details"] = details
-    return jsonify(response), status_code
\ No newline at end of file
+    return jsonify(response), status_code
+
+def raw_json_body(dumps, data_json: str, message: str, pagination: dict = None) -> str:
+    """
+    Success envelope around JSON text already rendered by the database. The text is spliced in as is, so it
+    is never parsed into Python objects or re-serialized.
+    """
+    body = '{"status":"success","message":' + dumps(message) + ',"data":' + data_json
+    if pagination is not None:
+        body += ',"pagination":' + dumps(pagination)
+    return body + "}"
+
+def raw_json_response(data_json: str, message: str = "Success", status_code: int = 200, pagination: dict = None):
+    """
+    Success response whose `data` is JSON text already rendered by the database (see raw_json_body).
+    """
+    body = raw_json_body(current_app.json.dumps, data_json, message, pagination)
+    return current_app.response_class(body.encode("utf-8"), status=status_code, mimetype="application/json")
+
+def page_info(result: dict):
+    """
+    Build the `pagination` block for a paged list result, or None when the caller did not ask for paging.
+    """
+    if result.get("limit") is None:
+        return None
+    return {"next_cursor": result.get("next_cursor"), "limit": result["limit"]}
+
+
+def list_response(result: Any, message: str, status_code: int = 200):
+    """
+    Success response for a list endpoint. Services return either a plain list, a page dict
+    ({"data", "next_cursor", "limit"}), a streamed page ({"rows", "limit", "cursor_key"}),
+    or a database-rendered page ({"json", "next_cursor", "limit"}).
+    """
+    if isinstance(result, dict) and "rows" in result:
+        return stream_response(
+            result["rows"], message, status_code,
+            limit=result.get("limit"), cursor_key=result.get("cursor_key")
+        )
+    if isinstance(result, dict) and "json" in result:
+        return raw_json_response(result["json"], message, status_code, pagination=page_info(result))
+    if isinstance(result, dict):
+        return success_response(data=result["data"], message=message, status_code=status_code, pagination=page_info(result))
+    return success_response(data=result, message=message, status_code=status_code)
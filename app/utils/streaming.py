@@ -0,0 +1,73 @@
+from flask import Response, current_app, stream_with_context
+from typing import Callable, Iterable, Optional
+import traceback
+
+from ..sources import db
+from .logger import app_logger
+from .pagination import encode_cursor
+
+# Rows fetched per round trip from the server-side cursor, and rows serialized per chunk written to the socket
+STREAM_BATCH_SIZE = 500
+
+
+def wants_stream(args) -> bool:
+    """
+    True when the client asked for a streamed list response (`?stream=1`).
+    """
+    return (args or {}).get("stream", "").lower() in ("1", "true", "yes")
+
+
+def stream_rows(statement, params: dict, row_fn: Callable = lambda row: dict(row._mapping)) -> Iterable[dict]:
+    """
+    Lazily execute `statement` through a server-side cursor, fetching STREAM_BATCH_SIZE rows per round trip.
+    Nothing runs until the first row is requested, i.e. once the response has started streaming.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE), params)
+    for row in result:
+        yield row_fn(row)
+
+
+def stream_response(rows: Iterable[dict], message: str, status_code: int = 200,
+                    limit: Optional[int] = None, cursor_key: Callable = None) -> Response:
+    """
+    Emit the standard {"status", "message", "data": [...]} envelope as a chunked response while `rows` is
+    still being read, so memory stays flat regardless of result size. When `limit` is set, `rows` is
+    expected to hold up to `limit + 1` rows; the extra row only signals that a next page exists.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '{"status":"success","message":' + dumps(message) + ',"data":['
+        chunk = []
+        emitted = 0
+        last_row = None
+        next_cursor = None
+        try:
+            for row in rows:
+                if limit is not None and emitted == limit:
+                    next_cursor = encode_cursor(*cursor_key(last_row))
+                    break
+                chunk.append(dumps(row))
+                emitted += 1
+                last_row = row
+                if len(chunk) >= STREAM_BATCH_SIZE:
+                    yield ("," if emitted > len(chunk) else "") + ",".join(chunk)
+                    chunk = []
+            if chunk:
+                yield ("," if emitted > len(chunk) else "") + ",".join(chunk)
+        except Exception as e:
+            # Headers are already sent, so the failure is reported inside the body instead of via the status code
+            app_logger.error({
+                "function": "stream_response",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            yield '],"error":' + dumps(f"Stream interrupted: {str(e)}") + '}'
+            return
+
+        tail = "]"
+        if limit is not None:
+            tail += ',"pagination":' + dumps({"next_cursor": next_cursor, "limit": limit})
+        yield tail + "}"
+
+    return Response(stream_with_context(generate()), status=status_code, mimetype="application/json")
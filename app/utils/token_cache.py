@@ -0,0 +1,289 @@
+# app/utils/token_cache.py
+"""
+Cache of verified JWT claims. A session replays the same token on every request, so after the first
+HMAC check the claims are served from memory until the token's own `exp`. Entries are keyed by a SHA-256
+digest, so the cache never holds bearer tokens themselves.
+
+Revocations (`revoke_token` / `revoke_user`, e.g. from POST /api/v1/users/<id>/revoke-sessions) deny
+tokens in the worker that handles them and notify the listeners registered with `on_revoke`. With
+TOKEN_REVOCATION_BACKEND = "redis" a listener fans them out to every worker through Redis pub/sub; the
+default "local" only reaches the one process, so it is meant for single-worker servers.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import jwt
+from flask import Flask, current_app
+
+from .logger import app_logger
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    pass
+
+
+class TokenCacheStats:
+    """
+    Thread-safe counters; `hit_rate` is hits over all lookups that reached the cache.
+    """
+    FIELDS = ("hits", "misses", "stores", "expirations", "evictions", "revocations", "rejected")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return counts
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of digest -> (claims, exp). Lookups past `exp` miss and drop the entry, so a cached token
+    expires exactly when `jwt.decode` would start rejecting it. `max_token_lifetime` bounds exp - iat of
+    the tokens the app issues; a user revocation is forgotten once every token it could deny has expired.
+    """
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.time, max_token_lifetime: float = 86400):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.max_token_lifetime = max_token_lifetime
+        self.stats = TokenCacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # digest -> (claims, exp)
+        self._revoked_tokens = {}  # digest -> exp; kept until the token would have expired anyway
+        self._revoked_users = {}  # user_id -> tokens issued before this second are denied
+        self._listeners: List[Callable[[dict], None]] = []
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Cached claims for `token` (a copy, callers may mutate it), or None when it must be verified.
+        Raises TokenRevokedError for a revoked token.
+        """
+        digest = token_digest(token)
+        now = self.clock()
+        with self._lock:
+            if digest in self._revoked_tokens:
+                self.stats.incr("rejected")
+                raise TokenRevokedError("Token has been revoked")
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] <= now:
+                del self._entries[digest]
+                self.stats.incr("expirations")
+                entry = None
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            self._entries.move_to_end(digest)
+        self.stats.incr("hits")
+        return dict(entry[0])
+
+    def put(self, token: str, claims: dict) -> None:
+        """
+        Remember freshly verified claims. Tokens without a numeric `exp` are never cached.
+        Raises TokenRevokedError when the claims belong to a revoked user session.
+        """
+        self.check_claims(claims)
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        digest = token_digest(token)
+        with self._lock:
+            self._entries[digest] = (dict(claims), exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.incr("evictions")
+        self.stats.incr("stores")
+
+    def check_claims(self, claims: dict) -> None:
+        with self._lock:
+            cutoff = self._revoked_users.get(claims.get("user_id"))
+        if cutoff is not None and claims.get("iat", 0) < cutoff:
+            self.stats.incr("rejected")
+            raise TokenRevokedError("Token has been revoked")
+
+    def revoke_token(self, token: str, exp: Optional[float] = None, notify: bool = True) -> None:
+        """
+        Deny one token until `exp` (defaults to the cached entry's exp, else one day).
+        """
+        digest = token_digest(token)
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if exp is None:
+                exp = entry[1] if entry else self.clock() + 86400
+            self._revoked_tokens[digest] = exp
+            self._prune_revocations()
+        self.stats.incr("revocations")
+        if notify:
+            self._notify({"digest": digest, "exp": exp})
+
+    def revoke_user(self, user_id: str, issued_before: Optional[float] = None, notify: bool = True) -> None:
+        """
+        Deny every token of `user_id` issued before `issued_before` (default: now), e.g. after a role
+        change or password reset. Tokens issued later, such as the next login, are unaffected. `iat` has
+        whole seconds, so the cutoff is rounded down: a token from the same second as the revocation is
+        let through rather than denying the login that follows it.
+        """
+        cutoff = math.floor(self.clock() if issued_before is None else issued_before)
+        with self._lock:
+            self._revoked_users[user_id] = max(cutoff, self._revoked_users.get(user_id, cutoff))
+            self._prune_revocations()
+            stale = [digest for digest, (claims, _) in self._entries.items() if claims.get("user_id") == user_id]
+            for digest in stale:
+                del self._entries[digest]
+        self.stats.incr("revocations")
+        if notify:
+            self._notify({"user_id": user_id, "issued_before": cutoff})
+
+    def apply_revocation(self, event: dict) -> None:
+        """
+        Apply a revocation event received from another worker without re-broadcasting it.
+        """
+        if "user_id" in event:
+            self.revoke_user(event["user_id"], event["issued_before"], notify=False)
+        else:
+            with self._lock:
+                self._entries.pop(event["digest"], None)
+                self._revoked_tokens[event["digest"]] = event["exp"]
+            self.stats.incr("revocations")
+
+    def on_revoke(self, listener: Callable[[dict], None]) -> None:
+        """
+        Register `listener(event)` to be called after each local revocation.
+        """
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "revoked_tokens": len(self._revoked_tokens),
+                "revoked_users": len(self._revoked_users),
+            }
+
+    def _prune_revocations(self) -> None:
+        now = self.clock()
+        for digest in [d for d, exp in self._revoked_tokens.items() if exp <= now]:
+            del self._revoked_tokens[digest]
+        for user_id in [u for u, cutoff in self._revoked_users.items() if cutoff + self.max_token_lifetime <= now]:
+            del self._revoked_users[user_id]
+
+    def _notify(self, event: dict) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                app_logger.error({"function": "VerifiedTokenCache._notify", "error": str(e)})
+
+
+class RedisRevocationChannel:
+    """
+    Shares revocations between workers. Each event is stored in a hash, so workers that start later load
+    the ones still in force, and published on a channel that every worker's subscriber thread applies to
+    its own cache. `client` only needs the redis-py methods used below.
+    """
+    name = "redis"
+
+    def __init__(self, client, cache: VerifiedTokenCache, prefix: str = "tr:"):
+        self.client = client
+        self.cache = cache
+        self.key = f"{prefix}revocations"
+        self.channel = f"{prefix}events"
+        self._subscriber_pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, event: dict) -> None:
+        field = f"user:{event['user_id']}" if "user_id" in event else f"token:{event['digest']}"
+        payload = json.dumps(event)
+        self.client.hset(self.key, field, payload)
+        self.client.publish(self.channel, payload)
+
+    def ensure_subscriber(self) -> None:
+        """
+        Start the subscriber thread for this process. Started lazily, so each forked gunicorn worker runs
+        its own rather than a preloading master.
+        """
+        if self._subscriber_pid == os.getpid():
+            return
+        with self._lock:
+            if self._subscriber_pid == os.getpid():
+                return
+            self._subscriber_pid = os.getpid()
+        threading.Thread(target=self._subscribe_forever, name="token-revocations", daemon=True).start()
+
+    def _expired(self, event: dict) -> bool:
+        now = self.cache.clock()
+        if "user_id" in event:
+            return event["issued_before"] + self.cache.max_token_lifetime <= now
+        return event["exp"] <= now
+
+    def _load_stored(self) -> None:
+        for field, payload in self.client.hgetall(self.key).items():
+            event = json.loads(payload)
+            if self._expired(event):
+                self.client.hdel(self.key, field)
+            else:
+                self.cache.apply_revocation(event)
+
+    def _subscribe_forever(self) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Subscribed before loading, so an event published in between is not missed
+                self._load_stored()
+                for message in pubsub.listen():
+                    self.cache.apply_revocation(json.loads(message["data"]))
+            except Exception as e:
+                app_logger.error({"function": "RedisRevocationChannel.subscribe", "error": str(e)})
+                time.sleep(1)
+
+
+def init_token_cache(app: Flask, client=None) -> None:
+    """
+    Attach the verified-token cache to the app. TOKEN_CACHE_MAX_ENTRIES = 0 turns off caching (every request
+    is verified again) but keeps revocation working. TOKEN_REVOCATION_BACKEND picks how revocations reach
+    the other workers: "redis" (needs redis-py, or `client` to inject one) or "local" (this process only).
+    """
+    cache = VerifiedTokenCache(app.config.get("TOKEN_CACHE_MAX_ENTRIES", 10000),
+                               max_token_lifetime=app.config.get("TOKEN_MAX_LIFETIME", 86400))
+    app.extensions["token_cache"] = cache
+
+    backend = app.config.get("TOKEN_REVOCATION_BACKEND", "local")
+    if backend == "redis":
+        if client is None:
+            import redis  # optional dependency, only needed to share revocations
+            client = redis.Redis.from_url(app.config["TOKEN_REVOCATION_URL"])
+        channel = RedisRevocationChannel(client, cache)
+        cache.on_revoke(channel.publish)
+        app.before_request(channel.ensure_subscriber)
+        app.extensions["token_revocations"] = channel
+    elif backend != "local":
+        raise ValueError(f"Unknown TOKEN_REVOCATION_BACKEND '{backend}'")
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    return current_app.extensions.get("token_cache")
@@ -0,0 +1,174 @@
+# app/utils/versioning.py
+"""
+Change stamps for conditional GETs. Every ORM flush stages the resource scopes whose tables it touched,
+and the commit bumps a per-customer version for each of them as the transaction's last statement, so a
+version can never be seen without the data it describes. Writes that bypass the ORM (raw SQL) call
+bump_versions themselves. Scopes that no table maps to (e.g. one project's dependency graph) are staged
+with stage_versions and bumped by the same statement.
+
+Trade-off: the bump upserts one resource_versions(customer_id, scope) row per scope and holds its row lock
+until the commit finishes, so one tenant's commits to a scope are serialized. Bumping in before_commit
+rather than at the flush keeps that window to the commit itself; long transactions and batch imports
+still wait for each other only while committing, not for their whole duration.
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from ..sources import db
+
+# Which cached responses a write to each table can change. Task lists embed subtasks, team lists embed
+# members and their users, user lists embed team names, and project stats read the task counters.
+# Dependencies are listed with the tasks; each project's dependency graph has a scope of its own, staged
+# by the services that change it.
+SCOPES_BY_TABLE = {
+    "tasks": ("tasks",),
+    "subtasks": ("tasks",),
+    "dependencies": ("tasks",),
+    "projects": ("projects",),
+    "teams": ("teams", "users"),
+    "team_members": ("teams", "users"),
+    "users": ("users", "teams"),
+    "time_entries": ("time_entries",),
+    "customers": ("projects", "tasks", "teams", "users", "time_entries"),
+}
+
+# Called with {customer_id: {scope: version}} after each commit that bumped versions, e.g. to drop cached
+# responses
+COMMIT_LISTENERS: List[Callable[[Dict[str, Dict[str, int]]], None]] = []
+
+BUMP_QUERY = """
+    INSERT INTO resource_versions (customer_id, scope, version, updated_at)
+    SELECT :customer_id, scope, 1, now() AT TIME ZONE 'UTC'
+    FROM unnest(CAST(:scopes AS varchar[])) AS scope
+    ON CONFLICT (customer_id, scope)
+    DO UPDATE SET version = resource_versions.version + 1, updated_at = EXCLUDED.updated_at
+    RETURNING scope, version
+"""
+
+
+VERSIONS_QUERY = """
+    SELECT scope, version
+    FROM resource_versions
+    WHERE customer_id = :customer_id
+    AND scope = ANY(:scopes)
+"""
+
+
+def bump_versions(customer_id: str, scopes: Iterable[str]) -> None:
+    """
+    Increment the version of each scope for a customer when the session's transaction commits, so it
+    commits or rolls back together with the write it describes.
+    """
+    stage_versions(customer_id, scopes)
+
+
+def stage_versions(customer_id: str, scopes: Iterable[str],
+                   on_commit: Optional[Callable[[Dict[str, int]], None]] = None) -> None:
+    """
+    Bump `scopes` together with the customer's other versions when the transaction commits. `on_commit` is
+    called after the commit with the versions the customer's scopes were bumped to; it is dropped on
+    rollback.
+    """
+    session = db.session()
+    session.info.setdefault("staged_versions", {}).setdefault(customer_id, set()).update(scopes)
+    if on_commit is not None:
+        session.info.setdefault("version_callbacks", []).append((customer_id, on_commit))
+
+
+def on_versions_committed(listener: Callable[[Dict[str, Dict[str, int]]], None]) -> None:
+    if listener not in COMMIT_LISTENERS:
+        COMMIT_LISTENERS.append(listener)
+
+
+def current_versions(customer_id: str, scopes: Iterable[str]) -> Dict[str, int]:
+    """
+    Current version per scope; scopes that were never written report 0.
+    """
+    scopes = sorted(set(scopes))
+    rows = db.session.execute(text(VERSIONS_QUERY), {"customer_id": customer_id, "scopes": scopes}).fetchall()
+    return versions_from_rows(scopes, rows)
+
+
+def versions_from_rows(scopes: List[str], rows) -> Dict[str, int]:
+    versions = {scope: 0 for scope in scopes}
+    versions.update({row.scope: row.version for row in rows})
+    return versions
+
+
+def _owner_customer(instance) -> Optional[str]:
+    if instance.__tablename__ == "customers":
+        return instance.id
+    customer_id = getattr(instance, "customer_id", None)
+    if customer_id:
+        return customer_id
+    # Subtasks and team memberships carry no customer_id; they are only written by authenticated requests
+    if has_request_context() and getattr(request, "decoded", None):
+        return request.decoded.get("customer_id")
+    return None
+
+
+def _bump(session, customer_id: str, scopes: Iterable[str]) -> None:
+    scopes = sorted(scopes)
+    if not customer_id or not scopes:
+        return
+    rows = session.execute(text(BUMP_QUERY), {"customer_id": customer_id, "scopes": scopes}).fetchall()
+    _record(session, customer_id, {row.scope: row.version for row in rows})
+
+
+def _record(session, customer_id: str, versions: Dict[str, int]) -> None:
+    session.info.setdefault("touched_versions", {}).setdefault(customer_id, {}).update(versions)
+
+
+def _after_flush(session, flush_context):
+    # Only stage here: bumping at the flush would hold the version rows' locks for the rest of the transaction
+    staged = session.info.setdefault("staged_versions", {})
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        scopes = SCOPES_BY_TABLE.get(getattr(instance, "__tablename__", None))
+        if not scopes or (instance in session.dirty and not session.is_modified(instance)):
+            continue
+        customer_id = _owner_customer(instance)
+        if customer_id:
+            staged.setdefault(customer_id, set()).update(scopes)
+
+
+def _before_commit(session):
+    # Flush first so the pending writes stage their scopes, then bump everything as the last statement
+    session.flush()
+    staged = session.info.pop("staged_versions", {})
+    for customer_id in sorted(staged):
+        _bump(session, customer_id, staged[customer_id])
+
+
+def committed_write() -> bool:
+    """
+    Whether the current request has committed a write. Every write bumps a version, so this is set by
+    the same commit hook.
+    """
+    return g.get("committed_write", False)
+
+
+def _after_commit(session):
+    touched = session.info.pop("touched_versions", None)
+    callbacks = session.info.pop("version_callbacks", ())
+    if touched and has_request_context():
+        g.committed_write = True
+    if touched:
+        for listener in COMMIT_LISTENERS:
+            listener(touched)
+    for customer_id, callback in callbacks:
+        callback((touched or {}).get(customer_id, {}))
+
+
+def _after_rollback(session):
+    for key in ("touched_versions", "staged_versions", "version_callbacks"):
+        session.info.pop(key, None)
+
+
+def register_change_tracking() -> None:
+    for name, listener in (("after_flush", _after_flush), ("before_commit", _before_commit),
+                           ("after_commit", _after_commit), ("after_rollback", _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
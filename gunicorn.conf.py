@@ -0,0 +1,29 @@
+# gunicorn.conf.py -- loaded automatically by `gunicorn` from the working directory
+#
+# The hooks below run in the master process. They must not import the `app` package: importing it starts
+# the log writer thread before the workers are forked.
+import glob
+import os
+
+# Workers write metric snapshots here so /metrics can merge them; must be set before the app is imported
+os.environ.setdefault("METRICS_DIR", "/tmp/tasks-api-metrics")
+
+
+def _snapshot_path(directory, pid, dead=False):
+    # Same naming as app/utils/metrics.py
+    return os.path.join(directory, f"metrics-{pid}{'.dead' if dead else ''}.json")
+
+
+def on_starting(server):
+    # Start every server run from empty snapshots
+    directory = os.environ["METRICS_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics-*.json*")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    # Keep an exited worker's counters and histograms but retire its gauges
+    directory = os.environ["METRICS_DIR"]
+    if os.path.exists(_snapshot_path(directory, worker.pid)):
+        os.replace(_snapshot_path(directory, worker.pid), _snapshot_path(directory, worker.pid, dead=True))
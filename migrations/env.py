@@ -97,14 +97,25 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=get_metadata(),
-            **conf_args
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        # The app's engine applies the API's statement_timeout at connect time; backfills and index builds
+        # on large tenants must not be cancelled by it. A session-level SET also holds across the
+        # migrations' autocommit blocks. RESET restores the connect-time value before the connection
+        # goes back to the pool.
+        connection.exec_driver_sql("SET statement_timeout = 0")
+        connection.commit()
+        try:
+            context.configure(
+                connection=connection,
+                target_metadata=get_metadata(),
+                **conf_args
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.rollback()
+            connection.exec_driver_sql("RESET statement_timeout")
+            connection.commit()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,31 @@
+"""add per-customer resource version stamps
+
+Revision ID: 4c1f7e9b2d60
+Revises: 9fc8868184dd
+Create Date: 2025-05-16 09:41:18.220784
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f7e9b2d60'
+down_revision = '9fc8868184dd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resource_versions',
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('scope', sa.String(length=32), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('customer_id', 'scope')
+    )
+
+
+def downgrade():
+    op.drop_table('resource_versions')
@@ -0,0 +1,40 @@
+"""add indexes for the my-work feed
+
+Revision ID: 5d2c8a7e4b19
+Revises: b3d58e61c9f4
+Create Date: 2025-06-02 09:41:18.276054
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8a7e4b19'
+down_revision = 'b3d58e61c9f4'
+branch_labels = None
+depends_on = None
+
+
+# The feed walks open subtasks of one assignee in (due date, id) order, undated ones last; each index
+# serves one side of the feed (direct and team assignments) as a bounded range scan.
+DUE_ORDER = sa.text("COALESCE(due_date, 'infinity'::timestamp)")
+OPEN_ONLY = sa.text("status <> 'Completed'")
+INDEXES = [
+    ('ix_subtasks_assigned_user_id_open_due', 'subtasks', ['assigned_user_id', DUE_ORDER, 'id']),
+    ('ix_subtasks_assigned_team_id_open_due', 'subtasks', ['assigned_team_id', DUE_ORDER, 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside the migration transaction, but keeps large tenants writable while indexes build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_where=OPEN_ONLY,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,247 @@
+"""add tag indexes and per-project tag counts
+
+Revision ID: 8a4f2c6d1e37
+Revises: c6e19f3a7d42
+Create Date: 2025-06-16 11:07:45.830215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4f2c6d1e37'
+down_revision = 'c6e19f3a7d42'
+branch_labels = None
+depends_on = None
+
+
+TAG_INDEXES = [
+    ('ix_tasks_tags', 'tasks', ['tags']),
+    ('ix_subtasks_tags', 'subtasks', ['tags']),
+    ('ix_projects_tech_stack', 'projects', ['tech_stack']),
+]
+
+# Applies a JSON array of {customer_id, project_id, source, tag, delta} to the counts. Deltas are summed per
+# counter first, and the whole statement's counters are upserted in one sorted INSERT, so concurrent writers
+# lock shared counters in the same order whatever rows their statements touch. Rows outside a project are not
+# counted; counts that reach zero are removed.
+APPLY_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tag_counts_apply(p_deltas jsonb) RETURNS void
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF p_deltas IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO tag_counts (customer_id, project_id, source, tag, count)
+        SELECT d.customer_id, d.project_id, d.source, d.tag, SUM(d.delta)
+        FROM jsonb_to_recordset(p_deltas) AS d(customer_id varchar, project_id varchar, source varchar,
+                                                tag varchar, delta integer)
+        WHERE d.project_id IS NOT NULL AND d.tag IS NOT NULL
+        GROUP BY d.customer_id, d.project_id, d.source, d.tag
+        HAVING SUM(d.delta) <> 0
+        ORDER BY d.project_id, d.source, d.tag
+        ON CONFLICT (project_id, source, tag) DO UPDATE SET count = tag_counts.count + EXCLUDED.count;
+        DELETE FROM tag_counts c
+        USING (SELECT DISTINCT d.project_id, d.source, d.tag
+               FROM jsonb_to_recordset(p_deltas) AS d(project_id varchar, source varchar, tag varchar, delta integer)
+               WHERE d.delta < 0) gone
+        WHERE c.project_id = gone.project_id AND c.source = gone.source AND c.tag = gone.tag AND c.count <= 0;
+    END
+    $$
+"""
+
+# Statement-level: `old_rows` / `new_rows` are the transition tables of the triggering statement. Each row
+# counts a tag once however often it repeats it.
+TASK_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tag_counts_task_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        deltas jsonb;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                SELECT DISTINCT n.id, n.customer_id, n.project_id, 'task' AS source, u.tag, 1 AS delta
+                FROM new_rows n CROSS JOIN unnest(n.tags) AS u(tag)
+            ) d;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                SELECT DISTINCT o.id, o.customer_id, o.project_id, 'task' AS source, u.tag, -1 AS delta
+                FROM old_rows o CROSS JOIN unnest(o.tags) AS u(tag)
+            ) d;
+        ELSE
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                WITH moved AS (
+                    SELECT o.id, o.customer_id AS old_customer_id, o.project_id AS old_project_id, o.tags AS old_tags,
+                           n.customer_id, n.project_id, n.tags
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE n.tags IS DISTINCT FROM o.tags OR n.project_id IS DISTINCT FROM o.project_id
+                )
+                SELECT DISTINCT m.id, m.old_customer_id AS customer_id, m.old_project_id AS project_id,
+                       'task' AS source, u.tag, -1 AS delta
+                FROM moved m CROSS JOIN unnest(m.old_tags) AS u(tag)
+                UNION ALL
+                SELECT DISTINCT m.id, m.customer_id, m.project_id, 'task', u.tag, 1
+                FROM moved m CROSS JOIN unnest(m.tags) AS u(tag)
+                -- Subtask tags are counted under their task's project, so they move with it
+                UNION ALL
+                SELECT DISTINCT s.id, m.old_customer_id, m.old_project_id, 'subtask', u.tag, -1
+                FROM moved m JOIN subtasks s ON s.task_id = m.id CROSS JOIN unnest(s.tags) AS u(tag)
+                WHERE m.project_id IS DISTINCT FROM m.old_project_id
+                UNION ALL
+                SELECT DISTINCT s.id, m.customer_id, m.project_id, 'subtask', u.tag, 1
+                FROM moved m JOIN subtasks s ON s.task_id = m.id CROSS JOIN unnest(s.tags) AS u(tag)
+                WHERE m.project_id IS DISTINCT FROM m.old_project_id
+            ) d;
+        END IF;
+        PERFORM tag_counts_apply(deltas);
+        RETURN NULL;
+    END
+    $$
+"""
+
+SUBTASK_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tag_counts_subtask_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        deltas jsonb;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                SELECT DISTINCT n.id, t.customer_id, t.project_id, 'subtask' AS source, u.tag, 1 AS delta
+                FROM new_rows n JOIN tasks t ON t.id = n.task_id CROSS JOIN unnest(n.tags) AS u(tag)
+            ) d;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                SELECT DISTINCT o.id, t.customer_id, t.project_id, 'subtask' AS source, u.tag, -1 AS delta
+                FROM old_rows o JOIN tasks t ON t.id = o.task_id CROSS JOIN unnest(o.tags) AS u(tag)
+            ) d;
+        ELSE
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                WITH changed AS (
+                    SELECT o.id, o.task_id AS old_task_id, o.tags AS old_tags, n.task_id, n.tags
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE n.tags IS DISTINCT FROM o.tags OR n.task_id <> o.task_id
+                )
+                SELECT DISTINCT c.id, t.customer_id, t.project_id, 'subtask' AS source, u.tag, -1 AS delta
+                FROM changed c JOIN tasks t ON t.id = c.old_task_id CROSS JOIN unnest(c.old_tags) AS u(tag)
+                UNION ALL
+                SELECT DISTINCT c.id, t.customer_id, t.project_id, 'subtask', u.tag, 1
+                FROM changed c JOIN tasks t ON t.id = c.task_id CROSS JOIN unnest(c.tags) AS u(tag)
+            ) d;
+        END IF;
+        PERFORM tag_counts_apply(deltas);
+        RETURN NULL;
+    END
+    $$
+"""
+
+# A deleted project's counts go with it through the foreign key's ON DELETE CASCADE
+PROJECT_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tag_counts_project_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        deltas jsonb;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                SELECT DISTINCT n.id, n.customer_id, n.id AS project_id, 'tech_stack' AS source, u.tag, 1 AS delta
+                FROM new_rows n CROSS JOIN unnest(n.tech_stack) AS u(tag)
+            ) d;
+        ELSE
+            SELECT jsonb_agg(d) INTO deltas FROM (
+                WITH changed AS (
+                    SELECT n.id, n.customer_id, o.tech_stack AS old_tech_stack, n.tech_stack
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE n.tech_stack IS DISTINCT FROM o.tech_stack
+                )
+                SELECT DISTINCT c.id, c.customer_id, c.id AS project_id, 'tech_stack' AS source, u.tag, -1 AS delta
+                FROM changed c CROSS JOIN unnest(c.old_tech_stack) AS u(tag)
+                UNION ALL
+                SELECT DISTINCT c.id, c.customer_id, c.id, 'tech_stack', u.tag, 1
+                FROM changed c CROSS JOIN unnest(c.tech_stack) AS u(tag)
+            ) d;
+        END IF;
+        PERFORM tag_counts_apply(deltas);
+        RETURN NULL;
+    END
+    $$
+"""
+
+# Transition tables rule out column lists and multi-event triggers, so there is one trigger per event, and
+# the UPDATE functions pick out the rows whose counted columns changed themselves
+TRIGGERS = [
+    ('tasks_tag_counts_insert', 'tasks', 'INSERT', 'NEW TABLE AS new_rows', 'tag_counts_task_update'),
+    ('tasks_tag_counts_update', 'tasks', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows', 'tag_counts_task_update'),
+    ('tasks_tag_counts_delete', 'tasks', 'DELETE', 'OLD TABLE AS old_rows', 'tag_counts_task_update'),
+    ('subtasks_tag_counts_insert', 'subtasks', 'INSERT', 'NEW TABLE AS new_rows', 'tag_counts_subtask_update'),
+    ('subtasks_tag_counts_update', 'subtasks', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows', 'tag_counts_subtask_update'),
+    ('subtasks_tag_counts_delete', 'subtasks', 'DELETE', 'OLD TABLE AS old_rows', 'tag_counts_subtask_update'),
+    ('projects_tag_counts_insert', 'projects', 'INSERT', 'NEW TABLE AS new_rows', 'tag_counts_project_update'),
+    ('projects_tag_counts_update', 'projects', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows', 'tag_counts_project_update'),
+]
+
+BACKFILL = """
+    INSERT INTO tag_counts (customer_id, project_id, source, tag, count)
+    SELECT customer_id, project_id, source, tag, COUNT(*)
+    FROM (
+        SELECT DISTINCT t.id, t.customer_id, t.project_id, 'task' AS source, u.tag
+        FROM tasks t CROSS JOIN unnest(t.tags) AS u(tag)
+        WHERE t.project_id IS NOT NULL
+        UNION ALL
+        SELECT DISTINCT s.id, t.customer_id, t.project_id, 'subtask', u.tag
+        FROM subtasks s JOIN tasks t ON t.id = s.task_id CROSS JOIN unnest(s.tags) AS u(tag)
+        WHERE t.project_id IS NOT NULL
+        UNION ALL
+        SELECT DISTINCT p.id, p.customer_id, p.id, 'tech_stack', u.tag
+        FROM projects p CROSS JOIN unnest(p.tech_stack) AS u(tag)
+    ) tagged
+    WHERE tag IS NOT NULL
+    GROUP BY customer_id, project_id, source, tag
+"""
+
+
+def upgrade():
+    op.create_table('tag_counts',
+    sa.Column('project_id', sa.String(length=36), nullable=False),
+    sa.Column('source', sa.String(length=16), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'source', 'tag')
+    )
+    with op.batch_alter_table('tag_counts', schema=None) as batch_op:
+        batch_op.create_index('ix_tag_counts_customer_id_source', ['customer_id', 'source'], unique=False)
+
+    op.execute(APPLY_FUNCTION)
+    for function in (TASK_TRIGGER_FUNCTION, SUBTASK_TRIGGER_FUNCTION, PROJECT_TRIGGER_FUNCTION):
+        op.execute(function)
+    for name, table, event, transition, function in TRIGGERS:
+        op.execute(f"CREATE TRIGGER {name} AFTER {event} ON {table} REFERENCING {transition} "
+                   f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()")
+    op.execute(BACKFILL)
+
+    # CONCURRENTLY cannot run inside the migration transaction, but keeps large tenants writable while indexes build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in TAG_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(TAG_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for name, table, event, transition, function in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    for function in ('tag_counts_project_update', 'tag_counts_subtask_update', 'tag_counts_task_update'):
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.execute("DROP FUNCTION IF EXISTS tag_counts_apply(jsonb)")
+
+    with op.batch_alter_table('tag_counts', schema=None) as batch_op:
+        batch_op.drop_index('ix_tag_counts_customer_id_source')
+
+    op.drop_table('tag_counts')
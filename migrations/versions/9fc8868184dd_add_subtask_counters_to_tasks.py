@@ -0,0 +1,42 @@
+"""add denormalized subtask counters to tasks
+
+Revision ID: 9fc8868184dd
+Revises: a822ee3dc5b2
+Create Date: 2025-05-14 16:02:47.903215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9fc8868184dd'
+down_revision = 'a822ee3dc5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subtask_total', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('subtask_completed', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE tasks t
+        SET subtask_total = c.total,
+            subtask_completed = c.completed
+        FROM (
+            SELECT s.task_id,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE s.status = 'Completed') AS completed
+            FROM subtasks s
+            GROUP BY s.task_id
+        ) c
+        WHERE t.id = c.task_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('subtask_completed')
+        batch_op.drop_column('subtask_total')
@@ -0,0 +1,48 @@
+"""add secondary indexes for hot queries
+
+Revision ID: a822ee3dc5b2
+Revises: b61372c503e2
+Create Date: 2025-05-12 10:14:02.518331
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a822ee3dc5b2'
+down_revision = 'b61372c503e2'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns). team_members(user_id) is already covered by the
+# (user_id, team_id) primary key, so only the team_id side needs its own index.
+INDEXES = [
+    ('ix_customers_domain', 'customers', ['domain']),
+    ('ix_users_customer_id', 'users', ['customer_id']),
+    ('ix_teams_customer_id', 'teams', ['customer_id']),
+    ('ix_team_members_team_id', 'team_members', ['team_id']),
+    ('ix_projects_customer_id_updated_at', 'projects', ['customer_id', 'updated_at', 'id']),
+    ('ix_projects_project_manager_id', 'projects', ['project_manager_id']),
+    ('ix_tasks_customer_id_updated_at', 'tasks', ['customer_id', 'updated_at', 'id']),
+    ('ix_tasks_project_id_updated_at', 'tasks', ['project_id', 'updated_at', 'id']),
+    ('ix_subtasks_task_id', 'subtasks', ['task_id']),
+    ('ix_subtasks_assigned_user_id', 'subtasks', ['assigned_user_id']),
+    ('ix_subtasks_assigned_team_id', 'subtasks', ['assigned_team_id']),
+    ('ix_time_entries_customer_id_start_time', 'time_entries', ['customer_id', 'start_time', 'id']),
+    ('ix_time_entries_user_id_start_time', 'time_entries', ['user_id', 'start_time']),
+    ('ix_time_entries_subtask_id', 'time_entries', ['subtask_id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside the migration transaction, but keeps large tenants writable while indexes build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
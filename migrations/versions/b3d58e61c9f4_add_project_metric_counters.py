@@ -0,0 +1,58 @@
+"""add project metric counters
+
+Revision ID: b3d58e61c9f4
+Revises: e7a24d913b85
+Create Date: 2025-05-26 10:04:37.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d58e61c9f4'
+down_revision = 'e7a24d913b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_metric_counters',
+    sa.Column('project_id', sa.String(length=36), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('tasks_total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('subtasks_total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('subtasks_completed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('minutes_logged', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    with op.batch_alter_table('project_metric_counters', schema=None) as batch_op:
+        batch_op.create_index('ix_project_metric_counters_customer_id', ['customer_id'], unique=False)
+
+    with op.batch_alter_table('project_metrics', schema=None) as batch_op:
+        batch_op.create_index('ix_project_metrics_project_id_metric_type_recorded_at', ['project_id', 'metric_type', 'recorded_at'], unique=False)
+
+    op.execute("""
+        INSERT INTO project_metric_counters (project_id, customer_id, tasks_total, subtasks_total,
+                                             subtasks_completed, minutes_logged, updated_at)
+        SELECT p.id, p.customer_id,
+               (SELECT COUNT(*) FROM tasks t WHERE t.project_id = p.id),
+               (SELECT COALESCE(SUM(t.subtask_total), 0) FROM tasks t WHERE t.project_id = p.id),
+               (SELECT COALESCE(SUM(t.subtask_completed), 0) FROM tasks t WHERE t.project_id = p.id),
+               (SELECT COALESCE(SUM(r.minutes), 0) FROM time_entry_daily_rollups r WHERE r.project_id = p.id),
+               now() AT TIME ZONE 'UTC'
+        FROM projects p
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('project_metrics', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_metrics_project_id_metric_type_recorded_at')
+
+    with op.batch_alter_table('project_metric_counters', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_metric_counters_customer_id')
+
+    op.drop_table('project_metric_counters')
@@ -0,0 +1,74 @@
+"""add full-text search vectors to tasks and subtasks
+
+Revision ID: c6e19f3a7d42
+Revises: 5d2c8a7e4b19
+Create Date: 2025-06-09 14:22:51.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e19f3a7d42'
+down_revision = '5d2c8a7e4b19'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('tasks', 'subtasks')
+
+# Title, tags and description weighted A, B and C for ranking. array_to_string is only STABLE, so the
+# column is kept by a trigger rather than generated.
+SEARCH_DOCUMENT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION search_document(title text, description text, tags varchar[]) RETURNS tsvector
+    LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', COALESCE(title, '')), 'A')
+            || setweight(to_tsvector('english', COALESCE(array_to_string(tags, ' '), '')), 'B')
+            || setweight(to_tsvector('english', COALESCE(description, '')), 'C')
+    $$
+"""
+
+SEARCH_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION search_vector_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := search_document(NEW.title, NEW.description, NEW.tags);
+        RETURN NEW;
+    END
+    $$
+"""
+
+
+def upgrade():
+    op.execute(SEARCH_DOCUMENT_FUNCTION)
+    op.execute(SEARCH_TRIGGER_FUNCTION)
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF title, description, tags ON {table}
+            FOR EACH ROW EXECUTE FUNCTION search_vector_update()
+        """)
+        op.execute(f"UPDATE {table} SET search_vector = search_document(title, description, tags)")
+
+    # CONCURRENTLY cannot run inside the migration transaction, but keeps large tenants writable while indexes build.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False,
+                            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('search_vector')
+    op.execute("DROP FUNCTION IF EXISTS search_vector_update()")
+    op.execute("DROP FUNCTION IF EXISTS search_document(text, text, varchar[])")
@@ -0,0 +1,57 @@
+"""add daily time entry rollups
+
+Revision ID: e7a24d913b85
+Revises: 4c1f7e9b2d60
+Create Date: 2025-05-19 11:22:05.604913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a24d913b85'
+down_revision = '4c1f7e9b2d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('time_entry_daily_rollups',
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('subtask_id', sa.String(length=36), nullable=False),
+    sa.Column('task_id', sa.String(length=36), nullable=False),
+    sa.Column('project_id', sa.String(length=36), nullable=True),
+    sa.Column('minutes', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('entries', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['subtask_id'], ['subtasks.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('customer_id', 'day', 'user_id', 'subtask_id')
+    )
+    with op.batch_alter_table('time_entry_daily_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_time_entry_daily_rollups_customer_id_project_id_day', ['customer_id', 'project_id', 'day'], unique=False)
+        batch_op.create_index('ix_time_entry_daily_rollups_customer_id_user_id_day', ['customer_id', 'user_id', 'day'], unique=False)
+
+    op.execute("""
+        INSERT INTO time_entry_daily_rollups (customer_id, day, user_id, subtask_id, task_id, project_id, minutes, entries)
+        SELECT te.customer_id, (te.start_time AT TIME ZONE c.time_zone)::date, te.user_id, te.subtask_id,
+               t.id, t.project_id, SUM(te.duration), COUNT(*)
+        FROM time_entries te
+        JOIN customers c ON c.id = te.customer_id
+        JOIN subtasks s ON s.id = te.subtask_id
+        JOIN tasks t ON t.id = s.task_id
+        GROUP BY te.customer_id, (te.start_time AT TIME ZONE c.time_zone)::date, te.user_id, te.subtask_id, t.id, t.project_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('time_entry_daily_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_time_entry_daily_rollups_customer_id_user_id_day')
+        batch_op.drop_index('ix_time_entry_daily_rollups_customer_id_project_id_day')
+
+    op.drop_table('time_entry_daily_rollups')
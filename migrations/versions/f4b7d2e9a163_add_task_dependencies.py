@@ -0,0 +1,57 @@
+"""add task dependencies
+
+Revision ID: f4b7d2e9a163
+Revises: 8a4f2c6d1e37
+Create Date: 2025-06-23 09:41:12.507316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b7d2e9a163'
+down_revision = '8a4f2c6d1e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dependencies',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('task_id', sa.String(length=36), nullable=False),
+    sa.Column('depends_on_task_id', sa.String(length=36), nullable=True),
+    sa.Column('depends_on_subtask_id', sa.String(length=36), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('(depends_on_task_id IS NOT NULL AND depends_on_subtask_id IS NULL) OR (depends_on_task_id IS NULL AND depends_on_subtask_id IS NOT NULL)', name='check_depends_on_task_or_subtask'),
+    sa.ForeignKeyConstraint(['depends_on_subtask_id'], ['subtasks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['depends_on_task_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('dependencies', schema=None) as batch_op:
+        # One row per (task, prerequisite); also serves the per-project edge load, which probes by task_id
+        batch_op.create_index('uq_dependencies_task_id_prerequisite',
+                              ['task_id', sa.text('COALESCE(depends_on_task_id, depends_on_subtask_id)')], unique=True)
+        # Cascading deletes of tasks and subtasks look their dependents up by prerequisite
+        batch_op.create_index('ix_dependencies_depends_on_task_id', ['depends_on_task_id'], unique=False)
+        batch_op.create_index('ix_dependencies_depends_on_subtask_id', ['depends_on_subtask_id'], unique=False)
+
+    # Room for the per-project graph scopes ("graph:<project id>"); widening a varchar does not rewrite the table
+    with op.batch_alter_table('resource_versions', schema=None) as batch_op:
+        batch_op.alter_column('scope', existing_type=sa.String(length=32), type_=sa.String(length=64),
+                              existing_nullable=False)
+
+
+def downgrade():
+    op.execute("DELETE FROM resource_versions WHERE scope LIKE 'graph:%'")
+    with op.batch_alter_table('resource_versions', schema=None) as batch_op:
+        batch_op.alter_column('scope', existing_type=sa.String(length=64), type_=sa.String(length=32),
+                              existing_nullable=False)
+
+    with op.batch_alter_table('dependencies', schema=None) as batch_op:
+        batch_op.drop_index('ix_dependencies_depends_on_subtask_id')
+        batch_op.drop_index('ix_dependencies_depends_on_task_id')
+        batch_op.drop_index('uq_dependencies_task_id_prerequisite')
+
+    op.drop_table('dependencies')
@@ -0,0 +1,196 @@
+# tests/test_dependency_graph.py
+import pytest
+from flask import Flask
+
+from app.utils.dependency_graph import (CycleError, DependencyGraph, _apply_committed, get_dependency_graphs,
+                                        init_dependency_graphs)
+
+PROJECT_ID = "project-1"
+CUSTOMER_ID = "customer-1"
+
+
+def task(node_id: str, estimated_duration: int = None, status: str = "Not Started") -> dict:
+    return {"id": node_id, "type": "task", "task_id": None, "project_id": PROJECT_ID, "title": node_id,
+            "status": status, "estimated_duration": estimated_duration}
+
+
+def subtask(node_id: str, parent: str, estimated_duration: int = None) -> dict:
+    return {"id": node_id, "type": "subtask", "task_id": parent, "project_id": PROJECT_ID, "title": node_id,
+            "status": "Not Started", "estimated_duration": estimated_duration}
+
+
+def dependency(dependency_id: str, task_id: str, depends_on_task_id: str = None,
+               depends_on_subtask_id: str = None) -> dict:
+    return {"id": dependency_id, "task_id": task_id, "depends_on_task_id": depends_on_task_id,
+            "depends_on_subtask_id": depends_on_subtask_id}
+
+
+def build(nodes: list, edges: list = (), version: int = 1) -> DependencyGraph:
+    return DependencyGraph.from_rows(PROJECT_ID, CUSTOMER_ID, version, nodes, edges)
+
+
+def assert_topological(graph: DependencyGraph) -> None:
+    for source, successors in graph._succ.items():
+        for target in successors:
+            assert graph._ord[source] < graph._ord[target], (source, target)
+
+
+def test_edge_against_the_order_is_accepted_after_reordering():
+    graph = build([task("a"), task("b"), task("c")])
+    assert graph._ord["a"] < graph._ord["b"] < graph._ord["c"]
+
+    # "a" waits on "c": the edge points backwards in the current order
+    graph.add_edge("d1", "c", "a")
+
+    assert graph.edges == {"d1": ("c", "a")}
+    assert graph._ord["c"] < graph._ord["a"]
+    assert_topological(graph)
+    order = [node["id"] for node in graph.analysis()["nodes"]]
+    assert order.index("c") < order.index("a")
+
+
+def test_back_edge_closing_a_cycle_through_a_subtask_reports_the_path():
+    # "b" waits on subtask "s" of "a", and "c" waits on "b"
+    graph = build(
+        [task("a"), task("b"), task("c"), subtask("s", "a")],
+        [dependency("d1", "b", depends_on_subtask_id="s"), dependency("d2", "c", depends_on_task_id="b")],
+    )
+    edges = dict(graph.edges)
+
+    # "a" waiting on "c" is fine for "a" itself, but its subtask "s" would then wait on "c" as well:
+    # s -> b -> c -> s
+    with pytest.raises(CycleError) as raised:
+        graph.add_edge("d3", "c", "a")
+
+    assert raised.value.path == ["s", "b", "c"]
+    # The order may have moved for "a", but it is still valid and no edge was added
+    assert graph.edges == edges
+    assert "c" not in graph._pred["a"] and "c" not in graph._pred["s"]
+    assert_topological(graph)
+
+
+def test_new_subtask_prerequisite_is_checked_through_its_parent():
+    # "a" waits on "p", and "p" waits on "b"
+    graph = build(
+        [task("a"), task("b"), task("p")],
+        [dependency("d1", "a", depends_on_task_id="p"), dependency("d2", "p", depends_on_task_id="b")],
+    )
+
+    # A subtask of "a" inherits the wait on "p", so "b" cannot wait on it
+    with pytest.raises(CycleError) as raised:
+        graph.check_edge("s", "b", parent="a")
+
+    assert raised.value.path == ["b", "p", "s"]
+    graph.check_edge("s", "p", parent="b")
+
+
+def test_remove_edge_drops_a_subtask_node_nothing_points_at():
+    graph = build(
+        [task("a"), task("b"), task("c"), subtask("s", "a")],
+        [dependency("d1", "b", depends_on_subtask_id="s"), dependency("d2", "c", depends_on_subtask_id="s")],
+    )
+
+    graph.remove_edge("d1")
+    assert "s" in graph.nodes
+    assert graph._succ["s"] == {"a": 1, "c": 1}
+
+    graph.remove_edge("d2")
+    assert "s" not in graph.nodes
+    assert "s" not in graph._pred["a"]
+    assert "s" not in graph._children["a"]
+    assert all("s" not in index for index in (graph._succ, graph._pred, graph._ord, graph._uses))
+    assert graph.edges == {}
+    assert graph.analysis()["node_count"] == 3
+
+
+def test_from_rows_falls_back_on_a_stored_cycle():
+    graph = build(
+        [task("a"), task("b"), task("c")],
+        [
+            dependency("d1", "b", depends_on_task_id="a"),
+            dependency("d2", "c", depends_on_task_id="b"),
+            dependency("d3", "a", depends_on_task_id="c"),
+        ],
+    )
+
+    # Added one by one, the edge that closes a -> b -> c -> a is the one left out
+    assert set(graph.edges) == {"d1", "d2"}
+    assert graph.prerequisites_of("a") == []
+    assert_topological(graph)
+
+
+def test_from_rows_drops_edges_to_nodes_it_was_not_given():
+    graph = build([task("a"), task("b")], [dependency("d1", "b", depends_on_task_id="gone")])
+
+    assert graph.edges == {}
+    assert graph.analysis()["edge_count"] == 0
+
+
+def test_critical_path_and_slack():
+    # a (30) and b (60) before c (10); d (5) stands alone
+    graph = build(
+        [task("a", 30), task("b", 60), task("c", 10), task("d", 5)],
+        [dependency("d1", "c", depends_on_task_id="a"), dependency("d2", "c", depends_on_task_id="b")],
+    )
+
+    analysis = graph.analysis()
+    nodes = {node["id"]: node for node in analysis["nodes"]}
+
+    assert analysis["critical_path"] == {"nodes": ["b", "c"], "duration": 70}
+    assert {node_id: node["slack"] for node_id, node in nodes.items()} == {"a": 30, "b": 0, "c": 0, "d": 65}
+    assert (nodes["c"]["earliest_start"], nodes["c"]["earliest_finish"]) == (60, 70)
+    assert nodes["c"]["blocked_by"] == ["a", "b"]
+    assert sorted(analysis["ready"]) == ["a", "b", "d"]
+    assert analysis["blocked"] == ["c"]
+
+
+def test_completed_prerequisites_do_not_block():
+    graph = build(
+        [task("a", 30, status="Completed"), task("b", 10)],
+        [dependency("d1", "b", depends_on_task_id="a")],
+    )
+
+    analysis = graph.analysis()
+    assert analysis["ready"] == ["b"]
+    assert analysis["blocked"] == []
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["DEPENDENCY_GRAPH_CACHE_SIZE"] = 4
+    init_dependency_graphs(app)
+    with app.app_context():
+        yield app
+
+
+def test_apply_committed_carries_the_next_version_over(app):
+    graph = build([task("a"), task("b")], version=3)
+    get_dependency_graphs().put(graph)
+
+    _apply_committed(PROJECT_ID, 4, lambda g: g.add_edge("d1", "a", "b"))
+
+    assert get_dependency_graphs().get(PROJECT_ID, CUSTOMER_ID, 4) is graph
+    assert graph.edges == {"d1": ("a", "b")}
+
+
+def test_apply_committed_discards_the_graph_on_a_version_gap(app):
+    graph = build([task("a"), task("b")], version=3)
+    get_dependency_graphs().put(graph)
+    applied = []
+
+    # Version 4 was a write this worker did not see
+    _apply_committed(PROJECT_ID, 5, applied.append)
+
+    assert applied == []
+    assert get_dependency_graphs().peek(PROJECT_ID) is None
+
+
+def test_apply_committed_discards_the_graph_when_the_change_fails(app):
+    graph = build([task("a"), task("b")], [dependency("d1", "b", depends_on_task_id="a")], version=3)
+    get_dependency_graphs().put(graph)
+
+    _apply_committed(PROJECT_ID, 4, lambda g: g.add_edge("d2", "b", "a"))
+
+    assert get_dependency_graphs().peek(PROJECT_ID) is None
+    assert graph.version == 3
@@ -0,0 +1,146 @@
+# tests/test_tag_counts.py
+"""
+The tag_counts triggers against Postgres: after each kind of write, the counts they maintained must equal
+a recount with TagsDao.rebuild_counts. Needs DATABASE_URL pointing at a migrated database; the rows are
+created under a customer of their own and removed again.
+"""
+import os
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, text
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="needs DATABASE_URL (a migrated Postgres)")
+
+COUNTS_QUERY = """
+    SELECT project_id, source, tag, count
+    FROM tag_counts
+    WHERE customer_id = :customer_id
+    ORDER BY project_id, source, tag
+"""
+
+
+@pytest.fixture(scope="module")
+def app():
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def tenant(app):
+    from app.models.customer import Customer
+    from app.models.project import Project
+    from app.models.user import User
+    from app.sources import db
+
+    suffix = uuid4().hex[:12]
+    customer = Customer(name="tag counts", contact_email=f"tags@{suffix}.example", domain=f"tagtest-{suffix}")
+    db.session.add(customer)
+    db.session.flush()
+    manager = User(customer_id=customer.id, username=f"tags_{suffix}", email=f"pm@{suffix}.example",
+                   password_hash="-", role="Project Manager")
+    db.session.add(manager)
+    db.session.flush()
+    projects = [
+        Project(customer_id=customer.id, title=title, project_manager_id=manager.id, tech_stack=["python", "python"])
+        for title in ("first", "second")
+    ]
+    db.session.add_all(projects)
+    db.session.commit()
+
+    yield {"customer_id": customer.id, "projects": [project.id for project in projects]}
+
+    db.session.rollback()
+    for statement in (
+        "DELETE FROM subtasks WHERE task_id IN (SELECT id FROM tasks WHERE customer_id = :customer_id)",
+        "DELETE FROM tasks WHERE customer_id = :customer_id",
+        "DELETE FROM tag_counts WHERE customer_id = :customer_id",
+        "DELETE FROM project_metric_counters WHERE customer_id = :customer_id",
+        "DELETE FROM projects WHERE customer_id = :customer_id",
+        "DELETE FROM resource_versions WHERE customer_id = :customer_id",
+        "DELETE FROM users WHERE customer_id = :customer_id",
+        "DELETE FROM customers WHERE id = :customer_id",
+    ):
+        db.session.execute(text(statement), {"customer_id": customer.id})
+    db.session.commit()
+
+
+def assert_counts_match_rebuild(customer_id: str) -> list:
+    from app.dao.tags import TagsDao
+    from app.sources import db
+
+    maintained = db.session.execute(text(COUNTS_QUERY), {"customer_id": customer_id}).fetchall()
+    TagsDao.rebuild_counts(customer_id)
+    rebuilt = db.session.execute(text(COUNTS_QUERY), {"customer_id": customer_id}).fetchall()
+    db.session.commit()
+    assert [tuple(row) for row in maintained] == [tuple(row) for row in rebuilt]
+    return [tuple(row) for row in maintained]
+
+
+def test_tag_counts_follow_every_write(tenant):
+    from app.models.subtask import Subtask
+    from app.models.task import Task
+    from app.sources import db
+
+    customer_id = tenant["customer_id"]
+    first, second = tenant["projects"]
+    assert (first, "tech_stack", "python", 1) in assert_counts_match_rebuild(customer_id)
+
+    # Insert with a tag repeated on the task and on its subtasks
+    task = Task(customer_id=customer_id, project_id=first, title="task", tags=["api", "api", "db"])
+    db.session.add(task)
+    db.session.flush()
+    db.session.add_all([
+        Subtask(task_id=task.id, title="subtask 1", tags=["api", "ui", "ui"]),
+        Subtask(task_id=task.id, title="subtask 2", tags=["ui"]),
+    ])
+    other = Task(customer_id=customer_id, project_id=first, title="other task", tags=["api"])
+    db.session.add(other)
+    db.session.commit()
+    counts = assert_counts_match_rebuild(customer_id)
+    assert (first, "task", "api", 2) in counts
+    assert (first, "subtask", "ui", 2) in counts
+
+    # Tag edits on a task, a subtask and a project's tech stack
+    task.tags = ["db", "infra"]
+    task.subtasks[0].tags = ["ui"]
+    db.session.execute(text("UPDATE projects SET tech_stack = ARRAY['python', 'go'] WHERE id = :id"), {"id": second})
+    db.session.commit()
+    assert_counts_match_rebuild(customer_id)
+
+    # Moving a task between projects moves its subtasks' tags with it
+    task.project_id = second
+    db.session.commit()
+    counts = assert_counts_match_rebuild(customer_id)
+    assert (second, "subtask", "ui", 2) in counts
+    assert not [row for row in counts if row[0] == first and row[1] == "subtask"]
+
+    # Moving a subtask to a task in the other project
+    task.subtasks[1].task_id = other.id
+    db.session.commit()
+    counts = assert_counts_match_rebuild(customer_id)
+    assert (first, "subtask", "ui", 1) in counts
+
+    # Deleting a task deletes its subtasks as well
+    db.session.delete(task)
+    db.session.commit()
+    counts = assert_counts_match_rebuild(customer_id)
+    assert not [row for row in counts if row[0] == second and row[1] != "tech_stack"]
+
+    # A bulk insert is one statement over many rows, as in the batch endpoints
+    rows = [
+        {"id": str(uuid4()), "customer_id": customer_id, "project_id": (first, second)[i % 2],
+         "title": f"bulk {i}", "tags": ["bulk", f"n{i % 3}", "bulk"]}
+        for i in range(30)
+    ]
+    db.session.execute(insert(Task), rows)
+    db.session.execute(insert(Subtask), [
+        {"id": str(uuid4()), "task_id": row["id"], "title": "bulk subtask", "tags": ["bulk", "ui"]} for row in rows
+    ])
+    db.session.commit()
+    counts = assert_counts_match_rebuild(customer_id)
+    assert (first, "task", "bulk", 15) in counts
+    assert (second, "subtask", "bulk", 15) in counts
@@ -0,0 +1,273 @@
+# tests/test_token_cache.py
+import json
+
+import pytest
+from flask import Flask
+
+from app.utils.token_cache import (RedisRevocationChannel, TokenRevokedError, VerifiedTokenCache, init_token_cache,
+                                   token_digest)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StopListening(BaseException):
+    """
+    Ends RedisRevocationChannel._subscribe_forever, which retries on any Exception.
+    """
+
+
+class FakePubSub:
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+
+    def subscribe(self, channel: str) -> None:
+        self.client.calls.append(("subscribe", channel))
+
+    def listen(self):
+        for payload in self.client.pending:
+            yield {"type": "message", "data": payload}
+        raise StopListening()
+
+
+class FakeRedis:
+    """
+    The redis-py methods RedisRevocationChannel uses, answering with bytes as redis-py does.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.published = []
+        self.pending = []
+        self.calls = []
+
+    def hset(self, key: str, field: str, value: str) -> None:
+        self.hashes.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hgetall(self, key: str) -> dict:
+        self.calls.append(("hgetall", key))
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key: str, field: bytes) -> None:
+        self.hashes.get(key, {}).pop(field, None)
+
+    def publish(self, channel: str, payload: str) -> None:
+        self.published.append((channel, payload))
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> FakePubSub:
+        return FakePubSub(self)
+
+
+def claims(user_id: str = "user-1", iat: float = 900, exp: float = 2000) -> dict:
+    return {"user_id": user_id, "role": "Admin", "customer_id": "customer-1", "iat": iat, "exp": exp}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return VerifiedTokenCache(max_entries=2, clock=clock, max_token_lifetime=100)
+
+
+def test_entry_expires_exactly_at_exp(cache, clock):
+    cache.put("token", claims(exp=1010))
+
+    clock.now = 1009.999
+    assert cache.get("token")["user_id"] == "user-1"
+
+    clock.now = 1010
+    assert cache.get("token") is None
+    assert cache.info()["entries"] == 0
+    assert cache.stats.snapshot()["expirations"] == 1
+
+
+def test_tokens_without_numeric_exp_are_not_cached(cache):
+    cache.put("no-exp", {"user_id": "user-1", "iat": 900})
+    cache.put("string-exp", claims(exp="2000"))
+
+    assert cache.get("no-exp") is None
+    assert cache.get("string-exp") is None
+    assert cache.stats.snapshot()["stores"] == 0
+
+
+def test_returned_claims_are_a_copy(cache):
+    cache.put("token", claims())
+    cache.get("token")["role"] = "Team Member"
+
+    assert cache.get("token")["role"] == "Admin"
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put("a", claims())
+    cache.put("b", claims())
+    assert cache.get("a") is not None
+
+    cache.put("c", claims())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats.snapshot()["evictions"] == 1
+
+
+def test_revoke_user_rounds_the_cutoff_down(cache, clock):
+    cache.put("old", claims(iat=999))
+    clock.now = 1000.7
+
+    cache.revoke_user("user-1")
+
+    # The cached session is dropped and cannot come back
+    assert cache.get("old") is None
+    with pytest.raises(TokenRevokedError):
+        cache.check_claims(claims(iat=999))
+    # A login in the same second as the revocation gets iat=1000 and is let through
+    cache.put("next-login", claims(iat=1000))
+    assert cache.get("next-login") is not None
+    cache.check_claims(claims(user_id="user-2", iat=999))
+
+
+def test_revoke_user_keeps_the_latest_cutoff(cache):
+    cache.revoke_user("user-1", issued_before=1005.5)
+    cache.revoke_user("user-1", issued_before=1001)
+
+    with pytest.raises(TokenRevokedError):
+        cache.check_claims(claims(iat=1004))
+
+
+def test_put_rejects_claims_of_a_revoked_user(cache):
+    cache.revoke_user("user-1")
+
+    with pytest.raises(TokenRevokedError):
+        cache.put("token", claims(iat=999))
+
+    assert cache.info()["entries"] == 0
+    assert cache.stats.snapshot()["rejected"] == 1
+
+
+def test_revoked_token_is_rejected_until_its_exp(cache, clock):
+    cache.put("token", claims(exp=1050))
+    cache.revoke_token("token")
+
+    with pytest.raises(TokenRevokedError):
+        cache.get("token")
+
+    clock.now = 1050
+    cache.revoke_token("other", exp=1100)
+    assert cache.get("token") is None
+    assert cache.info()["revoked_tokens"] == 1
+
+
+def test_prune_revocations_forgets_expired_revocations(cache, clock):
+    cache.revoke_token("token", exp=1010)
+    cache.revoke_user("user-1")
+    assert cache.info()["revoked_tokens"] == 1 and cache.info()["revoked_users"] == 1
+
+    clock.now = 1010
+    cache._prune_revocations()
+    assert cache.info()["revoked_tokens"] == 0
+    assert cache.info()["revoked_users"] == 1
+
+    # Every token the user revocation could deny has expired max_token_lifetime after the cutoff
+    clock.now = 1099.9
+    cache._prune_revocations()
+    assert cache.info()["revoked_users"] == 1
+    clock.now = 1100
+    cache._prune_revocations()
+    assert cache.info()["revoked_users"] == 0
+
+
+def test_local_revocations_notify_listeners(cache):
+    events = []
+    cache.on_revoke(events.append)
+
+    cache.revoke_user("user-1", issued_before=1000.4)
+    cache.revoke_token("token", exp=1500)
+
+    assert events == [{"user_id": "user-1", "issued_before": 1000}, {"digest": token_digest("token"), "exp": 1500}]
+
+
+def test_apply_revocation_does_not_rebroadcast(cache):
+    events = []
+    cache.on_revoke(events.append)
+    cache.put("token", claims(iat=1000))
+
+    cache.apply_revocation({"user_id": "user-1", "issued_before": 1001})
+    cache.apply_revocation({"digest": token_digest("other"), "exp": 1500})
+
+    assert events == []
+    assert cache.get("token") is None
+    with pytest.raises(TokenRevokedError):
+        cache.get("other")
+
+
+def test_failing_listener_does_not_fail_the_revocation(cache):
+    def fail(event):
+        raise ConnectionError("redis is down")
+
+    cache.on_revoke(fail)
+    cache.revoke_user("user-1")
+
+    with pytest.raises(TokenRevokedError):
+        cache.check_claims(claims(iat=999))
+
+
+def test_redis_channel_shares_revocations_between_workers(clock):
+    client = FakeRedis()
+    first = VerifiedTokenCache(max_entries=10, clock=clock, max_token_lifetime=100)
+    second = VerifiedTokenCache(max_entries=10, clock=clock, max_token_lifetime=100)
+    first.on_revoke(RedisRevocationChannel(client, first).publish)
+    channel = RedisRevocationChannel(client, second)
+    second.put("token", claims(iat=999))
+
+    first.revoke_user("user-1")
+    client.pending = [payload for _, payload in client.published]
+    with pytest.raises(StopListening):
+        channel._subscribe_forever()
+
+    assert client.calls[:2] == [("subscribe", "tr:events"), ("hgetall", "tr:revocations")]
+    assert second.get("token") is None
+    with pytest.raises(TokenRevokedError):
+        second.check_claims(claims(iat=999))
+
+
+def test_redis_channel_loads_stored_events_and_drops_expired_ones(clock):
+    client = FakeRedis()
+    publisher = RedisRevocationChannel(client, VerifiedTokenCache(max_entries=10, clock=clock))
+    publisher.publish({"user_id": "user-1", "issued_before": 1000})
+    publisher.publish({"user_id": "user-2", "issued_before": 800})
+    publisher.publish({"digest": token_digest("token"), "exp": 1000})
+    publisher.publish({"digest": token_digest("other"), "exp": 1200})
+
+    cache = VerifiedTokenCache(max_entries=10, clock=clock, max_token_lifetime=100)
+    RedisRevocationChannel(client, cache)._load_stored()
+
+    assert sorted(client.hashes["tr:revocations"]) == [f"token:{token_digest('other')}".encode(), b"user:user-1"]
+    assert cache.info() == {"entries": 0, "max_entries": 10, "revoked_tokens": 1, "revoked_users": 1}
+
+
+def test_init_token_cache_wires_the_redis_backend():
+    app = Flask(__name__)
+    app.config.update(TOKEN_REVOCATION_BACKEND="redis", TOKEN_CACHE_MAX_ENTRIES=5)
+    client = FakeRedis()
+
+    init_token_cache(app, client=client)
+    app.extensions["token_cache"].revoke_user("user-1", issued_before=1000)
+
+    assert app.extensions["token_revocations"].client is client
+    assert client.published == [("tr:events", json.dumps({"user_id": "user-1", "issued_before": 1000}))]
+
+
+def test_init_token_cache_rejects_an_unknown_backend():
+    app = Flask(__name__)
+    app.config["TOKEN_REVOCATION_BACKEND"] = "memcached"
+
+    with pytest.raises(ValueError):
+        init_token_cache(app)